@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Cost of failure classification over saved and synthetic failure logs.
+
+Times the streaming classifier (``classify_failure_stream`` on an open file)
+against the frozen whole-text classifier from
+``tests/failure_taxonomy_fixtures.py`` on every saved ``logs/pdf_errors/*.log``
+(when present) and on seeded synthetic LaTeX logs, then
+``load_failure_records`` (what ``scripts/summarize_failures.py`` runs) over a
+generated sidecar directory.  Offline, standard library only:
+
+    python3 benchmarks/failure_taxonomy_bench.py [--logs DIR] [--sidecars 300] [--json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from failure_taxonomy import classify_failure_stream  # noqa: E402
+from failure_taxonomy_fixtures import (  # noqa: E402
+    reference_classify_failure,
+    reference_load_failure_records,
+    synthetic_log,
+    write_sidecars,
+)
+from paperhub.failure_reports import load_failure_records  # noqa: E402
+from paperhub.paths import LOGS_DIR  # noqa: E402
+
+SYNTHETIC_CASES = (
+    ("clean_20k_lines", 20000, 0.0),
+    ("clean_80k_lines", 80000, 0.0),
+    ("sparse_80k_lines", 80000, 0.0005),
+    ("dense_20k_lines", 20000, 0.02),
+)
+
+
+def _best_seconds(function, repeat):
+    best = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _reference_file(path):
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        return reference_classify_failure("compile", handle.read())
+
+
+def _streamed_file(path):
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        return classify_failure_stream("compile", handle)
+
+
+def _row(name, paths, repeat):
+    size = sum(os.path.getsize(path) for path in paths)
+    reference = _best_seconds(lambda: [_reference_file(path) for path in paths], repeat)
+    streamed = _best_seconds(lambda: [_streamed_file(path) for path in paths], repeat)
+    return {
+        "corpus": name,
+        "logs": len(paths),
+        "mb": round(size / 1e6, 2),
+        "reference_ms": round(1e3 * reference, 1),
+        "stream_ms": round(1e3 * streamed, 1),
+        "speedup": round(reference / streamed, 2) if streamed else None,
+    }
+
+
+def run(logs_dir=None, sidecars=300, seed=20261019, repeat=3):
+    rows = []
+    saved = sorted(glob.glob(os.path.join(logs_dir, "*.log"))) if logs_dir else []
+    if saved:
+        rows.append(_row("saved_logs", saved, repeat))
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, lines, rate in SYNTHETIC_CASES:
+            path = os.path.join(tmp, name + ".log")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(synthetic_log(rng, lines, rate))
+            rows.append(_row(name, [path], repeat))
+
+        error_dir = os.path.join(tmp, "pdf_errors")
+        os.makedirs(error_dir)
+        # 每 10 篇一份数 MB 的驱动日志，接近真实 pdf_errors 目录
+        write_sidecars(error_dir, rng, count=sidecars, lines=400, big_lines=60000)
+        paths = glob.glob(os.path.join(error_dir, "*"))
+        reference = _best_seconds(lambda: reference_load_failure_records(error_dir), repeat)
+        streamed = _best_seconds(lambda: load_failure_records(error_dir), repeat)
+        rows.append({
+            "corpus": "load_failure_records",
+            "logs": sidecars,
+            "mb": round(sum(os.path.getsize(path) for path in paths) / 1e6, 2),
+            "reference_ms": round(1e3 * reference, 1),
+            "stream_ms": round(1e3 * streamed, 1),
+            "speedup": round(reference / streamed, 2) if streamed else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--logs", default=os.path.join(LOGS_DIR, "pdf_errors"),
+        help="已保存的失败日志目录（默认 logs/pdf_errors，不存在则只跑合成语料）",
+    )
+    parser.add_argument("--sidecars", type=int, default=300, help="合成 sidecar 数（默认 300）")
+    parser.add_argument("--seed", type=int, default=20261019)
+    parser.add_argument("--repeat", type=int, default=3, help="每项取最快的一次（默认 3 次）")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rows = run(logs_dir=args.logs, sidecars=args.sidecars, seed=args.seed, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+    print(f"{'corpus':<22}{'logs':>6}{'MB':>8}{'reference ms':>14}{'stream ms':>11}{'speedup':>9}")
+    for row in rows:
+        print(
+            f"{row['corpus']:<22}{row['logs']:>6}{row['mb']:>8}"
+            f"{row['reference_ms']:>14}{row['stream_ms']:>11}{row['speedup']:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Timing and regression gate for the hot ``latex_translation_filters`` predicates.
+
+The driver runs the response predicates once per chunk and the XeLaTeX
+fallbacks once per document, so a regex that turns super-linear on one odd
+line stalls a whole translation.  This suite times each predicate over the
+curated anonymized corpus in ``benchmarks/tex_corpus/`` (full documents and
+source/response chunk pairs) plus generated adversarial inputs (long lines,
+deep brace nesting, backslash runs, unclosed math), and fails when
+
+* a function's corpus cost regresses more than ``threshold`` against the
+  JSON baseline (``latex_filters_baseline.json``),
+* any single case exceeds the function's per-kilobyte budget, or
+* an adversarial input grows super-linearly (time ratio at 4x size above
+  ``growth_limit``).
+
+Timings are normalized by a fixed calibration workload so a baseline recorded
+on one machine is usable on another.  Offline, standard library only:
+
+    python3 benchmarks/latex_filters_bench.py [--json] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import latex_translation_filters as filters  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "tex_corpus")
+BASELINE_PATH = os.path.join(BENCH_DIR, "latex_filters_baseline.json")
+DEFAULT_THRESHOLD = 1.0
+DEFAULT_GROWTH_LIMIT = 8.0
+# 线性实现 4 倍输入约 4 倍耗时，二次方约 16 倍；8 倍留出计时噪声余量
+GROWTH_FACTOR = 4
+MIN_TIMING_SECONDS = 0.02
+# 极短用例（空响应等）按 0.25 KB 计，避免固定开销被换算成离谱的 µs/KB
+MIN_CASE_KB = 0.25
+
+PROMPT = (
+    "Below is a section from an English academic paper, translate it into "
+    "Chinese. Do not modify any latex command. Answer me only with the "
+    "translated text:\n\n"
+)
+PAIR_FUNCTIONS = (
+    "llm_translation_response_invalid",
+    "llm_translation_response_untranslated",
+    "normalize_llm_translation_response",
+)
+LINE_FUNCTION = "mixed_untranslated_english_clauses"
+DOCUMENT_FUNCTION = "add_xelatex_compatibility_fallbacks"
+FUNCTIONS = PAIR_FUNCTIONS + (LINE_FUNCTION, DOCUMENT_FUNCTION)
+
+
+def _read(name):
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as handle:
+        return handle.read()
+
+
+def load_corpus():
+    """``(documents, chunks)``: ``{name: text}`` and ``[{name, source, response}]``."""
+    documents = {
+        name[:-4]: _read(name)
+        for name in sorted(os.listdir(CORPUS_DIR))
+        if name.endswith(".tex")
+    }
+    chunks = json.loads(_read("chunks.json"))
+    return documents, chunks
+
+
+# Adversarial generators: ``size`` is the approximate payload in characters.
+
+def long_english_line(size):
+    words = ("the model retrieves evidence from every passage and then reranks "
+             "each sentence with a cross encoder before fusion").split()
+    out, length, index = [], 0, 0
+    while length < size:
+        word = words[index % len(words)]
+        out.append(word)
+        length += len(word) + 1
+        index += 1
+    return " ".join(out)
+
+
+def long_mixed_line(size):
+    unit = "检索阶段 keeps the top candidates while 重排序 stage reorders the sentences 并拼接，"
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def deep_nesting(size):
+    depth = max(1, size // 16)
+    return "\\textbf{" * depth + "深层嵌套 text" + "}" * depth
+
+
+def backslash_runs(size):
+    unit = "\\\\\\% 50\\% of \\{x\\} "
+    return unit * (size // len(unit) + 1)
+
+
+def unclosed_math(size):
+    return "设 $x = " + "a_i + " * (size // 6) + " 其中 we sum over all indices without closing"
+
+
+def citation_storm(size):
+    unit = "如文献~\\cite{anon2020,anon2021,anon2022} 所述，"
+    return unit * (size // len(unit) + 1)
+
+
+def brace_heavy_preamble(size):
+    lines = ["\\documentclass{article}", "\\usepackage[utf8]{inputenc}"]
+    index = 0
+    while sum(len(line) + 1 for line in lines) < size:
+        lines.append(
+            "\\newcommand{\\m%s}{{\\bfseries{\\itshape{x}}}} %% \\begin{document} example"
+            % _letters(index)
+        )
+        index += 1
+    lines += ["\\begin{document}", "正文。", "\\end{document}"]
+    return "\n".join(lines) + "\n"
+
+
+def _letters(index):
+    name = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = chr(97 + rest) + name
+    return name
+
+
+LINE_GENERATORS = (
+    long_english_line,
+    long_mixed_line,
+    deep_nesting,
+    backslash_runs,
+    unclosed_math,
+    citation_storm,
+)
+ADVERSARIAL_SIZE = 8192
+
+
+def _pair_args(payload):
+    # 响应为源文本的中文化改写：保持结构一致，谓词会走完整检查路径
+    return (PROMPT + payload, payload.replace("the", "该"))
+
+
+def build_cases(documents, chunks, size=ADVERSARIAL_SIZE):
+    """``{function: [(case, args, kilobytes, generator or None)]}``."""
+    cases = {name: [] for name in FUNCTIONS}
+    for chunk in chunks:
+        args = (chunk["source"], chunk["response"])
+        kb = (len(chunk["source"]) + len(chunk["response"])) / 1024
+        for name in PAIR_FUNCTIONS:
+            cases[name].append((chunk["name"], args, kb, None))
+        cases[LINE_FUNCTION].append((chunk["name"], (chunk["response"],), len(chunk["response"]) / 1024, None))
+    for generator in LINE_GENERATORS:
+        payload = generator(size)
+        for name in PAIR_FUNCTIONS:
+            args = _pair_args(payload)
+            cases[name].append((generator.__name__, args, sum(map(len, args)) / 1024, generator))
+        cases[LINE_FUNCTION].append((generator.__name__, (payload,), len(payload) / 1024, generator))
+    for doc_name, text in documents.items():
+        cases[DOCUMENT_FUNCTION].append((doc_name, (text,), len(text) / 1024, None))
+        # 逐行调用与 analyze_tex 的使用方式一致
+        cases[LINE_FUNCTION].append(("lines:" + doc_name, (text,), len(text) / 1024, None))
+    preamble = brace_heavy_preamble(size)
+    cases[DOCUMENT_FUNCTION].append(("brace_heavy_preamble", (preamble,), len(preamble) / 1024, brace_heavy_preamble))
+    return cases
+
+
+def _callable(name, case):
+    function = getattr(filters, name)
+    if name == LINE_FUNCTION and case.startswith("lines:"):
+        def per_line(text):
+            for line in text.splitlines():
+                function(line)
+        return per_line
+    return function
+
+
+def best_seconds(function, args, repeat=3):
+    """Best per-call wall time over ``repeat`` rounds of at least 20 ms each."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function(*args)
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_TIMING_SECONDS:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(MIN_TIMING_SECONDS / elapsed * 1.2))
+    best = elapsed / number
+    for _ in range(max(1, repeat) - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function(*args)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def calibration_seconds(repeat=3):
+    """Fixed regex/str workload used to normalize machine speed."""
+    text = long_english_line(4096) + " 中文混排 " * 64
+    pattern = re.compile(r"\b[A-Za-z][A-Za-z-]{2,}\b")
+
+    def workload():
+        pattern.findall(text)
+        text.lower().split()
+        sorted(text)
+
+    return best_seconds(workload, (), repeat)
+
+
+def run(repeat=3, size=ADVERSARIAL_SIZE, growth=True):
+    documents, chunks = load_corpus()
+    cases = build_cases(documents, chunks, size)
+    rows = []
+    calibrations = []
+    for name in FUNCTIONS:
+        # 沙箱/笔记本 CPU 频率会漂移：校准紧挨着每个函数测，取前后两次的较小值
+        calibration = calibration_seconds(repeat)
+        total_seconds = total_kb = 0.0
+        case_rows = []
+        growth_ratio, growth_case = 0.0, ""
+        for case, args, kb, generator in cases[name]:
+            function = _callable(name, case)
+            seconds = best_seconds(function, args, repeat)
+            total_seconds += seconds
+            total_kb += kb
+            case_rows.append({"case": case, "us_per_kb": round(1e6 * seconds / max(kb, MIN_CASE_KB), 2)})
+            if growth and generator is not None:
+                larger = generator(size * GROWTH_FACTOR)
+                larger_args = (
+                    _pair_args(larger) if name in PAIR_FUNCTIONS else (larger,)
+                )
+                ratio = best_seconds(function, larger_args, repeat) / max(seconds, 1e-9)
+                if ratio > growth_ratio:
+                    growth_ratio, growth_case = ratio, case
+        worst = max(case_rows, key=lambda row: row["us_per_kb"])
+        calibration = min(calibration, calibration_seconds(repeat))
+        calibrations.append(calibration)
+        rows.append({
+            "function": name,
+            "calibration_us": round(1e6 * calibration, 2),
+            "us_per_kb": round(1e6 * total_seconds / max(total_kb, 1e-3), 2),
+            "worst_case": worst["case"],
+            "worst_us_per_kb": worst["us_per_kb"],
+            "growth_ratio": round(growth_ratio, 2),
+            "growth_case": growth_case,
+            "cases": case_rows,
+        })
+    median = sorted(calibrations)[len(calibrations) // 2]
+    return {"calibration_us": round(1e6 * median, 2), "functions": rows}
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def compare(result, baseline, threshold=None, growth_limit=None):
+    """Return human-readable failures of ``result`` against ``baseline``."""
+    baseline = baseline or {}
+    threshold = baseline.get("threshold", DEFAULT_THRESHOLD) if threshold is None else threshold
+    growth_limit = (
+        baseline.get("growth_limit", DEFAULT_GROWTH_LIMIT)
+        if growth_limit is None else growth_limit
+    )
+    failures = []
+    recorded = baseline.get("functions", {})
+    for row in result["functions"]:
+        name = row["function"]
+        entry = recorded.get(name, {})
+        # 把本机耗时换算到录制基线时的机器速度（各函数用各自紧邻的校准值）
+        scale = 1.0
+        recorded_calibration = entry.get("calibration_us") or baseline.get("calibration_us")
+        current_calibration = row.get("calibration_us") or result.get("calibration_us")
+        if recorded_calibration and current_calibration:
+            scale = recorded_calibration / current_calibration
+        current = row["us_per_kb"] * scale
+        if entry.get("us_per_kb") and current > entry["us_per_kb"] * (1 + threshold):
+            failures.append(
+                f"{name}: {current:.1f} µs/KB 比基线 {entry['us_per_kb']:.1f} "
+                f"慢 {100 * (current / entry['us_per_kb'] - 1):.0f}%（阈值 {100 * threshold:.0f}%）"
+            )
+        worst = row["worst_us_per_kb"] * scale
+        if entry.get("budget_us_per_kb") and worst > entry["budget_us_per_kb"]:
+            failures.append(
+                f"{name}: 用例 {row['worst_case']} {worst:.1f} µs/KB 超出预算 "
+                f"{entry['budget_us_per_kb']:.1f} µs/KB"
+            )
+        if row["growth_ratio"] > growth_limit:
+            failures.append(
+                f"{name}: 用例 {row['growth_case']} 输入放大 {GROWTH_FACTOR} 倍耗时放大 "
+                f"{row['growth_ratio']:.1f} 倍（上限 {growth_limit:.1f}），疑似超线性"
+            )
+    return failures
+
+
+def updated_baseline(result, baseline=None):
+    """Record ``result`` as the new baseline, keeping hand-set budgets."""
+    baseline = dict(baseline or {})
+    previous = baseline.get("functions", {})
+    functions = {}
+    for row in result["functions"]:
+        entry = dict(previous.get(row["function"], {}))
+        entry["us_per_kb"] = row["us_per_kb"]
+        entry["calibration_us"] = row.get("calibration_us", result["calibration_us"])
+        # 新函数的预算默认取最差用例的 5 倍，之后由维护者手工调整
+        entry.setdefault("budget_us_per_kb", round(5 * row["worst_us_per_kb"], -1) or 10.0)
+        functions[row["function"]] = entry
+    baseline.update({
+        "calibration_us": result["calibration_us"],
+        "threshold": baseline.get("threshold", DEFAULT_THRESHOLD),
+        "growth_limit": baseline.get("growth_limit", DEFAULT_GROWTH_LIMIT),
+        "functions": functions,
+    })
+    return baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="每项取最快的一次（默认 3 次）")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=None, help="相对基线的允许退化比例（默认取基线文件，1.0 即慢一倍）")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果写为新基线（保留已有预算）")
+    parser.add_argument("--no-growth", action="store_true", help="跳过 4 倍输入的超线性检查")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = run(repeat=args.repeat, growth=not args.no_growth)
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(updated_baseline(result, baseline), handle, ensure_ascii=False, indent=2)
+            handle.write("\n")
+        print(f"基线已写入 {args.baseline}")
+        return 0
+
+    failures = compare(result, baseline, threshold=args.threshold)
+    if args.json:
+        print(json.dumps(dict(result, failures=failures), ensure_ascii=False, indent=2))
+    else:
+        print(f"{'function':<40}{'µs/KB':>9}{'worst µs/KB':>13}{'growth':>8}  worst case")
+        for row in result["functions"]:
+            print(
+                f"{row['function']:<40}{row['us_per_kb']:>9}{row['worst_us_per_kb']:>13}"
+                f"{row['growth_ratio']:>8}  {row['worst_case']}"
+            )
+        if baseline is None:
+            print("⚠️ 未找到基线文件，只检查超线性；用 --update-baseline 录制基线")
+        for failure in failures:
+            print("❌ " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
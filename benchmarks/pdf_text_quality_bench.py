@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Per-page cost of the PDF text-quality analyzer.
+
+Times ``PdfTextAnalyzer`` (single pass over line records) against the frozen
+multi-pass analyzer from ``tests/pdf_text_fixtures.py`` on the seeded
+synthetic corpus, overall and per page class.  Offline, standard library only:
+
+    python3 benchmarks/pdf_text_quality_bench.py [--documents 200] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from paperhub.pdf_text_quality import PdfTextAnalyzer  # noqa: E402
+from pdf_text_fixtures import (  # noqa: E402
+    PAGE_KINDS,
+    ReferencePdfTextAnalyzer,
+    synthetic_documents,
+    synthetic_page,
+)
+
+
+def _pages(text):
+    pages = text.split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    return pages
+
+
+def _best_seconds(analyzer_class, documents, repeat):
+    best = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        for pages in documents:
+            analyzer = analyzer_class()
+            for page in pages:
+                analyzer.feed(page)
+            analyzer.report()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _row(name, documents, repeat):
+    pages = sum(len(document) for document in documents)
+    single = _best_seconds(PdfTextAnalyzer, documents, repeat)
+    multi = _best_seconds(ReferencePdfTextAnalyzer, documents, repeat)
+    return {
+        "corpus": name,
+        "pages": pages,
+        "single_pass_us_per_page": round(1e6 * single / max(1, pages), 1),
+        "multi_pass_us_per_page": round(1e6 * multi / max(1, pages), 1),
+        "speedup": round(multi / single, 2) if single else None,
+    }
+
+
+def run(documents=200, seed=20261019, repeat=3, pages_per_kind=300):
+    corpus = [_pages(text) for text in synthetic_documents(seed=seed, count=documents)]
+    rows = [_row("all", corpus, repeat)]
+    rng = random.Random(seed)
+    for kind, _ in PAGE_KINDS:
+        pages = [synthetic_page(rng, kind, number) for number in range(pages_per_kind)]
+        # 每类页面按 20 页一份文档喂给分析器，跨页状态与真实文档一致
+        kind_documents = [pages[index:index + 20] for index in range(0, len(pages), 20)]
+        rows.append(_row(kind, kind_documents, repeat))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200, help="合成文档数（默认 200）")
+    parser.add_argument("--seed", type=int, default=20261019)
+    parser.add_argument("--repeat", type=int, default=3, help="每项取最快的一次（默认 3 次）")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rows = run(documents=args.documents, seed=args.seed, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+    print(f"{'corpus':<14}{'pages':>7}{'single µs/页':>14}{'multi µs/页':>13}{'speedup':>9}")
+    for row in rows:
+        print(
+            f"{row['corpus']:<14}{row['pages']:>7}"
+            f"{row['single_pass_us_per_page']:>14}{row['multi_pass_us_per_page']:>13}"
+            f"{row['speedup']:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
-"""Stable failure taxonomy shared by the container driver and host logs."""
+"""Stable failure taxonomy shared by the container driver and host logs.
 
+Logs are classified as a stream (:class:`FailureLogClassifier`,
+:func:`classify_failure_stream`) with bounded memory; :func:`classify_failure`
+is the string entry point.  Standard library only.
+"""
+
+import codecs
 import re
 from typing import Dict
 
@@ -71,216 +77,690 @@ def quality_failure(category: str, evidence: str = "") -> Dict[str, object]:
     )
 
 
-def _evidence(text: str, pattern: str) -> str:
-    match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-    if not match:
-        return ""
-    start = max(0, match.start() - 100)
-    end = min(len(text), match.end() + 180)
-    return " ".join(text[start:end].split())
+# ── Streaming classifier ────────────────────────────────────────────────
+#
+# Each rule pattern is listed with lowercase literals, one of which every
+# match contains.  A block of log text is lowercased once and searched for
+# the literals of the still-pending patterns with ``str.find``; only the lines
+# that contain one are run through the regexes.  (A single alternation of all
+# patterns is slower in ``re`` than the separate searches were.)  A pattern
+# without a usable literal is searched directly.  Patterns match within one
+# line, except those with ``\s`` (which also matches a newline): their last
+# line still holds the literal, and they are searched over the previous
+# ``_SPAN_CHARS`` of the log plus that line, so pretty-printed JSON and TeX's
+# 79-column wrapping still match.  The ``.*?`` under ``re.S`` rules become
+# "``first``, then ``then`` anywhere later".
 
 
-def classify_failure(phase: str, latex_log: str = "", plugin_error: str = "") -> Dict[str, object]:
-    """Classify a failure into a stable code and an actionable retry strategy."""
-    latex = latex_log or ""
-    plugin = plugin_error or ""
-    combined = f"{plugin}\n{latex}"
-
-    if phase == "translate":
-        if re.search(
-            r"insufficient[_ ](?:user[_ ])?quota|insufficient.*balance|"
-            r"balance .* is insufficient|额度不足|余额不足",
-            plugin,
-            re.I,
-        ):
-            return _result(
-                "translate.api_quota", "api", "manual_review", "recharge_api_balance",
-                "API 余额或额度不足；充值或切换已授权模型凭据后再重试。",
-                _evidence(
-                    plugin,
-                    r"insufficient[_ ](?:user[_ ])?quota|insufficient.*balance|"
-                    r"balance .* is insufficient|额度不足|余额不足",
-                ),
-            )
-        if re.search(r"FileNotFoundError.*(?:workfolder|gpt_log/arxiv_cache)", plugin, re.I | re.S):
-            return _result(
-                "runtime.workdir_missing", "runtime_path", "reuse_translation", "normalize_compile_workdir",
-                "编译工作目录解析失败；规范化容器绝对路径后复用翻译缓存重编译。",
-                _evidence(plugin, r"FileNotFoundError.*(?:workfolder|gpt_log/arxiv_cache)"),
-            )
-        if re.search(r"Tex源文件缺失|source.*not found|找不到.*(?:tex|sty|cls)", plugin, re.I):
-            return _result(
-                "translate.source_missing", "source", "restore_source", "verify_source_manifest",
-                "源码包或被引用的 TeX 文件缺失；先恢复源码，再重新翻译。",
-                _evidence(plugin, r"Tex源文件缺失|source.*not found|找不到.*(?:tex|sty|cls)"),
-            )
-        if re.search(r"401|403|unauthori[sz]ed|invalid.*api.?key", plugin, re.I):
-            return _result(
-                "translate.api_auth", "api", "manual_review", "fix_api_credentials",
-                "API 鉴权失败；修复凭据后再重试。", _evidence(plugin, r"401|403|unauthori[sz]ed|invalid.*api.?key"),
-            )
-        if re.search(r"429|rate.?limit|too many requests", plugin, re.I):
-            return _result(
-                "translate.api_rate_limit", "api", "retry_later", "backoff_translation",
-                "API 触发限流；退避后重新翻译。", _evidence(plugin, r"429|rate.?limit|too many requests"),
-            )
-        if re.search(r"timeout|timed out|connection reset|temporary failure", plugin, re.I):
-            return _result(
-                "translate.network_timeout", "network", "retry_translation", "retry_with_backoff",
-                "网络或 API 请求超时；保留源码并退避重试翻译。",
-                _evidence(plugin, r"timeout|timed out|connection reset|temporary failure"),
-            )
-        if re.search(r"RuntimeError", plugin):
-            return _result(
-                "translate.plugin_runtime", "plugin", "retry_translation", "inspect_plugin_runtime",
-                "翻译插件运行时异常；检查 traceback，修复后重新翻译。", _evidence(plugin, r"RuntimeError"),
-            )
-        if re.search(r"Traceback|\bError:", plugin):
-            return _result(
-                "translate.plugin_exception", "plugin", "retry_translation", "inspect_plugin_traceback",
-                "翻译插件抛出异常；根据 traceback 定位后重新翻译。", _evidence(plugin, r"Traceback|\bError:"),
-            )
-        return _result(
+def _pattern(regex, *anchors):
+    return regex, anchors
+
+
+def _watch(source, pattern, flags=re.I, then=None):
+    return ("watch", source, pattern, flags, then)
+
+
+_QUOTA = _pattern(
+    r"insufficient[_ ](?:user[_ ])?quota|insufficient.*balance|"
+    r"balance .* is insufficient|额度不足|余额不足",
+    "insufficient", "额度不足", "余额不足",
+)
+_FILE_NOT_FOUND = _pattern(r"FileNotFoundError", "filenotfounderror")
+_WORKDIR = _pattern(r"(?:workfolder|gpt_log/arxiv_cache)", "workfolder", "gpt_log/arxiv_cache")
+_WORKDIR_EVIDENCE = _pattern(r"FileNotFoundError.*(?:workfolder|gpt_log/arxiv_cache)", "filenotfounderror")
+_SOURCE_MISSING = _pattern(r"Tex源文件缺失|source.*not found|找不到.*(?:tex|sty|cls)", "tex源文件缺失", "source", "找不到")
+_AUTH = _pattern(r"401|403|unauthori[sz]ed|invalid.*api.?key", "401", "403", "unauthori", "invalid")
+_RATE_LIMIT = _pattern(r"429|rate.?limit|too many requests", "429", "rate", "too many requests")
+_TIMEOUT = _pattern(
+    r"timeout|timed out|connection reset|temporary failure",
+    "timeout", "timed out", "connection reset", "temporary failure",
+)
+_RUNTIME = _pattern(r"RuntimeError", "runtimeerror")
+_TRACEBACK = _pattern(r"Traceback|\bError:", "traceback", "error:")
+
+_UNDEFINED = _pattern(r"Undefined control sequence", "undefined control sequence")
+_CAPACITY = _pattern(r"TeX capacity exceeded|input stack size", "tex capacity exceeded", "input stack size")
+_ASSET = _pattern(
+    r"Image inclusion failed|Could not find file:.*\.(?:png|jpe?g|pdf|eps)",
+    "image inclusion failed", "could not find file:",
+)
+_DEPENDENCY = _pattern(r"File [`']?[^\n`']+\.(?:sty|cls|def)[`']? not found", " not found")
+_CJK_ENVIRONMENT = _pattern(r"Environment CJK\*? undefined", "environment cjk")
+_END_CJK = _pattern(r"endCJK\*?", "endcjk")
+_CJK_EVIDENCE = _pattern(
+    r"Environment CJK\*? undefined|Undefined control sequence.*?endCJK\*?",
+    "environment cjk", "undefined control sequence",
+)
+_RESPONSE_LEAK = _pattern(r'"translation"\s*:\s*"\\\\section|\[\s*"\\\\section', r'"\\section')
+_SOURCESANS3 = _pattern(r'fontspec Error: The font "SourceSans3-', 'fontspec error: the font "sourcesans3-')
+_PDFTEX_DRIVER = _pattern(r"\\(?:pdfshellescape|pdfcolorstack)", r"\pdfshellescape", r"\pdfcolorstack")
+_PDFTEX_PRIMITIVE = _pattern(
+    r"\\pdf(?:infoomitdate|trailerid|suppressptexinfo|gentounicode|output|inclusioncopyfonts)",
+    r"\pdfinfoomitdate", r"\pdftrailerid", r"\pdfsuppressptexinfo",
+    r"\pdfgentounicode", r"\pdfoutput", r"\pdfinclusioncopyfonts",
+)
+_END_TCOLORBOX = _pattern(r"\\endtcolorbox", r"\endtcolorbox")
+_END_TCOLORBOX_EVIDENCE = _pattern(r"Undefined control sequence.*?\\endtcolorbox", r"\endtcolorbox")
+_TIKZ_MATRIX = _pattern(
+    r"\\pgf@matrix@last@nextcell@options|matrix of nodes",
+    r"\pgf@matrix@last@nextcell@options", "matrix of nodes",
+)
+# 任何宏都以反斜杠开头，没有可用的字面量：直接用正则扫描
+_DUPLICATED_INITIAL = _pattern(r"\\([A-Za-z])\1[A-Za-z@]+")
+_STRUCTURE = _pattern(
+    r"begin\{document\} ended by|Runaway argument|Missing \}|Extra \}|Emergency stop",
+    "begin{document} ended by", "runaway argument", "missing }", "extra }", "emergency stop",
+)
+_NUMERIC = _pattern(r"Missing number|Illegal unit of measure", "missing number", "illegal unit of measure")
+_MATH = _pattern(
+    r"Missing \$ inserted|Extra alignment tab|Misplaced alignment tab",
+    "missing $ inserted", "extra alignment tab", "misplaced alignment tab",
+)
+_PROTECTED = _pattern(r"tcblisting|lstlisting|minted|verbatim", "tcblisting", "lstlisting", "minted", "verbatim")
+_PACKAGE_ERROR = _pattern(r"LaTeX Error|Package .* Error", " error")
+_COVERAGE = _pattern(r"翻译覆盖率检查失败|translation coverage.*failed", "翻译覆盖率检查失败", "translation coverage")
+_RESOURCE = _pattern(
+    r"out of memory|cannot allocate memory|(?:process |compile )killed|"
+    r"segmentation fault|(?:compile|compilation|command) timed? ?out",
+    "out of memory", "cannot allocate memory", "killed", "segmentation fault",
+    "compile time", "compilation time", "command time",
+)
+_LATEX_ERROR = _pattern(r"LaTeX Error|Package .* Error|Fatal error", " error")
+
+
+def _quality_fields(category):
+    spec = QUALITY_FAILURE_SPECS[category]
+    return category, spec["family"], spec["retry_strategy"], spec["repair_action"], spec["suggestion"]
+
+
+# Rules in priority order.  ``when`` is a watch, ``("any"|"all", ...)`` of
+# watches, or ``None`` for the fallback; ``evidence`` is ``(source, pattern)``
+# for the window around its first match, or ``(source, None)`` for the head of
+# that source.  Sources: ``plugin``, ``latex`` and ``combined`` (the plugin
+# error, a newline, then the LaTeX log).
+_TRANSLATE_RULES = (
+    {
+        "when": _watch("plugin", _QUOTA),
+        "evidence": ("plugin", _QUOTA),
+        "result": (
+            "translate.api_quota", "api", "manual_review", "recharge_api_balance",
+            "API 余额或额度不足；充值或切换已授权模型凭据后再重试。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _FILE_NOT_FOUND, then=_WORKDIR),
+        "evidence": ("plugin", _WORKDIR_EVIDENCE),
+        "result": (
+            "runtime.workdir_missing", "runtime_path", "reuse_translation", "normalize_compile_workdir",
+            "编译工作目录解析失败；规范化容器绝对路径后复用翻译缓存重编译。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _SOURCE_MISSING),
+        "evidence": ("plugin", _SOURCE_MISSING),
+        "result": (
+            "translate.source_missing", "source", "restore_source", "verify_source_manifest",
+            "源码包或被引用的 TeX 文件缺失；先恢复源码，再重新翻译。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _AUTH),
+        "evidence": ("plugin", _AUTH),
+        "result": (
+            "translate.api_auth", "api", "manual_review", "fix_api_credentials",
+            "API 鉴权失败；修复凭据后再重试。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _RATE_LIMIT),
+        "evidence": ("plugin", _RATE_LIMIT),
+        "result": (
+            "translate.api_rate_limit", "api", "retry_later", "backoff_translation",
+            "API 触发限流；退避后重新翻译。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _TIMEOUT),
+        "evidence": ("plugin", _TIMEOUT),
+        "result": (
+            "translate.network_timeout", "network", "retry_translation", "retry_with_backoff",
+            "网络或 API 请求超时；保留源码并退避重试翻译。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _RUNTIME, flags=0),
+        "evidence": ("plugin", _RUNTIME),
+        "result": (
+            "translate.plugin_runtime", "plugin", "retry_translation", "inspect_plugin_runtime",
+            "翻译插件运行时异常；检查 traceback，修复后重新翻译。",
+        ),
+    },
+    {
+        "when": _watch("plugin", _TRACEBACK, flags=0),
+        "evidence": ("plugin", _TRACEBACK),
+        "result": (
+            "translate.plugin_exception", "plugin", "retry_translation", "inspect_plugin_traceback",
+            "翻译插件抛出异常；根据 traceback 定位后重新翻译。",
+        ),
+    },
+    {
+        "when": None,
+        "evidence": ("plugin", None),
+        "result": (
             "translate.unknown", "translation", "retry_translation", "inspect_translation_output",
-            "翻译阶段未产生 TeX；检查网络、API 与插件输出后重试。", plugin[:500],
-        )
+            "翻译阶段未产生 TeX；检查网络、API 与插件输出后重试。",
+        ),
+    },
+)
 
-    if re.search(r"TeX capacity exceeded|input stack size", latex, re.I):
-        return _result(
+_COMPILE_RULES = (
+    {
+        "when": _watch("latex", _CAPACITY),
+        "evidence": ("latex", _CAPACITY),
+        "result": (
             "compile.macro_recursion", "latex_structure", "reuse_translation", "patch_recursive_macro",
             "宏递归耗尽 TeX 栈；对照原文修复递归宏后复用翻译重编译。",
-            _evidence(latex, r"TeX capacity exceeded|input stack size"),
-        )
-    if re.search(r"Image inclusion failed|Could not find file:.*\.(?:png|jpe?g|pdf|eps)", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _ASSET),
+        "evidence": ("latex", _ASSET),
+        "result": (
             "compile.asset_missing", "asset", "reuse_translation", "replace_missing_graphic",
             "图片资源缺失；恢复资源或插入占位图后复用翻译重编译。",
-            _evidence(latex, r"Image inclusion failed|Could not find file:.*\.(?:png|jpe?g|pdf|eps)"),
-        )
-    if re.search(r"File [`']?[^\n`']+\.(?:sty|cls|def)[`']? not found", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _DEPENDENCY),
+        "evidence": ("latex", _DEPENDENCY),
+        "result": (
             "compile.dependency_missing", "dependency", "reuse_translation", "install_or_stub_dependency",
             "LaTeX 依赖文件缺失；安装依赖或提供兼容 stub 后重编译。",
-            _evidence(latex, r"File [`']?[^\n`']+\.(?:sty|cls|def)[`']? not found"),
-        )
-    if re.search(r"Environment CJK\*? undefined|Undefined control sequence.*?endCJK\*?", latex, re.I | re.S):
-        return _result(
+        ),
+    },
+    {
+        "when": ("any", _watch("latex", _CJK_ENVIRONMENT), _watch("latex", _UNDEFINED, then=_END_CJK)),
+        "evidence": ("latex", _CJK_EVIDENCE),
+        "result": (
             "compile.legacy_cjk_environment", "latex_command", "reuse_translation", "add_cjk_environment_fallback",
             "旧模板使用未加载的 CJK/CJK* 环境；补 XeLaTeX 兼容定义后复用翻译重编译。",
-            _evidence(latex, r"Environment CJK\*? undefined|Undefined control sequence.*?endCJK\*?"),
-        )
-    if re.search(r'"translation"\s*:\s*"\\\\section|\[\s*"\\\\section', latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _RESPONSE_LEAK),
+        "evidence": ("latex", _RESPONSE_LEAK),
+        "result": (
             "compile.model_response_leak", "translation_artifact", "reuse_translation",
             "strip_serialized_translation_artifact",
             "模型序列化响应泄漏进 TeX；清除整行 JSON/list 残留后复用翻译重编译。",
-            _evidence(latex, r'"translation"\s*:\s*"\\\\section|\[\s*"\\\\section'),
-        )
-    if re.search(r'fontspec Error: The font "SourceSans3-', latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _SOURCESANS3),
+        "evidence": ("latex", _SOURCESANS3),
+        "result": (
             "compile.font_family_missing", "latex_font", "reuse_translation",
             "fallback_sourcesans3_family",
             "slim 镜像缺少 SourceSans3 字体族；映射到兼容 SourceSansPro 字体后重编译。",
-            _evidence(latex, r'fontspec Error: The font "SourceSans3-'),
-        )
-    if re.search(r"Undefined control sequence.*?\\(?:pdfshellescape|pdfcolorstack)", latex, re.I | re.S):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _UNDEFINED, then=_PDFTEX_DRIVER),
+        "evidence": ("latex", _UNDEFINED),
+        "result": (
             "compile.engine_driver_mismatch", "latex_engine", "reuse_translation",
             "remove_pdftex_graphics_driver",
             "graphicx 被强制为 pdftex driver；移除错误 driver 选项后由 XeLaTeX 自动选择。",
-            _evidence(latex, r"Undefined control sequence"),
-        )
-    if re.search(
-        r"Undefined control sequence.*?\\pdf(?:infoomitdate|trailerid|suppressptexinfo|gentounicode|output|inclusioncopyfonts)",
-        latex,
-        re.I | re.S,
-    ):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _UNDEFINED, then=_PDFTEX_PRIMITIVE),
+        "evidence": ("latex", _UNDEFINED),
+        "result": (
             "compile.pdftex_primitive", "latex_engine", "reuse_translation", "guard_pdftex_primitive",
             "模板调用了 XeLaTeX 不支持的 pdfTeX 原语；加引擎 guard 后重编译。",
-            _evidence(latex, r"Undefined control sequence"),
-        )
-    if re.search(r"Undefined control sequence.*?\\endtcolorbox", latex, re.I | re.S):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _UNDEFINED, then=_END_TCOLORBOX),
+        "evidence": ("latex", _END_TCOLORBOX_EVIDENCE),
+        "result": (
             "compile.unmatched_environment", "latex_structure", "reuse_translation",
             "remove_unmatched_environment_ending",
             "存在无对应 begin 的环境结束标签；按环境栈移除多余结束标签后重编译。",
-            _evidence(latex, r"Undefined control sequence.*?\\endtcolorbox"),
-        )
-    if re.search(r"\\pgf@matrix@last@nextcell@options|matrix of nodes", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _TIKZ_MATRIX),
+        "evidence": ("latex", _TIKZ_MATRIX),
+        "result": (
             "compile.tikz_matrix_legend", "latex_structure", "reuse_translation",
             "disable_fragile_tikz_matrix_legends",
             "TikZ matrix 图例混入显式 node/draw 后破坏单元格解析；省略图例并保留主图与图注。",
-            _evidence(latex, r"\\pgf@matrix@last@nextcell@options|matrix of nodes"),
-        )
-    if re.search(r"Undefined control sequence.*?\\([A-Za-z])\1[A-Za-z@]+", latex, re.I | re.S):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _UNDEFINED, then=_DUPLICATED_INITIAL),
+        "evidence": ("latex", _UNDEFINED),
+        "result": (
             "compile.duplicated_macro_initial", "translation_artifact", "reuse_translation",
             "repair_duplicated_macro_initials",
             "翻译结果把宏名首字母重复；仅在原文存在对应单首字母宏时恢复宏名。",
-            _evidence(latex, r"Undefined control sequence"),
-        )
-    if re.search(r"Undefined control sequence", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _UNDEFINED),
+        "evidence": ("latex", _UNDEFINED),
+        "result": (
             "compile.undefined_command", "latex_command", "reuse_translation", "patch_undefined_command",
             "存在未定义命令；识别命令来源并补兼容定义或修复宏与中文粘连。",
-            _evidence(latex, r"Undefined control sequence"),
-        )
-    if re.search(r"begin\{document\} ended by|Runaway argument|Missing \}|Extra \}|Emergency stop", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _STRUCTURE),
+        "evidence": ("latex", _STRUCTURE),
+        "result": (
             "compile.structure_mismatch", "latex_structure", "reuse_translation", "restore_tex_structure",
             "环境、参数或大括号结构被破坏；对照原始 TeX 恢复结构后重编译。",
-            _evidence(latex, r"begin\{document\} ended by|Runaway argument|Missing \}|Extra \}|Emergency stop"),
-        )
-    if re.search(r"Missing number|Illegal unit of measure", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _NUMERIC),
+        "evidence": ("latex", _NUMERIC),
+        "result": (
             "compile.numeric_syntax", "latex_syntax", "reuse_translation", "patch_numeric_argument",
             "长度或数值参数语法损坏；修正参数后复用翻译重编译。",
-            _evidence(latex, r"Missing number|Illegal unit of measure"),
-        )
-    if re.search(r"Missing \$ inserted|Extra alignment tab|Misplaced alignment tab", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _MATH),
+        "evidence": ("latex", _MATH),
+        "result": (
             "compile.math_or_alignment", "latex_syntax", "reuse_translation", "restore_math_or_table_syntax",
             "数学或表格对齐语法损坏；从原始 TeX 恢复对应块。",
-            _evidence(latex, r"Missing \$ inserted|Extra alignment tab|Misplaced alignment tab"),
-        )
-    if re.search(r"tcblisting|lstlisting|minted|verbatim", latex, re.I) and re.search(r"LaTeX Error|Package .* Error", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": ("all", _watch("latex", _PROTECTED), _watch("latex", _PACKAGE_ERROR)),
+        "evidence": ("latex", _PROTECTED),
+        "result": (
             "compile.verbatim_corruption", "protected_content", "reuse_translation", "restore_protected_environment",
             "代码或 verbatim 环境被翻译破坏；从原文恢复保护块后重编译。",
-            _evidence(latex, r"tcblisting|lstlisting|minted|verbatim"),
-        )
-    if re.search(r"翻译覆盖率检查失败|translation coverage.*failed", combined, re.I):
-        return quality_failure(
-            "quality.untranslated_prose",
-            _evidence(
-                combined,
-                r"翻译覆盖率检查失败|translation coverage.*failed",
-            ),
-        )
-    if re.search(
-        r"out of memory|cannot allocate memory|(?:process |compile )killed|"
-        r"segmentation fault|(?:compile|compilation|command) timed? ?out",
-        combined,
-        re.I,
-    ):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("combined", _COVERAGE),
+        "evidence": ("combined", _COVERAGE),
+        "result": _quality_fields("quality.untranslated_prose"),
+    },
+    {
+        "when": _watch("combined", _RESOURCE),
+        "evidence": ("combined", _RESOURCE),
+        "result": (
             "compile.resource_exhaustion", "runtime_resource", "retry_later", "reduce_compile_resources",
             "编译资源不足或超时；清理缓存、降低资源压力后重试。",
-            _evidence(
-                combined,
-                r"out of memory|cannot allocate memory|(?:process |compile )killed|"
-                r"segmentation fault|(?:compile|compilation|command) timed? ?out",
-            ),
-        )
-    if re.search(r"LaTeX Error|Package .* Error|Fatal error", latex, re.I):
-        return _result(
+        ),
+    },
+    {
+        "when": _watch("latex", _LATEX_ERROR),
+        "evidence": ("latex", _LATEX_ERROR),
+        "result": (
             "compile.latex_error", "latex", "reuse_translation", "inspect_first_latex_error",
             "LaTeX 编译错误；优先处理日志中的第一个错误后重编译。",
-            _evidence(latex, r"LaTeX Error|Package .* Error|Fatal error"),
-        )
-    return _result(
-        "compile.unknown", "compile", "manual_review", "inspect_compile_log",
-        "未匹配已知编译类型；检查结构化证据和完整日志后扩展分类规则。", latex[:500],
-    )
+        ),
+    },
+    {
+        "when": None,
+        "evidence": ("latex", None),
+        "result": (
+            "compile.unknown", "compile", "manual_review", "inspect_compile_log",
+            "未匹配已知编译类型；检查结构化证据和完整日志后扩展分类规则。",
+        ),
+    },
+)
+
+_EVIDENCE_BEFORE = 100
+_EVIDENCE_AFTER = 180
+_HEAD_CHARS = 500
+_READ_CHARS = 1 << 20
+_SCAN_CHARS = 1 << 16
+_SPAN_CHARS = 4096
+_SEGMENT_SOURCES = {"plugin": ("plugin", "combined"), "latex": ("latex", "combined")}
+
+
+class _Watch:
+    """First match of one pattern (optionally followed by ``then``) in a source."""
+
+    __slots__ = ("source", "regexes", "anchors", "spans", "stage", "done", "match", "text", "evidence")
+
+    def __init__(self, source, pattern, flags, then):
+        stages = (pattern,) if then is None else (pattern, then)
+        self.source = source
+        self.regexes = [re.compile(regex, flags) for regex, _ in stages]
+        self.anchors = [anchors for _, anchors in stages]
+        self.spans = [r"\s" in regex for regex, _ in stages]
+        self.stage = 0
+        self.done = False
+        self.match = None
+        self.text = ""
+        self.evidence = False
+
+    @property
+    def spanning(self) -> bool:
+        return self.spans[self.stage]
+
+    def finders(self):
+        """Lowercase literals to look for, or the regex itself."""
+        return self.anchors[self.stage] or (self.regexes[self.stage],)
+
+    def scan(self, line: str, folded: str, before: str = "") -> bool:
+        """Advance on one line (``folded`` is it lowercased); True on progress.
+
+        ``before`` is the preceding text a spanning pattern may start in; only
+        matches that end on ``line`` count.
+        """
+        anchors = self.anchors[self.stage]
+        if anchors:
+            for anchor in anchors:
+                if anchor in folded:
+                    break
+            else:
+                return False
+        regex = self.regexes[self.stage]
+        text = before + line if before and self.spanning else line
+        offset = len(text) - len(line)
+        match = regex.search(text)
+        while match is not None and match.end() <= offset:
+            match = regex.search(text, match.start() + 1)
+        if match is None:
+            return False
+        if self.stage + 1 < len(self.regexes):
+            self.stage += 1
+            if self.regexes[self.stage].search(text, match.end()) is None:
+                return True
+        self.done = True
+        self.match = match
+        self.text = text
+        return True
+
+
+def _holds(condition) -> bool:
+    if condition is None:
+        return True
+    if isinstance(condition, _Watch):
+        return condition.done
+    parts = (_holds(part) for part in condition[1:])
+    return any(parts) if condition[0] == "any" else all(parts)
+
+
+def _watches(condition):
+    if isinstance(condition, _Watch):
+        yield condition
+    elif condition is not None:
+        for part in condition[1:]:
+            yield from _watches(part)
+
+
+def _split_lines(block: str):
+    lines = block.split("\n")
+    for line in lines[:-1]:
+        yield line + "\n"
+    if lines[-1]:
+        yield lines[-1]
+
+
+class FailureLogClassifier:
+    """Incremental :func:`classify_failure` over streamed text.
+
+    Feed the plugin error first and then the LaTeX log, in chunks of any
+    size; :meth:`result` returns the same dict as :func:`classify_failure` on
+    the concatenated strings.  Memory is bounded by the longest line plus the
+    evidence windows (100 characters before a first match, 180 after, the
+    first 500 characters for the fallback) and the 4 KB window that patterns
+    spanning lines are searched in.  Patterns that can no longer
+    change the verdict are dropped as rules match, and :attr:`done` turns
+    true once the rest of the input cannot change the result.
+    """
+
+    def __init__(self, phase: str):
+        self.phase = phase
+        registry = {}
+
+        def build(spec):
+            if spec is None:
+                return None
+            if spec[0] != "watch":
+                return (spec[0],) + tuple(build(part) for part in spec[1:])
+            key = spec[1:]
+            if key not in registry:
+                registry[key] = _Watch(*key)
+            return registry[key]
+
+        self._rules = []
+        for rule in _TRANSLATE_RULES if phase == "translate" else _COMPILE_RULES:
+            source, pattern = rule["evidence"]
+            evidence = None
+            if pattern is not None:
+                evidence = build(_watch(source, pattern))
+                evidence.evidence = True
+            self._rules.append((build(rule["when"]), source, evidence, rule["result"]))
+        self._segment = "plugin"
+        self._ended = set()
+        self._carry = ""
+        self._tails = {"plugin": "", "latex": "", "combined": ""}
+        self._span_tails = {"plugin": "", "latex": "", "combined": ""}
+        self._heads = {"plugin": "", "latex": ""}
+        self._captures = []
+        self._evidence = {}
+        self._update()
+
+    @property
+    def done(self) -> bool:
+        if self._live:
+            return False
+        _, source, evidence, _ = self._rules[self._best]
+        if evidence is None:
+            return len(self._heads[source]) >= _HEAD_CHARS or source in self._ended
+        return evidence in self._evidence
+
+    def feed(self, text: str, source: str = "latex") -> None:
+        """Consume the next chunk of the ``plugin`` error or the ``latex`` log."""
+        if source not in self._heads:
+            raise ValueError(f"unknown log source: {source}")
+        if source == "plugin" and self._segment == "latex":
+            raise ValueError("the plugin error must be fed before the LaTeX log")
+        if self.done:
+            return
+        if source == "latex" and self._segment == "plugin":
+            self._finish_plugin()
+        buffer = self._carry + text
+        cut = buffer.rfind("\n") + 1
+        self._carry = buffer[cut:]
+        self._scan(buffer[:cut])
+
+    def result(self) -> Dict[str, object]:
+        """Finish the input and return the classification."""
+        if self._segment == "plugin":
+            self._finish_plugin()
+        if self._carry and not self.done:
+            self._scan(self._carry)
+        self._carry = ""
+        self._end(("latex", "combined"))
+        _, source, evidence, fields = self._rules[self._best]
+        if evidence is None:
+            return _result(*fields, self._heads[source])
+        return _result(*fields, self._evidence.get(evidence, ""))
+
+    def _finish_plugin(self) -> None:
+        if self._carry and not self.done:
+            self._scan(self._carry)
+        self._carry = ""
+        self._end(("plugin",))
+        self._segment = "latex"
+        # combined = plugin + "\n" + latex
+        self._advance("\n", ("combined",))
+        self._update()
+
+    def _end(self, sources) -> None:
+        self._ended.update(sources)
+        for capture in [capture for capture in self._captures if capture[0].source in sources]:
+            self._close(capture)
+        self._update()
+
+    def _update(self) -> None:
+        self._best = next(index for index, rule in enumerate(self._rules) if _holds(rule[0]))
+        live = {}
+        for index, (when, _, evidence, _) in enumerate(self._rules[:self._best + 1]):
+            watches = [evidence] if index == self._best else [*_watches(when), evidence]
+            for watch in watches:
+                if watch is not None and not watch.done and watch.source not in self._ended:
+                    live[watch] = None
+        self._live = list(live)
+        sources = _SEGMENT_SOURCES[self._segment]
+        self._live_here = [watch for watch in self._live if watch.source in sources]
+        self._finders = list(dict.fromkeys(
+            finder for watch in self._live_here for finder in watch.finders()
+        ))
+
+    def _scan(self, text: str) -> None:
+        # 按 64 KB 左右的整行分块：结论提前确定时不必把整块小写、查找到底
+        start = 0
+        while start < len(text) and not self.done:
+            end = text.find("\n", start + _SCAN_CHARS) + 1 or len(text)
+            self._scan_block(text[start:end])
+            start = end
+
+    def _scan_block(self, block: str) -> None:
+        folded = block.lower()
+        if len(folded) != len(block):
+            # 极少数字符小写后长度变化，位置无法对齐：逐行检查
+            for line in _split_lines(block):
+                if self.done:
+                    return
+                self._line(line)
+            return
+        position = 0
+        hits = {}
+        while position < len(block) and not self.done:
+            hit = -1
+            for finder in self._finders:
+                cached = hits.get(finder)
+                if cached is None or 0 <= cached < position:
+                    if isinstance(finder, str):
+                        cached = folded.find(finder, position)
+                    else:
+                        match = finder.search(block, position)
+                        cached = match.start() if match else -1
+                    hits[finder] = cached
+                if cached >= 0 and (hit < 0 or cached < hit):
+                    hit = cached
+            if hit < 0:
+                self._advance(block[position:])
+                return
+            start = block.rfind("\n", 0, hit) + 1
+            end = block.find("\n", hit) + 1 or len(block)
+            if start > position:
+                self._advance(block[position:start])
+            self._line(block[start:end])
+            position = end
+
+    def _line(self, line: str) -> None:
+        sources = _SEGMENT_SOURCES[self._segment]
+        self._advance_captures(line, sources)
+        folded = line.lower()
+        progressed = False
+        for watch in self._live_here:
+            before = self._span_tails[watch.source] if watch.spanning else ""
+            if watch.done or not watch.scan(line, folded, before):
+                continue
+            progressed = True
+            if watch.done and watch.evidence:
+                self._open_capture(watch, line)
+        self._advance_context(line, sources)
+        if progressed:
+            self._update()
+
+    def _open_capture(self, watch, line: str) -> None:
+        text = watch.text
+        start, end = watch.match.span()
+        context = self._tails[watch.source] if len(text) == len(line) else ""
+        before = (context + text[:start])[-_EVIDENCE_BEFORE:]
+        after = text[end:end + _EVIDENCE_AFTER]
+        capture = [watch, [before, text[start:end], after], _EVIDENCE_AFTER - len(after)]
+        if capture[2]:
+            self._captures.append(capture)
+        else:
+            self._evidence[watch] = " ".join("".join(capture[1]).split())
+
+    def _close(self, capture) -> None:
+        self._captures.remove(capture)
+        self._evidence[capture[0]] = " ".join("".join(capture[1]).split())
+
+    def _advance(self, text: str, sources=None) -> None:
+        sources = sources or _SEGMENT_SOURCES[self._segment]
+        self._advance_captures(text, sources)
+        self._advance_context(text, sources)
+
+    def _advance_captures(self, text: str, sources) -> None:
+        for capture in list(self._captures):
+            if capture[0].source not in sources:
+                continue
+            piece = text[:capture[2]]
+            capture[1].append(piece)
+            capture[2] -= len(piece)
+            if not capture[2]:
+                self._close(capture)
+
+    def _advance_context(self, text: str, sources) -> None:
+        for source in sources:
+            self._tails[source] = (self._tails[source] + text[-_EVIDENCE_BEFORE:])[-_EVIDENCE_BEFORE:]
+            self._span_tails[source] = (self._span_tails[source] + text[-_SPAN_CHARS:])[-_SPAN_CHARS:]
+            head = self._heads.get(source)
+            if head is not None and len(head) < _HEAD_CHARS:
+                self._heads[source] = head + text[:_HEAD_CHARS - len(head)]
+
+
+def _text_chunks(log):
+    """Text chunks of a string, a (text or binary) file handle or an iterable of chunks."""
+    if log is None:
+        return
+    if isinstance(log, (str, bytes)):
+        chunks = (log,)
+    elif hasattr(log, "read"):
+        chunks = iter(lambda: log.read(_READ_CHARS), log.read(0))
+    else:
+        chunks = log
+    decoder = None
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            decoder = decoder or codecs.getincrementaldecoder("utf-8")("replace")
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def classify_failure_stream(phase: str, latex_log=None, plugin_error=None) -> Dict[str, object]:
+    """:func:`classify_failure` over strings, file handles or chunk iterators.
+
+    Reading stops as soon as the rest of the input cannot change the result.
+    """
+    classifier = FailureLogClassifier(phase)
+    for chunk in _text_chunks(plugin_error):
+        if classifier.done:
+            break
+        classifier.feed(chunk, "plugin")
+    if phase != "translate":
+        for chunk in _text_chunks(latex_log):
+            if classifier.done:
+                break
+            classifier.feed(chunk, "latex")
+    return classifier.result()
+
+
+def classify_failure(phase: str, latex_log: str = "", plugin_error: str = "") -> Dict[str, object]:
+    """Classify a failure into a stable code and an actionable retry strategy."""
+    return classify_failure_stream(phase, latex_log or "", plugin_error or "")
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Pre-compile figure downscaling/conversion with a content-hash cache.
+
+Oversized PNG/JPEG figures, multi-megabyte PDF plots and EPS files that
+xdvipdfmx re-converts on every pass dominate compile time for some papers
+and bloat the published ``_zh.pdf``.  The container driver calls
+:func:`optimize_workfolder_figures` before compiling; each optimized result
+is stored under the hash of the original bytes so later passes, recompiles
+and ``--no-cache`` retries only copy files.
+
+Raster images keep their physical size: the DPI written with the smaller
+image is scaled by the same factor as the pixels, so ``\\includegraphics``
+without an explicit width still lays out identically.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with matplotlib in the container image.
+    Image = None
+
+FIGURE_CACHE_VERSION = "paper-trans-figures-2026-10-19-v1"
+DEFAULT_MAX_PIXELS = 3000
+DEFAULT_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+RASTER_MIN_BYTES = 256 * 1024
+PDF_MIN_BYTES = 1024 * 1024
+PDF_MIN_SAVING = 0.85
+RASTER_EXTS = (".png", ".jpg", ".jpeg")
+GRAPHIC_EXTS = (".pdf", ".png", ".jpg", ".jpeg", ".eps")
+_INCLUDEGRAPHICS_RE = re.compile(
+    r"\\includegraphics\*?\s*(?:\[[^\]]*\])?\s*\{([^{}]+)\}"
+)
+_GRAPHICSPATH_RE = re.compile(r"\\graphicspath\s*\{((?:\s*\{[^{}]*\})+)\s*\}")
+_GHOSTSCRIPT_BASE = [
+    "gs", "-q", "-dSAFER", "-dBATCH", "-dNOPAUSE", "-sDEVICE=pdfwrite",
+    "-dCompatibilityLevel=1.5",
+]
+
+
+def figure_cache_enabled(environ: Optional[dict] = None) -> bool:
+    value = (environ if environ is not None else os.environ).get(
+        "PAPER_TRANS_FIGURE_CACHE", "1"
+    )
+    return value.strip().lower() not in {"0", "off", "false", "no"}
+
+
+def max_pixels_from_env(environ: Optional[dict] = None) -> int:
+    raw = (environ if environ is not None else os.environ).get(
+        "PAPER_TRANS_FIGURE_MAX_PIXELS", ""
+    )
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_PIXELS
+    return max(800, min(value, 12000))
+
+
+def _strip_comments(text: str) -> str:
+    return re.sub(r"(?<!\\)%[^\n]*", "", text)
+
+
+def _graphics_prefixes(text: str) -> List[str]:
+    """Search prefixes for ``\\includegraphics``: the root, then ``\\graphicspath``."""
+    prefixes = [""]
+    for match in _GRAPHICSPATH_RE.finditer(_strip_comments(text)):
+        prefixes.extend(re.findall(r"\{([^{}]*)\}", match.group(1)))
+    return prefixes
+
+
+def _resolve_graphic(root: str, prefixes: List[str], rel: str) -> Optional[str]:
+    """First existing file ``rel`` names under ``root``, or ``None``."""
+    if not rel or rel.startswith("/") or "\\" in rel:
+        return None
+    candidates = []
+    for prefix in prefixes:
+        base = os.path.join(root, prefix, rel)
+        if os.path.splitext(rel)[1].lower() in GRAPHIC_EXTS:
+            candidates.append(base)
+        else:
+            candidates.extend(base + ext for ext in GRAPHIC_EXTS)
+    for candidate in candidates:
+        real = os.path.realpath(candidate)
+        if real.startswith(root + os.sep) and os.path.isfile(real):
+            return real
+    return None
+
+
+def referenced_graphics(workfolder: str, tex_paths: Iterable[str]) -> List[str]:
+    """Resolve ``\\includegraphics`` targets inside ``workfolder``."""
+    root = os.path.realpath(workfolder)
+    found: List[str] = []
+    seen: Set[str] = set()
+    for tex_path in tex_paths:
+        try:
+            with open(tex_path, encoding="utf-8", errors="replace") as handle:
+                text = _strip_comments(handle.read())
+        except OSError:
+            continue
+        prefixes = _graphics_prefixes(text)
+        for match in _INCLUDEGRAPHICS_RE.finditer(text):
+            real = _resolve_graphic(root, prefixes, match.group(1).strip().strip('"'))
+            if real is not None and real not in seen:
+                seen.add(real)
+                found.append(real)
+    return found
+
+
+def _file_digest(path: str, policy: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(policy.encode("utf-8"))
+    digest.update(b"\0")
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_paths(cache_dir: str, digest: str, ext: str) -> Dict[str, str]:
+    shard = os.path.join(cache_dir, digest[:2])
+    return {
+        "shard": shard,
+        "result": os.path.join(shard, digest + ext),
+        "keep": os.path.join(shard, digest + ".keep"),
+    }
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def _store(cache_dir: str, digest: str, ext: str, produced: Optional[str]) -> None:
+    """Record ``produced`` (or "keep the original") for ``digest``."""
+    paths = _cache_paths(cache_dir, digest, ext)
+    os.makedirs(paths["shard"], exist_ok=True)
+    target = paths["result"] if produced else paths["keep"]
+    tmp = f"{target}.{os.getpid()}.{int(time.time() * 1000)}.tmp"
+    if produced:
+        shutil.copyfile(produced, tmp)
+    else:
+        with open(tmp, "wb"):
+            pass
+    os.replace(tmp, target)
+
+
+def _downscale_raster(src: str, dst: str, max_pixels: int) -> bool:
+    if Image is None:
+        return False
+    with Image.open(src) as image:
+        width, height = image.size
+        longest = max(width, height)
+        if longest <= max_pixels or image.mode in ("I", "I;16", "F"):
+            return False
+        scale = max_pixels / float(longest)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        dpi = image.info.get("dpi") or (72, 72)
+        try:
+            new_dpi = (float(dpi[0]) * scale, float(dpi[1]) * scale)
+        except (TypeError, ValueError, IndexError):
+            new_dpi = (72 * scale, 72 * scale)
+        resized = image.resize(size, Image.LANCZOS)
+        fmt = (image.format or "").upper()
+        if fmt == "JPEG":
+            if resized.mode not in ("RGB", "L", "CMYK"):
+                resized = resized.convert("RGB")
+            resized.save(dst, "JPEG", quality=90, optimize=True, dpi=new_dpi)
+        elif fmt == "PNG":
+            resized.save(dst, "PNG", optimize=True, dpi=new_dpi)
+        else:
+            return False
+    return os.path.getsize(dst) < os.path.getsize(src)
+
+
+def _run_ghostscript(args: List[str], timeout: int) -> bool:
+    try:
+        result = subprocess.run(
+            _GHOSTSCRIPT_BASE + args, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, timeout=timeout,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0
+
+
+def _looks_like_pdf(path: str) -> bool:
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(5) == b"%PDF-"
+    except OSError:
+        return False
+
+
+def _recompress_pdf(src: str, dst: str, timeout: int) -> bool:
+    ok = _run_ghostscript([
+        "-dPDFSETTINGS=/printer", "-dDetectDuplicateImages=true",
+        "-dCompressFonts=true", "-dAutoRotatePages=/None",
+        f"-sOutputFile={dst}", src,
+    ], timeout)
+    return (
+        ok and _looks_like_pdf(dst)
+        and os.path.getsize(dst) < os.path.getsize(src) * PDF_MIN_SAVING
+    )
+
+
+def _convert_eps(src: str, dst: str, timeout: int) -> bool:
+    ok = _run_ghostscript(["-dEPSCrop", f"-sOutputFile={dst}", src], timeout)
+    return ok and _looks_like_pdf(dst) and os.path.getsize(dst) > 0
+
+
+def _rewrite_eps_references(tex_paths: Iterable[str], converted: Set[str], workfolder: str) -> int:
+    """Point explicit ``foo.eps`` inclusions at the converted ``foo.pdf``.
+
+    Inclusions resolve through ``\\graphicspath`` exactly as in
+    :func:`referenced_graphics`, so the rewrite matches what was converted.
+    """
+    root = os.path.realpath(workfolder)
+    total = 0
+    for tex_path in tex_paths:
+        try:
+            with open(tex_path, encoding="utf-8", errors="replace") as handle:
+                text = handle.read()
+        except OSError:
+            continue
+        count = 0
+        prefixes = _graphics_prefixes(text)
+
+        def replace(match):
+            nonlocal count
+            rel = match.group(1).strip()
+            if not rel.lower().endswith(".eps"):
+                return match.group(0)
+            if _resolve_graphic(root, prefixes, rel) not in converted:
+                return match.group(0)
+            count += 1
+            start, end = match.span(1)
+            whole = match.group(0)
+            offset = match.start()
+            return whole[:start - offset] + rel[:-4] + ".pdf" + whole[end - offset:]
+
+        new_text = _INCLUDEGRAPHICS_RE.sub(replace, text)
+        if count:
+            with open(tex_path, "w", encoding="utf-8") as handle:
+                handle.write(new_text)
+            total += count
+    return total
+
+
+def prune_figure_cache(cache_dir: str, max_bytes: int = DEFAULT_CACHE_BYTES) -> int:
+    """Drop least-recently-used cache files until the cache fits ``max_bytes``."""
+    entries = []
+    total = 0
+    for root, _dirs, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    removed = 0
+    for _mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def optimize_workfolder_figures(
+    workfolder: str,
+    cache_dir: str,
+    tex_paths: Optional[Iterable[str]] = None,
+    max_pixels: int = DEFAULT_MAX_PIXELS,
+    timeout: int = 120,
+) -> Dict[str, int]:
+    """Downscale/convert referenced figures in place, reusing cached results.
+
+    Returns counters: ``cached`` (served from cache), ``optimized`` (newly
+    produced), ``eps_converted`` and ``saved_bytes``.
+    """
+    if tex_paths is None:
+        tex_paths = [
+            os.path.join(workfolder, name)
+            for name in sorted(os.listdir(workfolder))
+            if name.endswith(".tex")
+        ]
+    tex_paths = list(tex_paths)
+    stats = {"cached": 0, "optimized": 0, "eps_converted": 0, "saved_bytes": 0}
+    policy = f"{FIGURE_CACHE_VERSION}:{max_pixels}"
+    converted_eps: Set[str] = set()
+    for path in referenced_graphics(workfolder, tex_paths):
+        ext = os.path.splitext(path)[1].lower()
+        size = os.path.getsize(path)
+        if ext in RASTER_EXTS and size < RASTER_MIN_BYTES:
+            continue
+        if ext == ".pdf" and size < PDF_MIN_BYTES:
+            continue
+        out_ext = ".pdf" if ext == ".eps" else ext
+        target = path[:-len(ext)] + ".pdf" if ext == ".eps" else path
+        digest = _file_digest(path, policy)
+        cached = _cache_paths(cache_dir, digest, out_ext)
+        if ext == ".eps" and os.path.exists(target):
+            # Only reuse a sibling PDF that this cache produced; an author's
+            # own foo.pdf may differ from foo.eps.
+            if (
+                os.path.exists(cached["result"])
+                and os.path.getsize(cached["result"]) == os.path.getsize(target)
+            ):
+                converted_eps.add(path)
+            continue
+        if os.path.exists(cached["keep"]):
+            _touch(cached["keep"])
+            continue
+        if os.path.exists(cached["result"]):
+            _touch(cached["result"])
+            shutil.copyfile(cached["result"], target + ".figtmp")
+            os.replace(target + ".figtmp", target)
+            stats["cached"] += 1
+        else:
+            tmp = f"{target}.{os.getpid()}.fig{out_ext}"
+            try:
+                if ext in RASTER_EXTS:
+                    produced = _downscale_raster(path, tmp, max_pixels)
+                elif ext == ".pdf":
+                    produced = _recompress_pdf(path, tmp, timeout)
+                else:
+                    produced = _convert_eps(path, tmp, timeout)
+            except Exception:
+                produced = False
+            if not produced:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                _store(cache_dir, digest, out_ext, None)
+                continue
+            _store(cache_dir, digest, out_ext, tmp)
+            os.replace(tmp, target)
+            stats["optimized"] += 1
+            # A second pass over the already optimized bytes must be a no-op.
+            _store(cache_dir, _file_digest(target, policy), out_ext, None)
+        if ext == ".eps":
+            converted_eps.add(path)
+            stats["eps_converted"] += 1
+        else:
+            stats["saved_bytes"] += max(0, size - os.path.getsize(target))
+    if converted_eps:
+        _rewrite_eps_references(tex_paths, converted_eps, workfolder)
+    if stats["optimized"]:
+        prune_figure_cache(cache_dir)
+    return stats
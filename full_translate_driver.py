@@ -1,40 +1,75 @@
 #!/usr/bin/env python3
 """
 在 gpt-academic Docker 容器内运行的全文翻译驱动脚本
-用法: python3 full_translate_driver.py <arxiv_id> [--no-cache] [--retries N]
+用法: python3 full_translate_driver.py <arxiv_id> [--no-cache] [--keep-translation]
 输出: RESULT:SUCCESS:<pdf_path>  或  RESULT:ERROR:<msg>
+
+常驻服务 full_translate_service.py 会 import 本模块一次（完成 gpt-academic
+导入与全部 monkey patch），之后每篇论文 fork 子进程调用 configure_job() + main()。
 """
 import sys, os, glob, time, shutil, tarfile
 import latex_translation_filters as _ltf
+import latex_format_cache as _lfc
+import figure_cache as _figs
+import llm_concurrency as _llm_conc
+import llm_router as _llm_router
 from failure_taxonomy import classify_failure
 try:
     # Container deployment copies this support module beside the driver.
-    from translation_quality import (
-        analyze_tex as _analyze_translated_tex,
-        is_untranslated_prose as _is_untranslated_prose,
-    )
+    from translation_quality import is_untranslated_prose as _is_untranslated_prose
 except ImportError:
     # Keep direct host-side diagnostics/imports usable from the repository.
-    from paperhub.translation_quality import (
-        analyze_tex as _analyze_translated_tex,
-        is_untranslated_prose as _is_untranslated_prose,
-    )
+    from paperhub.translation_quality import is_untranslated_prose as _is_untranslated_prose
+
+try:
+    from driver_events import emit_event as _emit_event
+except ImportError:
+    from paperhub.driver_events import emit_event as _emit_event
+
+try:
+    from quality_cache import cached_analyze_tex as _cached_analyze_tex
+    from quality_cache import cached_tex_gate as _cached_tex_gate
+except ImportError:
+    from paperhub.quality_cache import cached_analyze_tex as _cached_analyze_tex
+    from paperhub.quality_cache import cached_tex_gate as _cached_tex_gate
+
+try:
+    from pdf_cost import source_features as _source_features
+except ImportError:
+    from paperhub.pdf_cost import source_features as _source_features
+
+try:
+    from latex_scan import LatexScan as _LatexScan
+except ImportError:
+    from paperhub.latex_scan import LatexScan as _LatexScan
 
 sys.path.insert(0, '/gpt')
 os.chdir('/gpt')
 
-arxiv_id        = sys.argv[1] if len(sys.argv) > 1 else None
-no_cache        = "--no-cache" in sys.argv
-keep_translation = "--keep-translation" in sys.argv   # 保留已有翻译，只重跑编译
+
+
+def parse_job_args(argv):
+    """Return ``(arxiv_id, no_cache, keep_translation)`` from a driver argv."""
+    positional = [arg for arg in argv[1:] if not arg.startswith("--")]
+    return (
+        positional[0] if positional else None,
+        "--no-cache" in argv,
+        "--keep-translation" in argv,   # 保留已有翻译，只重跑编译
+    )
+
+
+# 直接运行时从 argv 读取任务；被常驻服务 import 时由 configure_job() 逐篇设置。
+if __name__ == "__main__":
+    arxiv_id, no_cache, keep_translation = parse_job_args(sys.argv)
+else:
+    arxiv_id, no_cache, keep_translation = None, False, False
 max_retries = 0   # 只翻译一次，不重试
 SPLITTER_CACHE_VERSION = "paper-trans-splitter-2026-07-31-v30"
 
-if not arxiv_id:
+if __name__ == "__main__" and not arxiv_id:
     print("RESULT:ERROR:请提供 arxiv_id", flush=True)
     sys.exit(1)
 
-print(f"[driver] 开始处理: {arxiv_id}  no_cache={no_cache}  keep_translation={keep_translation}  max_retries={max_retries}", flush=True)
-
 # ── 代理注入（必须在所有 gpt-academic 模块导入之前）──────────────────────────────
 HOST_PROXY   = os.environ.get("HOST_PROXY", "http://127.0.0.1:7890")
 PROXIES_DICT = {"http": HOST_PROXY, "https": HOST_PROXY}
@@ -119,20 +154,37 @@ class _PatchedSession(_OrigSession):
     def request(self, method, url, **kwargs):
         if kwargs.get("timeout") is None:
             kwargs["timeout"] = _LLM_HTTP_TIMEOUT
+        url, kwargs = _route_llm_request(url, kwargs)
         return super().request(method, url, **kwargs)
 
 
 _orig_request = _req.request
 
 
+def _route_llm_request(url, kwargs):
+    # 端点池：llm_router 在当前线程绑定的端点接管 chat/completions 请求
+    endpoint = _llm_router.active_endpoint()
+    if endpoint is None:
+        return url, kwargs
+    return endpoint.rewrite(url, kwargs)
+
+
 def _patched_request(method, url, **kwargs):
     if kwargs.get("timeout") is None:
         kwargs["timeout"] = _LLM_HTTP_TIMEOUT
+    url, kwargs = _route_llm_request(url, kwargs)
+    return _orig_request(method, url, **kwargs)
+
+
+def _routed_api_request(method, url, **kwargs):
+    url, kwargs = _route_llm_request(url, kwargs)
     return _orig_request(method, url, **kwargs)
 
 
 _req.Session = _PatchedSession
 _req.request = _patched_request
+# requests.post/get 在 requests.api 模块内按名字查找 request()
+_req.api.request = _routed_api_request
 
 # ── Patch compile_latex_with_timeout：用进程组 kill，防止 pdflatex 变孤儿进程 ─────
 import subprocess as _subprocess
@@ -157,6 +209,32 @@ def _disable_tex_shell_escape(command):
     return _ltf.force_no_tex_shell_escape(command)
 
 
+_FIGURE_OPTIMIZED_DIRS = set()
+
+
+def optimize_figures_before_compile(workfolder, tex_paths=None):
+    """Downscale oversized figures / convert EPS once, reusing the hash cache."""
+    if not _figs.figure_cache_enabled():
+        return None
+    try:
+        stats = _figs.optimize_workfolder_figures(
+            workfolder, FIGURE_CACHE_DIR, tex_paths,
+            max_pixels=_figs.max_pixels_from_env(),
+        )
+    except Exception as e:
+        print(f"[driver] ⚠️  插图预处理失败，按原图编译: {e}", flush=True)
+        return None
+    if stats["cached"] or stats["optimized"] or stats["eps_converted"]:
+        print(
+            "[driver] 🖼️  插图预处理: "
+            f"缓存命中 {stats['cached']}，新处理 {stats['optimized']}，"
+            f"EPS 转 PDF {stats['eps_converted']}，"
+            f"节省 {stats['saved_bytes'] // 1024}KB",
+            flush=True,
+        )
+    return stats
+
+
 def _patched_compile_with_timeout(command, cwd, timeout=90):
     """Bound compilation and disable TeX shell escape / broad file access."""
     # gpt-academic 传入的缓存目录通常是相对 /gpt 的路径。插件内部会切换
@@ -165,6 +243,9 @@ def _patched_compile_with_timeout(command, cwd, timeout=90):
     if not _os.path.isabs(cwd):
         cwd = _os.path.join("/gpt", cwd)
     cwd = _os.path.abspath(cwd)
+    if cwd not in _FIGURE_OPTIMIZED_DIRS:
+        _FIGURE_OPTIMIZED_DIRS.add(cwd)
+        optimize_figures_before_compile(cwd)
     command = _disable_tex_shell_escape(command)
     process = _subprocess.Popen(
         command, shell=True,
@@ -533,27 +614,24 @@ def _patch_latex_translation_splitter():
                 break
         return env_stack
 
-    def _update_env_stack(text: str, env_stack):
-        for line in text.splitlines(keepends=True) or [text]:
-            env_stack = _promote_semantic_frame(line, env_stack)
-            events = _re.finditer(r"\\(begin|end)\{([^}]+)\}", line)
-            for event in events:
-                action, env = event.groups()
-                if not _env_is_tracked(env):
-                    continue
-                if action == "begin":
-                    semantic_source_data = (
-                        _ltf.is_semantic_source_data_opening(env, line)
-                        or _ltf.is_semantic_source_data_content(env, line)
-                    )
-                    env_stack.append((env, semantic_source_data))
-                    continue
-                names = [name for name, _ in env_stack]
-                if env in names:
-                    pos = len(names) - 1 - names[::-1].index(env)
-                    env_stack = env_stack[:pos]
-                elif env_stack:
-                    env_stack.pop()
+    def _apply_env_events(line: str, events, env_stack):
+        env_stack = _promote_semantic_frame(line, env_stack)
+        for is_begin, env in events:
+            if not _env_is_tracked(env):
+                continue
+            if is_begin:
+                semantic_source_data = (
+                    _ltf.is_semantic_source_data_opening(env, line)
+                    or _ltf.is_semantic_source_data_content(env, line)
+                )
+                env_stack.append((env, semantic_source_data))
+                continue
+            names = [name for name, _ in env_stack]
+            if env in names:
+                pos = len(names) - 1 - names[::-1].index(env)
+                env_stack = env_stack[:pos]
+            elif env_stack:
+                env_stack.pop()
         return env_stack
 
     dense_split_log_count = 0
@@ -584,16 +662,23 @@ def _patch_latex_translation_splitter():
 
     def _split_preserved_text(text: str, state: dict):
         nodes = []
-        for line in text.splitlines(keepends=True):
+        # One tokenizer pass per node; each line reads its events from it.
+        scan = _LatexScan(text)
+        for index in range(len(scan)):
+            line = scan.line(index)
             if r"\begin{document}" in line:
                 _append(nodes, line, True)
                 state["in_document"] = True
-                state["env_stack"] = _update_env_stack(line, state["env_stack"])
+                state["env_stack"] = _apply_env_events(
+                    line, scan.events(index), state["env_stack"],
+                )
                 continue
             if r"\end{document}" in line:
                 _append(nodes, line, True)
                 state["in_document"] = False
-                state["env_stack"] = _update_env_stack(line, state["env_stack"])
+                state["env_stack"] = _apply_env_events(
+                    line, scan.events(index), state["env_stack"],
+                )
                 continue
 
             state["env_stack"] = _promote_semantic_frame(
@@ -616,8 +701,8 @@ def _patch_latex_translation_splitter():
                 semantic_source_data or _ltf.is_hard_protected_env(env)
                 for env, semantic_source_data in state["env_stack"]
             )
-            begins = _re.findall(r"\\begin\{([^}]+)\}", line)
-            ends = _re.findall(r"\\end\{([^}]+)\}", line)
+            begins = scan.begins(index)
+            ends = scan.ends(index)
             structural_line = any(_env_is_tracked(env) for env in begins + ends)
 
             if (
@@ -655,7 +740,9 @@ def _patch_latex_translation_splitter():
                 else:
                     _append(nodes, line, preserve=True)
 
-            state["env_stack"] = _update_env_stack(line, state["env_stack"])
+            state["env_stack"] = _apply_env_events(
+                line, scan.events(index), state["env_stack"],
+            )
         return nodes
 
     def _recompute_ranges(nodes):
@@ -777,7 +864,9 @@ def _patch_latex_translation_splitter():
         }
         promoted = 0
         for node in nodes:
-            for line in node.string.splitlines(keepends=True):
+            scan = _LatexScan(node.string)
+            for index in range(len(scan)):
+                line = scan.line(index)
                 if r"\begin{document}" in line:
                     state["in_document"] = True
                 state["env_stack"] = _promote_semantic_frame(
@@ -815,8 +904,9 @@ def _patch_latex_translation_splitter():
                     merge=False,
                 )
                 promoted += int(promote)
-                state["env_stack"] = _update_env_stack(
+                state["env_stack"] = _apply_env_events(
                     line,
+                    scan.events(index),
                     state["env_stack"],
                 )
                 if r"\end{document}" in line:
@@ -824,6 +914,8 @@ def _patch_latex_translation_splitter():
         return rescued, promoted
 
     def _patched_split(self, txt, project_folder, opts):
+        _emit_event("phase_start", phase="split")
+        t_split = time.time()
         res = _orig_split(self, txt, project_folder, opts)
         original_transform = sum(1 for node in self.nodes if not node.preserve)
         original_chars = sum(len(node.string) for node in self.nodes if not node.preserve)
@@ -881,6 +973,10 @@ def _patch_latex_translation_splitter():
                             f.write(f'<p style="color:black;">#{node.range}{show_html}#</p>')
             except Exception as e:
                 print(f"[driver] ⚠️  rewrite debug_log.html failed: {e}", flush=True)
+        _emit_event(
+            "phase_end", phase="split", ok=True, chunks=len(self.sp),
+            seconds=round(time.time() - t_split, 3),
+        )
         return self.sp
 
     _la.LatexPaperSplit.split = _patched_split
@@ -927,6 +1023,141 @@ def _int_env(name, default, minimum=0, maximum=20):
     return max(minimum, min(maximum, value))
 
 
+def _emit_chunk_round(round_index, sources, remaining, request_failed, untranslated,
+                      structurally_invalid, **extra):
+    """Report one LLM validation round (0 = first pass) as a chunks event."""
+    chars = sum(len(source) for source in sources)
+    _emit_event(
+        "chunks", round=round_index, total=len(sources), failed=len(remaining),
+        chars=chars, tokens_est=(chars + 3) // 4,
+        request_failed=len(request_failed), untranslated=len(untranslated),
+        structure_invalid=len(structurally_invalid), **extra,
+    )
+
+
+def _packed_translation_requests(original, options, packs, sources):
+    """Send marker-packed requests, then expand to one response slot per fragment.
+
+    Request-failure and quota payloads are copied to every member so the
+    normal per-slot validation still sees them; a response whose segment
+    markers do not round-trip leaves its members empty, which the failed-slot
+    retry then re-requests one fragment at a time.
+    """
+    inputs = options.get("inputs_array", [])
+    visible = options.get("inputs_show_user_array", [])
+    histories = options.get("history_array", [])
+    prompts = options.get("sys_prompt_array", [])
+    packed_inputs, packed_visible, packed_histories, packed_prompts = [], [], [], []
+    for pack in packs:
+        first = pack[0]
+        label = visible[first] if first < len(visible) else f"chunk-{first}"
+        prompt = prompts[first] if first < len(prompts) else ""
+        packed_histories.append(histories[first] if first < len(histories) else [])
+        if len(pack) == 1:
+            packed_inputs.append(inputs[first])
+            packed_visible.append(label)
+            packed_prompts.append(prompt)
+            continue
+        prefix = inputs[first][:len(inputs[first]) - len(sources[first])]
+        packed_inputs.append(
+            _ltf.build_packed_translation_input(prefix, [sources[index] for index in pack])
+        )
+        packed_visible.append(f"{label} (+{len(pack) - 1})")
+        packed_prompts.append(prompt + _ltf.TRANSLATION_PACK_INSTRUCTION)
+    packed = dict(options)
+    packed.update({
+        "inputs_array": packed_inputs,
+        "inputs_show_user_array": packed_visible,
+        "history_array": packed_histories,
+        "sys_prompt_array": packed_prompts,
+    })
+    packed_result = yield from original(**packed)
+
+    result = []
+    for index in range(len(inputs)):
+        result.extend([visible[index] if index < len(visible) else "", ""])
+    lost = 0
+    for position, pack in enumerate(packs):
+        response_index = position * 2 + 1
+        response = packed_result[response_index] if response_index < len(packed_result) else ""
+        if len(pack) == 1:
+            parts = [response]
+        elif (
+            _ltf.llm_translation_response_failed(response)
+            or _ltf.llm_translation_response_quota_failed(response)
+        ):
+            parts = [response] * len(pack)
+        else:
+            parts = _ltf.split_packed_translation_response(
+                str(response), [sources[index] for index in pack],
+            )
+            if parts is None:
+                lost += 1
+                parts = [""] * len(pack)
+        for index, part in zip(pack, parts):
+            result[index * 2 + 1] = part
+    if lost:
+        print(f"[driver] ⚠️  {lost} 个打包请求的分段标记未完整返回，成员 chunk 转入逐个重试", flush=True)
+    return result
+
+
+# AIMD 并发上限与 arxiv_cache 同卷：并发驱动共享，容器重建后沿用上次收敛值
+LLM_CONCURRENCY_STATE = os.path.join('/gpt', 'gpt_log', 'llm_concurrency.json')
+# 可选多端点池（PAPER_TRANS_LLM_ENDPOINTS）随只读挂载的 config_private.py 进入容器
+LLM_ENDPOINT_CONFIG = os.path.join('/gpt', 'config_private.py')
+
+
+def _llm_limiter_fields(limiter, hedger=None, router=None):
+    fields = {}
+    if router is not None:
+        fields.update(endpoints=router.stats(), failovers=router.failovers)
+    if limiter is not None:
+        # 阶段结束时发布本地攒下的加性增长，下一个驱动从收敛值起步
+        if limiter.state_path:
+            limiter.flush()
+        fields.update(concurrency=round(limiter.limit, 2), throttled=limiter.throttles)
+    if hedger is not None:
+        fields.update(hedges=hedger.hedges, hedge_wins=hedger.hedge_wins)
+    return fields
+
+
+def _install_llm_request_gate(limiter, hedger, router=None):
+    """Route every single LLM request through the hedger, AIMD limiter and router.
+
+    The upstream multi-thread helper imports ``predict_no_ui_long_connection``
+    from ``request_llms.bridge_all`` when called, so patching the module
+    attribute gates each pool worker without touching the pool itself.  Each
+    hedged attempt takes its own limiter slot; the router then binds an
+    endpoint to the worker thread for ``_route_llm_request``.
+    """
+    from request_llms import bridge_all as _bridge
+
+    original = _bridge.predict_no_ui_long_connection
+    if getattr(original, "_paper_trans_gated", False):
+        return
+
+    def _routed(*args, **kwargs):
+        if router is None:
+            return original(*args, **kwargs)
+        return router.call(original, *args, **kwargs)
+
+    def _attempt(*args, **kwargs):
+        if limiter is None:
+            return _routed(*args, **kwargs)
+        return limiter.call(_routed, *args, **kwargs)
+
+    def _gated(*args, **kwargs):
+        if hedger is None:
+            return _attempt(*args, **kwargs)
+        return hedger.call(_attempt, *args, **kwargs)
+
+    _gated._paper_trans_gated = True
+    _bridge.predict_no_ui_long_connection = _gated
+    from crazy_functions import crazy_utils as _crazy_utils
+    if hasattr(_crazy_utils, "predict_no_ui_long_connection"):
+        _crazy_utils.predict_no_ui_long_connection = _gated
+
+
 def _patch_latex_llm_rate_limit_handling():
     """Throttle LaTeX requests and retry only failed response slots serially."""
     from crazy_functions import crazy_utils as _crazy_utils
@@ -942,6 +1173,26 @@ def _patch_latex_llm_rate_limit_handling():
     # eight simultaneous requests that caused widespread 429 responses. Any
     # failed slots are subsequently retried with one worker.
     max_workers = _int_env("PAPER_TRANS_LLM_WORKERS", 2, minimum=1, maximum=8)
+    # Adaptive mode: PAPER_TRANS_LLM_WORKERS becomes the starting limit, the
+    # pool is sized at the AIMD ceiling and every request passes the limiter,
+    # which backs off on 429/quota markers and probes upward on success.
+    limiter = None
+    # A configured endpoint pool scales the concurrency ceiling with its size.
+    endpoints = _llm_router.load_config_pool(LLM_ENDPOINT_CONFIG)
+    router = _llm_router.LlmRouter(endpoints) if len(endpoints) > 1 else None
+    if _llm_conc.adaptive_enabled():
+        initial, max_workers = _llm_conc.limits_from_env()
+        if router is not None:
+            max_workers = min(_llm_conc.HARD_MAX_LIMIT, max_workers * len(endpoints))
+        limiter = _llm_conc.AimdLimiter(LLM_CONCURRENCY_STATE, initial, max_workers)
+    # Hedging: a chunk slower than the p90 for its size, or without a first
+    # streamed token by the TTFT deadline, gets one duplicate request.
+    hedge_budget, ttft_seconds = _llm_conc.hedge_settings_from_env()
+    hedger = None
+    if hedge_budget > 0:
+        hedger = _llm_conc.HedgedCaller(hedge_budget, ttft_seconds)
+    if limiter is not None or hedger is not None or router is not None:
+        _install_llm_request_gate(limiter, hedger, router)
     # Let the outer failed-slot loop own retries. Upstream retries every failed
     # future independently and can spend tens of minutes sleeping on a
     # deterministic quota error before the batch result is inspectable.
@@ -951,13 +1202,14 @@ def _patch_latex_llm_rate_limit_handling():
         2,
         maximum=5,
     )
+    # Adjacent small fragments share one request up to this estimated token
+    # budget (0 disables packing); validation and retries stay per fragment.
+    pack_tokens = _int_env("PAPER_TRANS_LLM_PACK_TOKENS", 900, maximum=4000)
 
     def _patched(*args, **kwargs):
         options = dict(kwargs)
         options["max_workers"] = max_workers
         options["retry_times_at_unknown_error"] = per_call_retries
-        result = yield from original(*args, **options)
-
         inputs = options.get("inputs_array", [])
         visible_inputs = options.get("inputs_show_user_array", [])
         histories = options.get("history_array", [])
@@ -971,6 +1223,20 @@ def _patch_latex_llm_rate_limit_handling():
             _ltf.extract_translation_fragment(item)
             for item in inputs
         ]
+        packs = _ltf.plan_translation_packs(validation_sources, pack_tokens, prompts, histories)
+        _emit_event("phase_start", phase="llm")
+        t_llm = time.time()
+        if not args and len(packs) < len(inputs):
+            result = yield from _packed_translation_requests(
+                original, options, packs, validation_sources,
+            )
+        else:
+            packs = [[index] for index in range(len(inputs))]
+            result = yield from original(*args, **options)
+        _emit_event(
+            "phase_end", phase="llm", ok=True, seconds=round(time.time() - t_llm, 3),
+            requests=len(packs), **_llm_limiter_fields(limiter, hedger, router),
+        )
 
         def log_abnormal_chunks(payload, failed_indices, invalid_reasons, stage):
             """Print enough structure evidence to diagnose a rejected slot.
@@ -1092,6 +1358,10 @@ def _patch_latex_llm_rate_limit_handling():
             invalid_reasons,
             quota_failed,
         ) = response_status(result)
+        _emit_chunk_round(
+            0, validation_sources, remaining, request_failed, untranslated,
+            structurally_invalid, requests=len(packs),
+        )
         if quota_failed:
             raise RuntimeError(
                 "insufficient_user_quota: API balance is insufficient for "
@@ -1135,7 +1405,13 @@ def _patch_latex_llm_rate_limit_handling():
                 "sys_prompt_array": retry_prompts,
                 "max_workers": 1,
             })
+            _emit_event("phase_start", phase="llm_retry", round=round_index)
+            t_llm = time.time()
             retried = yield from original(**retry_options)
+            _emit_event(
+                "phase_end", phase="llm_retry", ok=True, round=round_index,
+                seconds=round(time.time() - t_llm, 3), **_llm_limiter_fields(limiter, hedger, router),
+            )
             for local_index, original_index in enumerate(remaining):
                 result[original_index * 2 + 1] = retried[local_index * 2 + 1]
             (
@@ -1146,6 +1422,7 @@ def _patch_latex_llm_rate_limit_handling():
                 invalid_reasons,
                 quota_failed,
             ) = response_status(result)
+            _emit_chunk_round(round_index, validation_sources, remaining, request_failed, untranslated, structurally_invalid)
             if quota_failed:
                 raise RuntimeError(
                     "insufficient_user_quota: API balance is insufficient for "
@@ -1172,7 +1449,10 @@ def _patch_latex_llm_rate_limit_handling():
     _crazy_utils._paper_trans_rate_limit_patch = True
     print(
         f"[driver] ✅ LaTeX LLM 请求已 patch（workers={max_workers}, "
-        f"retries={per_call_retries}, failed_chunk_rounds={retry_rounds}）",
+        f"adaptive={'on' if limiter else 'off'}, "
+        f"hedge={hedge_budget:g}, endpoints={len(endpoints) if router else 1}, "
+        f"retries={per_call_retries}, failed_chunk_rounds={retry_rounds}, "
+        f"pack_tokens={pack_tokens}）",
         flush=True,
     )
 
@@ -1190,7 +1470,10 @@ def _patch_safe_archive_extraction():
             reason = _ltf.source_tar_safety_error(file_path)
             if reason:
                 raise RuntimeError(f"unsafe arXiv source archive: {reason}")
-        return original(file_path, dest_dir, *args, **kwargs)
+        return _timed_phase(
+            "extract", lambda: original(file_path, dest_dir, *args, **kwargs),
+            judge=lambda _: True,
+        )
 
     _toolbox.extract_archive = _safe_extract_archive
     _toolbox._paper_trans_safe_archive_patch = True
@@ -1211,12 +1494,18 @@ from toolbox import get_conf, ChatBotWithCookies, default_user_name
 api_key   = get_conf('API_KEY')
 llm_model = os.environ.get("PAPER_TRANS_LLM_MODEL") or get_conf('LLM_MODEL')
 ARXIV_CACHE_DIR = get_conf('ARXIV_CACHE_DIR')
+# 预编译 xelatex 格式缓存与 arxiv_cache 同卷，容器重建后仍可复用
+LATEX_FORMAT_CACHE_DIR = os.path.join('/gpt', 'gpt_log', 'latex_format_cache')
+# 插图降采样/EPS 转换结果按原始字节 hash 缓存，重编译与 --no-cache 重试直接复用
+FIGURE_CACHE_DIR = os.path.join('/gpt', 'gpt_log', 'figure_cache')
+# 译文 TeX 质量结论按内容 hash + 质量策略版本缓存，重编译/重试不再重复分析同一份 tex
+QUALITY_CACHE_PATH = os.path.join('/gpt', 'gpt_log', 'quality_cache.sqlite3')
 print(f"[driver] 模型: {llm_model}", flush=True)
 print(f"[driver] 缓存目录: {ARXIV_CACHE_DIR}", flush=True)
 
 from crazy_functions.Latex_Function import Latex翻译中文并重新编译PDF
 
-arxiv_url = f"https://arxiv.org/abs/{arxiv_id}"
+arxiv_url = None
 
 # 模块级：收集插件运行中所有完整消息（不截断），供 diagnose_failure 分析
 _plugin_msgs_full: list[str] = []
@@ -1228,8 +1517,16 @@ def translation_quality_report(workfolder: str) -> dict:
     trans_tex = os.path.join(workfolder, "merge_translate_zh.tex")
     if not os.path.exists(trans_tex):
         return {"ok": False, "reason": "missing merge_translate_zh.tex"}
-    report = _analyze_translated_tex(trans_tex)
-    report["ok"] = not _is_untranslated_prose(report)
+    # 流式门禁：结论一旦确定即停止读取，且不统计诊断计数
+    report = _cached_tex_gate(trans_tex, QUALITY_CACHE_PATH)
+    if report.get("untranslated"):
+        # 仅在需要报告失败时补全完整诊断（同样按内容缓存）
+        early_verdict = report.get("early_verdict")
+        report = _cached_analyze_tex(trans_tex, QUALITY_CACHE_PATH)
+        report["early_verdict"] = early_verdict
+        report["ok"] = not _is_untranslated_prose(report)
+    else:
+        report["ok"] = True
     report["samples"] = [
         (sample["line"], sample["text"])
         for sample in report.get("samples", [])
@@ -1254,12 +1551,19 @@ def translation_quality_ok(workfolder: str, arxiv_id_: str) -> bool:
     global _last_quality_report
     report = translation_quality_report(workfolder)
     _last_quality_report = report
+    _emit_event(
+        "quality", ok=bool(report.get("ok")),
+        cjk_pct=round(float(report.get("cjk_pct", 0) or 0), 2),
+        long_english_lines=report.get("long_english_lines", 0),
+        prose_lines=report.get("prose_lines", 0),
+    )
     if not report.get("ok"):
         print(
             f"[driver] ❌ 翻译覆盖率检查失败: {arxiv_id_} "
             f"cjk_pct={report.get('cjk_pct', 0):.1f}% "
             f"long_english_lines={report.get('long_english_lines', 0)} "
-            f"prose_lines={report.get('prose_lines', 0)}",
+            f"prose_lines={report.get('prose_lines', 0)}"
+            + (" (流式门禁提前判定)" if report.get("early_verdict") else ""),
             flush=True,
         )
         for line_no, sample in report.get("samples", []):
@@ -1269,7 +1573,8 @@ def translation_quality_ok(workfolder: str, arxiv_id_: str) -> bool:
     print(
         f"[driver] ✅ 翻译覆盖率检查通过: {arxiv_id_} "
         f"cjk_pct={report.get('cjk_pct', 0):.1f}% "
-        f"long_english_lines={report.get('long_english_lines', 0)}",
+        f"long_english_lines={report.get('long_english_lines', 0)}"
+        + (f" (提前判定，已读 {report.get('lines_read', 0)} 行)" if report.get("early_verdict") else ""),
         flush=True,
     )
     return True
@@ -3278,14 +3583,45 @@ def patch_and_recompile(workfolder, arxiv_id_):
     # Run the idempotent escape cleanup once more immediately before compilation
     # so a restored ``\中文`` artifact cannot survive into the final pass.
     patch_spurious_cjk_command_escapes(trans_tex)
+    optimize_figures_before_compile(workfolder, [trans_tex])
 
-    def _latex_cmds(engine, has_bbl):
-        if engine == 'xelatex':
-            engine_cmd = [
-                engine, '-no-shell-escape', '-no-pdf',
+    latex_format = None
+    if _lfc.format_cache_enabled():
+        try:
+            latex_format = _lfc.prepare_xelatex_format(
+                workfolder, LATEX_FORMAT_CACHE_DIR, _restricted_tex_env(),
+            )
+        except Exception as e:
+            print(f"[driver] ⚠️  xelatex 格式缓存准备失败，按原方式编译: {e}", flush=True)
+            latex_format = None
+        if latex_format:
+            state = "命中" if latex_format["hit"] else "新生成"
+            print(f"[driver] ⚡ xelatex 预编译格式{state}: {latex_format['name']}", flush=True)
+
+    def _xelatex_cmd():
+        if latex_format:
+            return [
+                'xelatex', f"-fmt={latex_format['name']}",
+                '-jobname=merge_translate_zh',
+                '-no-shell-escape', '-no-pdf',
                 '-interaction=nonstopmode', '-file-line-error',
-                'merge_translate_zh.tex',
+                latex_format['source'],
             ]
+        return [
+            'xelatex', '-no-shell-escape', '-no-pdf',
+            '-interaction=nonstopmode', '-file-line-error',
+            'merge_translate_zh.tex',
+        ]
+
+    def _tex_env(cmd):
+        env = _restricted_tex_env()
+        if latex_format and cmd[0] == 'xelatex':
+            env = _lfc.format_env(env, latex_format['cache_dir'])
+        return env
+
+    def _latex_cmds(engine, has_bbl):
+        if engine == 'xelatex':
+            engine_cmd = _xelatex_cmd()
         else:
             engine_cmd = [
                 engine, '-no-shell-escape',
@@ -3303,16 +3639,33 @@ def patch_and_recompile(workfolder, arxiv_id_):
         ]
 
     def _run_latex_cmds(cmds):
+        nonlocal latex_format
         segfault = False
         is_xelatex = False
         for idx, cmd in enumerate(cmds):
+            t_pass = time.time()
             r = _sp.run(
                 cmd, cwd=workfolder, timeout=900,
                 stdout=_sp.DEVNULL, stderr=_sp.PIPE,
-                env=_restricted_tex_env(),
+                env=_tex_env(cmd),
+            )
+            _emit_event(
+                "compile_pass", engine=cmd[0], index=idx, returncode=r.returncode,
+                seconds=round(time.time() - t_pass, 3), format=bool(latex_format),
             )
             if cmd[0] == 'xelatex':
                 is_xelatex = True
+            if (
+                idx == 0 and latex_format and cmd[0] == 'xelatex'
+                and not os.path.exists(os.path.join(workfolder, 'merge_translate_zh.xdv'))
+            ):
+                # 格式与当前 TeX/宏包状态不兼容时只损失一轮，随后按原始源码全量重跑
+                print("[driver] ⚠️  预编译格式首轮未产出 XDV，丢弃格式并回退完整编译", flush=True)
+                _lfc.discard_format(latex_format['cache_dir'], latex_format['name'])
+                latex_format = None
+                return _run_latex_cmds([
+                    _xelatex_cmd() if c[0] == 'xelatex' else c for c in cmds
+                ])
             if cmd[0] in ('xelatex', 'lualatex') and idx < len(cmds) - 1:
                 sanitize_latex_aux_file(workfolder)
             stderr = (r.stderr or b'').decode('utf-8', errors='replace')
@@ -3322,11 +3675,16 @@ def patch_and_recompile(workfolder, arxiv_id_):
 
         if not segfault and is_xelatex:
             print("[driver] 🛠️  运行 xdvipdfmx 转换 DVI 为 PDF (zlib compression level = 3)", flush=True)
+            t_pass = time.time()
             r_pdf = _sp.run(
                 ['xdvipdfmx', '-z', '3', 'merge_translate_zh.xdv'],
                 cwd=workfolder, timeout=900,
                 stdout=_sp.DEVNULL, stderr=_sp.PIPE,
             )
+            _emit_event(
+                "compile_pass", engine="xdvipdfmx", index=len(cmds), returncode=r_pdf.returncode,
+                seconds=round(time.time() - t_pass, 3), format=False,
+            )
             stderr_pdf = (r_pdf.stderr or b'').decode('utf-8', errors='replace')
             if r_pdf.returncode != 0 or 'Segmentation fault' in stderr_pdf:
                 print(f"[driver] ❌ xdvipdfmx 运行失败: returncode={r_pdf.returncode}, stderr={stderr_pdf[:200]}", flush=True)
@@ -3337,6 +3695,7 @@ def patch_and_recompile(workfolder, arxiv_id_):
         segfault = _run_latex_cmds(_latex_cmds('xelatex', synthesized_bbl))
         if segfault:
             print("[driver] ⚠️  xelatex 触发 segfault，切换 lualatex 重编译", flush=True)
+            latex_format = None
             clean_latex_intermediates(workfolder)
             synthesized_bbl = synthesize_bbl_from_tex(workfolder, trans_tex)
             if synthesized_bbl:
@@ -3351,6 +3710,7 @@ def patch_and_recompile(workfolder, arxiv_id_):
         and not latex_compile_health_ok(workfolder, arxiv_id_, strict=False)
     ):
         print("[driver] 🔁 xelatex 产物含真实编译错误，切换 lualatex 做兼容重编译", flush=True)
+        latex_format = None
         clean_latex_intermediates(workfolder)
         synthesized_bbl = synthesize_bbl_from_tex(workfolder, trans_tex)
         if synthesized_bbl:
@@ -3371,17 +3731,14 @@ def patch_and_recompile(workfolder, arxiv_id_):
                     flush=True,
                 )
                 try:
+                    r1_cmd = _xelatex_cmd()
                     r1 = _sp.run(
-                        [
-                            'xelatex', '-no-shell-escape', '-no-pdf',
-                            '-interaction=nonstopmode', '-file-line-error',
-                            'merge_translate_zh.tex',
-                        ],
+                        r1_cmd,
                         cwd=workfolder,
                         timeout=900,
                         stdout=_sp.DEVNULL,
                         stderr=_sp.PIPE,
-                        env=_restricted_tex_env(),
+                        env=_tex_env(r1_cmd),
                     )
                     if r1.returncode == 0:
                         _sp.run(
@@ -3497,6 +3854,7 @@ def diagnose_failure(workfolder, arxiv_id_):
         'has_orig_tex':      has_orig,
         'has_trans_tex':     has_trans,
     }
+    _emit_event("diagnosis", diagnosis=diag)
     print(f"PDF_DIAGNOSIS:{_json.dumps(diag, ensure_ascii=False)}", flush=True)
     return diag
 
@@ -3719,69 +4077,124 @@ def prepare_keep_translation_workfolder():
 
 
 # ── 主逻辑：首次 + 重试 ────────────────────────────────────────────────────────
-result_pdf = None
+WORKFOLDER = TRANSLATE_TEX = ORIG_TEX = None
+
+
+def configure_job(arxiv_id_, no_cache_=False, keep_translation_=False):
+    """Bind one paper's job parameters to the module globals used below."""
+    global arxiv_id, no_cache, keep_translation, arxiv_url
+    global WORKFOLDER, TRANSLATE_TEX, ORIG_TEX
+    arxiv_id = arxiv_id_
+    no_cache = bool(no_cache_)
+    keep_translation = bool(keep_translation_)
+    arxiv_url = f"https://arxiv.org/abs/{arxiv_id}"
+    WORKFOLDER = os.path.join(ARXIV_CACHE_DIR, arxiv_id, 'workfolder')
+    TRANSLATE_TEX = os.path.join(WORKFOLDER, 'merge_translate_zh.tex')
+    ORIG_TEX = os.path.join(WORKFOLDER, 'merge.tex')
+    print(f"[driver] 开始处理: {arxiv_id}  no_cache={no_cache}  keep_translation={keep_translation}  max_retries={max_retries}", flush=True)
+    _emit_event(
+        "job_start", arxiv_id=arxiv_id, no_cache=no_cache,
+        keep_translation=keep_translation, service=__name__ != "__main__",
+        splitter_version=SPLITTER_CACHE_VERSION,
+    )
 
-WORKFOLDER = os.path.join(ARXIV_CACHE_DIR, arxiv_id, 'workfolder')
-TRANSLATE_TEX = os.path.join(WORKFOLDER, 'merge_translate_zh.tex')
-ORIG_TEX = os.path.join(WORKFOLDER, 'merge.tex')
 
-if keep_translation and os.path.exists(TRANSLATE_TEX) and os.path.exists(ORIG_TEX):
-    # 保留已有 GPT 翻译，只重跑编译。绕开插件生成器，避免它重建 workfolder 后删掉已恢复的中文 tex。
-    print(f"[driver] ♻️  复用已有翻译缓存: {TRANSLATE_TEX}（直接重编译，跳过 GPT 翻译）", flush=True)
-    result_pdf = patch_and_recompile(WORKFOLDER, arxiv_id)
-else:
-    if keep_translation and os.path.exists(TRANSLATE_TEX):
-        # 只有中文 tex、没有完整源码 workfolder 时，先重建 workfolder 并直编译。
-        print(f"[driver] ♻️  发现翻译缓存但 workfolder 不完整，尝试恢复源码后直编译", flush=True)
-        if prepare_keep_translation_workfolder():
-            result_pdf = patch_and_recompile(WORKFOLDER, arxiv_id)
-        if result_pdf:
+def _emit_source_features():
+    """记录源码包规模（文件数 / tex 字节 / 预估 chunk），供宿主机按成本排队 PDF 任务。"""
+    src_tar = os.path.join(ARXIV_CACHE_DIR, arxiv_id, 'e-print', arxiv_id + '.tar')
+    if not source_cache_is_valid():
+        return
+    try:
+        _emit_event("source", **_source_features(src_tar))
+    except Exception as e:
+        print(f"[driver] ⚠️  源码规模统计失败: {e}", flush=True)
+
+
+def _timed_phase(phase, func, *args, judge=bool, **fields):
+    """Run one driver phase between phase_start/phase_end events."""
+    _emit_event("phase_start", phase=phase, **fields)
+    t_phase = time.time()
+    ok = False
+    try:
+        result = func(*args)
+        ok = judge(result)
+        return result
+    finally:
+        _emit_event(
+            "phase_end", phase=phase, ok=bool(ok),
+            seconds=round(time.time() - t_phase, 3), **fields,
+        )
+
+
+def main():
+    """Run the configured job and terminate the process with the RESULT contract."""
+    result_pdf = None
+    if keep_translation and os.path.exists(TRANSLATE_TEX) and os.path.exists(ORIG_TEX):
+        # 保留已有 GPT 翻译，只重跑编译。绕开插件生成器，避免它重建 workfolder 后删掉已恢复的中文 tex。
+        print(f"[driver] ♻️  复用已有翻译缓存: {TRANSLATE_TEX}（直接重编译，跳过 GPT 翻译）", flush=True)
+        result_pdf = _timed_phase("recompile", patch_and_recompile, WORKFOLDER, arxiv_id)
+    else:
+        if keep_translation and os.path.exists(TRANSLATE_TEX):
+            # 只有中文 tex、没有完整源码 workfolder 时，先重建 workfolder 并直编译。
+            print(f"[driver] ♻️  发现翻译缓存但 workfolder 不完整，尝试恢复源码后直编译", flush=True)
+            if _timed_phase("source", prepare_keep_translation_workfolder):
+                result_pdf = _timed_phase("recompile", patch_and_recompile, WORKFOLDER, arxiv_id)
+            if result_pdf:
+                actual_no_cache = False
+            else:
+                print(f"[driver] ⚠️  直编译未成功，退回插件路径（仍尝试复用翻译 tex）", flush=True)
             actual_no_cache = False
+        elif no_cache:
+            # 强制重新翻译/编译；若源码包已经有效缓存，则复用源码，避免 arXiv 下载断流导致无法进入编译阶段。
+            clear_compile_cache(full=True)
+            if source_cache_is_valid() or _timed_phase("source", prefetch_source_cache):
+                print(f"[driver] ♻️  复用已下载源码缓存（仍会重新翻译/编译）", flush=True)
+                actual_no_cache = False
+            else:
+                actual_no_cache = True
         else:
-            print(f"[driver] ⚠️  直编译未成功，退回插件路径（仍尝试复用翻译 tex）", flush=True)
-        actual_no_cache = False
-    elif no_cache:
-        # 强制重新翻译/编译；若源码包已经有效缓存，则复用源码，避免 arXiv 下载断流导致无法进入编译阶段。
-        clear_compile_cache(full=True)
-        if source_cache_is_valid() or prefetch_source_cache():
-            print(f"[driver] ♻️  复用已下载源码缓存（仍会重新翻译/编译）", flush=True)
+            if not source_cache_is_valid():
+                _timed_phase("source", prefetch_source_cache)
             actual_no_cache = False
-        else:
-            actual_no_cache = True
+
+        if not result_pdf:
+            _emit_source_features()
+            for attempt in range(1, max_retries + 2):   # 最多3次（1次首次 + 2次重试）
+                if attempt == 1:
+                    result_pdf = _timed_phase("translate", run_translation, actual_no_cache, attempt, attempt=attempt)
+                else:
+                    # 重试：强制清缓存，重新翻译
+                    print(f"\n[driver] ══ 第 {attempt} 次重试（清除缓存后重新翻译）══", flush=True)
+                    clear_compile_cache()
+                    result_pdf = _timed_phase("translate", run_translation, True, attempt, attempt=attempt)
+
+                if result_pdf:
+                    break
+                if attempt <= max_retries:
+                    print(f"[driver] 等待 5s 后重试...", flush=True)
+                    time.sleep(5)
+
+        # ── Fallback：翻译完成但编译失败时，修补 verbatim 环境后重编译 ──────────────
+        if not result_pdf:
+            result_pdf = _timed_phase("recompile", patch_and_recompile, WORKFOLDER, arxiv_id)
+
+    # ── 输出结果 ────────────────────────────────────────────────────────────────
+    if result_pdf:
+        _emit_event("result", status="success", pdf=result_pdf)
+        print(f"RESULT:SUCCESS:{result_pdf}", flush=True)
+        # gpt-academic may leave non-daemon worker threads alive after all output
+        # has been produced.  This file is a one-shot subprocess, so waiting for
+        # those idle workers only makes the host wrapper appear hung.
+        os._exit(0)
     else:
-        if not source_cache_is_valid():
-            prefetch_source_cache()
-        actual_no_cache = False
-
-    if not result_pdf:
-        for attempt in range(1, max_retries + 2):   # 最多3次（1次首次 + 2次重试）
-            if attempt == 1:
-                result_pdf = run_translation(actual_no_cache, attempt)
-            else:
-                # 重试：强制清缓存，重新翻译
-                print(f"\n[driver] ══ 第 {attempt} 次重试（清除缓存后重新翻译）══", flush=True)
-                clear_compile_cache()
-                result_pdf = run_translation(True, attempt)
+        workfolder_ = os.path.join(ARXIV_CACHE_DIR, arxiv_id, 'workfolder')
+        diagnose_failure(workfolder_, arxiv_id)
+        message = f"所有 {max_retries+1} 次尝试均未生成 PDF"
+        _emit_event("result", status="error", message=message)
+        print(f"RESULT:ERROR:{message}", flush=True)
+        os._exit(1)
 
-            if result_pdf:
-                break
-            if attempt <= max_retries:
-                print(f"[driver] 等待 5s 后重试...", flush=True)
-                time.sleep(5)
-
-    # ── Fallback：翻译完成但编译失败时，修补 verbatim 环境后重编译 ──────────────
-    if not result_pdf:
-        result_pdf = patch_and_recompile(WORKFOLDER, arxiv_id)
-
-# ── 输出结果 ────────────────────────────────────────────────────────────────
-if result_pdf:
-    print(f"RESULT:SUCCESS:{result_pdf}", flush=True)
-    # gpt-academic may leave non-daemon worker threads alive after all output
-    # has been produced.  This file is a one-shot subprocess, so waiting for
-    # those idle workers only makes the host wrapper appear hung.
-    os._exit(0)
-else:
-    workfolder_ = os.path.join(ARXIV_CACHE_DIR, arxiv_id, 'workfolder')
-    diagnose_failure(workfolder_, arxiv_id)
-    print(f"RESULT:ERROR:所有 {max_retries+1} 次尝试均未生成 PDF", flush=True)
-    os._exit(1)
+
+if __name__ == "__main__":
+    configure_job(arxiv_id, no_cache, keep_translation)
+    main()
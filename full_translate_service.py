@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+容器内常驻全文翻译服务：只做一次 gpt-academic 导入和 monkey patch，
+之后每篇论文 fork 一个独立 session 的子进程执行驱动主逻辑。
+
+用法:
+  python3 full_translate_service.py serve
+      启动服务（宿主机用 docker exec -d 拉起，由 docker 回收，不给 PID 1 留 zombie）。
+  python3 full_translate_service.py submit <arxiv_id> [--no-cache] [--keep-translation]
+      连接服务提交一篇任务，把驱动输出原样转发到 stdout，并以驱动退出码退出。
+      服务不可用时输出 SERVICE:UNAVAILABLE 并以 75 退出，宿主机退回一次性 launcher。
+
+隔离：每篇任务在 fork 出的子进程中运行（os.setsid，独立进程组），stdout/stderr
+直接写入该任务的 Unix socket，RESULT:/PDF_DIAGNOSIS: 契约与一次性驱动完全一致。
+客户端断开时服务向任务进程组发送 TERM/KILL；任务 PID 登记在 JOB_REGISTRY_DIR，
+供宿主机 /proc helper 按 arXiv ID 定位和终止。
+
+服务按“支持文件内容 + PAPER_TRANS_*/HOST_PROXY 环境”计算 socket 名，代码或
+配置变化时自动使用新服务，旧服务空闲超时后退出。
+"""
+import ctypes
+import hashlib
+import json
+import os
+import re
+import selectors
+import signal
+import socket
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+SUPPORT_FILES = (
+    "full_translate_driver.py",
+    "full_translate_service.py",
+    "latex_translation_filters.py",
+    "failure_taxonomy.py",
+    "translation_quality.py",
+    "driver_events.py",
+    "pdf_cost.py",
+    "quality_cache.py",
+    "latex_scan.py",
+    "text_similarity.py",
+    "latex_format_cache.py",
+    "figure_cache.py",
+    "llm_concurrency.py",
+    "llm_router.py",
+)
+SOCKET_DIR = "/tmp"
+JOB_REGISTRY_DIR = "/tmp/paper-trans-driver-jobs"
+EXIT_MARKER = b"PAPER_TRANS_SERVICE_EXIT:"
+UNAVAILABLE_EXIT_CODE = 75
+ID_RE = re.compile(r"^\d{4}\.\d{4,5}$")
+ALLOWED_FLAGS = ("--no-cache", "--keep-translation")
+DEFAULT_IDLE_SECONDS = 1800
+
+
+def _idle_seconds():
+    try:
+        value = int(os.environ.get("PAPER_TRANS_DRIVER_SERVICE_IDLE_SECONDS", DEFAULT_IDLE_SECONDS))
+    except (TypeError, ValueError):
+        value = DEFAULT_IDLE_SECONDS
+    return max(60, min(86400, value))
+
+
+def service_key(environ=None, base_dir=SERVICE_DIR):
+    """Hash of deployed support files and the driver-relevant environment."""
+    environ = os.environ if environ is None else environ
+    digest = hashlib.sha256()
+    for name in SUPPORT_FILES:
+        digest.update(name.encode("utf-8") + b"\0")
+        try:
+            with open(os.path.join(base_dir, name), "rb") as handle:
+                digest.update(hashlib.sha256(handle.read()).digest())
+        except OSError:
+            digest.update(b"missing")
+    for name in sorted(environ):
+        if name == "HOST_PROXY" or name.startswith("PAPER_TRANS_"):
+            digest.update(f"{name}={environ[name]}\0".encode("utf-8", "replace"))
+    digest.update(str(os.getuid()).encode("ascii"))
+    return digest.hexdigest()[:16]
+
+
+def socket_path(key=None):
+    return os.path.join(SOCKET_DIR, f"paper-trans-driver-{key or service_key()}.sock")
+
+
+def parse_submit_args(args):
+    """Validate ``<arxiv_id> [flags]``; returns the driver argv tail or None."""
+    positional = [arg for arg in args if not arg.startswith("--")]
+    flags = [arg for arg in args if arg.startswith("--")]
+    if len(positional) != 1 or not ID_RE.fullmatch(positional[0]):
+        return None
+    if any(flag not in ALLOWED_FLAGS for flag in flags):
+        return None
+    return [positional[0]] + flags
+
+
+def _proc_starttime(pid):
+    try:
+        with open("/proc/%d/stat" % pid, encoding="utf-8") as handle:
+            stat = handle.read()
+        return int(stat[stat.rfind(")") + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _register_job(pid, arxiv_id):
+    os.makedirs(JOB_REGISTRY_DIR, mode=0o755, exist_ok=True)
+    path = os.path.join(JOB_REGISTRY_DIR, str(pid))
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump({
+            "pid": pid,
+            "arxiv_id": arxiv_id,
+            "starttime": _proc_starttime(pid),
+            "service_pid": os.getpid(),
+        }, handle)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _unregister_job(pid):
+    try:
+        os.remove(os.path.join(JOB_REGISTRY_DIR, str(pid)))
+    except OSError:
+        pass
+
+
+def _kill_group(pgid, grace=2.0):
+    for sig, wait in ((signal.SIGTERM, grace), (signal.SIGKILL, 1.0)):
+        try:
+            os.killpg(pgid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            try:
+                os.killpg(pgid, 0)
+            except (ProcessLookupError, PermissionError):
+                return
+            time.sleep(0.05)
+
+
+def _adopted_orphans(job_pids):
+    found = []
+    me = os.getpid()
+    for name in os.listdir("/proc"):
+        if not name.isdigit() or int(name) in job_pids:
+            continue
+        try:
+            with open("/proc/%s/stat" % name, encoding="utf-8") as handle:
+                stat = handle.read()
+            if int(stat[stat.rfind(")") + 2:].split()[1]) == me:
+                found.append(int(name))
+        except (OSError, ValueError, IndexError):
+            continue
+    return found
+
+
+def _run_job(conn, argv_tail, driver):
+    """Child side of fork: become the driver for one paper, never return."""
+    try:
+        os.setsid()
+        fd = conn.fileno()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        os.close(devnull)
+        sys.stdout = open(1, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        arxiv_id, no_cache, keep_translation = driver.parse_job_args(["driver"] + argv_tail)
+        driver.configure_job(arxiv_id, no_cache, keep_translation)
+        driver.main()
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else 1
+        os._exit(code)
+    except BaseException as exc:  # noqa: BLE001 - report and exit the child
+        try:
+            print(f"[driver] ❌ 常驻服务任务异常: {type(exc).__name__}: {exc}", flush=True)
+            print("RESULT:ERROR:常驻服务任务异常", flush=True)
+        finally:
+            os._exit(1)
+    os._exit(1)
+
+
+def serve():
+    key = service_key()
+    path = socket_path(key)
+    log_path = path[:-len(".sock")] + ".log"
+    log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    os.dup2(log_fd, 1)
+    os.dup2(log_fd, 2)
+    os.close(log_fd)
+
+    lock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        lock.connect(path)
+        print(f"[service] 已有服务在运行: {path}", flush=True)
+        return 0
+    except OSError:
+        pass
+    finally:
+        lock.close()
+    try:
+        ctypes.CDLL(None).prctl(36, 1, 0, 0, 0)   # PR_SET_CHILD_SUBREAPER
+    except Exception:
+        pass
+
+    started = time.monotonic()
+    sys.argv = [os.path.join(SERVICE_DIR, "full_translate_driver.py")]
+    sys.path.insert(0, SERVICE_DIR)
+    import full_translate_driver as driver
+    print(f"[service] 驱动预加载完成 ({time.monotonic() - started:.1f}s): key={key}", flush=True)
+
+    tmp_path = f"{path}.{os.getpid()}"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(tmp_path)
+    os.chmod(tmp_path, 0o600)
+    listener.listen(8)
+    os.replace(tmp_path, path)
+    listener.setblocking(False)
+
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ, None)
+    jobs = {}   # pid -> (conn, arxiv_id)
+    last_activity = time.monotonic()
+    stopping = False
+
+    def _stop(_signum, _frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    idle_limit = _idle_seconds()
+
+    try:
+        while True:
+            for sel_key, _ in selector.select(timeout=0.5):
+                if sel_key.data is None:
+                    try:
+                        conn, _addr = listener.accept()
+                    except BlockingIOError:
+                        continue
+                    _accept_job(conn, driver, jobs, selector, listener)
+                    last_activity = time.monotonic()
+                    continue
+                pid = sel_key.data
+                conn = sel_key.fileobj
+                try:
+                    data = conn.recv(1024)
+                except OSError:
+                    data = b""
+                if not data:
+                    # 客户端断开（宿主机超时/人工终止）：收束整篇任务的进程组。
+                    print(f"[service] 客户端断开，终止任务 pid={pid}", flush=True)
+                    selector.unregister(conn)
+                    _kill_group(pid)
+
+            while True:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                job = jobs.pop(pid, None)
+                if job is None:
+                    continue
+                conn, arxiv_id = job
+                _finish_job(pid, status, conn, selector)
+                print(f"[service] 任务结束: {arxiv_id} pid={pid} status={status}", flush=True)
+                last_activity = time.monotonic()
+
+            if not jobs:
+                for orphan in _adopted_orphans(set()):
+                    try:
+                        os.kill(orphan, signal.SIGKILL)
+                    except (ProcessLookupError, PermissionError):
+                        pass
+            current = path_is_ours(path, listener)
+            if stopping or not current:
+                if not jobs:
+                    break
+            elif not jobs and time.monotonic() - last_activity > idle_limit:
+                print(f"[service] 空闲超过 {idle_limit}s，退出", flush=True)
+                break
+    finally:
+        try:
+            if path_is_ours(path, listener):
+                os.remove(path)
+        except OSError:
+            pass
+        listener.close()
+    return 0
+
+
+def path_is_ours(path, listener):
+    try:
+        return os.stat(path).st_ino == os.fstat(listener.fileno()).st_ino
+    except OSError:
+        return False
+
+
+def _accept_job(conn, driver, jobs, selector, listener):
+    conn.setblocking(True)
+    conn.settimeout(10)
+    try:
+        raw = b""
+        while not raw.endswith(b"\n") and len(raw) < 4096:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            raw += chunk
+        request = json.loads(raw.decode("utf-8"))
+        argv_tail = parse_submit_args(request.get("argv", []))
+    except (OSError, ValueError, AttributeError):
+        argv_tail = None
+    conn.settimeout(None)
+    if not argv_tail:
+        try:
+            conn.sendall(b"RESULT:ERROR:invalid service request\n" + EXIT_MARKER + b"2\n")
+        except OSError:
+            pass
+        conn.close()
+        return
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        # 子进程只保留自己的连接，避免其他任务的 socket 因被继承而收不到 EOF。
+        selector.close()
+        listener.close()
+        for other, _arxiv_id in jobs.values():
+            other.close()
+        _run_job(conn, argv_tail, driver)
+    _register_job(pid, argv_tail[0])
+    jobs[pid] = (conn, argv_tail[0])
+    selector.register(conn, selectors.EVENT_READ, pid)
+    print(f"[service] 接收任务: {' '.join(argv_tail)} pid={pid}", flush=True)
+
+
+def _finish_job(pid, status, conn, selector):
+    _unregister_job(pid)
+    # 驱动已 os._exit；同组残留（TeX/BibTeX 等）一起收束。
+    _kill_group(pid, grace=0.5)
+    if os.WIFEXITED(status):
+        code = os.WEXITSTATUS(status)
+    elif os.WIFSIGNALED(status):
+        code = 128 + os.WTERMSIG(status)
+    else:
+        code = 1
+    try:
+        selector.unregister(conn)
+    except (KeyError, ValueError):
+        pass
+    try:
+        conn.sendall(EXIT_MARKER + str(code).encode("ascii") + b"\n")
+    except OSError:
+        pass
+    conn.close()
+
+
+def submit(args):
+    argv_tail = parse_submit_args(args)
+    if not argv_tail:
+        print("RESULT:ERROR:请提供合法 arxiv_id", flush=True)
+        return 2
+    path = socket_path()
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+        client.sendall(json.dumps({"argv": argv_tail}).encode("utf-8") + b"\n")
+    except OSError as exc:
+        client.close()
+        print(f"SERVICE:UNAVAILABLE:{type(exc).__name__}", flush=True)
+        return UNAVAILABLE_EXIT_CODE
+
+    out = sys.stdout.buffer
+    pending = b""
+    while True:
+        try:
+            chunk = client.recv(65536)
+        except InterruptedError:
+            continue
+        except OSError:
+            chunk = b""
+        if not chunk:
+            break
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            pos = line.find(EXIT_MARKER)
+            if pos >= 0:
+                if pos:
+                    out.write(line[:pos] + b"\n")
+                out.flush()
+                try:
+                    return int(line[pos + len(EXIT_MARKER):] or b"1")
+                except ValueError:
+                    return 1
+            out.write(line + b"\n")
+        out.flush()
+    if pending:
+        out.write(pending + b"\n")
+    print("RESULT:ERROR:常驻翻译服务连接中断", flush=True)
+    return 1
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[1] == "serve":
+        return serve()
+    if len(argv) >= 2 and argv[1] == "submit":
+        return submit(argv[2:])
+    print(__doc__, file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Precompiled xelatex formats for translated-paper preambles.
+
+The container driver compiles ``merge_translate_zh.tex`` four or five times
+per recompile, and each xelatex pass re-parses the whole preamble (class,
+tikz, fontawesome, hyperref ...).  This module dumps that preamble once with
+``mylatexformat`` and caches the ``.fmt`` on the container volume, keyed by
+the dumped text, the TeX Live build and any paper-local style files.
+
+XeTeX cannot dump natively loaded fonts, so the dump stops before the first
+font-dependent line (fontspec/xeCJK/ctex/...).  The ``\\usepackage{ctex}``
+line that gpt-academic injects directly after ``\\documentclass`` is moved
+to just after the dump point in a separate compile source; the translated
+TeX itself is never rewritten.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FORMAT_CACHE_VERSION = "paper-trans-latex-format-2026-10-19-v1"
+FORMAT_SOURCE_NAME = "merge_translate_zh_fmt.tex"
+DUMP_MARKER = "\\csname endofdump\\endcsname"
+DEFAULT_MAX_ENTRIES = 32
+LOCAL_STYLE_SUFFIXES = (".sty", ".cls", ".clo", ".cfg", ".def", ".fd")
+
+# Packages that load OpenType fonts (directly or through fontspec) while the
+# preamble is read.  Anything from the first of these onward stays outside
+# the dumped format.
+FONT_PACKAGES = frozenset({
+    "fontspec", "xeCJK", "ctex", "xltxtra", "xunicode", "unicode-math",
+    "mathspec", "polyglossia", "fontawesome", "fontawesome5", "fontawesome6",
+    "academicons", "libertinus", "libertinus-otf", "sourcesanspro",
+    "sourceserifpro", "sourcecodepro", "sourcesans3", "inter", "roboto",
+    "noto", "fira", "FiraSans", "FiraMono", "plex-otf", "emoji",
+})
+FONT_CLASSES = frozenset({
+    "ctexart", "ctexbook", "ctexrep", "ctexbeamer", "ctexbeamerarticle",
+})
+_PACKAGE_RE = re.compile(
+    r"\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{([^{}]*)\}"
+)
+_FONT_COMMAND_RE = re.compile(
+    r"\\(?:setmainfont|setsansfont|setmonofont|newfontfamily|newfontface|"
+    r"setCJK\w*font|setmathfont|setromanfont|defaultfontfeatures|fontspec|"
+    r"xeCJKsetup|ctexset|setdefaultlanguage|setotherlanguage|"
+    r"newCJKfontfamily|addfontfeatures?)(?![A-Za-z@])"
+)
+_DOCUMENTCLASS_RE = re.compile(
+    r"\\documentclass\s*(?:\[[^\]]*\])?\s*\{([^{}]*)\}[^\n]*\n"
+)
+_BEGIN_DOCUMENT_RE = re.compile(r"\\begin\s*\{document\}")
+_INJECTED_CTEX_RE = re.compile(r"\\usepackage\s*\{ctex\}[ \t]*\n")
+
+
+def _strip_comment(line: str) -> str:
+    idx = 0
+    while True:
+        idx = line.find("%", idx)
+        if idx < 0:
+            return line
+        backslashes = 0
+        pos = idx - 1
+        while pos >= 0 and line[pos] == "\\":
+            backslashes += 1
+            pos -= 1
+        if backslashes % 2 == 0:
+            return line[:idx]
+        idx += 1
+
+
+def _line_loads_fonts(line: str) -> bool:
+    code = _strip_comment(line)
+    if "\\" not in code:
+        return False
+    if _FONT_COMMAND_RE.search(code):
+        return True
+    for match in _PACKAGE_RE.finditer(code):
+        names = {name.strip() for name in match.group(1).split(",")}
+        if names & FONT_PACKAGES:
+            return True
+    return False
+
+
+def split_dumpable_preamble(source: str) -> Optional[Tuple[str, str]]:
+    """Return ``(dump_prefix, compile_source)`` or ``None`` when not dumpable.
+
+    ``dump_prefix`` is the exact text stored in the format (used for the cache
+    key).  ``compile_source`` is the translated TeX with :data:`DUMP_MARKER`
+    at the cut and the injected ``\\usepackage{ctex}`` moved behind it.
+    """
+    doc_match = _DOCUMENTCLASS_RE.search(source)
+    begin_match = _BEGIN_DOCUMENT_RE.search(source)
+    if not doc_match or not begin_match or begin_match.start() < doc_match.end():
+        return None
+    head = source[:doc_match.start()]
+    if any(_strip_comment(line).strip() for line in head.splitlines()):
+        # Material before \documentclass (\RequirePackage, \pdfoutput, %&fmt)
+        # is too irregular to dump safely.
+        return None
+    classes = {name.strip() for name in doc_match.group(1).split(",")}
+    if classes & FONT_CLASSES:
+        return None
+
+    after_class = doc_match.end()
+    preamble = source[after_class:begin_match.start()]
+    if DUMP_MARKER in preamble:
+        cut = source.index(DUMP_MARKER, after_class)
+        return source[:cut], source
+
+    moved = ""
+    ctex_match = _INJECTED_CTEX_RE.match(preamble)
+    if ctex_match:
+        moved = ctex_match.group(0)
+        preamble = preamble[ctex_match.end():]
+
+    offset = 0
+    cut = len(preamble)
+    for line in preamble.splitlines(keepends=True):
+        if _line_loads_fonts(line):
+            cut = offset
+            break
+        offset += len(line)
+
+    prefix = source[:after_class] + preamble[:cut]
+    if not preamble[:cut].strip():
+        # Only the class would be dumped; not worth a format file.
+        return None
+    if not prefix.endswith("\n"):
+        prefix += "\n"
+    compile_source = (
+        prefix
+        + DUMP_MARKER + "\n"
+        + moved
+        + preamble[cut:]
+        + source[begin_match.start():]
+    )
+    return prefix, compile_source
+
+
+def local_style_files(workfolder: str) -> List[str]:
+    """Paper-local class/style files that the dumped preamble may read."""
+    found = []
+    for root, dirs, files in os.walk(workfolder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.endswith(LOCAL_STYLE_SUFFIXES):
+                found.append(os.path.join(root, name))
+    return found
+
+
+def format_cache_key(prefix: str, tex_version: str, style_files: Iterable[str], workfolder: str = "") -> str:
+    """Stable format name for one preamble/TeX build/local-style combination."""
+    digest = hashlib.sha256()
+    for part in (FORMAT_CACHE_VERSION, tex_version.strip(), prefix):
+        digest.update(part.encode("utf-8", errors="replace"))
+        digest.update(b"\0")
+    for path in style_files:
+        rel = os.path.relpath(path, workfolder) if workfolder else os.path.basename(path)
+        digest.update(rel.encode("utf-8", errors="replace"))
+        digest.update(b"\0")
+        with open(path, "rb") as handle:
+            digest.update(hashlib.sha256(handle.read()).digest())
+    return "paper-trans-" + digest.hexdigest()[:24]
+
+
+_TEX_VERSION_CACHE: Dict[str, str] = {}
+
+
+def tex_engine_version(engine: str = "xelatex", env: Optional[dict] = None) -> str:
+    """First line of ``<engine> --version``; empty when the engine is absent."""
+    if engine not in _TEX_VERSION_CACHE:
+        try:
+            result = subprocess.run(
+                [engine, "--version"], stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, timeout=30, env=env,
+            )
+            text = result.stdout.decode("utf-8", errors="replace")
+            _TEX_VERSION_CACHE[engine] = text.splitlines()[0] if text else ""
+        except (OSError, subprocess.SubprocessError):
+            _TEX_VERSION_CACHE[engine] = ""
+    return _TEX_VERSION_CACHE[engine]
+
+
+def format_cache_enabled(environ: Optional[dict] = None) -> bool:
+    value = (environ if environ is not None else os.environ).get(
+        "PAPER_TRANS_LATEX_FORMAT_CACHE", "1"
+    )
+    return value.strip().lower() not in {"0", "off", "false", "no"}
+
+
+def format_env(env: dict, cache_dir: str) -> dict:
+    """Copy of ``env`` whose kpathsea format search starts at ``cache_dir``."""
+    merged = dict(env)
+    existing = merged.get("TEXFORMATS", "")
+    # A trailing empty element makes kpathsea append the default format path.
+    merged["TEXFORMATS"] = f"{cache_dir}:{existing}" if existing else f"{cache_dir}:"
+    return merged
+
+
+def format_path(cache_dir: str, name: str) -> str:
+    return os.path.join(cache_dir, name + ".fmt")
+
+
+def discard_format(cache_dir: str, name: str) -> None:
+    try:
+        os.remove(format_path(cache_dir, name))
+    except OSError:
+        pass
+
+
+def prune_format_cache(cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> List[str]:
+    """Delete least-recently-used formats beyond ``max_entries``."""
+    try:
+        names = [name for name in os.listdir(cache_dir) if name.endswith(".fmt")]
+    except OSError:
+        return []
+    entries = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    removed = []
+    for _mtime, path in entries[max(0, max_entries):]:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            continue
+    return removed
+
+
+def dump_format_command(name: str, source_name: str = FORMAT_SOURCE_NAME) -> List[str]:
+    return [
+        "xelatex", "-ini", "-interaction=nonstopmode", "-no-shell-escape",
+        f"-jobname={name}", "&xelatex", "mylatexformat.ltx", source_name,
+    ]
+
+
+def mylatexformat_available(env: Optional[dict] = None) -> bool:
+    try:
+        result = subprocess.run(
+            ["kpsewhich", "mylatexformat.ltx"], stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, timeout=30, env=env,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
+def prepare_xelatex_format(
+    workfolder: str,
+    cache_dir: str,
+    env: dict,
+    tex_name: str = "merge_translate_zh.tex",
+    timeout: int = 600,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> Optional[Dict[str, object]]:
+    """Ensure a cached format for ``tex_name`` and write its compile source.
+
+    Returns ``{"name", "cache_dir", "source", "hit"}`` when xelatex should run
+    ``-fmt=<name> -jobname=merge_translate_zh <source>`` with
+    :func:`format_env`; ``None`` means compile the original file as before.
+    """
+    tex_path = os.path.join(workfolder, tex_name)
+    try:
+        with open(tex_path, encoding="utf-8", errors="replace") as handle:
+            source = handle.read()
+    except OSError:
+        return None
+    split = split_dumpable_preamble(source)
+    if split is None:
+        return None
+    prefix, compile_source = split
+    version = tex_engine_version("xelatex", env)
+    if not version:
+        return None
+    name = format_cache_key(prefix, version, local_style_files(workfolder), workfolder)
+    source_path = os.path.join(workfolder, FORMAT_SOURCE_NAME)
+    with open(source_path, "w", encoding="utf-8") as handle:
+        handle.write(compile_source)
+
+    cached = format_path(cache_dir, name)
+    if os.path.exists(cached):
+        try:
+            os.utime(cached, None)
+        except OSError:
+            pass
+        return {"name": name, "cache_dir": cache_dir, "source": FORMAT_SOURCE_NAME, "hit": True}
+
+    if not mylatexformat_available(env):
+        return None
+    try:
+        result = subprocess.run(
+            dump_format_command(name), cwd=workfolder, timeout=timeout,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    dumped = os.path.join(workfolder, name + ".fmt")
+    for leftover in (name + ".log",):
+        try:
+            os.remove(os.path.join(workfolder, leftover))
+        except OSError:
+            pass
+    if result.returncode != 0 or not os.path.exists(dumped):
+        try:
+            os.remove(dumped)
+        except OSError:
+            pass
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.{int(time.time() * 1000)}.tmp"
+    try:
+        shutil.move(dumped, tmp)
+        os.replace(tmp, cached)
+    except OSError:
+        for path in (dumped, tmp):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return None
+    prune_format_cache(cache_dir, max_entries)
+    return {"name": name, "cache_dir": cache_dir, "source": FORMAT_SOURCE_NAME, "hit": False}
@@ -7,7 +7,6 @@ checks, and fallback restoration. Keeping the policy here prevents future fixes
 from being hard-coded in only one of those paths.
 """
 
-import difflib
 import os
 import re
 import tarfile
@@ -15,6 +14,14 @@ from collections import Counter
 from pathlib import PurePosixPath
 from typing import Iterable, List, Optional, Set, Tuple
 
+try:
+    # Container deployment copies these support modules beside the filters.
+    from latex_scan import LatexScan
+    import text_similarity
+except ImportError:
+    from paperhub.latex_scan import LatexScan
+    from paperhub import text_similarity
+
 
 def rank_main_tex_candidate(path: str, content: str, candidates: Iterable[str]) -> int:
     """Rank a TeX file as an entrypoint without guessing from prose volume.
@@ -464,8 +471,10 @@ def llm_translation_response_quota_failed(text: str) -> bool:
 # English to Chinese`` / ``Language: Chinese`` is a known prompt echo that can
 # replace an entire LaTeX list item.  Reject it before merge instead of trying
 # to regex-delete the already-corrupted output afterwards.
+# Anchored: the DOTALL lookaheads already scan the whole response, so
+# retrying them at every offset (plain ``search``) only made this quadratic.
 LLM_TRANSLATION_TASK_ECHO_RE = re.compile(
-    r"(?is)(?=.*\bclassification\s*:\s*academic\s+translation\b)"
+    r"(?is)\A(?=.*\bclassification\s*:\s*academic\s+translation\b)"
     r"(?=.*\btask\s*:\s*english\s+to\s+chinese\b)"
     r"(?=.*\blanguage\s*:\s*chinese\b)"
 )
@@ -496,40 +505,12 @@ _BARE_HEADING_LABELS = {
 
 def _without_unescaped_comments(text: str) -> str:
     """Remove TeX comments before comparing structural command signatures."""
-    lines = []
-    for line in (text or "").splitlines(keepends=True):
-        cut = len(line)
-        for index, char in enumerate(line):
-            if char != "%":
-                continue
-            slashes = 0
-            cursor = index - 1
-            while cursor >= 0 and line[cursor] == "\\":
-                slashes += 1
-                cursor -= 1
-            if slashes % 2 == 0:
-                cut = index
-                break
-        lines.append(line[:cut])
-    return "".join(lines)
+    return LatexScan(text).without_comments()
 
 
 def _unescaped_brace_balance(text: str) -> int:
     """Return the net balance of uncommented, unescaped TeX braces."""
-    balance = 0
-    for line in _without_unescaped_comments(text).splitlines(keepends=True):
-        for index, char in enumerate(line):
-            if char not in "{}":
-                continue
-            slashes = 0
-            cursor = index - 1
-            while cursor >= 0 and line[cursor] == "\\":
-                slashes += 1
-                cursor -= 1
-            if slashes % 2:
-                continue
-            balance += 1 if char == "{" else -1
-    return balance
+    return LatexScan(text).final_depth
 
 
 def _critical_latex_signature(
@@ -1653,30 +1634,34 @@ def llm_translation_response_untranslated(source: str, response: str) -> bool:
     )
     response_cjk = len(re.findall(r"[\u4e00-\u9fff]", response_prose))
 
+    if (
+        source_letters >= 40
+        and len(source_words) >= 6
+        and source_cjk < 8
+        and response_letters >= 24
+        and response_cjk < 6
+    ):
+        return True
+
     # Short prose used to rely on long reference keys to cross the generic
     # 40-letter threshold. Once those keys are correctly removed, retain a
     # narrow exact-copy detector so a genuine English echo is still rejected.
-    source_word_text = " ".join(word.lower() for word in source_words)
-    response_word_text = " ".join(word.lower() for word in response_words)
-    copied_short_prose = (
+    # Checked last: long untranslated chunks are decided above without it.
+    if not (
         source_letters >= 12
         and len(source_words) >= 3
         and source_cjk < 8
         and response_letters >= 10
         and response_cjk < 6
-        and difflib.SequenceMatcher(
-            None,
-            source_word_text,
-            response_word_text,
-        ).ratio() >= 0.92
-    )
-    return copied_short_prose or (
-        source_letters >= 40
-        and len(source_words) >= 6
-        and source_cjk < 8
-        and response_letters >= 24
-        and response_cjk < 6
-    )
+    ):
+        return False
+    source_word_text = " ".join(word.lower() for word in source_words)
+    response_word_text = " ".join(word.lower() for word in response_words)
+    return text_similarity.ratio(
+        source_word_text,
+        response_word_text,
+        cutoff=0.92,
+    ) >= 0.92
 
 
 TRANSLATION_STRUCTURAL_UNIT_RE = re.compile(
@@ -2001,6 +1986,137 @@ def enforce_translation_fragment_limits(
     return bounded
 
 
+TRANSLATION_PACK_MAX_SEGMENTS = 8
+TRANSLATION_PACK_MARKER = "%%% PAPER_TRANS_SEGMENT {} %%%"
+TRANSLATION_PACK_MARKER_RE = re.compile(
+    r"^[ \t]*%%% PAPER_TRANS_SEGMENT (\d+) %%%[ \t]*$",
+    re.MULTILINE,
+)
+TRANSLATION_PACK_INSTRUCTION = (
+    "\n\nThe text contains several independent segments. Each segment starts "
+    "with a LaTeX comment line of the form `%%% PAPER_TRANS_SEGMENT k %%%`. "
+    "Copy every marker line unchanged on its own line, keep the segments in "
+    "order, and translate each segment in place below its marker."
+)
+_TOKEN_WORD_RE = re.compile(r"[A-Za-z]+|\d+")
+_TOKEN_SYMBOL_RE = re.compile(r"[^\sA-Za-z\d\u4e00-\u9fff]")
+_TOKEN_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+
+def estimate_translation_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer dependency.
+
+    Latin words cost about one token per four letters, every CJK character
+    and every LaTeX symbol (backslash, brace, dollar, punctuation) about one.
+    """
+    value = text or ""
+    words = sum(
+        max(1, (len(word) + 3) // 4)
+        for word in _TOKEN_WORD_RE.findall(value)
+    )
+    return (
+        words
+        + len(_TOKEN_CJK_RE.findall(value))
+        + len(_TOKEN_SYMBOL_RE.findall(value))
+    )
+
+
+def _packable_translation_fragment(text: str) -> bool:
+    value = text or ""
+    return (
+        bool(value.strip())
+        and "PAPER_TRANS_SEGMENT" not in value
+        # Citation/reference-dense prose already gets a deliberately small
+        # request so the citation multiset stays recoverable; keep it alone.
+        and recommended_translation_chunk_limit(value) >= 1200
+    )
+
+
+def plan_translation_packs(
+    sources: List[str],
+    target_tokens: int,
+    sys_prompts: Optional[List[str]] = None,
+    histories: Optional[List[object]] = None,
+    max_segments: int = TRANSLATION_PACK_MAX_SEGMENTS,
+) -> List[List[int]]:
+    """Group adjacent fragment indices into requests near ``target_tokens``.
+
+    A pack never spans a heading (a fragment opening a structural unit starts
+    a new pack), never mixes system prompts or histories, and never grows
+    past ``target_tokens`` or ``max_segments``.  ``target_tokens <= 0``
+    disables packing (every fragment is its own request).
+    """
+    packs: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    def request_key(index):
+        prompt = sys_prompts[index] if sys_prompts and index < len(sys_prompts) else ""
+        history = histories[index] if histories and index < len(histories) else []
+        return prompt, repr(history)
+
+    for index, source in enumerate(sources):
+        tokens = estimate_translation_tokens(source)
+        packable = target_tokens > 0 and _packable_translation_fragment(source)
+        joins = (
+            packable
+            and current
+            and len(current) < max_segments
+            and current_tokens + tokens <= target_tokens
+            and not starts_translation_structural_unit(source)
+            and request_key(index) == request_key(current[0])
+            and _packable_translation_fragment(sources[current[0]])
+        )
+        if joins:
+            current.append(index)
+            current_tokens += tokens
+            continue
+        if current:
+            packs.append(current)
+        current = [index]
+        current_tokens = tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def build_packed_translation_input(prefix: str, fragments: List[str]) -> str:
+    """Upstream prompt prefix followed by marker-delimited fragments."""
+    body = "".join(
+        TRANSLATION_PACK_MARKER.format(position + 1) + "\n" + fragment.strip() + "\n"
+        for position, fragment in enumerate(fragments)
+    )
+    return prefix + body
+
+
+def split_packed_translation_response(
+    response: str,
+    sources: List[str],
+) -> Optional[List[str]]:
+    """Recover per-fragment translations, or ``None`` if markers were lost.
+
+    Markers must appear exactly once each, numbered ``1..len(sources)`` in
+    order, with nothing but whitespace before the first one.  Each segment
+    takes its source fragment's leading/trailing whitespace, since the marker
+    layout (not the model) decides the whitespace around a segment.
+    """
+    value = response or ""
+    matches = list(TRANSLATION_PACK_MARKER_RE.finditer(value))
+    if [int(match.group(1)) for match in matches] != list(range(1, len(sources) + 1)):
+        return None
+    if value[:matches[0].start()].strip():
+        return None
+    parts = []
+    for position, match in enumerate(matches):
+        end = matches[position + 1].start() if position + 1 < len(matches) else len(value)
+        source = sources[position] or ""
+        body = source.strip()
+        leading = source[:len(source) - len(source.lstrip())]
+        trailing = source[len(leading) + len(body):]
+        parts.append(leading + value[match.end():end].strip() + trailing)
+    return parts
+
+
 def _extra_artifact_patterns() -> List[object]:
     raw = os.environ.get("PAPER_TRANS_EXTRA_LLM_ARTIFACT_PATTERNS", "")
     if not raw.strip():
@@ -2025,25 +2141,7 @@ def strip_llm_translation_artifacts(text: str) -> Tuple[str, int]:
 
 def find_uncommented_latex_token(text: str, token: str) -> int:
     """Return the first TeX token position outside an unescaped ``%`` comment."""
-    offset = 0
-    for line in (text or "").splitlines(keepends=True):
-        comment_at = len(line)
-        for index, char in enumerate(line):
-            if char != "%":
-                continue
-            backslashes = 0
-            cursor = index - 1
-            while cursor >= 0 and line[cursor] == "\\":
-                backslashes += 1
-                cursor -= 1
-            if backslashes % 2 == 0:
-                comment_at = index
-                break
-        position = line[:comment_at].find(token)
-        if position >= 0:
-            return offset + position
-        offset += len(line)
-    return -1
+    return LatexScan(text).find_uncommented(token)
 
 
 def _safe_top_level_line_start(text: str, position: int) -> int:
@@ -2125,14 +2223,15 @@ def insert_latex_preamble_snippet(
     if not snippet or snippet in text:
         return text, False
 
+    scan = LatexScan(text)
     positions = []
     for marker in command_markers:
         token = marker if marker.startswith("\\") else "\\" + marker
-        pos = find_uncommented_latex_token(text, token)
+        pos = scan.find_uncommented(token)
         if pos >= 0:
             positions.append(pos)
 
-    begin_doc = find_uncommented_latex_token(text, r"\begin{document}")
+    begin_doc = scan.find_uncommented(r"\begin{document}")
     if positions:
         pos = min(positions)
         if begin_doc < 0 or pos < begin_doc:
@@ -2766,24 +2865,17 @@ def separate_builtin_layout_ascii_glue(
         total += 1
         return "\\" + match.group("layout") + " " + match.group("cjk")
 
-    for line in source.splitlines(keepends=True):
+    scan = LatexScan(source)
+    for index in range(len(scan)):
+        line = scan.line(index)
         begins = re.findall(r"\\begin\{([^{}]+)\}", line)
         protected = bool(env_stack) or any(env in verbatim_envs for env in begins)
         if protected:
             output.append(line)
         else:
             comment_at = len(line)
-            for index, char in enumerate(line):
-                if char != "%":
-                    continue
-                backslashes = 0
-                cursor = index - 1
-                while cursor >= 0 and line[cursor] == "\\":
-                    backslashes += 1
-                    cursor -= 1
-                if backslashes % 2 == 0:
-                    comment_at = index
-                    break
+            if scan.has_comment(index):
+                comment_at = scan.comment_starts[index] - scan.line_starts[index]
             body = glued_re.sub(replace, line[:comment_at])
             body = glued_cjk_re.sub(replace_cjk, body)
             output.append(body + line[comment_at:])
@@ -3219,13 +3311,22 @@ def unique_label_replacement(
         target for target in targets
         if target.startswith(namespace + ":") and target in original_targets
     ]
-    scored = sorted(
-        (
-            difflib.SequenceMatcher(None, label, target).ratio(),
-            target,
-        )
-        for target in comparable
-    )
+    if not comparable:
+        return None
+    # Score in decreasing upper-bound order and stop once no remaining
+    # candidate can enter the top two (or reach the threshold at all).
+    bounded = sorted(
+        ((text_similarity.upper_bound(label, target), target) for target in comparable),
+        reverse=True,
+    )
+    scored = []
+    for bound, target in bounded:
+        if len(scored) >= 2 and bound < scored[-2][0]:
+            break
+        if bound < 0.78 and (not scored or scored[-1][0] < 0.78):
+            break
+        scored.append((text_similarity.ratio(label, target), target))
+        scored.sort()
     if not scored:
         return None
     best_score, best = scored[-1]
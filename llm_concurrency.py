@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""Adaptive (AIMD) concurrency for the container's LLM chunk requests.
+
+gpt-academic submits a whole batch of chunks to a fixed-size thread pool.
+The driver sizes that pool at the ceiling and routes every request through
+:class:`AimdLimiter` instead:
+
+- a successful response raises the limit additively (+1/limit per success,
+  i.e. roughly +1 per full window);
+- a response or exception carrying 429/rate-limit/quota markers halves it,
+  at most once per cooldown so one window of in-flight 429s is one cut;
+- the limit and the time of the last cut live in a flock-guarded state file
+  on the gpt_log volume, so concurrent drivers share one budget (split by
+  live driver count) and one cooldown.
+
+:class:`HedgedCaller` handles the tail: once a request outlives the observed
+p90 latency for its input size, or streams no first token within the TTFT
+deadline, one duplicate is issued (bounded by a per-process hedging budget).
+The first valid response wins; the loser is cancelled through upstream's own
+``observe_window`` watchdog slot, which aborts its streaming loop.
+
+Standard library only; deployed beside the driver in the container's /tmp.
+"""
+
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import latex_translation_filters as _ltf
+
+DEFAULT_INITIAL_LIMIT = 2
+DEFAULT_MAX_LIMIT = 8
+HARD_MAX_LIMIT = 16
+MIN_LIMIT = 1.0
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN_SECONDS = 10.0
+SYNC_EVERY_SUCCESSES = 8
+SYNC_INTERVAL_SECONDS = 2.0
+STATE_TTL_SECONDS = 6 * 3600
+DRIVER_TTL_SECONDS = 180
+DEFAULT_HEDGE_BUDGET = 0.1
+DEFAULT_TTFT_SECONDS = 45
+HEDGE_MIN_SAMPLES = 5
+HEDGE_PERCENTILE = 90
+LATENCY_WINDOW = 64
+THROTTLE_MARKERS = (
+    "Too Many Requests",
+    "Rate limit reached",
+    "rate_limit_exceeded",
+    "429 Client Error",
+    "Error code: 429",
+)
+
+
+def adaptive_enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    value = str(environ.get("PAPER_TRANS_LLM_ADAPTIVE", "1")).strip().lower()
+    return value not in ("0", "off", "false", "no")
+
+
+def _bounded_int(environ, name, default, minimum, maximum):
+    try:
+        value = int(environ.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(minimum, min(maximum, value))
+
+
+def limits_from_env(environ=None):
+    """``(initial, maximum)``：PAPER_TRANS_LLM_WORKERS 作为起点，MAX_WORKERS 为上限。"""
+    environ = os.environ if environ is None else environ
+    maximum = _bounded_int(
+        environ, "PAPER_TRANS_LLM_MAX_WORKERS", DEFAULT_MAX_LIMIT, 1, HARD_MAX_LIMIT,
+    )
+    initial = _bounded_int(
+        environ, "PAPER_TRANS_LLM_WORKERS", DEFAULT_INITIAL_LIMIT, 1, maximum,
+    )
+    return initial, maximum
+
+
+def hedge_settings_from_env(environ=None):
+    """``(budget, ttft_seconds)``; a budget of 0 disables hedging."""
+    environ = os.environ if environ is None else environ
+    try:
+        budget = float(environ.get("PAPER_TRANS_LLM_HEDGE_BUDGET", DEFAULT_HEDGE_BUDGET))
+    except (TypeError, ValueError):
+        budget = DEFAULT_HEDGE_BUDGET
+    ttft = _bounded_int(environ, "PAPER_TRANS_LLM_TTFT_SECONDS", DEFAULT_TTFT_SECONDS, 5, 600)
+    return max(0.0, min(1.0, budget)), ttft
+
+
+def is_throttled(text):
+    value = text or ""
+    return (
+        any(marker in value for marker in THROTTLE_MARKERS)
+        or _ltf.llm_translation_response_quota_failed(value)
+    )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class AimdLimiter:
+    """Thread-safe AIMD gate; ``state_path=None`` keeps the limit process-local.
+
+    Additive increases take effect locally at once and are published to the
+    shared state file in batches (every ``SYNC_EVERY_SUCCESSES`` successes or
+    ``SYNC_INTERVAL_SECONDS``); cuts are published immediately. File I/O runs
+    outside the gate's condition so waiting requests are not blocked by it.
+    """
+
+    def __init__(self, state_path=None, initial=DEFAULT_INITIAL_LIMIT,
+                 maximum=DEFAULT_MAX_LIMIT, clock=time.time,
+                 cooldown=DECREASE_COOLDOWN_SECONDS):
+        self.state_path = state_path
+        self.maximum = max(1, int(maximum))
+        self.initial = self._clamp(initial)
+        self.limit = self.initial
+        self.cooldown = cooldown
+        self.successes = 0
+        self.throttles = 0
+        self._clock = clock
+        self._share = 1
+        self._inflight = 0
+        self._last_cut = None
+        self._registered = False
+        self._synced_limit = self.initial
+        self._unsynced = 0
+        self._last_sync = 0.0
+        self._cond = threading.Condition()
+        self._sync_lock = threading.Lock()
+
+    def _clamp(self, value):
+        return max(MIN_LIMIT, min(float(self.maximum), float(value)))
+
+    def local_cap(self):
+        """Concurrent requests this process may run under the shared budget."""
+        return max(1, int(math.floor(self.limit / max(1, self._share))))
+
+    def _adjust(self, limit, increases, cut, last_cut, now):
+        """Apply ``increases`` additive steps and an optional cut; returns ``(limit, last_cut)``."""
+        for _ in range(increases):
+            limit = self._clamp(limit + 1.0 / max(limit, 1.0))
+        if cut and (last_cut is None or now - last_cut >= self.cooldown):
+            limit = self._clamp(limit * DECREASE_FACTOR)
+            last_cut = now
+        return limit, last_cut
+
+    def _sync(self, limit, increases, cut, last_cut, now):
+        """Merge with the shared state file; returns ``(limit, last_cut, share)``.
+
+        The cut cooldown is read from the file under the flock, so concurrent
+        drivers throttled by the same burst halve the shared limit only once.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.state_path + ".lock", "a+") as lock:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                try:
+                    with open(self.state_path, encoding="utf-8") as handle:
+                        state = json.load(handle)
+                except (OSError, ValueError):
+                    state = {}
+                if not isinstance(state, dict):
+                    state = {}
+                drivers = {}
+                for pid, seen in (state.get("drivers") or {}).items():
+                    try:
+                        if now - float(seen) < DRIVER_TTL_SECONDS and _pid_alive(int(pid)):
+                            drivers[str(pid)] = float(seen)
+                    except (TypeError, ValueError):
+                        continue
+                drivers[str(os.getpid())] = now
+                shared = state.get("limit")
+                try:
+                    fresh = now - float(state.get("updated", 0)) < STATE_TTL_SECONDS
+                except (TypeError, ValueError):
+                    fresh = False
+                if fresh and isinstance(shared, (int, float)):
+                    limit = self._clamp(shared)
+                try:
+                    shared_cut = float(state["last_cut"])
+                except (KeyError, TypeError, ValueError):
+                    shared_cut = None
+                if shared_cut is not None and (last_cut is None or shared_cut > last_cut):
+                    last_cut = shared_cut
+                limit, last_cut = self._adjust(limit, increases, cut, last_cut, now)
+                staged = f"{self.state_path}.{os.getpid()}.tmp"
+                with open(staged, "w", encoding="utf-8") as handle:
+                    json.dump(
+                        {"limit": limit, "updated": now, "last_cut": last_cut, "drivers": drivers},
+                        handle,
+                    )
+                os.replace(staged, self.state_path)
+                return limit, last_cut, len(drivers)
+        except OSError:
+            # 状态文件不可用时退化为进程内 AIMD
+            limit, last_cut = self._adjust(limit, increases, cut, last_cut, now)
+            return limit, last_cut, self._share
+
+    def flush(self, cut=False):
+        """Publish batched increases (and a pending cut) to the shared state."""
+        with self._sync_lock:
+            with self._cond:
+                increases, self._unsynced = self._unsynced, 0
+                limit, last_cut = self._synced_limit, self._last_cut
+                now = self._last_sync = self._clock()
+            limit, last_cut, share = self._sync(limit, increases, cut, last_cut, now)
+            with self._cond:
+                self._synced_limit, self._last_cut, self._share = limit, last_cut, share
+                self._registered = True
+                # I/O 期间到达的成功先在本地生效，下次同步再发布
+                self.limit = self._adjust(limit, self._unsynced, False, None, now)[0]
+                self._cond.notify_all()
+
+    def acquire(self):
+        if self.state_path and not self._registered:
+            self.flush()
+        with self._cond:
+            while self._inflight >= self.local_cap():
+                self._cond.wait(timeout=1.0)
+            self._inflight += 1
+
+    def release(self, outcome):
+        """``outcome``: ``ok`` (additive increase), ``throttled`` (cut) or ``error``."""
+        cut = False
+        with self._cond:
+            self._inflight -= 1
+            now = self._clock()
+            if outcome == "ok":
+                self.successes += 1
+                self._unsynced += 1
+                self.limit = self._clamp(self.limit + 1.0 / max(self.limit, 1.0))
+            elif outcome == "throttled":
+                self.throttles += 1
+                # 本进程冷却期内已减半过（或已采纳别的驱动的减半），不必再读状态文件
+                cut = self._last_cut is None or now - self._last_cut >= self.cooldown
+            if self.state_path:
+                due = (
+                    cut
+                    or self._unsynced >= SYNC_EVERY_SUCCESSES
+                    or now - self._last_sync >= SYNC_INTERVAL_SECONDS
+                )
+            else:
+                due = False
+                self._unsynced = 0
+                if cut:
+                    self.limit, self._last_cut = self._adjust(self.limit, 0, True, self._last_cut, now)
+            self._cond.notify_all()
+        if due:
+            self.flush(cut)
+
+    def call(self, func, *args, **kwargs):
+        """Run one LLM request under the gate and feed its outcome back."""
+        self.acquire()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            text = result if isinstance(result, str) else str(result or "")
+            if is_throttled(text):
+                outcome = "throttled"
+            elif text.strip():
+                outcome = "ok"
+            return result
+        except Exception as exc:
+            if is_throttled(f"{type(exc).__name__}: {exc}"):
+                outcome = "throttled"
+            raise
+        finally:
+            self.release(outcome)
+
+
+def size_bucket(chars):
+    """Latency bucket for an input of ``chars`` characters (1k, 2k, 4k ... 32k+)."""
+    return min(6, max(0, int(chars) // 1024).bit_length())
+
+
+class LatencyTracker:
+    """Recent successful request latencies, grouped by input size bucket."""
+
+    def __init__(self, window=LATENCY_WINDOW, min_samples=HEDGE_MIN_SAMPLES,
+                 pct=HEDGE_PERCENTILE):
+        self.window = window
+        self.min_samples = min_samples
+        self.pct = pct
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, chars, seconds):
+        with self._lock:
+            bucket = self._samples.setdefault(size_bucket(chars), deque(maxlen=self.window))
+            bucket.append(float(seconds))
+
+    def threshold(self, chars):
+        """p90 latency for this size, or ``None`` until enough samples exist."""
+        with self._lock:
+            samples = sorted(self._samples.get(size_bucket(chars), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(math.ceil(len(samples) * self.pct / 100.0)) - 1)]
+
+
+def _valid_response(result):
+    return isinstance(result, str) and bool(result.strip()) and not is_throttled(result)
+
+
+class _Attempt:
+    def __init__(self, clock, finished):
+        self.started = clock()
+        self.window = ["", time.time(), ""]
+        self.done = False
+        self.cancelled = False
+        self.result = None
+        self.error = None
+        self._finished = finished
+
+    def run(self, func, args, kwargs):
+        try:
+            self.result = func(*args, **kwargs)
+        except BaseException as exc:  # 由发起方决定是否重新抛出
+            self.error = exc
+        finally:
+            self.done = True
+            self._finished.set()
+
+    def cancel(self):
+        self.cancelled = True
+        # upstream 流式循环发现看门狗时间戳过期即抛出“用户取消了程序”
+        self.window[1] = 0
+
+
+class HedgedCaller:
+    """Issue at most one duplicate for slow or stalled LLM requests."""
+
+    def __init__(self, budget=DEFAULT_HEDGE_BUDGET, ttft_seconds=DEFAULT_TTFT_SECONDS,
+                 tracker=None, clock=time.monotonic, poll_seconds=0.5):
+        self.budget = budget
+        self.ttft_seconds = ttft_seconds
+        self.tracker = tracker or LatencyTracker()
+        self.poll_seconds = poll_seconds
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _take_budget(self):
+        with self._lock:
+            if self.budget <= 0 or self.hedges >= max(1.0, self.budget * self.requests):
+                return False
+            self.hedges += 1
+            return True
+
+    def _start(self, func, args, kwargs, finished):
+        attempt = _Attempt(self._clock, finished)
+        call_args, call_kwargs = list(args), dict(kwargs)
+        if len(call_args) > 4:
+            call_args[4] = attempt.window
+        else:
+            call_kwargs["observe_window"] = attempt.window
+        thread = threading.Thread(
+            target=attempt.run, args=(func, tuple(call_args), call_kwargs), daemon=True,
+        )
+        thread.start()
+        return attempt
+
+    def call(self, func, *args, **kwargs):
+        """Same contract as ``predict_no_ui_long_connection``."""
+        with self._lock:
+            self.requests += 1
+        caller_window = kwargs.get("observe_window", args[4] if len(args) > 4 else None)
+        if caller_window is not None and len(caller_window) < 2:
+            caller_window = None
+        inputs = kwargs.get("inputs", args[0] if args else "")
+        chars = len(inputs) if isinstance(inputs, str) else 0
+        started = self._clock()
+        delay = self.tracker.threshold(chars)
+        finished = threading.Event()
+        attempts = [self._start(func, args, kwargs, finished)]
+        while True:
+            finished.wait(self.poll_seconds)
+            finished.clear()
+            for attempt in attempts:
+                if not attempt.cancelled:
+                    attempt.window[1] = caller_window[1] if caller_window else time.time()
+            if caller_window is not None:
+                caller_window[0] = max((a.window[0] for a in attempts), key=len)
+            for index, attempt in enumerate(attempts):
+                if attempt.done and attempt.error is None and _valid_response(attempt.result):
+                    for other in attempts:
+                        if other is not attempt and not other.done:
+                            other.cancel()
+                    self.tracker.record(chars, self._clock() - attempt.started)
+                    if index:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return attempt.result
+            if all(attempt.done for attempt in attempts):
+                primary = attempts[0]
+                if primary.error is not None:
+                    raise primary.error
+                return primary.result
+            if len(attempts) == 1:
+                elapsed = self._clock() - started
+                stalled = not attempts[0].window[0] and elapsed >= self.ttft_seconds
+                slow = delay is not None and elapsed >= delay
+                if (stalled or slow) and self._take_budget():
+                    print(
+                        f"[driver]    hedge: {'无首 token' if stalled else '超过 p90'} "
+                        f"{elapsed:.1f}s，发出一次重复请求",
+                        flush=True,
+                    )
+                    attempts.append(self._start(func, args, kwargs, finished))
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Route LLM requests across a pool of OpenAI-compatible endpoints/keys.
+
+The pool is an optional ``PAPER_TRANS_LLM_ENDPOINTS=[...]`` JSON line in
+gpt-academic's ``config_private.py`` (rendered from
+``GPT_ACADEMIC_LLM_ENDPOINTS_JSON``).  Each entry carries ``api_base``,
+``api_key`` and optionally ``name``, ``model``, ``weight`` and ``rpm``; the
+config's own ``API_KEY``/``API_URL_REDIRECT`` endpoint is always part of it.
+
+:class:`LlmRouter` picks the endpoint with the lowest expected latency
+(EWMA latency, inflated by the EWMA error rate and by in-flight requests,
+divided by weight) among those with rate-limit budget left.  Failures are
+classified with :func:`failure_taxonomy.classify_failure`: quota and auth
+errors take the endpoint out of rotation for hours, 429s for seconds, and
+:meth:`LlmRouter.call` immediately fails over to the next endpoint so one
+exhausted key never fails a chunk or stalls the run.
+
+Standard library only; used by ``translate_arxiv.call_llm`` on the host and
+deployed beside the driver in the container's /tmp.
+"""
+
+import json
+import threading
+import time
+
+from failure_taxonomy import classify_failure
+
+POOL_CONFIG_KEY = "PAPER_TRANS_LLM_ENDPOINTS"
+DEFAULT_LATENCY_SECONDS = 10.0
+EWMA_ALPHA = 0.2
+ERROR_PENALTY = 4.0
+BURST_SECONDS = 5.0
+QUOTA_COOLDOWN_SECONDS = 6 * 3600
+AUTH_COOLDOWN_SECONDS = 6 * 3600
+RATE_LIMIT_COOLDOWN_SECONDS = 30
+COOLDOWNS = {
+    "translate.api_quota": QUOTA_COOLDOWN_SECONDS,
+    "translate.api_auth": AUTH_COOLDOWN_SECONDS,
+    "translate.api_rate_limit": RATE_LIMIT_COOLDOWN_SECONDS,
+}
+FAILOVER_CATEGORIES = frozenset(COOLDOWNS)
+
+_ACTIVE = threading.local()
+
+
+class RouterExhausted(RuntimeError):
+    """Every endpoint in the pool is cooling down after quota/auth/429 errors."""
+
+
+def chat_completions_url(api_base):
+    base = (api_base or "").strip()
+    if base.endswith("/chat/completions"):
+        return base
+    return base.rstrip("/") + "/chat/completions"
+
+
+class Endpoint:
+    def __init__(self, name, api_base, api_key, model="", weight=1.0, rpm=0,
+                 clock=time.monotonic):
+        self.name = name
+        self.url = chat_completions_url(api_base)
+        self.api_key = api_key
+        self.model = model or ""
+        self.weight = max(0.01, float(weight))
+        self.rpm = max(0, int(rpm))
+        self.latency = None
+        self.error_rate = 0.0
+        self.inflight = 0
+        self.disabled_until = 0.0
+        self.disabled_reason = ""
+        self.capacity = max(1.0, self.rpm / 60.0 * BURST_SECONDS)
+        self._tokens = self.capacity
+        self._refilled = clock()
+
+    def _refill(self, now):
+        if self.rpm:
+            self._tokens = min(self.capacity, self._tokens + (now - self._refilled) * self.rpm / 60.0)
+        self._refilled = now
+
+    def token_wait(self, now):
+        """Seconds until the rate limit allows one more request (0 = now)."""
+        if not self.rpm:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) * 60.0 / self.rpm
+
+    def take_token(self):
+        if self.rpm:
+            self._tokens -= 1
+
+    def score(self):
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY_SECONDS
+        return latency * (1 + ERROR_PENALTY * self.error_rate) * (1 + self.inflight) / self.weight
+
+    def rewrite(self, url, kwargs):
+        """Point one chat-completions ``requests`` call at this endpoint."""
+        if not str(url).endswith("/chat/completions"):
+            return url, kwargs
+        kwargs = dict(kwargs)
+        headers = dict(kwargs.get("headers") or {})
+        headers["Authorization"] = f"Bearer {self.api_key}"
+        kwargs["headers"] = headers
+        if self.model and isinstance(kwargs.get("json"), dict):
+            kwargs["json"] = dict(kwargs["json"], model=self.model)
+        return self.url, kwargs
+
+
+def parse_pool(entries, clock=time.monotonic):
+    """Endpoints from decoded pool JSON; malformed entries are skipped."""
+    endpoints = []
+    for index, entry in enumerate(entries if isinstance(entries, list) else []):
+        if not isinstance(entry, dict) or not entry.get("api_base") or not entry.get("api_key"):
+            continue
+        try:
+            endpoints.append(Endpoint(
+                str(entry.get("name") or f"endpoint-{index + 1}"),
+                str(entry["api_base"]),
+                str(entry["api_key"]),
+                str(entry.get("model") or ""),
+                entry.get("weight", 1.0),
+                entry.get("rpm", 0),
+                clock=clock,
+            ))
+        except (TypeError, ValueError):
+            continue
+    return endpoints
+
+
+def load_config_pool(config_path, clock=time.monotonic):
+    """Primary config endpoint plus the configured pool; ``[]`` without a pool."""
+    values = {}
+    try:
+        with open(config_path, encoding="utf-8") as handle:
+            for line in handle:
+                key, sep, raw = line.strip().partition("=")
+                if sep and key.strip() in ("API_KEY", "API_URL_REDIRECT", "LLM_MODEL", POOL_CONFIG_KEY):
+                    values[key.strip()] = raw.strip()
+    except OSError:
+        return []
+    try:
+        pool = parse_pool(json.loads(values.get(POOL_CONFIG_KEY, "[]")), clock)
+    except ValueError:
+        pool = []
+    if not pool:
+        return []
+    try:
+        redirect = json.loads(values.get("API_URL_REDIRECT", "{}"))
+        primary_base = list(redirect.values())[0] if isinstance(redirect, dict) and redirect else ""
+    except ValueError:
+        primary_base = ""
+    primary_key = values.get("API_KEY", "").strip("'\"")
+    endpoints = []
+    if primary_base and primary_key:
+        endpoints.append(Endpoint("primary", primary_base, primary_key, clock=clock))
+    seen = {(endpoint.url, endpoint.api_key) for endpoint in endpoints}
+    for endpoint in pool:
+        if (endpoint.url, endpoint.api_key) not in seen:
+            seen.add((endpoint.url, endpoint.api_key))
+            endpoints.append(endpoint)
+    return endpoints
+
+
+def active_endpoint():
+    """Endpoint bound to the current thread by :meth:`LlmRouter.call`."""
+    return getattr(_ACTIVE, "endpoint", None)
+
+
+class LlmRouter:
+    """Latency/error-aware endpoint selection with quota/auth failover."""
+
+    def __init__(self, endpoints, clock=time.monotonic, sleep=time.sleep):
+        if not endpoints:
+            raise ValueError("LlmRouter needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.failovers = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def _exhausted(self, now):
+        reasons = "; ".join(
+            f"{endpoint.name}: {endpoint.disabled_reason}"
+            for endpoint in self.endpoints if endpoint.disabled_until > now
+        )
+        return RouterExhausted(f"all LLM endpoints unavailable ({reasons})")
+
+    def has_available(self, exclude=()):
+        now = self._clock()
+        with self._lock:
+            return any(
+                endpoint.disabled_until <= now and endpoint.name not in exclude
+                for endpoint in self.endpoints
+            )
+
+    def acquire(self, exclude=()):
+        """Reserve the best endpoint, waiting for rate-limit budget if needed."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                enabled = [
+                    endpoint for endpoint in self.endpoints
+                    if endpoint.disabled_until <= now and endpoint.name not in exclude
+                ]
+                if not enabled:
+                    raise self._exhausted(now)
+                ready = [endpoint for endpoint in enabled if endpoint.token_wait(now) == 0]
+                if ready:
+                    endpoint = min(ready, key=Endpoint.score)
+                    endpoint.take_token()
+                    endpoint.inflight += 1
+                    return endpoint
+                wait = min(endpoint.token_wait(now) for endpoint in enabled)
+            self._sleep(min(wait, 5.0))
+
+    def release(self, endpoint):
+        """Return a reservation without scoring it (the failure was not the endpoint's)."""
+        with self._lock:
+            endpoint.inflight = max(0, endpoint.inflight - 1)
+
+    def report(self, endpoint, seconds, error=""):
+        """Feed one outcome back; returns the taxonomy category of a failure."""
+        category = ""
+        with self._lock:
+            endpoint.inflight = max(0, endpoint.inflight - 1)
+            if not error:
+                endpoint.latency = (
+                    seconds if endpoint.latency is None
+                    else (1 - EWMA_ALPHA) * endpoint.latency + EWMA_ALPHA * seconds
+                )
+                endpoint.error_rate *= 1 - EWMA_ALPHA
+                return category
+            endpoint.error_rate = (1 - EWMA_ALPHA) * endpoint.error_rate + EWMA_ALPHA
+            category = str(classify_failure("translate", plugin_error=error).get("category") or "")
+            cooldown = COOLDOWNS.get(category)
+            if cooldown:
+                endpoint.disabled_until = self._clock() + cooldown
+                endpoint.disabled_reason = " ".join(str(error).split())[:200]
+        return category
+
+    def call(self, func, *args, **kwargs):
+        """Run ``func`` bound to a routed endpoint, failing over on quota/auth/429."""
+        tried = set()
+        while True:
+            endpoint = self.acquire(exclude=tried)
+            tried.add(endpoint.name)
+            _ACTIVE.endpoint = endpoint
+            started = self._clock()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                category = self.report(endpoint, self._clock() - started, f"{type(exc).__name__}: {exc}")
+                if category in FAILOVER_CATEGORIES and self.has_available(exclude=tried):
+                    with self._lock:
+                        self.failovers += 1
+                    print(
+                        f"[driver]    endpoint {endpoint.name} 触发 {category}，切换到下一个端点",
+                        flush=True,
+                    )
+                    continue
+                raise
+            finally:
+                _ACTIVE.endpoint = None
+            self.report(endpoint, self._clock() - started)
+            return result
+
+    def stats(self):
+        now = self._clock()
+        with self._lock:
+            return [
+                {
+                    "name": endpoint.name,
+                    "latency": round(endpoint.latency, 3) if endpoint.latency is not None else None,
+                    "error_rate": round(endpoint.error_rate, 3),
+                    "disabled": endpoint.disabled_until > now,
+                }
+                for endpoint in self.endpoints
+            ]
@@ -3,20 +3,31 @@
 
 import json
 import os
-from concurrent.futures import ThreadPoolExecutor
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from paperhub import paper_store
 from paperhub.pdf_text_quality import (
+    DEFAULT_EARLY_CLEAN_PAGES,
     DEFAULT_MAX_PAGES,
     DEFAULT_MAX_TEXT_BYTES,
     DEFAULT_TIMEOUT_SECONDS,
     analyze_pdf,
     analyze_pdf_cached,
 )
-from paperhub.translation_quality import analyze_tex, is_untranslated_prose
+from paperhub.quality_cache import cache_path as quality_cache_path
+from paperhub.quality_scan import scan as quality_scan
+from paperhub.quality_scan import tex_quality_task
+from paperhub.translation_quality import is_untranslated_prose
+
+
+def _scan_pdf_task(item):
+    """Process-pool task: text-quality report of one translated PDF."""
+    pdf_path, store_path, options = item
+    if store_path:
+        return analyze_pdf_cached(pdf_path, store_path, **options)
+    return analyze_pdf(pdf_path, **options)
 
 
 def audit_repository(
@@ -30,6 +41,9 @@ def audit_repository(
     pdf_text_timeout: int = DEFAULT_TIMEOUT_SECONDS,
     pdf_text_workers: int = 4,
     pdf_text_cache: bool = True,
+    pdf_text_early_verdict: bool = True,
+    tex_quality_cache: bool = True,
+    quality_workers: Optional[int] = None,
 ) -> Dict[str, object]:
     data_root = Path(data_dir)
     paper_root = data_root / "papers"
@@ -197,17 +211,23 @@ def audit_repository(
 
     quality_tex_ids = set()
     tex_backup_root = data_root / "tex_backup"
+    tex_store = quality_cache_path(logs_dir) if tex_quality_cache else None
+    tex_targets = []
     for aid in sorted(referenced):
         tex_path = tex_backup_root / f"{aid}_merge_translate_zh.tex"
-        if not tex_path.is_file():
-            continue
-        try:
-            quality = analyze_tex(tex_path)
-        except (OSError, UnicodeError, ValueError) as exc:
+        if tex_path.is_file():
+            tex_targets.append((aid, tex_path))
+    tex_results = quality_scan(
+        tex_quality_task,
+        [(str(tex_path), tex_store) for _, tex_path in tex_targets],
+        workers=quality_workers,
+    )
+    for (aid, tex_path), (quality, error) in zip(tex_targets, tex_results):
+        if error:
             issues["quality_scan_error"].append({
                 "arxiv_id": aid,
                 "tex": str(tex_path),
-                "error": str(exc),
+                "error": error,
             })
             continue
         quality_tex_ids.add(aid)
@@ -239,34 +259,42 @@ def audit_repository(
     pdf_text_retried = 0
     pdf_text_recovered_after_retry = 0
     pdf_text_cache_hits = 0
+    pdf_text_early_verdicts = Counter()
+    pdf_text_early_clean_ids = []
     if scan_pdf_text:
         pdf_text_targets = quality_without_tex_pdf_ids[
             :max(0, int(pdf_text_max_files))
         ]
 
-        def scan_pdf(aid):
-            pdf_path = paper_root / f"{aid}_zh.pdf"
-            try:
-                options = {
-                    "max_pages": max(1, int(pdf_text_max_pages)),
-                    "max_text_bytes": max(1, int(pdf_text_max_bytes)),
-                    "timeout_seconds": max(1, int(pdf_text_timeout)),
-                }
-                if pdf_text_cache:
-                    quality = analyze_pdf_cached(
-                        pdf_path,
-                        Path(logs_dir) / "pdf_text_quality_cache",
-                        **options,
-                    )
-                else:
-                    quality = analyze_pdf(pdf_path, **options)
-            except Exception as exc:
-                return aid, None, str(exc)
-            return aid, quality, ""
+        pdf_options = {
+            "max_pages": max(1, int(pdf_text_max_pages)),
+            "max_text_bytes": max(1, int(pdf_text_max_bytes)),
+            "timeout_seconds": max(1, int(pdf_text_timeout)),
+            "stream": True,
+            "early_verdict": bool(pdf_text_early_verdict),
+        }
+        pdf_store = quality_cache_path(logs_dir) if pdf_text_cache else None
 
-        workers = max(1, min(8, int(pdf_text_workers)))
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            scan_results = list(executor.map(scan_pdf, pdf_text_targets))
+        def scan_pdfs(aids, workers):
+            results = quality_scan(
+                _scan_pdf_task,
+                [
+                    (str(paper_root / f"{aid}_zh.pdf"), pdf_store, pdf_options)
+                    for aid in aids
+                ],
+                workers=workers,
+                # pdftotext 自带超时；这里兜底整份 PDF 的提取加分析
+                timeout=2 * pdf_options["timeout_seconds"] + 30,
+            )
+            return [
+                (aid, quality, error)
+                for aid, (quality, error) in zip(aids, results)
+            ]
+
+        scan_results = scan_pdfs(
+            pdf_text_targets,
+            max(1, min(8, int(pdf_text_workers))),
+        )
         # Poppler can exceed its wall-clock budget transiently when several
         # font-heavy PDFs start together. Retry only timeout cases serially;
         # deterministic extraction/format errors remain single-attempt.
@@ -275,7 +303,7 @@ def audit_repository(
             if not error or "timed out" not in error:
                 continue
             pdf_text_retried += 1
-            retried = scan_pdf(aid)
+            retried = scan_pdfs([aid], 1)[0]
             scan_results[index] = retried
             if not retried[2]:
                 pdf_text_recovered_after_retry += 1
@@ -290,6 +318,10 @@ def audit_repository(
             pdf_text_extracted_ids.add(aid)
             if quality.get("_cache_hit"):
                 pdf_text_cache_hits += 1
+            if quality.get("early_verdict"):
+                pdf_text_early_verdicts[quality["early_verdict"]] += 1
+                if quality["early_verdict"] == "clean":
+                    pdf_text_early_clean_ids.append(aid)
             if quality["page_limit_reached"]:
                 pdf_text_page_limited_ids.append(aid)
             inconclusive_reasons = []
@@ -397,6 +429,11 @@ def audit_repository(
             "recovered_after_retry": pdf_text_recovered_after_retry,
             "cache_enabled": bool(pdf_text_cache),
             "cache_hits": pdf_text_cache_hits,
+            "early_verdict_enabled": bool(pdf_text_early_verdict),
+            "early_verdicts": dict(sorted(pdf_text_early_verdicts.items())),
+            # "clean" 提前结论只看了前若干页正文，属于启发式截断而非完整读取
+            "early_clean_pages": DEFAULT_EARLY_CLEAN_PAGES if pdf_text_early_verdict else 0,
+            "early_clean_ids": sorted(pdf_text_early_clean_ids),
             "skipped_by_file_limit": max(
                 0,
                 len(quality_without_tex_pdf_ids) - len(pdf_text_targets),
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Batched host <-> container file transfer over one tar stream per direction.
+
+Every ``docker cp``/``docker exec`` is a full docker CLI round-trip, so the
+per-paper control plane (driver deployment, TeX restore/backup, PDF fetch)
+used to cost a dozen of them.  This module bundles them:
+
+- ``status``: one exec reports SHA-256 digests and sizes for any number of
+  container paths (unchanged driver files are skipped on deployment);
+- ``put``: one ``docker exec -i`` extracts a tar from stdin, then optionally
+  hands directories back to ``gptuser`` (replaces ``cp`` + ``chown`` + ``chmod``);
+- ``get``: one exec streams the requested non-empty files back as a tar.
+
+The in-container half is :data:`TRANSFER_HELPER`, passed via ``python3 -c``
+so it never needs deploying itself.  It only touches absolute, normalized
+paths below :data:`CONTAINER_ROOTS`.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+from typing import Dict, List
+
+CONTAINER_ROOTS = ("/tmp/", "/gpt/gpt_log/arxiv_cache/")
+CONTAINER_USER = "gptuser"
+
+TRANSFER_HELPER = r"""
+import hashlib
+import io
+import json
+import os
+import pwd
+import shutil
+import stat
+import sys
+import tarfile
+
+ROOTS = %(roots)r
+USER = %(user)r
+
+
+def allowed(path):
+    return (
+        isinstance(path, str) and os.path.isabs(path)
+        and os.path.normpath(path) == path and path.startswith(ROOTS)
+    )
+
+
+def size(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return -1
+    return st.st_size if stat.S_ISREG(st.st_mode) else -1
+
+
+def digest(path):
+    if size(path) < 0:
+        return None
+    sha = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def owner():
+    try:
+        return pwd.getpwnam(USER)
+    except KeyError:
+        return None
+
+
+def make_parents(path, account):
+    # 新建的目录交给 gptuser，驱动之后还要在其中写编译产物。
+    missing = []
+    while not os.path.isdir(path):
+        missing.append(path)
+        path = os.path.dirname(path)
+    for directory in reversed(missing):
+        os.mkdir(directory)
+        if account is not None:
+            os.lchown(directory, account.pw_uid, account.pw_gid)
+
+
+def put(spec):
+    written = []
+    account = owner()
+    data = sys.stdin.buffer.read()
+    if data:
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            for member in tar.getmembers():
+                path = "/" + member.name
+                if not member.isfile() or not allowed(path):
+                    raise ValueError("refusing tar member " + member.name)
+                make_parents(os.path.dirname(path), account)
+                staged = "%%s.part.%%d" %% (path, os.getpid())
+                with tar.extractfile(member) as src, open(staged, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.chmod(staged, 0o644)
+                os.replace(staged, path)
+                written.append(path)
+    for top in spec.get("writable", []):
+        if not allowed(top) or not os.path.isdir(top) or account is None:
+            raise ValueError("not a container work directory: %%s" %% top)
+        for dirpath, dirnames, filenames in os.walk(top):
+            for path in [dirpath] + [os.path.join(dirpath, n) for n in dirnames + filenames]:
+                os.lchown(path, account.pw_uid, account.pw_gid)
+                if not os.path.islink(path):
+                    os.chmod(path, os.lstat(path).st_mode | 0o600)
+    return {"ok": True, "written": written}
+
+
+def get(spec):
+    with tarfile.open(fileobj=sys.stdout.buffer, mode="w|") as tar:
+        for path in spec.get("paths", []):
+            if allowed(path) and size(path) > 0:
+                tar.add(path, arcname=path.lstrip("/"), recursive=False)
+
+
+def main():
+    op, spec = sys.argv[1], json.loads(sys.argv[2])
+    if op == "status":
+        print(json.dumps({
+            "ok": True,
+            "hash": {p: digest(p) for p in spec.get("hash", []) if allowed(p)},
+            "size": {p: size(p) for p in spec.get("size", []) if allowed(p)},
+        }))
+    elif op == "put":
+        print(json.dumps(put(spec)))
+    elif op == "get":
+        get(spec)
+    else:
+        raise ValueError("unsupported transfer op: " + op)
+
+
+try:
+    main()
+except Exception as exc:
+    print(json.dumps({"ok": False, "error": "%%s: %%s" %% (type(exc).__name__, exc)}), file=sys.stderr)
+    sys.exit(1)
+""".strip() % {"roots": CONTAINER_ROOTS, "user": CONTAINER_USER}
+
+
+def container_path_allowed(path: str) -> bool:
+    return (
+        os.path.isabs(path) and os.path.normpath(path) == path
+        and path.startswith(CONTAINER_ROOTS)
+    )
+
+
+def transfer_command(container: str, op: str, spec: dict) -> List[str]:
+    """``docker exec`` argv running :data:`TRANSFER_HELPER` as root."""
+    cmd = ["docker", "exec"]
+    if op == "put":
+        cmd.append("-i")
+    return cmd + [
+        "-u", "root", container, "python3", "-c", TRANSFER_HELPER,
+        op, json.dumps(spec, sort_keys=True),
+    ]
+
+
+def file_digest(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def changed_files(files: Dict[str, str], remote_hashes: Dict[str, str]) -> Dict[str, str]:
+    """Subset of ``{container_path: local_path}`` whose content differs remotely."""
+    return {
+        container_path: local_path
+        for container_path, local_path in files.items()
+        if remote_hashes.get(container_path) != file_digest(local_path)
+    }
+
+
+def pack(files: Dict[str, str]) -> bytes:
+    """Tar ``{container_path: local_path}`` with root-owned 0644 members."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for container_path, local_path in files.items():
+            if not container_path_allowed(container_path):
+                raise ValueError(f"container path outside transfer roots: {container_path}")
+            info = tar.gettarinfo(local_path, arcname=container_path.lstrip("/"))
+            info.mode = 0o644
+            info.uid = info.gid = 0
+            info.uname = info.gname = "root"
+            with open(local_path, "rb") as handle:
+                tar.addfile(info, handle)
+    return buffer.getvalue()
+
+
+def unpack(data: bytes, targets: Dict[str, str]) -> Dict[str, bool]:
+    """Write requested members of a ``get`` tar to their local targets.
+
+    Only members named in ``targets`` are extracted, and only as regular
+    files at the caller-chosen local path; returns which paths arrived.
+    """
+    wanted = {path.lstrip("/"): path for path in targets}
+    arrived = {path: False for path in targets}
+    if not data:
+        return arrived
+    try:
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            for member in tar.getmembers():
+                container_path = wanted.get(member.name)
+                if container_path is None or not member.isfile():
+                    continue
+                source = tar.extractfile(member)
+                if source is None:
+                    continue
+                with source, open(targets[container_path], "wb") as handle:
+                    while True:
+                        block = source.read(1 << 20)
+                        if not block:
+                            break
+                        handle.write(block)
+                arrived[container_path] = True
+    except tarfile.TarError:
+        # 截断的流：已完整写出的成员仍然有效，其余按未取回处理。
+        pass
+    return arrived
+
+
+def parse_json_line(text: str) -> dict:
+    lines = (text or "").strip().splitlines()
+    try:
+        payload = json.loads(lines[-1]) if lines else {}
+    except ValueError:
+        payload = {}
+    return payload if isinstance(payload, dict) else {}
+
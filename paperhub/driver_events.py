@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Typed driver -> host event protocol plus a bounded host-side transcript.
+
+The driver emits JSON events (phase start/end, source size, chunk progress, compile
+passes, quality verdict, diagnosis, final result) as ``EVENT_PREFIX`` lines.
+``docker exec`` and the resident service relay forward a single byte stream,
+so events share stdout with the human-readable ``[driver]`` log instead of a
+separate fd; the prefix keeps them unambiguous.
+
+On the host, :class:`DriverTranscript` keeps only a ring buffer of raw text
+for diagnostics, pins protocol lines (``RESULT:``/``PDF_DIAGNOSIS:``/result
+and diagnosis events) so they survive eviction, and appends every event to a
+compact per-paper JSONL file.
+
+This module is deployed beside the driver inside the container, so it must
+stay standard-library only.
+"""
+
+import collections
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+EVENT_PREFIX = "PAPER_TRANS_EVENT:"
+EVENT_TYPES = (
+    "job_start", "phase_start", "phase_end", "source", "chunks",
+    "compile_pass", "quality", "diagnosis", "result",
+)
+DEFAULT_RING_LINES = 4000
+MAX_PINNED_LINES = 64
+PINNED_LINE_PREFIXES = ("RESULT:", "PDF_DIAGNOSIS:", "SERVICE:")
+# Events the host needs for classification stay in the transcript text.
+PINNED_EVENTS = ("diagnosis", "result")
+
+
+def format_event(event: str, **fields) -> str:
+    if event not in EVENT_TYPES:
+        raise ValueError(f"unknown driver event: {event}")
+    payload = {"event": event, "t": round(time.time(), 3)}
+    payload.update(fields)
+    return EVENT_PREFIX + json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+
+def emit_event(event: str, **fields) -> None:
+    """Print one event line; never lets a serialization problem kill the driver."""
+    try:
+        line = format_event(event, **fields)
+    except (TypeError, ValueError) as exc:
+        line = format_event("phase_end", phase="event_error", error=str(exc))
+    print(line, file=sys.stdout, flush=True)
+
+
+def parse_event(line: str) -> Optional[dict]:
+    if not line.startswith(EVENT_PREFIX):
+        return None
+    try:
+        payload = json.loads(line[len(EVENT_PREFIX):])
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or payload.get("event") not in EVENT_TYPES:
+        return None
+    return payload
+
+
+def load_events(path: str) -> List[dict]:
+    """Read a per-paper events file, skipping torn or foreign lines."""
+    events = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                try:
+                    payload = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(payload, dict) and payload.get("event") in EVENT_TYPES:
+                    events.append(payload)
+    except OSError:
+        return []
+    return events
+
+
+class DriverTranscript:
+    """Bounded view of one driver run's output."""
+
+    def __init__(self, events_path: Optional[str] = None,
+                 max_lines: int = DEFAULT_RING_LINES):
+        self.lines = collections.deque(maxlen=max(1, int(max_lines)))
+        self.pinned = collections.deque(maxlen=MAX_PINNED_LINES)
+        self.result: Optional[dict] = None
+        self.diagnosis: Optional[dict] = None
+        self.event_count = 0
+        self.line_count = 0
+        self._events = None
+        self._events_path = events_path
+        if events_path:
+            # 事件文件只描述最近一次驱动执行；首个事件到达时才创建。
+            try:
+                os.remove(events_path)
+            except OSError:
+                pass
+
+    def _keep(self, line: str, pinned: bool) -> None:
+        if len(self.lines) == self.lines.maxlen:
+            evicted_line, evicted_pinned = self.lines[0]
+            if evicted_pinned:
+                self.pinned.append(evicted_line)
+        self.lines.append((line, pinned))
+
+    def feed(self, line: str) -> Optional[dict]:
+        """Record one decoded output line; returns the event it carried, if any."""
+        self.line_count += 1
+        event = parse_event(line)
+        if event is None:
+            self._keep(line, line.startswith(PINNED_LINE_PREFIXES))
+            return None
+        self.event_count += 1
+        if event["event"] == "result":
+            self.result = event
+        elif event["event"] == "diagnosis":
+            self.diagnosis = event.get("diagnosis") if isinstance(event.get("diagnosis"), dict) else None
+        if event["event"] in PINNED_EVENTS:
+            self._keep(line, True)
+        if self._events is None and self._events_path:
+            try:
+                os.makedirs(os.path.dirname(self._events_path), exist_ok=True)
+                self._events = open(self._events_path, "w", encoding="utf-8")
+            except OSError:
+                self._events_path = None
+        if self._events is not None:
+            try:
+                self._events.write(line[len(EVENT_PREFIX):] + "\n")
+                self._events.flush()
+            except (OSError, ValueError):
+                self._events = None
+                self._events_path = None
+        return event
+
+    def text(self) -> str:
+        return "\n".join(list(self.pinned) + [line for line, _ in self.lines])
+
+    def close(self) -> None:
+        self._events_path = None
+        if self._events is not None:
+            try:
+                self._events.close()
+            except OSError:
+                pass
+            self._events = None
@@ -7,9 +7,82 @@ from collections import Counter
 from pathlib import Path
 from typing import Dict, List
 
-from failure_taxonomy import classify_failure
+from failure_taxonomy import classify_failure, classify_failure_stream
 from paperhub.json_io import read_json
 
+_READ_CHARS = 1 << 20
+_COVERAGE_BEFORE = 120
+_COVERAGE_AFTER = 360
+_PHASE_RE = re.compile(r"【失败阶段】\s+(translate|compile)")
+
+
+def _chunks(handle):
+    return iter(lambda: handle.read(_READ_CHARS), "")
+
+
+class _FirstWindow:
+    """Streamed ``text[pos - before:pos + after]`` around the first ``marker``."""
+
+    def __init__(self, marker, before, after, fold=False):
+        self.marker = marker
+        self.before = before
+        self.after = after
+        self.fold = fold
+        self.window = None
+        self._tail = ""
+        self._needed = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.window is not None and not self._needed
+
+    def feed(self, chunk: str) -> None:
+        if self.window is not None:
+            piece = chunk[:self._needed]
+            self.window += piece
+            self._needed -= len(piece)
+            return
+        text = self._tail + chunk
+        index = (text.lower() if self.fold else text).find(self.marker)
+        if index < 0:
+            self._tail = text[-(self.before + len(self.marker)):]
+            return
+        self.window = text[max(0, index - self.before):index + self.after]
+        self._needed = max(0, index + self.after - len(text))
+
+
+def _classify_driver_log(log_path: Path) -> Dict[str, object]:
+    # Coverage failures are explicit and may live in multi-megabyte driver
+    # logs: classify the bounded evidence around the first marker, otherwise
+    # stream the whole log through the classifier.
+    chinese = _FirstWindow("翻译覆盖率检查失败", _COVERAGE_BEFORE, _COVERAGE_AFTER)
+    english = _FirstWindow("translation coverage", _COVERAGE_BEFORE, _COVERAGE_AFTER, fold=True)
+    with open(log_path, encoding="utf-8", errors="replace") as handle:
+        for chunk in _chunks(handle):
+            chinese.feed(chunk)
+            english.feed(chunk)
+            if chinese.complete:
+                break
+    window = chinese.window if chinese.window is not None else english.window
+    if window is not None:
+        return classify_failure("compile", window)
+    with open(log_path, encoding="utf-8", errors="replace") as handle:
+        return classify_failure_stream("compile", handle)
+
+
+def _legacy_log_phase(log_path: Path) -> str:
+    translate_marker = False
+    tail = ""
+    with open(log_path, encoding="utf-8", errors="replace") as handle:
+        for chunk in _chunks(handle):
+            text = tail + chunk
+            phase_match = _PHASE_RE.search(text)
+            if phase_match:
+                return phase_match.group(1)
+            translate_marker = translate_marker or "GPT 翻译阶段" in text
+            tail = text[-64:]
+    return "translate" if translate_marker else "compile"
+
 
 def load_failure_records(error_dir: str) -> List[Dict[str, object]]:
     base = Path(error_dir)
@@ -29,18 +102,7 @@ def load_failure_records(error_dir: str) -> List[Dict[str, object]]:
             if data.get("category") in {"compile.unknown", "unknown.unstructured"}:
                 log_path = base / f"{path.stem}.log"
                 if log_path.is_file():
-                    log_text = log_path.read_text(encoding="utf-8", errors="replace")
-                    coverage_pos = log_text.find("翻译覆盖率检查失败")
-                    if coverage_pos < 0:
-                        coverage_pos = log_text.lower().find("translation coverage")
-                    # Coverage failures are explicit and may live in multi-megabyte
-                    # driver logs. Classify the bounded evidence instead of running
-                    # every fallback regex across the entire transcript.
-                    evidence = (
-                        log_text[max(0, coverage_pos - 120):coverage_pos + 360]
-                        if coverage_pos >= 0 else log_text
-                    )
-                    refined = classify_failure("compile", evidence)
+                    refined = _classify_driver_log(log_path)
                     if refined.get("category") != "compile.unknown":
                         preserved = {
                             key: value for key, value in data.items()
@@ -53,12 +115,12 @@ def load_failure_records(error_dir: str) -> List[Dict[str, object]]:
     for path in sorted(base.glob("*.log")):
         if path.stem in records:
             continue
-        text = path.read_text(encoding="utf-8", errors="replace")
-        phase_match = re.search(r"【失败阶段】\s+(translate|compile)", text)
-        phase = phase_match.group(1) if phase_match else (
-            "translate" if "GPT 翻译阶段" in text else "compile"
-        )
-        record = classify_failure(phase, text if phase == "compile" else "", text if phase == "translate" else "")
+        phase = _legacy_log_phase(path)
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            if phase == "translate":
+                record = classify_failure_stream(phase, plugin_error=handle)
+            else:
+                record = classify_failure_stream(phase, latex_log=handle)
         record.update({"arxiv_id": path.stem, "phase": phase, "legacy_log": True})
         records[path.stem] = record
 
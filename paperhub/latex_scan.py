@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+r"""Single-pass line model of a LaTeX source.
+
+The quality scan (``translation_quality.analyze_tex``), the driver's splitter
+and several ``latex_translation_filters`` repairs each re-derived the same
+facts line by line with their own loops and regexes: where an unescaped
+``%`` comment starts, which ``\begin``/``\end`` events a line holds, the
+brace balance and where the document body is.  :class:`LatexScan` computes
+all of them in one left-to-right tokenizer pass and keeps them in flat
+arrays indexed by line; consumers query the model instead of rescanning.
+
+Conventions, matching the scanners it replaces:
+
+* lines are ``str.splitlines(keepends=True)``;
+* ``%`` starts a comment unless preceded by an odd run of backslashes;
+* an environment event is ``\begin{name}``/``\end{name}`` where ``name``
+  runs to the first ``}`` on the same line; events inside comments are kept
+  but flagged, because the driver's splitter counts them while the quality
+  scan does not;
+* brace depth counts ``{``/``}`` outside comments and not escaped.
+
+Consumers keep their own environment stacks (tracked-environment and
+source-data rules differ between them) and feed them from :meth:`events`.
+
+Standard library only; deployed beside the driver in the container's /tmp.
+"""
+
+import bisect
+import re
+from array import array
+from typing import List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\\+|[%{}]")
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_ENV_PREFIXES = (("begin{", True), ("end{", False))
+
+
+class LatexScan:
+    """Comment spans, environment events, brace depth and body range per line."""
+
+    __slots__ = (
+        "text",
+        "line_starts",
+        "content_ends",
+        "comment_starts",
+        "depth_before",
+        "final_depth",
+        "event_offsets",
+        "event_ends",
+        "event_begins",
+        "event_names",
+        "line_events",
+        "body_start",
+        "body_end",
+    )
+
+    def __init__(self, text: str):
+        text = text or ""
+        self.text = text
+        self.line_starts = array("l")
+        self.content_ends = array("l")
+        position = 0
+        for line in text.splitlines(True):
+            self.line_starts.append(position)
+            self.content_ends.append(position + len(line.rstrip(_LINE_BREAKS)))
+            position += len(line)
+        count = len(self.line_starts)
+        self.comment_starts = array("l", [-1]) * count
+        self.depth_before = array("l", [0]) * count
+        self.event_offsets = array("l")
+        self.event_ends = array("l")
+        self.event_begins = bytearray()
+        self.event_names: List[str] = []
+        self.line_events = array("l", [0]) * (count + 1)
+        self._tokenize()
+        self.body_start = self._first_event_line("document", True, 0)
+        self.body_end = self._first_event_line(
+            "document", False, 0 if self.body_start is None else self.body_start
+        )
+
+    def _tokenize(self):
+        text = self.text
+        starts = self.line_starts
+        count = len(starts)
+        line = -1
+        next_start = 0
+        content_end = 0
+        comment = -1
+        depth = 0
+        escaped_at = -1
+        # Begins and ends are matched independently, like the separate
+        # ``\\begin{..}``/``\\end{..}`` regexes the consumers used.
+        resume = {True: 0, False: 0}
+        for match in _TOKEN_RE.finditer(text):
+            offset = match.start()
+            if offset >= next_start:
+                while line + 1 < count and starts[line + 1] <= offset:
+                    line += 1
+                    self.line_events[line] = len(self.event_offsets)
+                    self.depth_before[line] = depth
+                next_start = starts[line + 1] if line + 1 < count else len(text) + 1
+                content_end = self.content_ends[line]
+                comment = -1
+            token = match.group()
+            if token[0] == "\\":
+                end = match.end()
+                escaped_at = end if len(token) % 2 else -1
+                for prefix, is_begin in _ENV_PREFIXES:
+                    if not text.startswith(prefix, end):
+                        continue
+                    name_start = end + len(prefix)
+                    close = text.find("}", name_start, content_end)
+                    if close > name_start and end > resume[is_begin]:
+                        self.event_offsets.append(end - 1)
+                        self.event_ends.append(close + 1)
+                        self.event_begins.append(is_begin)
+                        self.event_names.append(text[name_start:close])
+                        resume[is_begin] = close + 1
+                    break
+                continue
+            if offset == escaped_at or comment >= 0:
+                continue
+            if token == "%":
+                comment = offset
+                self.comment_starts[line] = offset
+            elif token == "{":
+                depth += 1
+            else:
+                depth -= 1
+        # Lines after the last token (or a text without tokens).
+        while line + 1 < count:
+            line += 1
+            self.line_events[line] = len(self.event_offsets)
+            self.depth_before[line] = depth
+        self.line_events[count] = len(self.event_offsets)
+        self.final_depth = depth
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
+
+    def _line_end(self, index: int) -> int:
+        return (
+            self.line_starts[index + 1]
+            if index + 1 < len(self.line_starts) else len(self.text)
+        )
+
+    def line(self, index: int, keepends: bool = True) -> str:
+        end = self._line_end(index) if keepends else self.content_ends[index]
+        return self.text[self.line_starts[index]:end]
+
+    def code(self, index: int, keepends: bool = False) -> str:
+        """The line before an unescaped ``%``.
+
+        Like the per-line scanners it replaces, the line break is kept (with
+        ``keepends``) only when the line has no comment.
+        """
+        comment = self.comment_starts[index]
+        if comment >= 0:
+            return self.text[self.line_starts[index]:comment]
+        return self.line(index, keepends)
+
+    def has_comment(self, index: int) -> bool:
+        return self.comment_starts[index] >= 0
+
+    def _line_events(self, index: int, code_only: bool):
+        comment = self.comment_starts[index] if code_only else -1
+        for event in range(self.line_events[index], self.line_events[index + 1]):
+            if comment >= 0 and self.event_ends[event] > comment:
+                continue
+            yield event
+
+    def events(self, index: int, code_only: bool = False) -> List[Tuple[bool, str]]:
+        r"""``(is_begin, name)`` events of one line, as one ``\(begin|end){..}`` scan.
+
+        A begin and an end whose names overlap (``\end{\begin{x}``) share
+        their closing brace; like a single combined regex, only the first
+        counts.
+        """
+        result = []
+        last_end = -1
+        for event in self._line_events(index, code_only):
+            if self.event_offsets[event] < last_end:
+                continue
+            last_end = self.event_ends[event]
+            result.append((bool(self.event_begins[event]), self.event_names[event]))
+        return result
+
+    def begins(self, index: int, code_only: bool = False) -> List[str]:
+        return [
+            self.event_names[event]
+            for event in self._line_events(index, code_only)
+            if self.event_begins[event]
+        ]
+
+    def ends(self, index: int, code_only: bool = False) -> List[str]:
+        return [
+            self.event_names[event]
+            for event in self._line_events(index, code_only)
+            if not self.event_begins[event]
+        ]
+
+    def _first_event_line(self, name: str, is_begin: bool, from_line: int) -> Optional[int]:
+        for event in range(self.line_events[from_line], len(self.event_offsets)):
+            if self.event_names[event] != name or bool(self.event_begins[event]) != is_begin:
+                continue
+            index = bisect.bisect_right(self.line_starts, self.event_offsets[event]) - 1
+            comment = self.comment_starts[index]
+            if comment < 0 or self.event_ends[event] <= comment:
+                return index
+        return None
+
+    def without_comments(self) -> str:
+        """The source with every comment removed (its line break too)."""
+        if not any(comment >= 0 for comment in self.comment_starts):
+            return self.text
+        return "".join(self.code(index, keepends=True) for index in range(len(self)))
+
+    def find_uncommented(self, token: str) -> int:
+        """Offset of the first ``token`` lying within one line's code, else ``-1``."""
+        text = self.text
+        position = text.find(token)
+        while position >= 0:
+            index = bisect.bisect_right(self.line_starts, position) - 1
+            comment = self.comment_starts[index]
+            limit = comment if comment >= 0 else self._line_end(index)
+            if position + len(token) <= limit:
+                return position
+            # Resume on the next line: the rest of this one is comment.
+            next_line = index + 1
+            if next_line >= len(self.line_starts):
+                return -1
+            position = text.find(token, self.line_starts[next_line])
+        return -1
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Nightly planner that does each distinct paper's work once across all lists.
+
+The daily, weekly, monthly and topic cron entries run independently: each
+fetches its list, probes the paper store and schedules summary/PDF work, so
+a paper trending all week is handled by every one of them.
+:func:`run_nightly` instead
+
+1. fetches every list due tonight (fetch modes whose trigger falls within
+   the night, every enabled topic with one shared HF vote table);
+2. builds one deduplicated plan: for each distinct arXiv id, whether its
+   summary and/or full PDF still has to be produced;
+3. executes that plan once, with summaries in plan order and PDFs on the
+   shared ``run_papers`` pipeline worker (cheapest estimated job first) as
+   soon as a summary lands;
+4. publishes every index through the existing runners with the prefetched
+   lists; papers the plan already attempted are store hits or are published
+   as failed without another summary or container attempt;
+5. prints one consolidated stats report.
+
+LLM calls and container time therefore scale with distinct papers rather
+than with list memberships.
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from paperhub import paper_store, topic_store
+from paperhub.modes import FETCH_MODE_SPECS, ModeSpec
+from paperhub.paths import mode_papers_dir
+
+NIGHT_HORIZON_HOURS = 6
+NIGHTLY_LOG_MODE = "nightly"
+
+
+@dataclass
+class Target:
+    """One index to publish tonight and the papers it lists, in rank order."""
+
+    mode: str
+    key: str
+    papers: List[dict]
+    limit: int = 0
+    topic: Optional[tuple] = None
+
+    @property
+    def label(self) -> str:
+        if self.topic:
+            return f"topic/{self.topic[0]['slug']}/{self.key}"
+        return f"{self.mode}/{self.key}"
+
+    @property
+    def week_str(self) -> str:
+        return f"topic/{self.topic[0]['slug']}" if self.topic else f"{self.mode}/{self.key}"
+
+    def papers_dir(self) -> str:
+        if self.topic:
+            return os.path.join(topic_store.date_dir(self.topic[0]["slug"], self.key), "papers")
+        return mode_papers_dir(self.mode, self.key)
+
+
+@dataclass
+class PlanItem:
+    """Work still owed for one distinct paper."""
+
+    arxiv_id: str
+    meta: dict
+    targets: List[str] = field(default_factory=list)
+    needs_summary: bool = False
+    needs_pdf: bool = False
+
+
+def due_key(spec: ModeSpec, now: datetime, horizon_hours: int = NIGHT_HORIZON_HOURS) -> Optional[str]:
+    """Key of ``spec`` if its scheduled fetch falls within tonight's window."""
+    if spec.name == "daily":
+        return spec.key_for(now.date())
+    window = timedelta(hours=horizon_hours)
+    for offset in (-1, 0, 1):
+        day = now.date() + timedelta(days=offset)
+        if spec.name == "weekly" and day.weekday() != spec.trigger_day:
+            continue
+        if spec.name == "monthly" and day.day != spec.trigger_day:
+            continue
+        trigger = datetime(day.year, day.month, day.day, spec.trigger_hour)
+        if abs(trigger - now) <= window:
+            return spec.key_for(day)
+    return None
+
+
+def _has_abstract(meta: dict) -> bool:
+    return bool(str(meta.get("abstract") or meta.get("summary") or "").strip())
+
+
+def _summary_done(arxiv_id: str) -> bool:
+    return paper_store.translation_complete(paper_store.read_raw(arxiv_id))
+
+
+def _pdf_done(arxiv_id: str) -> bool:
+    from run_papers import _pdf_store_hit
+
+    return bool(_pdf_store_hit(arxiv_id))
+
+
+def build_plan(targets: Sequence[Target], do_full_translate: bool = True,
+               summary_done: Callable[[str], bool] = _summary_done,
+               pdf_done: Callable[[str], bool] = _pdf_done) -> List[PlanItem]:
+    """Deduplicate tonight's papers; each store probe runs once per distinct id."""
+    items: Dict[str, PlanItem] = {}
+    for target in targets:
+        for paper in target.papers:
+            aid = paper.get("arxiv_id", "")
+            if not aid:
+                continue
+            item = items.get(aid)
+            if item is None:
+                item = items[aid] = PlanItem(aid, dict(paper))
+            elif _has_abstract(paper) and not _has_abstract(item.meta):
+                # topic 候选带 arXiv 摘要，比 HF 列表只有标题的条目更完整
+                item.meta = dict(paper)
+            item.targets.append(target.label)
+    for item in items.values():
+        item.needs_summary = not summary_done(item.arxiv_id)
+        item.needs_pdf = do_full_translate and not pdf_done(item.arxiv_id)
+    return list(items.values())
+
+
+def fetch_targets(now: Optional[datetime] = None, modes: Optional[Sequence[str]] = None,
+                  topics: bool = True, force: bool = False) -> List[Target]:
+    """Fetch every list due tonight; ``modes`` overrides the due-date check."""
+    from fetch_hf import fetch_hf_papers
+
+    now = now or datetime.now()
+    targets = []
+    for name, spec in FETCH_MODE_SPECS.items():
+        if modes is not None:
+            key = spec.key_for(now.date()) if name in modes else None
+        else:
+            key = due_key(spec, now)
+        if not key:
+            continue
+        papers = fetch_hf_papers(name, key, spec.limit)
+        if not papers:
+            print(f"[nightly] ❌ 未获取到论文: {name}/{key}", flush=True)
+        targets.append(Target(name, key, papers, limit=spec.limit))
+
+    if topics:
+        from topic_engine import fetch_hf_votes, plan_topic
+
+        profiles = topic_store.list_topics(enabled=True)
+        votes = fetch_hf_votes() if profiles else {}
+        key = now.strftime("%Y-%m-%d")
+        for profile in profiles:
+            planned = plan_topic(profile["slug"], key=key, force=force, votes=votes)
+            targets.append(Target("topic", key, list(planned[2]), topic=planned))
+    return targets
+
+
+def execute_plan(items: Sequence[PlanItem], targets: Sequence[Target], do_full_translate: bool = True,
+                 key: str = "") -> dict:
+    """Run each item's owed summary/PDF work exactly once."""
+    import run_papers
+
+    stats = {"summary_attempted": 0, "summary_failed": 0, "pdf_attempted": 0, "pdf_failed": 0}
+    by_label = {target.label: target for target in targets}
+    pending_summaries = [item for item in items if item.needs_summary]
+    pending_pdfs = [item for item in items if item.needs_pdf] if do_full_translate else []
+
+    pipeline = None
+    pdf_entries = []
+    if pending_pdfs:
+        from translate_full import translate_full
+
+        pipeline = run_papers._PdfPipeline(
+            lambda entry: run_papers._full_translate_entry(
+                entry, translate_full, lambda apply: apply(), NIGHTLY_LOG_MODE, key,
+            ),
+            estimate=run_papers._pdf_cost_estimator(),
+            on_defer=lambda entry, cost: run_papers.log(
+                f"  ⏭️ 慢车道预算不足，顺延到重试: {entry['arxiv_id']}（预估 {cost / 60:.0f} 分钟）",
+                NIGHTLY_LOG_MODE, key,
+            ),
+        )
+
+    def submit_pdf(item):
+        if pipeline is not None and item.needs_pdf:
+            entry = {"arxiv_id": item.arxiv_id}
+            pdf_entries.append(entry)
+            pipeline.submit(entry)
+
+    try:
+        if pending_summaries:
+            from translate_arxiv import load_api_config, translate_and_save
+
+            config = load_api_config()
+
+        for item in items:
+            if item.needs_summary:
+                stats["summary_attempted"] += 1
+                target = by_label[item.targets[0]]
+                rank = next(
+                    (i for i, paper in enumerate(target.papers, 1) if paper.get("arxiv_id") == item.arxiv_id), 1
+                )
+                run_papers.log(f"🔄 摘要: {item.arxiv_id}（{', '.join(item.targets)}）", NIGHTLY_LOG_MODE, key)
+                try:
+                    translate_and_save(
+                        arxiv_id=item.arxiv_id,
+                        output_dir=target.papers_dir(),
+                        rank=rank,
+                        week_str=target.week_str,
+                        config=config,
+                        prefetched_meta=item.meta if _has_abstract(item.meta) else None,
+                    )
+                except Exception as e:
+                    run_papers.log(f"  ❌ {item.arxiv_id}: {e}", NIGHTLY_LOG_MODE, key)
+                if not _summary_done(item.arxiv_id):
+                    stats["summary_failed"] += 1
+            submit_pdf(item)
+    except BaseException:
+        # 与 run_papers 相同：异常退出前等正在执行的容器任务结束，未开始的丢弃
+        if pipeline is not None:
+            pipeline.close(cancel=True)
+        raise
+
+    if pipeline is not None:
+        pipeline.close()
+    stats["pdf_attempted"] = len(pdf_entries)
+    stats["pdf_failed"] = sum(1 for entry in pdf_entries if not entry.get("pdf_zh"))
+    return stats
+
+
+def attempted_ids(items: Sequence[PlanItem]) -> Set[str]:
+    """Ids whose summary or PDF :func:`execute_plan` already ran tonight."""
+    return {item.arxiv_id for item in items if item.needs_summary or item.needs_pdf}
+
+
+def publish_targets(targets: Sequence[Target], do_full_translate: bool = True, force: bool = False,
+                    attempted: Iterable[str] = ()) -> Dict[str, bool]:
+    """Publish every index from its prefetched list.
+
+    Ids in ``attempted`` are not retried: whatever :func:`execute_plan` left in
+    the store is published, and failures wait for the retry jobs.
+    """
+    attempted = frozenset(attempted)
+    import run_papers
+
+    published = {}
+    for target in targets:
+        if target.topic:
+            from topic_engine import run_topic
+
+            profile = target.topic[0]
+            result = run_topic(profile["slug"], key=target.key, do_full_translate=do_full_translate,
+                               force=force, planned=target.topic, attempted=attempted)
+            published[target.label] = not any(
+                paper.get("error") or paper.get("pdf_zh_failed") for paper in result["papers"]
+            )
+        elif target.papers:
+            published[target.label] = bool(run_papers.run(
+                target.mode, target.key, target.limit, do_full_translate, papers=target.papers,
+                attempted=attempted,
+            ))
+        else:
+            published[target.label] = False
+    return published
+
+
+def run_nightly(now: Optional[datetime] = None, modes: Optional[Sequence[str]] = None,
+                topics: bool = True, do_full_translate: bool = True, force: bool = False) -> dict:
+    import run_papers
+
+    now = now or datetime.now()
+    key = now.strftime("%Y-%m-%d")
+    try:
+        lock = run_papers.RunLock(NIGHTLY_LOG_MODE, key)
+        lock.__enter__()
+    except RuntimeError as e:
+        print(f"⚠️  {e}", flush=True)
+        return {"ok": False, "published": {}}
+    try:
+        return _run_nightly_locked(run_papers, now, key, modes, topics, do_full_translate, force)
+    finally:
+        lock.__exit__(None, None, None)
+
+
+def _run_nightly_locked(run_papers, now, key, modes, topics, do_full_translate, force):
+    targets = fetch_targets(now, modes=modes, topics=topics, force=force)
+    items = build_plan(targets, do_full_translate)
+    slots = sum(len(target.papers) for target in targets)
+    run_papers.log(
+        f"📋 规划: {len(targets)} 个索引，{slots} 个论文位，去重后 {len(items)} 篇；"
+        f"待摘要 {sum(item.needs_summary for item in items)}，待 PDF {sum(item.needs_pdf for item in items)}",
+        NIGHTLY_LOG_MODE, key,
+    )
+    stats = execute_plan(items, targets, do_full_translate, key=key)
+    published = publish_targets(targets, do_full_translate, force=force, attempted=attempted_ids(items))
+    report = {
+        "targets": len(targets),
+        "paper_slots": slots,
+        "distinct_papers": len(items),
+        **stats,
+        "published": published,
+        "ok": bool(targets) and all(published.values()),
+    }
+    failed = [label for label, ok in published.items() if not ok]
+    run_papers.log(
+        f"📊 nightly: 索引 {len(targets) - len(failed)}/{len(targets)} 发布成功，"
+        f"论文位 {slots} → 去重 {len(items)}；摘要 {stats['summary_attempted'] - stats['summary_failed']}"
+        f"/{stats['summary_attempted']}，PDF {stats['pdf_attempted'] - stats['pdf_failed']}/{stats['pdf_attempted']}"
+        + (f"；未完成: {', '.join(failed)}" if failed else ""),
+        NIGHTLY_LOG_MODE, key,
+    )
+    return report
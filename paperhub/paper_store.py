@@ -13,6 +13,7 @@ import shutil
 import tempfile
 
 from paperhub import paths
+from paperhub import pdf_optimize
 from paperhub.json_io import read_json, write_json_atomic
 from paperhub.publication_lock import paper_publication_lock
 
@@ -184,6 +185,54 @@ def save_pdf(arxiv_id, src_path):
                 os.unlink(temp_path)
 
 
+def optimize_pdf(arxiv_id, mode=None):
+    """Linearize/recompress a published PDF in place when a tool is available.
+
+    The optimizer works on a private copy outside the paper lock; the result
+    is only swapped in if the published file is unchanged and the candidate
+    still passes :func:`pdf_file_valid`.  Failures leave the original alone.
+    """
+    destination = paths.paper_store_pdf_path(arxiv_id)
+    mode = mode or pdf_optimize.optimize_mode()
+    if mode == "off" or not pdf_file_valid(destination):
+        return {"ok": False, "mode": mode, "reason": "skipped"}
+    directory = os.path.dirname(destination)
+    prefix = f".{os.path.basename(destination)}."
+    try:
+        before = os.stat(destination)
+    except OSError:
+        return {"ok": False, "mode": mode, "reason": "missing"}
+    with tempfile.TemporaryDirectory(dir=directory, prefix=prefix) as tmp:
+        source = os.path.join(tmp, "source.pdf")
+        candidate = os.path.join(tmp, "optimized.pdf")
+        shutil.copy2(destination, source)
+        result = pdf_optimize.optimize_pdf_file(
+            source, candidate, mode=mode, validate=pdf_file_valid,
+        )
+        if not result.get("ok"):
+            return result
+        with open(candidate, "rb") as handle:
+            os.fsync(handle.fileno())
+        with paper_publication_lock(
+            arxiv_id,
+            lock_dir=_paper_lock_dir(),
+        ):
+            try:
+                current = os.stat(destination)
+            except OSError:
+                current = None
+            if (
+                current is None
+                or current.st_size != before.st_size
+                or current.st_mtime_ns != before.st_mtime_ns
+            ):
+                result["ok"] = False
+                result["reason"] = "published PDF changed during optimization"
+                return result
+            os.replace(candidate, destination)
+    return result
+
+
 def update_pdf_status(arxiv_id, status):
     try:
         with paper_publication_lock(
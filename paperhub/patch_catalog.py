@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Catalog of reusable repair patches and the failure classes they address."""
 
+import hashlib
+import json
 from typing import Dict, Iterable, List
 
 
@@ -299,3 +301,10 @@ def patches_for_records(records: Iterable[Dict[str, object]]) -> List[Dict[str,
         seen.add(category)
         result.append({"category": category, **spec})
     return result
+
+
+def catalog_fingerprint(category: str) -> str:
+    """Short hash of one category's catalog entry; changes when its patches ship."""
+    spec = PATCH_CATALOG.get(str(category or ""), {})
+    payload = json.dumps(spec, ensure_ascii=False, sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Cost estimates and lanes for shortest-job-first PDF scheduling.
+
+A full translation takes anywhere from a few minutes to the whole 3600 s
+``translate_full`` timeout, so running PDFs in rank order lets one giant
+paper block a night's queue.  :class:`CostModel` predicts a paper's wall
+time from
+
+* its own latest run in ``logs/phase_timing.jsonl`` (retries, re-runs);
+* the source archive: the driver emits a ``source`` event with the tarball
+  size, file count, total ``.tex`` bytes and a chunk estimate
+  (:func:`source_features`), which lands in the timing record; history
+  yields seconds per chunk and chunks per tarball byte;
+* for papers never seen, the tarball size from a ``HEAD`` on arXiv's
+  e-print endpoint (:func:`probe_source_bytes`).
+
+Callers run cheap jobs first and move outliers (estimate above
+``PAPER_TRANS_PDF_OUTLIER_SECONDS``, default 1800) to a slow lane that only
+runs after the fast lane drains, within its own
+``PAPER_TRANS_PDF_SLOW_LANE_SECONDS`` budget (default 7200); outliers that
+do not fit are left for the next sweep.
+
+Standard library only; deployed beside the driver in the container's /tmp.
+"""
+
+import gzip
+import math
+import os
+import statistics
+import tarfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_SECONDS = 600.0
+BASE_SECONDS = 90.0
+DEFAULT_SECONDS_PER_CHUNK = 4.0
+# 源码包里还有插图/样式文件：经验上约 20KB 压缩包对应一个翻译 chunk
+DEFAULT_CHUNKS_PER_BYTE = 1 / 20000
+# 切分器默认每个请求 1200 字符，约一半 tex 是公式/命令等保留内容
+TEX_BYTES_PER_CHUNK = 2 * 1200
+DEFAULT_OUTLIER_SECONDS = 1800.0
+DEFAULT_SLOW_LANE_SECONDS = 7200.0
+MAX_SINGLE_TEX_BYTES = 64 * 1024 * 1024
+FAST_LANE = "fast"
+SLOW_LANE = "slow"
+
+
+def _env_seconds(env, name: str, default: float) -> float:
+    env = os.environ if env is None else env
+    try:
+        value = float(env.get(name, default))
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def outlier_seconds(env=None) -> float:
+    return _env_seconds(env, "PAPER_TRANS_PDF_OUTLIER_SECONDS", DEFAULT_OUTLIER_SECONDS)
+
+
+def slow_lane_seconds(env=None) -> float:
+    return _env_seconds(env, "PAPER_TRANS_PDF_SLOW_LANE_SECONDS", DEFAULT_SLOW_LANE_SECONDS)
+
+
+def source_features(tar_path: str) -> Dict[str, int]:
+    """Size, file count, ``.tex`` bytes and chunk estimate of one e-print archive."""
+    try:
+        tar_bytes = os.path.getsize(tar_path)
+    except OSError:
+        return {}
+    files = 0
+    tex_bytes = 0
+    try:
+        with tarfile.open(tar_path) as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                files += 1
+                if member.name.lower().endswith(".tex"):
+                    tex_bytes += member.size
+    except tarfile.TarError:
+        # arXiv 单文件投稿是 gzip 压缩（或未压缩）的单个 .tex
+        files = 1
+        try:
+            with gzip.open(tar_path, "rb") as handle:
+                tex_bytes = len(handle.read(MAX_SINGLE_TEX_BYTES))
+        except OSError:
+            tex_bytes = tar_bytes
+    return {
+        "tar_bytes": tar_bytes,
+        "files": files,
+        "tex_bytes": tex_bytes,
+        "chunks_est": math.ceil(tex_bytes / TEX_BYTES_PER_CHUNK),
+    }
+
+
+def probe_source_bytes(arxiv_id: str, timeout: float = 5) -> Dict[str, int]:
+    """Features from the e-print ``Content-Length``; ``{}`` when unavailable."""
+    try:
+        import requests
+
+        response = requests.head(
+            f"https://arxiv.org/e-print/{arxiv_id}", allow_redirects=True, timeout=timeout,
+        )
+        size = int(response.headers.get("Content-Length") or 0)
+    except Exception:
+        return {}
+    return {"tar_bytes": size} if response.ok and size > 0 else {}
+
+
+class CostModel:
+    """Predict full-translation seconds per paper from timing history."""
+
+    def __init__(self, records: Iterable[dict] = (), probe: Optional[Callable[[str], dict]] = None):
+        self.history: Dict[str, float] = {}
+        self.probe = probe
+        per_chunk = []
+        chunks_per_byte = []
+        for record in records:
+            aid = str(record.get("arxiv_id") or "")
+            total = float(record.get("total_seconds") or 0)
+            if not aid or total <= 0:
+                continue
+            self.history[aid] = total
+            driver = record.get("driver") or {}
+            source = driver.get("source") or {}
+            chunks = int(source.get("chunks_est") or driver.get("chunks") or 0)
+            if record.get("success") and chunks > 0 and not record.get("keep_translation"):
+                per_chunk.append(max(0.0, total - BASE_SECONDS) / chunks)
+            if source.get("tar_bytes") and source.get("chunks_est"):
+                chunks_per_byte.append(float(source["chunks_est"]) / float(source["tar_bytes"]))
+        self.default_seconds = statistics.median(self.history.values()) if self.history else DEFAULT_SECONDS
+        self.seconds_per_chunk = statistics.median(per_chunk) if per_chunk else DEFAULT_SECONDS_PER_CHUNK
+        self.chunks_per_byte = statistics.median(chunks_per_byte) if chunks_per_byte else DEFAULT_CHUNKS_PER_BYTE
+
+    @classmethod
+    def from_log(cls, path: Optional[str] = None, probe=probe_source_bytes) -> "CostModel":
+        from paperhub.phase_timing import load_records
+
+        return cls(load_records(path), probe=probe)
+
+    def estimate(self, arxiv_id: str, features: Optional[dict] = None) -> float:
+        if arxiv_id in self.history:
+            return self.history[arxiv_id]
+        if features is None and self.probe is not None:
+            features = self.probe(arxiv_id)
+        features = features or {}
+        chunks = features.get("chunks_est") or float(features.get("tar_bytes") or 0) * self.chunks_per_byte
+        if chunks:
+            return BASE_SECONDS + chunks * self.seconds_per_chunk
+        return self.default_seconds
+
+
+def lane_for(estimate: float, outlier: Optional[float] = None) -> str:
+    return SLOW_LANE if estimate > (outlier_seconds() if outlier is None else outlier) else FAST_LANE
+
+
+def order_by_cost(items: Sequence, cost: Callable, outlier: Optional[float] = None) -> List[Tuple[float, object]]:
+    """``(seconds, item)`` pairs: fast lane cheapest first, then the slow lane.
+
+    Ties keep input (rank) order.
+    """
+    outlier = outlier_seconds() if outlier is None else outlier
+    scored = [(cost(item), index, item) for index, item in enumerate(items)]
+    scored.sort(key=lambda row: (lane_for(row[0], outlier) == SLOW_LANE, row[0], row[1]))
+    return [(seconds, item) for seconds, _, item in scored]
+
+
+class LaneBudget:
+    """Wall-clock budget of the slow lane, counted from its first admitted job."""
+
+    def __init__(self, seconds: Optional[float] = None, clock=time.monotonic):
+        self.seconds = slow_lane_seconds() if seconds is None else seconds
+        self._clock = clock
+        self._started = None
+
+    def admit(self, estimate: float) -> bool:
+        now = self._clock()
+        elapsed = 0.0 if self._started is None else now - self._started
+        if elapsed + estimate > self.seconds:
+            return False
+        if self._started is None:
+            self._started = now
+        return True
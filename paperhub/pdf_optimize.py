@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Optional post-publication PDF optimization for fast first-page display.
+
+xelatex/xdvipdfmx output is not linearized, so the browser viewer behind
+``/view/<id>`` has to fetch most of the file before page 1 renders.  When a
+local tool is available, accepted PDFs are rewritten into a linearized
+("fast web view") file with recompressed streams and object streams:
+
+- ``lossless`` (default): qpdf only; content streams, fonts and images are
+  preserved byte-for-byte after decompression.
+- ``full``: ghostscript ``pdfwrite`` first (dedupes images, subsets and
+  compresses fonts, downsamples images to 300 dpi), then qpdf linearization
+  when available.  Opt-in because it re-encodes the document.
+- ``off``: disabled.
+
+The caller only replaces the published file when the candidate still passes
+the store's ``%PDF-``/``%%EOF`` gate and did not grow materially.
+"""
+
+import os
+import shutil
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+PDF_OPTIMIZE_MODES = ("off", "lossless", "full")
+DEFAULT_MODE = "lossless"
+DEFAULT_TIMEOUT_SECONDS = 180
+# Linearization adds hint tables; tiny growth is worth faster first paint.
+MAX_GROWTH_RATIO = 1.05
+
+
+def optimize_mode(environ: Optional[dict] = None) -> str:
+    raw = (environ if environ is not None else os.environ).get(
+        "PAPER_TRANS_PDF_OPTIMIZE", DEFAULT_MODE
+    )
+    value = str(raw or "").strip().lower()
+    if value in {"0", "false", "no"}:
+        return "off"
+    return value if value in PDF_OPTIMIZE_MODES else DEFAULT_MODE
+
+
+def qpdf_command(src: str, dst: str, executable: str = "qpdf", modern: bool = True) -> List[str]:
+    command = [executable, "--linearize", "--object-streams=generate"]
+    if modern:
+        command += [
+            "--compress-streams=y", "--recompress-flate",
+            "--compression-level=9",
+        ]
+    return command + [src, dst]
+
+
+def ghostscript_command(src: str, dst: str, executable: str = "gs", linearize: bool = False) -> List[str]:
+    command = [
+        executable, "-q", "-dSAFER", "-dBATCH", "-dNOPAUSE",
+        "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.6",
+        "-dPDFSETTINGS=/printer", "-dDetectDuplicateImages=true",
+        "-dCompressFonts=true", "-dSubsetFonts=true",
+        "-dAutoRotatePages=/None",
+    ]
+    if linearize:
+        command.append("-dFastWebView=true")
+    return command + [f"-sOutputFile={dst}", src]
+
+
+def _run(command: List[str], timeout: int) -> int:
+    try:
+        completed = subprocess.run(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return -1
+    return completed.returncode
+
+
+def _qpdf(src: str, dst: str, executable: str, timeout: int) -> bool:
+    # qpdf exits 3 for "succeeded with warnings"; older builds lack the
+    # recompression flags, so fall back to plain linearization.
+    for modern in (True, False):
+        if _run(qpdf_command(src, dst, executable, modern), timeout) in (0, 3):
+            return os.path.exists(dst)
+    return False
+
+
+def optimize_pdf_file(
+    src: str,
+    dst: str,
+    mode: Optional[str] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+    timeout: int = DEFAULT_TIMEOUT_SECONDS,
+) -> Dict[str, object]:
+    """Write an optimized copy of ``src`` to ``dst``.
+
+    Returns ``{"ok", "mode", "tool", "before", "after", "reason"}``.  ``ok``
+    is only true when ``dst`` exists, passes ``validate`` and is at most
+    :data:`MAX_GROWTH_RATIO` times the original size.
+    """
+    mode = mode or optimize_mode()
+    before = os.path.getsize(src)
+    result: Dict[str, object] = {
+        "ok": False, "mode": mode, "tool": "", "before": before,
+        "after": before, "reason": "",
+    }
+    if mode == "off":
+        result["reason"] = "disabled"
+        return result
+    qpdf = shutil.which("qpdf")
+    gs = shutil.which("gs") if mode == "full" else None
+    if not qpdf and not gs:
+        result["reason"] = "no optimizer available"
+        return result
+
+    tools = []
+    current = src
+    if gs:
+        staged = dst + ".gs.pdf" if qpdf else dst
+        if _run(ghostscript_command(current, staged, gs, linearize=not qpdf), timeout) == 0:
+            current = staged
+            tools.append("gs")
+        elif staged != dst and os.path.exists(staged):
+            os.remove(staged)
+    if qpdf and _qpdf(current, dst, qpdf, timeout):
+        tools.append("qpdf")
+    elif current != src and current != dst:
+        os.replace(current, dst)
+    if current != src and current != dst and os.path.exists(current):
+        os.remove(current)
+    result["tool"] = "+".join(tools)
+    if not tools or not os.path.exists(dst):
+        result["reason"] = "optimizer failed"
+        return result
+
+    after = os.path.getsize(dst)
+    result["after"] = after
+    if validate is not None and not validate(dst):
+        result["reason"] = "optimized PDF failed validation"
+        return result
+    if after > before * MAX_GROWTH_RATIO:
+        result["reason"] = "optimized PDF is larger"
+        return result
+    result["ok"] = True
+    return result
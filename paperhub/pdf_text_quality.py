@@ -6,25 +6,43 @@ paper prose from LaTeX structure precisely.  Historical PDFs do not always
 have a TeX backup, so this module provides an explicitly enabled fallback:
 extract bounded page text with Poppler, ignore reference/source-data pages, and
 only report sustained English-dominant prose.
+
+Bulk audits use the streaming mode (:func:`analyze_pdf_stream`): Poppler
+writes to a pipe, pages are analyzed as they arrive, the byte budget is
+enforced while reading, and extraction stops as soon as the verdict can no
+longer change.
+
+Each page is tokenized once into line records (:class:`PageLines`); counts,
+line runs, samples and reference density derive from them, and page-level
+patterns that may span lines only run when their answer matters.
 """
 
-import json
+import codecs
 import os
 import re
 import shutil
+import string
 import subprocess
 import tempfile
+import threading
 from pathlib import Path
 from typing import Dict
 
+from paperhub.quality_cache import QualityCache
+
 
 PDF_TEXT_POLICY_VERSION = "pdf-text-quality-2026-07-28-v18"
 DEFAULT_MAX_PAGES = 200
 DEFAULT_MAX_TEXT_BYTES = 8 * 1024 * 1024
 DEFAULT_TIMEOUT_SECONDS = 120
+DEFAULT_EARLY_CLEAN_PAGES = 40
+STREAM_READ_BYTES = 64 * 1024
 
 CJK_RE = re.compile(r"[\u4e00-\u9fff]")
 LETTER_RE = re.compile(r"[A-Za-z]")
+CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+LETTER_RUN_RE = re.compile(r"[A-Za-z]+")
+_DROP_ASCII_LETTERS = str.maketrans("", "", string.ascii_letters)
 WORD_RE = re.compile(r"\b[A-Za-z][A-Za-z-]{2,}\b")
 REFERENCE_HEADING_RE = re.compile(
     r"(?im)(?:^|[ \t]{4,})[ \t]*"
@@ -245,38 +263,161 @@ def extract_pdf_text(
         return output_path.read_text(encoding="utf-8", errors="replace")
 
 
+def iter_pdf_pages(
+    pdf_path,
+    executable="pdftotext",
+    max_pages=DEFAULT_MAX_PAGES,
+    max_text_bytes=DEFAULT_MAX_TEXT_BYTES,
+    timeout_seconds=DEFAULT_TIMEOUT_SECONDS,
+):
+    """Yield Poppler page texts from a pipe under the same limits.
+
+    The byte budget is checked while reading, and ``pdftotext`` is killed
+    when the caller stops early (``close()`` on the generator), overruns the
+    budget or exceeds the wall-clock timeout.
+    """
+    resolved = shutil.which(executable)
+    if not resolved:
+        raise PdfTextQualityError(
+            "pdftotext is unavailable; install poppler-utils"
+        )
+    max_text_bytes = max(1, int(max_text_bytes))
+    timeout_seconds = max(1, int(timeout_seconds))
+    command = pdftotext_command(
+        pdf_path,
+        "-",
+        max_pages=max_pages,
+        executable=resolved,
+    )
+    # stderr goes to a file: a chatty PDF must not block on a full pipe
+    with tempfile.TemporaryFile(prefix="paper-trans-pdf-text-") as stderr:
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+            )
+        except OSError as exc:
+            raise PdfTextQualityError("pdftotext failed: {}".format(exc))
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout_seconds, expire)
+        timer.daemon = True
+        timer.start()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = []
+        total = 0
+        try:
+            while True:
+                block = os.read(process.stdout.fileno(), STREAM_READ_BYTES)
+                if not block:
+                    break
+                total += len(block)
+                if total > max_text_bytes:
+                    raise PdfTextQualityError(
+                        "pdftotext output exceeds {} bytes: {}+".format(
+                            max_text_bytes,
+                            total,
+                        )
+                    )
+                text = decoder.decode(block)
+                if "\f" not in text:
+                    pending.append(text)
+                    continue
+                parts = text.split("\f")
+                pending.append(parts[0])
+                yield "".join(pending)
+                for part in parts[1:-1]:
+                    yield part
+                pending = [parts[-1]]
+            pending.append(decoder.decode(b"", final=True))
+            process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+        if timed_out.is_set():
+            raise PdfTextQualityError(
+                "pdftotext timed out after {}s".format(timeout_seconds)
+            )
+        if process.returncode != 0:
+            stderr.seek(0)
+            diagnostic = stderr.read(4096).decode(
+                "utf-8", errors="replace"
+            ).strip()
+            raise PdfTextQualityError(
+                "pdftotext exited {}: {}".format(
+                    process.returncode,
+                    diagnostic[:300] or "no diagnostic",
+                )
+            )
+    remainder = "".join(pending)
+    if remainder.strip():
+        yield remainder
+
+
+class PageLines:
+    """One tokenization of a page into line records.
+
+    Each record is ``(start, text, cjk, letters, words)``: the line's offset
+    in the page, its whitespace-normalized text and its CJK, ASCII-letter and
+    word counts.  Page totals are sums over the records, so the heading,
+    reference, sample and line-run checks below share a single pass instead
+    of re-splitting and re-counting the page each.
+    """
+
+    __slots__ = ("text", "lines", "cjk", "letters", "words")
+
+    def __init__(self, text):
+        self.text = text
+        self.lines = []
+        cjk_total = letter_total = word_total = 0
+        position = 0
+        for raw_line in text.splitlines(True):
+            normalized = " ".join(raw_line.split())
+            cjk = letters = words = 0
+            if normalized:
+                if normalized.isascii():
+                    letters = len(normalized) - len(
+                        normalized.translate(_DROP_ASCII_LETTERS)
+                    )
+                else:
+                    cjk = sum(map(len, CJK_RUN_RE.findall(normalized)))
+                    letters = sum(map(len, LETTER_RUN_RE.findall(normalized)))
+                # WORD_RE needs a leading and a closing letter
+                if letters >= 2:
+                    words = len(WORD_RE.findall(normalized))
+                cjk_total += cjk
+                letter_total += letters
+                word_total += words
+            self.lines.append((position, normalized, cjk, letters, words))
+            position += len(raw_line)
+        self.cjk = cjk_total
+        self.letters = letter_total
+        self.words = word_total
+
+
 def _page_sample(page):
     candidates = []
-    for line in page.splitlines():
-        normalized = " ".join(line.split())
-        if len(LETTER_RE.findall(normalized)) < 80:
-            continue
-        if len(WORD_RE.findall(normalized)) < 12:
+    for _, line, _, letters, words in page.lines:
+        if letters < 80 or words < 12:
             continue
-        if REFERENCE_LIKE_LINE_RE.search(normalized):
+        if REFERENCE_LIKE_LINE_RE.search(line):
             continue
-        candidates.append(normalized)
+        candidates.append(line)
         if len(candidates) >= 2:
             break
     if not candidates:
-        candidates = [" ".join(page.split())]
+        candidates = [" ".join(line[1] for line in page.lines if line[1])]
     return " ".join(candidates)[:360]
 
 
-def _longest_consecutive_run(numbers):
-    longest = 0
-    current = 0
-    previous = None
-    for number in sorted(numbers):
-        if previous is not None and number == previous + 1:
-            current += 1
-        else:
-            current = 1
-        longest = max(longest, current)
-        previous = number
-    return longest
-
-
 def _english_line_run(page):
     """Return the strongest run of wrapped English prose lines."""
     best_lines = 0
@@ -284,11 +425,7 @@ def _english_line_run(page):
     best_text = ""
     current = []
     current_words = 0
-    for raw_line in page.splitlines():
-        line = " ".join(raw_line.split())
-        letters = len(LETTER_RE.findall(line))
-        cjk = len(CJK_RE.findall(line))
-        words = len(WORD_RE.findall(line))
+    for _, line, cjk, letters, words in page.lines:
         english_line = (
             letters >= 15
             and words >= 3
@@ -314,22 +451,18 @@ def _english_line_run(page):
 
 
 def _reference_dense(page):
-    lines = [
-        " ".join(line.split())
-        for line in page.splitlines()
-        if line.strip()
-    ]
-    cjk = len(CJK_RE.findall(page))
-    letters = len(LETTER_RE.findall(page))
-    if 100 * cjk / max(1, cjk + letters) >= 8.0:
+    if 100 * page.cjk / max(1, page.cjk + page.letters) >= 8.0:
         return False
     # Parenthetical citations are common in ordinary Related Work and
     # Introduction prose.  Only use bibliography-entry-shaped line starts as
     # a heading-free fallback; explicit References headings cover other styles.
-    numbered_entries = sum(
-        1 for line in lines if NUMBERED_REFERENCE_ENTRY_RE.match(line)
-    )
-    return numbered_entries >= 3
+    numbered_entries = 0
+    for _, line, _, _, _ in page.lines:
+        if line.startswith("[") and NUMBERED_REFERENCE_ENTRY_RE.match(line):
+            numbered_entries += 1
+            if numbered_entries >= 3:
+                return True
+    return False
 
 
 def _substantive_reference_chunk(text):
@@ -348,13 +481,8 @@ def _split_chinese_reference_heading_position(page):
     Similar duplication also occurs inside figure captions, so the block must
     be detached from adjacent prose rather than merely contain the four glyphs.
     """
-    lines = page.splitlines(True)
-    positions = []
-    position = 0
-    for raw_line in lines:
-        positions.append(position)
-        position += len(raw_line)
-    normalized = ["".join(line.split()) for line in lines]
+    lines = page.lines
+    normalized = [line[1].replace(" ", "") for line in lines]
     allowed = set("参考文献")
     index = 0
     while index < len(lines):
@@ -386,7 +514,7 @@ def _split_chinese_reference_heading_position(page):
             and (not following or following[0] not in allowed)
         )
         if end - index >= 5 and ordered and detached:
-            return positions[index]
+            return lines[index][0]
         index = end
     return None
 
@@ -459,54 +587,81 @@ def is_untranslated_pdf_prose(report: Dict[str, object]) -> bool:
     )
 
 
-def analyze_pdf_text(text, max_samples=5):
-    """Analyze already extracted Poppler text, one form-feed per PDF page."""
-    pages = str(text or "").split("\f")
-    if pages and not pages[-1].strip():
-        pages.pop()
+class PdfTextAnalyzer:
+    """Incremental form of :func:`analyze_pdf_text`, fed one page at a time.
+
+    Streaming extraction feeds pages as Poppler emits them and asks
+    :meth:`verdict` after each one; the report covers the pages fed so far.
+    """
 
-    in_references = False
-    reference_pages = []
-    source_data_pages = []
-    structural_pages = []
-    refusal_pages = []
-    refusal_samples = []
-    dominant_pages = []
-    partial_pages = []
-    partial_samples = []
-    samples = []
-    analyzable_pages = 0
-    cjk_total = 0
-    letter_total = 0
-
-    in_appendix = False
-    source_section_label = None
-    for page_number, page in enumerate(pages, 1):
-        refusal = TRANSLATION_REFUSAL_RE.search(page)
+    def __init__(self, max_samples=5):
+        self.max_samples = max(0, int(max_samples))
+        self.pages_scanned = 0
+        self.in_references = False
+        self.in_appendix = False
+        self.source_section_label = None
+        self.reference_pages = []
+        self.source_data_pages = []
+        self.structural_pages = []
+        self.refusal_pages = []
+        self.refusal_samples = []
+        self.dominant_pages = []
+        self.partial_pages = []
+        self.partial_samples = []
+        self.samples = []
+        self.analyzable_pages = 0
+        self.cjk_total = 0
+        self.letter_total = 0
+        self._dominant_run = 0
+        self.longest_english_page_run = 0
+
+    def feed(self, page):
+        self.pages_scanned += 1
+        page_number = self.pages_scanned
+        refusal = (
+            TRANSLATION_REFUSAL_RE.search(page) if "抱歉" in page else None
+        )
         if refusal:
-            refusal_pages.append(page_number)
-            if len(refusal_samples) < max(0, int(max_samples)):
+            self.refusal_pages.append(page_number)
+            if len(self.refusal_samples) < self.max_samples:
                 start = max(0, refusal.start() - 80)
                 end = min(len(page), refusal.end() + 120)
-                refusal_samples.append({
+                self.refusal_samples.append({
                     "page": page_number,
                     "text": " ".join(page[start:end].split())[:360],
                 })
+        lines = None
+        # Substring gates for the heading patterns.  The fragments avoid the
+        # letters i/s/k, which IGNORECASE also matches to non-ASCII forms
+        # (dotless i, long s, Kelvin sign) that ``str.lower`` keeps distinct.
+        lowered = page.lower()
         markers = []
-        markers.extend(
-            (match.start(), "references")
-            for match in REFERENCE_HEADING_RE.finditer(page)
-        )
-        split_reference_heading = _split_chinese_reference_heading_position(
-            page
-        )
-        if split_reference_heading is not None:
-            markers.append((split_reference_heading, "references"))
-        markers.extend(
-            (match.start(), "appendix")
-            for match in APPENDIX_HEADING_RE.finditer(page)
-        )
-        if in_references and not any(
+        if (
+            "参考文献" in page
+            or "reference" in lowered
+            or "ography" in lowered
+        ):
+            markers.extend(
+                (match.start(), "references")
+                for match in REFERENCE_HEADING_RE.finditer(page)
+            )
+        if "参" in page:
+            lines = PageLines(page)
+            split_reference_heading = (
+                _split_chinese_reference_heading_position(lines)
+            )
+            if split_reference_heading is not None:
+                markers.append((split_reference_heading, "references"))
+        if (
+            "附录" in page
+            or "append" in lowered
+            or "upplementary" in lowered
+        ):
+            markers.extend(
+                (match.start(), "appendix")
+                for match in APPENDIX_HEADING_RE.finditer(page)
+            )
+        if self.in_references and not any(
             marker == "appendix" for _, marker in markers
         ):
             bare_appendix = _bare_appendix_heading_position(page)
@@ -516,7 +671,7 @@ def analyze_pdf_text(text, max_samples=5):
         analysis_parts = []
         reference_content = False
         cursor = 0
-        reference_state = in_references
+        reference_state = self.in_references
         for position, marker in ordered_markers:
             position = max(cursor, min(len(page), position))
             chunk = page[cursor:position]
@@ -529,7 +684,7 @@ def analyze_pdf_text(text, max_samples=5):
                 analysis_parts.append(chunk)
             reference_state = marker == "references"
             if marker == "appendix":
-                in_appendix = True
+                self.in_appendix = True
             cursor = position
         remainder = page[cursor:]
         if reference_state:
@@ -539,85 +694,74 @@ def analyze_pdf_text(text, max_samples=5):
             )
         else:
             analysis_parts.append(remainder)
-        in_references = reference_state
+        self.in_references = reference_state
         analysis_page = "".join(analysis_parts)
-        if not ordered_markers and not in_references and _reference_dense(page):
+        if not ordered_markers and not self.in_references:
+            lines = lines or PageLines(page)
+        if (
+            not ordered_markers
+            and not self.in_references
+            and _reference_dense(lines)
+        ):
             # A citation-dense page without a heading is probably part of the
             # bibliography, but must not force every later survey/body page
             # into reference mode.
             reference_content = True
             analysis_page = ""
         if reference_content:
-            reference_pages.append(page_number)
+            self.reference_pages.append(page_number)
         if not analysis_page.strip():
-            continue
+            return
+        if lines is None or analysis_page != page:
+            # Headings cut the page: the records must describe only the
+            # analyzed (non-reference) text.
+            lines = PageLines(analysis_page)
         page = analysis_page
-        if in_appendix:
-            source_section_label = _update_source_section(
+        if self.in_appendix:
+            self.source_section_label = _update_source_section(
                 page,
-                source_section_label,
+                self.source_section_label,
             )
 
-        cjk = len(CJK_RE.findall(page))
-        letters = len(LETTER_RE.findall(page))
-        words = len(WORD_RE.findall(page))
+        cjk = lines.cjk
+        letters = lines.letters
+        words = lines.words
         structural = (
             bool(CONTENTS_PAGE_RE.search(page))
-            or len(DOT_LEADER_RE.findall(page)) >= 8
+            or (
+                # eight dot leaders need at least forty dots
+                page.count(".") >= 40
+                and len(DOT_LEADER_RE.findall(page)) >= 8
+            )
             or (
                 bool(TABLE_HEADING_RE.search(page))
                 and len(NUMERIC_TOKEN_RE.findall(page)) >= 35
             )
         )
         if structural:
-            structural_pages.append(page_number)
-            continue
+            self.structural_pages.append(page_number)
+            return
         if cjk + letters < 300 or (words < 30 and cjk < 100):
-            continue
+            return
         cjk_pct = 100 * cjk / max(1, cjk + letters)
-        source_markers = len(SOURCE_DATA_MARKER_RE.findall(page))
-        qa_markers = len(SOURCE_DATA_QA_RE.findall(page))
-        image_prompt_markers = len(IMAGE_PROMPT_RE.findall(page))
-        template_terms = len(SOURCE_TEMPLATE_TERM_RE.findall(page))
-        json_fields = len(JSON_FIELD_RE.findall(page))
-        source_data = cjk_pct < 20.0 and (
-            bool(source_section_label)
-            or source_markers >= 2
-            or len(MARKDOWN_HEADING_RE.findall(page)) >= 4
-            or bool(SOURCE_TRAJECTORY_EXAMPLE_RE.search(page))
-            or (
-                template_terms >= 3
-                and bool(SOURCE_TEMPLATE_STRUCTURE_RE.search(page))
-            )
-            or json_fields >= 6
-            or (
-                image_prompt_markers >= 2
-                and bool(FIGURE_FRAME_RE.search(page))
-            )
-            or (
-                in_appendix
-                and (
-                    source_markers >= 1
-                    or qa_markers >= 1
-                    or image_prompt_markers >= 2
-                    or (
-                        template_terms >= 3
-                        and bool(SOURCE_TEMPLATE_STRUCTURE_RE.search(page))
-                    )
-                )
-            )
-            or (
-                in_appendix
-                and bool(SOURCE_DATA_APPENDIX_RE.search(page[:2000]))
-            )
-        )
-        if source_data:
-            source_data_pages.append(page_number)
-            continue
+        # The page-level source/partial patterns below may span lines, so they
+        # still run on the page text, but only when their answer can change
+        # the outcome; most translated pages stop at the CJK share.
+        source_markers = None
+
+        def count_source_markers():
+            nonlocal source_markers
+            if source_markers is None:
+                source_markers = len(SOURCE_DATA_MARKER_RE.findall(page))
+            return source_markers
+
+        if cjk_pct < 20.0 and self._source_data(page, count_source_markers):
+            self.source_data_pages.append(page_number)
+            return
 
-        analyzable_pages += 1
-        cjk_total += cjk
-        letter_total += letters
+        self.analyzable_pages += 1
+        self.cjk_total += cjk
+        self.letter_total += letters
 
         english_dominant = (
             letters >= 700
@@ -625,75 +769,147 @@ def analyze_pdf_text(text, max_samples=5):
             and cjk_pct < 20.0
         )
         if english_dominant:
-            dominant_pages.append(page_number)
-            if len(samples) < max(0, int(max_samples)):
-                samples.append({
+            previous = self.dominant_pages[-1] if self.dominant_pages else None
+            self._dominant_run = (
+                self._dominant_run + 1 if previous == page_number - 1 else 1
+            )
+            self.longest_english_page_run = max(
+                self.longest_english_page_run,
+                self._dominant_run,
+            )
+            self.dominant_pages.append(page_number)
+            if len(self.samples) < self.max_samples:
+                self.samples.append({
                     "page": page_number,
                     "cjk_pct": round(cjk_pct, 1),
                     "english_words": words,
-                    "text": _page_sample(page),
+                    "text": _page_sample(lines),
                 })
-        line_run, line_words, line_sample = _english_line_run(page)
-        partial_source_like = (
-            source_markers >= 1
-            or bool(PARTIAL_SOURCE_HINT_RE.search(page))
-            or len(IMPERATIVE_EXAMPLE_LINE_RE.findall(page)) >= 3
-            or len(NUMBERED_PROCEDURE_LINE_RE.findall(page)) >= 3
-            or bool(PARTIAL_VISUAL_BLOCK_RE.search(line_sample[:160]))
-        )
+        line_run, line_words, line_sample = _english_line_run(lines)
         partial_reason = None
         if english_dominant and SCHOLARLY_PROOF_RE.search(page):
             partial_reason = "scholarly_proof"
         elif (
-            not partial_source_like
-            and
-            ACADEMIC_SECTION_HEADING_RE.search(page)
-            and line_run >= 3
+            line_run >= 3
             and line_words >= 30
+            and ACADEMIC_SECTION_HEADING_RE.search(page)
             and (
                 len(re.findall(r"[.!?](?:\s|$)", line_sample)) >= 2
                 or bool(ACADEMIC_NARRATIVE_RE.search(line_sample))
             )
+            and not (
+                count_source_markers() >= 1
+                or bool(PARTIAL_SOURCE_HINT_RE.search(page))
+                or len(IMPERATIVE_EXAMPLE_LINE_RE.findall(page)) >= 3
+                or len(NUMBERED_PROCEDURE_LINE_RE.findall(page)) >= 3
+                or bool(PARTIAL_VISUAL_BLOCK_RE.search(line_sample[:160]))
+            )
         ):
             partial_reason = "english_paragraph_in_academic_section"
         if partial_reason:
-            partial_pages.append(page_number)
-            if len(partial_samples) < max(0, int(max_samples)):
-                partial_samples.append({
+            self.partial_pages.append(page_number)
+            if len(self.partial_samples) < self.max_samples:
+                self.partial_samples.append({
                     "page": page_number,
                     "reason": partial_reason,
-                    "text": line_sample or _page_sample(page),
+                    "text": line_sample or _page_sample(lines),
                 })
 
-    total_letters = cjk_total + letter_total
-    cjk_pct_exact = 100 * cjk_total / max(1, total_letters)
-    report = {
-        "policy_version": PDF_TEXT_POLICY_VERSION,
-        "pages_scanned": len(pages),
-        "analyzable_pages": analyzable_pages,
-        "reference_pages": len(reference_pages),
-        "reference_page_numbers": reference_pages,
-        "source_data_pages": len(source_data_pages),
-        "source_data_page_numbers": source_data_pages,
-        "structural_pages": len(structural_pages),
-        "structural_page_numbers": structural_pages,
-        "translation_refusal_pages": len(refusal_pages),
-        "translation_refusal_page_numbers": refusal_pages,
-        "translation_refusal_samples": refusal_samples,
-        "cjk": cjk_total,
-        "letters": letter_total,
-        "cjk_pct": round(cjk_pct_exact, 1),
-        "cjk_pct_exact": cjk_pct_exact,
-        "english_dominant_pages": len(dominant_pages),
-        "english_dominant_page_numbers": dominant_pages,
-        "longest_english_page_run": _longest_consecutive_run(dominant_pages),
-        "partial_untranslated_prose_pages": len(partial_pages),
-        "partial_untranslated_prose_page_numbers": partial_pages,
-        "partial_untranslated_prose_samples": partial_samples,
-        "samples": samples,
-    }
-    report["untranslated_prose"] = is_untranslated_pdf_prose(report)
-    return report
+    def _source_data(self, page, count_source_markers):
+        """Whether a low-CJK page is prompt/example source data."""
+        source_markers = count_source_markers()
+        if (
+            self.source_section_label
+            or source_markers >= 2
+            or len(MARKDOWN_HEADING_RE.findall(page)) >= 4
+            or SOURCE_TRAJECTORY_EXAMPLE_RE.search(page)
+        ):
+            return True
+        template_terms = len(SOURCE_TEMPLATE_TERM_RE.findall(page))
+        template = (
+            template_terms >= 3
+            and bool(SOURCE_TEMPLATE_STRUCTURE_RE.search(page))
+        )
+        if template or len(JSON_FIELD_RE.findall(page)) >= 6:
+            return True
+        image_prompt_markers = len(IMAGE_PROMPT_RE.findall(page))
+        if image_prompt_markers >= 2 and FIGURE_FRAME_RE.search(page):
+            return True
+        if not self.in_appendix:
+            return False
+        return bool(
+            source_markers >= 1
+            or SOURCE_DATA_QA_RE.search(page)
+            or image_prompt_markers >= 2
+            or SOURCE_DATA_APPENDIX_RE.search(page[:2000])
+        )
+
+    def verdict(self, clean_pages=DEFAULT_EARLY_CLEAN_PAGES):
+        """Return an early verdict, else ``None``.
+
+        ``"untranslated"`` is final: the page-count rules of
+        :func:`is_untranslated_pdf_prose` that only ever grow are met.
+        ``"clean"`` is a heuristic cutoff, not a proof: ``clean_pages``
+        analyzable pages were seen without a single English-dominant,
+        partial-prose or refusal page while still in the body (references and
+        appendices are always read to the end).  Later body pages could still
+        flip a full read, so callers report ``clean_pages`` alongside it.
+        """
+        if self.longest_english_page_run >= 4 or len(self.dominant_pages) >= 10:
+            return "untranslated"
+        if (
+            clean_pages
+            and self.analyzable_pages >= int(clean_pages)
+            and not self.dominant_pages
+            and not self.partial_pages
+            and not self.refusal_pages
+            and not self.in_references
+            and not self.in_appendix
+        ):
+            return "clean"
+        return None
+
+    def report(self):
+        total_letters = self.cjk_total + self.letter_total
+        cjk_pct_exact = 100 * self.cjk_total / max(1, total_letters)
+        report = {
+            "policy_version": PDF_TEXT_POLICY_VERSION,
+            "pages_scanned": self.pages_scanned,
+            "analyzable_pages": self.analyzable_pages,
+            "reference_pages": len(self.reference_pages),
+            "reference_page_numbers": list(self.reference_pages),
+            "source_data_pages": len(self.source_data_pages),
+            "source_data_page_numbers": list(self.source_data_pages),
+            "structural_pages": len(self.structural_pages),
+            "structural_page_numbers": list(self.structural_pages),
+            "translation_refusal_pages": len(self.refusal_pages),
+            "translation_refusal_page_numbers": list(self.refusal_pages),
+            "translation_refusal_samples": list(self.refusal_samples),
+            "cjk": self.cjk_total,
+            "letters": self.letter_total,
+            "cjk_pct": round(cjk_pct_exact, 1),
+            "cjk_pct_exact": cjk_pct_exact,
+            "english_dominant_pages": len(self.dominant_pages),
+            "english_dominant_page_numbers": list(self.dominant_pages),
+            "longest_english_page_run": self.longest_english_page_run,
+            "partial_untranslated_prose_pages": len(self.partial_pages),
+            "partial_untranslated_prose_page_numbers": list(self.partial_pages),
+            "partial_untranslated_prose_samples": list(self.partial_samples),
+            "samples": list(self.samples),
+        }
+        report["untranslated_prose"] = is_untranslated_pdf_prose(report)
+        return report
+
+
+def analyze_pdf_text(text, max_samples=5):
+    """Analyze already extracted Poppler text, one form-feed per PDF page."""
+    pages = str(text or "").split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    analyzer = PdfTextAnalyzer(max_samples=max_samples)
+    for page in pages:
+        analyzer.feed(page)
+    return analyzer.report()
 
 
 def analyze_pdf(
@@ -702,8 +918,22 @@ def analyze_pdf(
     max_pages=DEFAULT_MAX_PAGES,
     max_text_bytes=DEFAULT_MAX_TEXT_BYTES,
     timeout_seconds=DEFAULT_TIMEOUT_SECONDS,
+    stream=False,
+    early_verdict=True,
 ):
-    """Extract and analyze one PDF under the configured resource bounds."""
+    """Extract and analyze one PDF under the configured resource bounds.
+
+    ``stream=True`` delegates to :func:`analyze_pdf_stream`.
+    """
+    if stream:
+        return analyze_pdf_stream(
+            pdf_path,
+            executable=executable,
+            max_pages=max_pages,
+            max_text_bytes=max_text_bytes,
+            timeout_seconds=timeout_seconds,
+            early_verdict=early_verdict,
+        )
     max_pages = max(1, int(max_pages))
     # Extract one sentinel page so an exactly-N-page PDF is distinguishable
     # from a longer PDF truncated at the configured page boundary.
@@ -724,60 +954,86 @@ def analyze_pdf(
     return report
 
 
-def analyze_pdf_cached(
+def analyze_pdf_stream(
     pdf_path,
-    cache_dir,
     executable="pdftotext",
     max_pages=DEFAULT_MAX_PAGES,
     max_text_bytes=DEFAULT_MAX_TEXT_BYTES,
     timeout_seconds=DEFAULT_TIMEOUT_SECONDS,
+    early_verdict=True,
+    clean_pages=DEFAULT_EARLY_CLEAN_PAGES,
 ):
-    """Reuse metrics when the PDF, policy, and extraction bounds are unchanged."""
-    pdf_path = Path(pdf_path)
-    cache_root = Path(cache_dir)
-    cache_root.mkdir(parents=True, exist_ok=True)
-    cache_path = cache_root / (pdf_path.stem + ".json")
-    stat = pdf_path.stat()
-    signature = {
-        "policy_version": PDF_TEXT_POLICY_VERSION,
-        "pdf_size": stat.st_size,
-        "pdf_mtime_ns": getattr(
-            stat,
-            "st_mtime_ns",
-            int(stat.st_mtime * 1_000_000_000),
-        ),
-        "max_pages": int(max_pages),
-        "max_text_bytes": int(max_text_bytes),
-    }
-    try:
-        cached = json.loads(cache_path.read_text(encoding="utf-8"))
-        if (
-            isinstance(cached, dict)
-            and cached.get("signature") == signature
-            and isinstance(cached.get("report"), dict)
-        ):
-            report = dict(cached["report"])
-            report["_cache_hit"] = True
-            return report
-    except (OSError, ValueError):
-        pass
+    """Streaming :func:`analyze_pdf`: constant memory, optional early verdict.
 
-    report = analyze_pdf(
+    ``report["early_verdict"]`` names the verdict that stopped extraction
+    (``"untranslated"``/``"clean"``) or is ``None`` after a full read.
+    """
+    max_pages = max(1, int(max_pages))
+    analyzer = PdfTextAnalyzer()
+    verdict = None
+    page_limit_reached = False
+    pages = iter_pdf_pages(
         pdf_path,
         executable=executable,
-        max_pages=max_pages,
+        max_pages=max_pages + 1,
         max_text_bytes=max_text_bytes,
         timeout_seconds=timeout_seconds,
     )
-    payload = {"signature": signature, "report": report}
-    temporary = cache_path.with_name(
-        "{}.{}.tmp".format(cache_path.name, os.getpid())
-    )
-    temporary.write_text(
-        json.dumps(payload, ensure_ascii=False, sort_keys=True),
-        encoding="utf-8",
-    )
-    os.replace(str(temporary), str(cache_path))
-    report = dict(report)
-    report["_cache_hit"] = False
+    try:
+        for page in pages:
+            if analyzer.pages_scanned >= max_pages:
+                # Sentinel page: the PDF is longer than the page budget.
+                page_limit_reached = True
+                break
+            analyzer.feed(page)
+            if early_verdict:
+                verdict = analyzer.verdict(clean_pages)
+                if verdict:
+                    break
+    finally:
+        pages.close()
+    report = analyzer.report()
+    report["path"] = str(pdf_path)
+    report["page_limit_reached"] = page_limit_reached
+    report["early_verdict"] = verdict
     return report
+
+
+def analyze_pdf_cached(
+    pdf_path,
+    cache_path,
+    executable="pdftotext",
+    max_pages=DEFAULT_MAX_PAGES,
+    max_text_bytes=DEFAULT_MAX_TEXT_BYTES,
+    timeout_seconds=DEFAULT_TIMEOUT_SECONDS,
+    stream=False,
+    early_verdict=True,
+):
+    """Reuse metrics when the PDF bytes, policy, and extraction bounds are unchanged.
+
+    ``cache_path`` is the shared :mod:`paperhub.quality_cache` SQLite store,
+    so copies and restores of the same PDF reuse one verdict.
+    """
+    params = {
+        "max_pages": int(max_pages),
+        "max_text_bytes": int(max_text_bytes),
+    }
+    if stream and early_verdict:
+        # Early-verdict reports cover a page prefix; never mix them with
+        # full-read reports.
+        params["early_verdict"] = DEFAULT_EARLY_CLEAN_PAGES
+    return QualityCache(cache_path).analyze(
+        "pdf_text",
+        str(pdf_path),
+        PDF_TEXT_POLICY_VERSION,
+        lambda path: analyze_pdf(
+            path,
+            executable=executable,
+            max_pages=max_pages,
+            max_text_bytes=max_text_bytes,
+            timeout_seconds=timeout_seconds,
+            stream=stream,
+            early_verdict=early_verdict,
+        ),
+        params,
+    )
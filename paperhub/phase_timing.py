@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Per-paper phase timing records for the full-translation pipeline.
+
+``translate_full`` times its own host phases (container check, driver
+deployment, keep-translation prepare, the container run, PDF fetch) and
+folds in the driver's typed events (``logs/driver_events/<id>.jsonl``):
+source download/extraction and archive size (the cost features of
+``paperhub.pdf_cost``), splitting, LLM translation, recompile and every
+compile pass, chunk counts, token estimates and retry rounds.  One JSON line
+per run is appended to ``logs/phase_timing.jsonl``;
+``scripts/phase_timing_report.py`` aggregates p50/p95 per phase and compares
+``SPLITTER_CACHE_VERSION``s.
+"""
+
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from paperhub.paths import LOGS_DIR
+
+TIMING_LOG_NAME = "phase_timing.jsonl"
+DEFAULT_REGRESSION_RATIO = 1.25
+DEFAULT_MIN_SAMPLES = 3
+
+
+def timing_log_path(logs_dir: str = LOGS_DIR) -> str:
+    return os.path.join(logs_dir, TIMING_LOG_NAME)
+
+
+class PhaseTimer:
+    """Accumulate wall-clock seconds per named host phase."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.started = clock()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (self._clock() - start)
+
+    def total(self) -> float:
+        return self._clock() - self.started
+
+
+def summarize_driver_events(events: Iterable[dict]) -> dict:
+    """Collapse one run's driver events into phase/compile/chunk totals."""
+    summary = {
+        "splitter_version": "",
+        "phases": {},
+        "compile": {},
+        "compile_passes": 0,
+        "translate_attempts": 0,
+        "chunks": 0,
+        "llm_requests": 0,
+        "tokens_est": 0,
+        "chunk_retry_rounds": 0,
+        "chunks_failed": 0,
+        "quality_ok": None,
+        "result": "",
+        "source": {},
+    }
+    phases = summary["phases"]
+    compile_seconds = summary["compile"]
+    for event in events:
+        kind = event.get("event")
+        if kind == "job_start":
+            summary["splitter_version"] = str(event.get("splitter_version") or "")
+        elif kind == "phase_end":
+            name = str(event.get("phase") or "unknown")
+            phases[name] = phases.get(name, 0.0) + float(event.get("seconds") or 0)
+            if name == "translate":
+                summary["translate_attempts"] += 1
+        elif kind == "compile_pass":
+            engine = str(event.get("engine") or "unknown")
+            compile_seconds[engine] = compile_seconds.get(engine, 0.0) + float(event.get("seconds") or 0)
+            summary["compile_passes"] += 1
+        elif kind == "chunks":
+            if event.get("round") == 0:
+                summary["chunks"] += int(event.get("total") or 0)
+                # 打包后一次请求可覆盖多个 chunk；旧事件没有 requests 字段
+                summary["llm_requests"] += int(event.get("requests") or event.get("total") or 0)
+                summary["tokens_est"] += int(event.get("tokens_est") or 0)
+            else:
+                summary["chunk_retry_rounds"] += 1
+            summary["chunks_failed"] = int(event.get("failed") or 0)
+        elif kind == "source":
+            summary["source"] = {
+                name: int(event.get(name) or 0) for name in ("tar_bytes", "files", "tex_bytes", "chunks_est")
+            }
+        elif kind == "quality":
+            summary["quality_ok"] = bool(event.get("ok"))
+        elif kind == "result":
+            summary["result"] = str(event.get("status") or "")
+    return summary
+
+
+def build_record(arxiv_id: str, timer: PhaseTimer, events: Iterable[dict],
+                 success: bool, no_cache: bool = False,
+                 keep_translation: bool = False) -> dict:
+    driver = summarize_driver_events(events)
+    record = {
+        "arxiv_id": arxiv_id,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "success": bool(success),
+        "no_cache": bool(no_cache),
+        "keep_translation": bool(keep_translation),
+        "splitter_version": driver.pop("splitter_version"),
+        "total_seconds": round(timer.total(), 3),
+        "host": {name: round(seconds, 3) for name, seconds in timer.phases.items()},
+    }
+    driver["phases"] = {k: round(v, 3) for k, v in driver["phases"].items()}
+    driver["compile"] = {k: round(v, 3) for k, v in driver["compile"].items()}
+    record["driver"] = driver
+    return record
+
+
+def append_record(record: dict, path: Optional[str] = None) -> None:
+    path = path or timing_log_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 单行追加（O_APPEND）：并发的 runner 不会互相截断
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+def load_records(path: Optional[str] = None, since: Optional[str] = None) -> List[dict]:
+    records = []
+    try:
+        with open(path or timing_log_path(), encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                if since and str(record.get("recorded_at", "")) < since:
+                    continue
+                records.append(record)
+    except OSError:
+        return []
+    return records
+
+
+def record_phase_seconds(record: dict) -> Dict[str, float]:
+    """Flatten a record into ``host.*``/``driver.*``/``compile.*``/``total`` series."""
+    flat = {"total": float(record.get("total_seconds") or 0)}
+    for name, seconds in (record.get("host") or {}).items():
+        flat[f"host.{name}"] = float(seconds)
+    driver = record.get("driver") or {}
+    for name, seconds in (driver.get("phases") or {}).items():
+        flat[f"driver.{name}"] = float(seconds)
+    for engine, seconds in (driver.get("compile") or {}).items():
+        flat[f"compile.{engine}"] = float(seconds)
+    return flat
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (``pct`` in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of empty sequence")
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def aggregate(records: Iterable[dict], group_by: str = "splitter_version") -> Dict[str, Dict[str, dict]]:
+    """``{group: {phase: {"count", "p50", "p95", "total"}}}`` over the records."""
+    series: Dict[str, Dict[str, List[float]]] = {}
+    for record in records:
+        group = str(record.get(group_by) or "unknown")
+        bucket = series.setdefault(group, {})
+        for phase, seconds in record_phase_seconds(record).items():
+            bucket.setdefault(phase, []).append(seconds)
+    return {
+        group: {
+            phase: {
+                "count": len(values),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "total": round(sum(values), 3),
+            }
+            for phase, values in sorted(phases.items())
+        }
+        for group, phases in series.items()
+    }
+
+
+def find_regressions(stats: Dict[str, Dict[str, dict]], baseline: str, candidate: str,
+                     ratio: float = DEFAULT_REGRESSION_RATIO,
+                     min_samples: int = DEFAULT_MIN_SAMPLES) -> List[dict]:
+    """Phases whose p50 or p95 grew by more than ``ratio`` from baseline to candidate."""
+    found = []
+    old_phases = stats.get(baseline, {})
+    for phase, new in stats.get(candidate, {}).items():
+        old = old_phases.get(phase)
+        if not old or old["count"] < min_samples or new["count"] < min_samples:
+            continue
+        for metric in ("p50", "p95"):
+            if old[metric] > 0 and new[metric] > old[metric] * ratio:
+                found.append({
+                    "phase": phase,
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "candidate": new[metric],
+                    "ratio": round(new[metric] / old[metric], 2),
+                })
+    return found
+
+
+def version_order(records: Iterable[dict]) -> List[str]:
+    """Splitter versions ordered by first appearance in the log."""
+    seen = []
+    for record in records:
+        version = str(record.get("splitter_version") or "unknown")
+        if version not in seen:
+            seen.append(version)
+    return seen
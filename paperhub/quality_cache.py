@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Content-addressed store of translation-quality verdicts.
+
+One SQLite file holds every cached quality report, keyed by
+
+* ``kind`` (``"tex"`` for :func:`translation_quality.analyze_tex`,
+  ``"pdf_text"`` for :mod:`pdf_text_quality`),
+* the SHA-256 of the analyzed file's bytes,
+* the policy version of the analyzer
+  (``TEX_QUALITY_POLICY_VERSION`` / ``PDF_TEXT_POLICY_VERSION``),
+* analyzer parameters that change the report (page/byte budgets, the
+  streamed ``tex_quality_gate`` mode).
+
+A copy into the paper store, a restore from ``tex_backup`` or a touch keeps
+the verdict; a content or policy change re-analyzes.  The audit, the repair
+queue script and the container driver share this module; the host keeps its
+store at ``logs/quality_cache.sqlite3``, the driver beside its other caches
+under ``/gpt/gpt_log``.  Standard library only; any SQLite failure degrades to
+an uncached analysis.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DB_NAME = "quality_cache.sqlite3"
+HASH_BLOCK_BYTES = 1024 * 1024
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    policy TEXT NOT NULL,
+    params TEXT NOT NULL,
+    report TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (kind, digest, policy, params)
+)
+"""
+
+
+def cache_path(logs_dir) -> str:
+    return os.path.join(str(logs_dir), DB_NAME)
+
+
+def content_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _params_key(params) -> str:
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+class QualityCache:
+    """Get/put quality reports; one short-lived connection per call.
+
+    Short connections keep the store safe to share between audit worker
+    threads and concurrent cron processes (WAL mode, busy timeout).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(SCHEMA)
+        return connection
+
+    def get(self, kind, digest, policy, params=None):
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT report FROM verdicts WHERE kind=? AND digest=? AND policy=? AND params=?",
+                (kind, digest, policy, _params_key(params)),
+            ).fetchone()
+        finally:
+            connection.close()
+        if not row:
+            return None
+        try:
+            report = json.loads(row[0])
+        except ValueError:
+            return None
+        return report if isinstance(report, dict) else None
+
+    def put(self, kind, digest, policy, report, params=None) -> None:
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, digest, policy, _params_key(params),
+                     json.dumps(report, ensure_ascii=False, sort_keys=True), time.time()),
+                )
+        finally:
+            connection.close()
+
+    def analyze(self, kind, path, policy, analyze, params=None):
+        """``analyze(path)`` through the cache; adds ``_cache_hit``."""
+        try:
+            digest = content_digest(path)
+            cached = self.get(kind, digest, policy, params)
+        except (sqlite3.Error, OSError):
+            digest, cached = None, None
+        if cached is not None:
+            cached["path"] = str(path)
+            cached["_cache_hit"] = True
+            return cached
+        report = analyze(path)
+        if digest is not None:
+            try:
+                self.put(kind, digest, policy, report, params)
+            except (sqlite3.Error, OSError):
+                pass
+        report = dict(report)
+        report["_cache_hit"] = False
+        return report
+
+
+def cached_analyze_tex(path, store_path):
+    """:func:`analyze_tex` memoized by content and ``TEX_QUALITY_POLICY_VERSION``."""
+    try:
+        from translation_quality import TEX_QUALITY_POLICY_VERSION, analyze_tex
+    except ImportError:
+        from paperhub.translation_quality import TEX_QUALITY_POLICY_VERSION, analyze_tex
+    return QualityCache(store_path).analyze("tex", path, TEX_QUALITY_POLICY_VERSION, analyze_tex)
+
+
+def cached_tex_gate(path, store_path):
+    """:func:`tex_quality_gate` memoized like :func:`cached_analyze_tex`."""
+    try:
+        from translation_quality import TEX_QUALITY_POLICY_VERSION, tex_quality_gate
+    except ImportError:
+        from paperhub.translation_quality import TEX_QUALITY_POLICY_VERSION, tex_quality_gate
+    return QualityCache(store_path).analyze(
+        "tex", path, TEX_QUALITY_POLICY_VERSION, tex_quality_gate, params={"mode": "gate"},
+    )
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Process-pool engine for bulk translated-TeX and PDF quality scans.
+
+``analyze_tex`` and the PDF page analyzer are regex-heavy pure Python, so
+threads do not scale past one core.  :func:`scan` fans a task function over
+a :class:`~concurrent.futures.ProcessPoolExecutor`:
+
+* items are submitted in chunks (fewer pickling round trips per file);
+* at most ``max_pending`` chunks are in flight, which bounds the results
+  held in memory while a large backup directory is scanned;
+* every item runs under a per-file wall-clock timeout (``SIGALRM`` in the
+  worker), so one pathological file cannot stall its chunk forever;
+* results come back in input order regardless of completion order.
+
+Task functions must be module-level (picklable) callables of one item and
+return a JSON-like report; failures are returned as ``(None, error)``
+instead of raised.  ``workers=1`` runs in-process.
+"""
+
+import math
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, List, Optional, Sequence, Tuple
+
+DEFAULT_TASK_TIMEOUT_SECONDS = 300
+DEFAULT_CHUNK_SIZE = 8
+MAX_WORKERS = 16
+
+
+class ScanTimeout(Exception):
+    """Raised inside a worker when one item exceeds its wall-clock budget."""
+
+
+def default_workers() -> int:
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def _raise_timeout(signum, frame):
+    raise ScanTimeout()
+
+
+def _alarm_available() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _run_one(func, item, timeout):
+    try:
+        if not timeout or not _alarm_available():
+            return func(item), ""
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, float(timeout))
+        try:
+            return func(item), ""
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    except ScanTimeout:
+        return None, "analysis timed out after {}s".format(timeout)
+    except Exception as exc:
+        return None, str(exc) or exc.__class__.__name__
+
+
+def _run_chunk(func, items, timeout):
+    return [_run_one(func, item, timeout) for item in items]
+
+
+def scan(func: Callable, items: Sequence, workers: Optional[int] = None,
+         timeout: Optional[float] = DEFAULT_TASK_TIMEOUT_SECONDS,
+         chunk_size: Optional[int] = None,
+         max_pending: Optional[int] = None) -> List[Tuple[object, str]]:
+    """``[(result, error), ...]`` for ``items``, in input order."""
+    items = list(items)
+    workers = default_workers() if workers is None else max(1, int(workers))
+    workers = min(workers, max(1, len(items)))
+    if workers <= 1:
+        return _run_chunk(func, items, timeout)
+    if chunk_size is None:
+        # 每个 worker 约分到 4 个 chunk，兼顾负载均衡与进程间往返次数
+        chunk_size = max(1, min(DEFAULT_CHUNK_SIZE, math.ceil(len(items) / (workers * 4))))
+    chunks = iter(range(0, len(items), chunk_size))
+    max_pending = max_pending or workers * 2
+    results: List[Tuple[object, str]] = [(None, "")] * len(items)
+
+    def fail(start, count, exc):
+        error = "scan worker failed: {}".format(str(exc) or exc.__class__.__name__)
+        results[start:start + count] = [(None, error)] * count
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            for start in chunks:
+                chunk = items[start:start + chunk_size]
+                try:
+                    pending[pool.submit(_run_chunk, func, chunk, timeout)] = (start, len(chunk))
+                    return
+                except Exception as exc:
+                    # 进程池已损坏（worker 被 OOM 杀掉等）：剩余 chunk 直接记为错误
+                    fail(start, len(chunk), exc)
+
+        for _ in range(max_pending):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, count = pending.pop(future)
+                try:
+                    results[start:start + count] = future.result()
+                except Exception as exc:
+                    fail(start, count, exc)
+                submit_next()
+    return results
+
+
+def tex_quality_task(item):
+    """Analyze one translated TeX; ``item`` is ``(path, store_path or None)``."""
+    path, store_path = item
+    if store_path:
+        from paperhub.quality_cache import cached_analyze_tex
+
+        return cached_analyze_tex(path, store_path)
+    from paperhub.translation_quality import analyze_tex
+
+    return analyze_tex(path)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Persisted per-paper PDF retry ledger driven by the failure taxonomy.
+
+Every repair sweep (``retry-pdf`` for daily/weekly/monthly, topic retries and
+the weekly all-modes repair) funnels through
+``run_papers.retry_failed_pdf_entries``, which consults this ledger before
+dispatching a container job.  ``logs/retry_ledger.json`` keeps, per arXiv id,
+the attempt count, the last classified category/family/retry strategy, the
+next eligible time and the ``PATCH_CATALOG`` fingerprint of that category:
+
+* ``manual_review`` failures (quota, auth, unknown compile errors) are not
+  retried automatically at all;
+* other failures back off exponentially from a per-family base delay
+  (an hour for rate limits and network errors, a day for deterministic LaTeX
+  failures), capped at :data:`MAX_BACKOFF_SECONDS`;
+* a changed catalog fingerprint (a relevant patch shipped) makes the paper
+  eligible again immediately.
+
+A verified PDF removes the paper from the ledger.  Set
+``PAPER_TRANS_RETRY_LEDGER=0`` to retry every failed PDF on every sweep.
+"""
+
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from paperhub.json_io import read_json, write_json_atomic
+from paperhub.patch_catalog import catalog_fingerprint
+from paperhub.paths import LOGS_DIR
+
+LEDGER_NAME = "retry_ledger.json"
+HOUR = 3600
+DEFAULT_BASE_SECONDS = 12 * HOUR
+FAMILY_BASE_SECONDS: Dict[str, int] = {
+    "api": 1 * HOUR,
+    "network": 1 * HOUR,
+    "runtime_resource": 1 * HOUR,
+    "plugin": 6 * HOUR,
+    "source": 6 * HOUR,
+    "translation": 6 * HOUR,
+    "translation_quality": 6 * HOUR,
+    "runtime_path": 6 * HOUR,
+    "asset": 24 * HOUR,
+    "dependency": 24 * HOUR,
+    "latex": 24 * HOUR,
+    "latex_command": 24 * HOUR,
+    "latex_engine": 24 * HOUR,
+    "latex_font": 24 * HOUR,
+    "latex_structure": 24 * HOUR,
+    "latex_syntax": 24 * HOUR,
+    "protected_content": 24 * HOUR,
+    "translation_artifact": 24 * HOUR,
+}
+MAX_BACKOFF_SECONDS = 7 * 24 * HOUR
+
+
+def ledger_enabled(env=None) -> bool:
+    env = os.environ if env is None else env
+    return str(env.get("PAPER_TRANS_RETRY_LEDGER", "1")).strip().lower() not in {"0", "false", "no", "off"}
+
+
+def ledger_path(logs_dir: str = LOGS_DIR) -> str:
+    return os.path.join(logs_dir, LEDGER_NAME)
+
+
+def backoff_seconds(family: str, attempts: int) -> int:
+    base = FAMILY_BASE_SECONDS.get(str(family or ""), DEFAULT_BASE_SECONDS)
+    return min(MAX_BACKOFF_SECONDS, base * 2 ** max(0, int(attempts) - 1))
+
+
+class RetryLedger:
+    """Read-modify-write access to the ledger under a cross-process flock."""
+
+    def __init__(self, path: Optional[str] = None, clock=time.time):
+        self.path = path or ledger_path()
+        self._clock = clock
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a+") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                data = read_json(self.path, {})
+                yield data if isinstance(data, dict) else {}
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def get(self, arxiv_id: str) -> dict:
+        data = read_json(self.path, {})
+        record = data.get(arxiv_id) if isinstance(data, dict) else None
+        return record if isinstance(record, dict) else {}
+
+    def eligible(self, arxiv_id: str) -> Tuple[bool, str]:
+        """``(True, "")`` when a retry may run now, else ``(False, reason)``."""
+        record = self.get(arxiv_id)
+        if not record:
+            return True, ""
+        category = str(record.get("category") or "")
+        if record.get("catalog") != catalog_fingerprint(category):
+            return True, ""
+        if record.get("strategy") == "manual_review":
+            return False, f"{category or 'unknown'} 需人工处理（patch catalog 未更新）"
+        remaining = float(record.get("next_eligible") or 0) - self._clock()
+        if remaining > 0:
+            return False, (
+                f"{category or 'unknown'} 第 {record.get('attempts', 0)} 次失败后退避，"
+                f"{remaining / HOUR:.1f} 小时后可重试"
+            )
+        return True, ""
+
+    def record_failure(self, arxiv_id: str, diagnosis: Optional[dict] = None) -> dict:
+        diagnosis = diagnosis if isinstance(diagnosis, dict) else {}
+        category = str(diagnosis.get("category") or "")
+        family = str(diagnosis.get("family") or "")
+        now = self._clock()
+        with self._locked() as data:
+            previous = data.get(arxiv_id) if isinstance(data.get(arxiv_id), dict) else {}
+            fingerprint = catalog_fingerprint(category)
+            # 同类失败且 catalog 未变才累加；换了类别或补丁已上线时从头退避
+            same = previous.get("category") == category and previous.get("catalog") == fingerprint
+            attempts = int(previous.get("attempts") or 0) + 1 if same else 1
+            record = {
+                "attempts": attempts,
+                "category": category,
+                "family": family,
+                "strategy": str(diagnosis.get("retry_strategy") or ""),
+                "catalog": fingerprint,
+                "last_attempt": now,
+                "next_eligible": now + backoff_seconds(family, attempts),
+            }
+            data[arxiv_id] = record
+            write_json_atomic(self.path, data)
+        return record
+
+    def record_success(self, arxiv_id: str) -> None:
+        if not self.get(arxiv_id):
+            return
+        with self._locked() as data:
+            if data.pop(arxiv_id, None) is not None:
+                write_json_atomic(self.path, data)
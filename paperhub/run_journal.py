@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Append-only progress journal for one ``(mode, key)`` runner invocation.
+
+``logs/run_journal/<mode>-<key>.jsonl`` holds one JSON line per event: a
+``run_start`` record with the fetched paper list, one ``stage`` record per
+paper and completed stage (``summary``/``pdf``), and a ``run_end`` record.
+Every line is flushed and fsynced, so a runner killed mid-run (OOM, reboot,
+timeout) leaves a journal without ``run_end``; the next invocation resumes
+from it instead of re-fetching metadata and re-probing finished papers.  A
+finished journal is discarded by the next run.  A torn trailing line is
+ignored.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from paperhub.paths import LOGS_DIR
+
+JOURNAL_DIR_NAME = "run_journal"
+STAGES = ("summary", "pdf")
+
+
+def journal_path(mode: str, key: str, logs_dir: str = LOGS_DIR) -> str:
+    return os.path.join(logs_dir, JOURNAL_DIR_NAME, f"{mode}-{key}.jsonl")
+
+
+def _read_records(path: str) -> List[dict]:
+    records = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+    except OSError:
+        return []
+    return records
+
+
+def _ends_torn(path: str) -> bool:
+    try:
+        with open(path, "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            if handle.tell() == 0:
+                return False
+            handle.seek(-1, os.SEEK_END)
+            return handle.read(1) != b"\n"
+    except OSError:
+        return False
+
+
+class RunJournal:
+    """Completed stages of the current (possibly interrupted) run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.papers: Optional[List[dict]] = None
+        self.resumed = False
+        self._stages: Dict[str, Dict[str, dict]] = {stage: {} for stage in STAGES}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        records = _read_records(self.path)
+        starts = [i for i, record in enumerate(records) if record.get("event") == "run_start"]
+        if not starts:
+            return
+        current = records[starts[-1]:]
+        if any(record.get("event") == "run_end" for record in current):
+            return
+        papers = current[0].get("papers")
+        if not isinstance(papers, list) or not papers:
+            return
+        self.papers = papers
+        self.resumed = True
+        for record in current[1:]:
+            stage = record.get("stage")
+            aid = record.get("arxiv_id")
+            if record.get("event") == "stage" and stage in self._stages and aid:
+                self._stages[stage][aid] = record
+
+    def _append(self, record: dict, truncate: bool = False) -> None:
+        record = dict(record, ts=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n"
+        with self._lock:
+            if not truncate and _ends_torn(self.path):
+                # 上次被强杀留下的半行不能与新记录拼在一起
+                line = "\n" + line
+            with open(self.path, "w" if truncate else "a", encoding="utf-8") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def start(self, papers: List[dict]) -> None:
+        """Begin a fresh journal for ``papers``; a resumed run keeps its own."""
+        if self.resumed:
+            return
+        self.papers = list(papers)
+        self._append({"event": "run_start", "papers": self.papers}, truncate=True)
+
+    def completed(self, stage: str, arxiv_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._stages[stage].get(arxiv_id)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {stage: len(done) for stage, done in self._stages.items()}
+
+    def record(self, stage: str, arxiv_id: str, **fields) -> None:
+        entry = dict(fields, event="stage", stage=stage, arxiv_id=arxiv_id)
+        self._append(entry)
+        with self._lock:
+            self._stages[stage][arxiv_id] = entry
+
+    def finish(self, ok: bool) -> None:
+        self._append({"event": "run_end", "ok": bool(ok)})
@@ -6,6 +6,7 @@ of prose.  In particular, code-like environments, inline code, URLs, math, and
 LaTeX structure are not evidence of an untranslated paper.
 """
 
+import os
 import re
 from collections import Counter
 from pathlib import Path
@@ -13,6 +14,15 @@ from typing import Dict
 
 import latex_translation_filters as filters
 
+try:
+    from latex_scan import LatexScan
+except ImportError:
+    from paperhub.latex_scan import LatexScan
+
+# Bump whenever analyze_tex or the latex_translation_filters predicates it
+# uses change their output; cached verdicts (paperhub.quality_cache) are keyed
+# by this version.
+TEX_QUALITY_POLICY_VERSION = "tex-quality-2026-10-19-v1"
 
 LATEX_COMMAND_RE = re.compile(
     r"\\[A-Za-z@]+\*?(?:\[[^\]]*\])?(?:\{[^{}]*\})?"
@@ -103,44 +113,58 @@ def rough_text(line: str) -> str:
     return filters.latex_prose_probe(value)
 
 
-def analyze_tex(path) -> Dict[str, object]:
-    """Measure Chinese coverage and long English prose in translated TeX."""
-    text = Path(path).read_text(encoding="utf-8", errors="replace")
-    in_document = False
-    # ``(environment_name, semantic_source_data)`` frames keep instance-level
-    # prompt/example protection aligned with the production splitter.
-    env_stack = []
-    inline_source_data_state = {}
-    english_lines = []
-    broad_english_lines = []
-    very_long_english = 0
-    mixed_lines = 0
-    english_dominant_lines = 0
-    mixed_clause_lines = 0
-    mixed_clause_words = 0
-    mixed_clauses = []
-    envs = Counter()
-    commands = Counter()
-    english_words = Counter()
-    english_word_line_bins = Counter()
-    cjk_total = 0
-    letter_total = 0
-    prose_lines = 0
-
-    for line_no, line in enumerate(text.splitlines(), 1):
-        code = strip_tex_comment(line)
+class _TexProseScan:
+    """Line-by-line state of the translated-TeX prose scan.
+
+    :func:`analyze_tex` feeds every line with ``diagnostics=True``.  The gate
+    (:func:`tex_quality_gate`) keeps only the counts that
+    :func:`is_untranslated_prose` reads plus the first samples, and skips the
+    word/command/environment counters.
+    """
+
+    def __init__(self, diagnostics: bool = True):
+        self.diagnostics = diagnostics
+        self.in_document = False
+        # ``(environment_name, semantic_source_data)`` frames keep instance-level
+        # prompt/example protection aligned with the production splitter.
+        self.env_stack = []
+        self.inline_source_data_state = {}
+        self.english_lines = []
+        self.long_english_lines = 0
+        self.broad_english_lines = []
+        self.very_long_english = 0
+        self.mixed_lines = 0
+        self.english_dominant_lines = 0
+        self.mixed_clause_lines = 0
+        self.mixed_clause_words = 0
+        self.mixed_clause_count = 0
+        self.mixed_clauses = []
+        self.envs = Counter()
+        self.commands = Counter()
+        self.english_words = Counter()
+        self.english_word_line_bins = Counter()
+        self.cjk_total = 0
+        self.letter_total = 0
+        self.prose_lines = 0
+
+    def feed(self, line_no: int, line: str, code: str, begins, ends) -> None:
+        """Scan one line.
+
+        ``code`` is the line before its comment; ``begins``/``ends`` are its
+        uncommented environment names.
+        """
         if r"\begin{document}" in code:
-            in_document = True
-            continue
+            self.in_document = True
+            return
         if r"\end{document}" in code:
-            in_document = False
-            continue
-        begins = re.findall(r"\\begin\{([^}]+)\}", code)
-        ends = re.findall(r"\\end\{([^}]+)\}", code)
-        inline_source_data, inline_source_data_state = (
+            self.in_document = False
+            return
+        diagnostics = self.diagnostics
+        env_stack = self.env_stack
+        inline_source_data, self.inline_source_data_state = (
             filters.inline_prompt_source_data_line_protected(
                 code,
-                inline_source_data_state,
+                self.inline_source_data_state,
             )
         )
         for index in range(len(env_stack) - 1, -1, -1):
@@ -165,27 +189,27 @@ def analyze_tex(path) -> Dict[str, object]:
             or filters.is_citation_heavy_proper_name_catalog(code)
         )
         structural = any(filters.is_tracked_env(env) for env in begins + ends)
-        if in_document and not protected and not structural:
+        if self.in_document and not protected and not structural:
             rough = rough_text(code)
             letters = len(re.findall(r"[A-Za-z]", rough))
             cjk = len(re.findall(r"[\u4e00-\u9fff]", rough))
             words = WORD_RE.findall(rough)
-            cjk_total += cjk
-            letter_total += letters
+            self.cjk_total += cjk
+            self.letter_total += letters
             if letters >= 40 or cjk >= 10:
-                prose_lines += 1
-            if len(words) >= 8 and letters >= 50:
+                self.prose_lines += 1
+            if diagnostics and len(words) >= 8 and letters >= 50:
                 normalized_words = [word.lower() for word in words]
-                english_words.update(normalized_words)
-                english_word_line_bins[
+                self.english_words.update(normalized_words)
+                self.english_word_line_bins[
                     "8-15" if len(words) <= 15 else
                     "16-30" if len(words) <= 30 else
                     "31+"
                 ] += 1
-                envs[active] += 1
+                self.envs[active] += 1
                 command = COMMAND_RE.match(line)
-                commands[command.group(1) if command else "plain"] += 1
-                broad_english_lines.append({
+                self.commands[command.group(1) if command else "plain"] += 1
+                self.broad_english_lines.append({
                     "line": line_no,
                     "env": active,
                     "command": command.group(1) if command else "plain",
@@ -194,29 +218,35 @@ def analyze_tex(path) -> Dict[str, object]:
                     "text": line.strip()[:220],
                 })
                 if cjk >= 8:
-                    mixed_lines += 1
+                    self.mixed_lines += 1
                 if cjk < 8 or len(words) >= cjk:
-                    english_dominant_lines += 1
+                    self.english_dominant_lines += 1
             if letters >= 80 and cjk <= 5 and len(words) >= 12:
-                command = COMMAND_RE.match(line)
-                english_lines.append({
-                    "line": line_no,
-                    "env": active,
-                    "command": command.group(1) if command else "plain",
-                    "words": len(words),
-                    "cjk": cjk,
-                    "text": line.strip()[:220],
-                })
+                self.long_english_lines += 1
+                if diagnostics or len(self.english_lines) < 8:
+                    command = COMMAND_RE.match(line)
+                    self.english_lines.append({
+                        "line": line_no,
+                        "env": active,
+                        "command": command.group(1) if command else "plain",
+                        "words": len(words),
+                        "cjk": cjk,
+                        "text": line.strip()[:220],
+                    })
             if letters >= 180 and cjk <= 8 and len(words) >= 24:
-                very_long_english += 1
+                self.very_long_english += 1
             # Tables/algorithms are structured data rather than ordinary
             # paragraph prose.  Their English labels and pseudo-code should
             # not create a mixed-language repair candidate.
             if not filters.is_soft_text_env(active):
                 clauses = mixed_untranslated_english_clauses(code)
                 if clauses:
-                    mixed_clause_lines += 1
+                    self.mixed_clause_lines += 1
+                    self.mixed_clause_count += len(clauses)
                     for clause in clauses:
+                        self.mixed_clause_words += int(clause["words"])
+                        if not diagnostics and len(self.mixed_clauses) >= 12:
+                            continue
                         clause.update({
                             "line": line_no,
                             "env": active,
@@ -225,8 +255,7 @@ def analyze_tex(path) -> Dict[str, object]:
                                 if COMMAND_RE.match(line) else "plain"
                             ),
                         })
-                        mixed_clauses.append(clause)
-                        mixed_clause_words += int(clause["words"])
+                        self.mixed_clauses.append(clause)
 
         for env in begins:
             semantic_source_data = (
@@ -238,45 +267,172 @@ def analyze_tex(path) -> Dict[str, object]:
             names = [name for name, _ in env_stack]
             if env in names:
                 pos = len(names) - 1 - names[::-1].index(env)
-                env_stack = env_stack[:pos]
-    total_letters = cjk_total + letter_total
-    cjk_pct_exact = 100 * cjk_total / max(1, total_letters)
-    return {
-        "path": str(path),
-        "cjk": cjk_total,
-        "letters": letter_total,
-        "cjk_pct": round(cjk_pct_exact, 1),
-        "cjk_pct_exact": cjk_pct_exact,
-        "prose_lines": prose_lines,
-        "long_english_lines": len(english_lines),
-        "broad_english_lines": len(broad_english_lines),
-        "very_long_english_lines": very_long_english,
-        "mixed_language_lines": mixed_lines,
-        "mixed_english_clause_count": len(mixed_clauses),
-        "mixed_english_clause_lines": mixed_clause_lines,
-        "mixed_english_clause_words": mixed_clause_words,
-        "mixed_english_clause_samples": mixed_clauses[:12],
-        "english_dominant_lines": english_dominant_lines,
-        "english_word_occurrences": sum(english_words.values()),
-        "english_word_line_bins": dict(english_word_line_bins),
-        "top_english_words": dict(english_words.most_common(30)),
-        "_english_word_counts": dict(english_words),
-        "by_environment": dict(envs),
-        "by_command": dict(commands),
-        "samples": english_lines[:8],
-    }
+                self.env_stack = env_stack = env_stack[:pos]
+
+    def cjk_pct(self, extra_cjk: int = 0, extra_letters: int = 0) -> float:
+        total_letters = self.cjk_total + extra_cjk + self.letter_total + extra_letters
+        return 100 * (self.cjk_total + extra_cjk) / max(1, total_letters)
+
+    def verdict(self, remaining_chars: int):
+        """The final :func:`is_untranslated_prose` verdict once it is forced.
+
+        ``None`` while the next ``remaining_chars`` characters could still
+        change it.  Every counter only grows and each future increment needs
+        a minimum amount of text (a long English line has 80 letters, a very
+        long one 180, a prose line 10 characters, a mixed clause 12 letters),
+        so the rest of the file can only move the counts and the CJK share
+        within known bounds.
+        """
+        remaining = max(0, int(remaining_chars))
+        if _untranslated(
+            self.cjk_pct(extra_cjk=remaining),
+            self.prose_lines,
+            self.long_english_lines,
+            self.very_long_english,
+            self.mixed_clause_count,
+        ):
+            return True
+        if not _untranslated(
+            self.cjk_pct(extra_letters=remaining),
+            self.prose_lines + remaining // 10,
+            self.long_english_lines + remaining // 80,
+            self.very_long_english + remaining // 180,
+            self.mixed_clause_count + remaining // 12,
+        ):
+            return False
+        return None
+
+    def report(self, path) -> Dict[str, object]:
+        cjk_pct_exact = self.cjk_pct()
+        if not self.diagnostics:
+            return {
+                "path": str(path),
+                "cjk": self.cjk_total,
+                "letters": self.letter_total,
+                "cjk_pct": round(cjk_pct_exact, 1),
+                "cjk_pct_exact": cjk_pct_exact,
+                "prose_lines": self.prose_lines,
+                "long_english_lines": self.long_english_lines,
+                "very_long_english_lines": self.very_long_english,
+                "mixed_english_clause_count": self.mixed_clause_count,
+                "mixed_english_clause_lines": self.mixed_clause_lines,
+                "mixed_english_clause_words": self.mixed_clause_words,
+                "mixed_english_clause_samples": self.mixed_clauses[:12],
+                "samples": self.english_lines[:8],
+            }
+        return {
+            "path": str(path),
+            "cjk": self.cjk_total,
+            "letters": self.letter_total,
+            "cjk_pct": round(cjk_pct_exact, 1),
+            "cjk_pct_exact": cjk_pct_exact,
+            "prose_lines": self.prose_lines,
+            "long_english_lines": self.long_english_lines,
+            "broad_english_lines": len(self.broad_english_lines),
+            "very_long_english_lines": self.very_long_english,
+            "mixed_language_lines": self.mixed_lines,
+            "mixed_english_clause_count": self.mixed_clause_count,
+            "mixed_english_clause_lines": self.mixed_clause_lines,
+            "mixed_english_clause_words": self.mixed_clause_words,
+            "mixed_english_clause_samples": self.mixed_clauses[:12],
+            "english_dominant_lines": self.english_dominant_lines,
+            "english_word_occurrences": sum(self.english_words.values()),
+            "english_word_line_bins": dict(self.english_word_line_bins),
+            "top_english_words": dict(self.english_words.most_common(30)),
+            "_english_word_counts": dict(self.english_words),
+            "by_environment": dict(self.envs),
+            "by_command": dict(self.commands),
+            "samples": self.english_lines[:8],
+        }
+
+
+def analyze_tex(path) -> Dict[str, object]:
+    """Measure Chinese coverage and long English prose in translated TeX."""
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    scan = LatexScan(text)
+    state = _TexProseScan()
+    for index in range(len(scan)):
+        state.feed(
+            index + 1,
+            scan.line(index, keepends=False),
+            scan.code(index),
+            scan.begins(index, code_only=True),
+            scan.ends(index, code_only=True),
+        )
+    return state.report(path)
+
+
+_GATE_FIRST_BLOCK = 4096
+_GATE_MAX_BLOCK = 1 << 18
+
+
+def tex_quality_gate(path) -> Dict[str, object]:
+    """Streamed pass/fail form of ``is_untranslated_prose(analyze_tex(path))``.
+
+    The file is read in blocks of whole lines and the scan stops as soon as
+    the verdict can no longer change (see :meth:`_TexProseScan.verdict`); the
+    diagnostic counters are skipped.  The report carries the verdict as
+    ``untranslated``, the counts read so far, the first samples and
+    ``early_verdict`` when it stopped before the end.  Use :func:`analyze_tex`
+    for the full diagnostic report.
+    """
+    size = os.path.getsize(path)
+    consumed = 0
+    line_no = 0
+    state = _TexProseScan(diagnostics=False)
+    verdict = None
+    block_hint = _GATE_FIRST_BLOCK
+    with open(path, "rb") as handle:
+        # Blocks of whole binary lines (split only on ``\n``); decoding each
+        # block and re-splitting it reproduces ``read_text().splitlines()``
+        # (universal newlines plus the other Unicode line breaks), so line
+        # numbers match analyze_tex.  Blocks double in size: an untranslated
+        # file fails within the first few KB, a translated one is scanned in
+        # few large steps.
+        while True:
+            raw = b"".join(handle.readlines(block_hint))
+            if not raw:
+                break
+            block_hint = min(block_hint * 2, _GATE_MAX_BLOCK)
+            consumed += len(raw)
+            scan = LatexScan(raw.decode("utf-8", errors="replace"))
+            for index in range(len(scan)):
+                line_no += 1
+                state.feed(
+                    line_no,
+                    scan.line(index, keepends=False),
+                    scan.code(index),
+                    scan.begins(index, code_only=True),
+                    scan.ends(index, code_only=True),
+                )
+            # Remaining bytes bound the remaining characters.
+            verdict = state.verdict(size - consumed)
+            if verdict is not None:
+                break
+    report = state.report(path)
+    report["untranslated"] = bool(verdict) if verdict is not None else is_untranslated_prose(report)
+    report["early_verdict"] = consumed < size
+    report["lines_read"] = line_no
+    return report
 
 
 def is_untranslated_prose(report: Dict[str, object]) -> bool:
     """Apply the one publication-quality predicate used by every workflow."""
-    cjk_pct = float(report.get("cjk_pct_exact", report.get("cjk_pct", 0.0)))
-    prose_lines = int(report.get("prose_lines", 0))
-    long_count = int(report.get("long_english_lines", 0))
-    very_long_count = int(report.get("very_long_english_lines", 0))
+    return _untranslated(
+        float(report.get("cjk_pct_exact", report.get("cjk_pct", 0.0))),
+        int(report.get("prose_lines", 0)),
+        int(report.get("long_english_lines", 0)),
+        int(report.get("very_long_english_lines", 0)),
+        int(report.get("mixed_english_clause_count", 0)),
+    )
+
+
+def _untranslated(cjk_pct, prose_lines, long_count, very_long_count, mixed_clause_count) -> bool:
+    # Monotone: more counted lines or a lower CJK share never turn a failing
+    # document into a passing one; the streamed gate's bounds rely on this.
     # One isolated English phrase can be a formally retained term.  Two
     # independently qualified mixed clauses in ordinary prose are strong
     # evidence of a partial translation and cover the high-CJK failure mode.
-    mixed_clause_count = int(report.get("mixed_english_clause_count", 0))
     return (
         long_count >= 20
         or very_long_count >= 3
@@ -41,6 +41,7 @@ _STAT_FIELDS = (
     "pdf_attempted",
     "pdf_succeeded",
     "pdf_failed",
+    "pdf_deferred",
 )
 _WEEK_KEY_RE = re.compile(r"^(\d{4})-W(\d{2})$")
 
@@ -666,6 +667,9 @@ def run_current_week_repair(
             "unique_papers": len(selected_ids),
             "metadata_repaired": int(summary_stats.get("summary_repaired", 0) or 0),
             "pdf_repaired": int(pdf_stats.get("pdf_succeeded", 0) or 0),
+            # 顺延的论文仍在 residual_ids 中；这里单独列出以区分“未尝试”与“重试失败”
+            "pdf_deferred": int(pdf_stats.get("pdf_deferred", 0) or 0),
+            "deferred_ids": list(pdf_stats.get("deferred_ids", [])),
             "repair_stats": summary_stats,
             "pdf_stats": pdf_stats,
             "sync_stats": sync_stats,
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Paper Trans — nightly 统一规划器
+一次抓取当晚到期的 daily/weekly/monthly 列表与全部启用主题，按论文去重后
+摘要/全文 PDF 各只做一次，再统一发布所有索引并输出一份汇总统计。
+用法:
+  python3 run_nightly.py                       # 当晚到期的全部列表（含全文翻译）
+  python3 run_nightly.py --modes daily,weekly  # 只跑指定 mode（忽略到期判断）
+  python3 run_nightly.py --no-topics --no-full
+定时: 每天 23:00（取代 daily/weekly/monthly/topic 四条抓取 cron）
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from paperhub.modes import FETCH_MODES
+from paperhub.nightly import run_nightly
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="nightly 统一规划：跨 mode/topic 去重后执行一次")
+    parser.add_argument("--modes", help=f"逗号分隔的 mode（{','.join(FETCH_MODES)}），默认按到期时间判断")
+    parser.add_argument("--no-topics", action="store_true", help="不规划主题订阅")
+    parser.add_argument("--no-full", action="store_true", help="只做摘要翻译，不生成全文中文 PDF")
+    parser.add_argument("--force", action="store_true", help="主题忽略 seen 去重，强制重排当天")
+    args = parser.parse_args(argv)
+
+    modes = None
+    if args.modes is not None:
+        modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+        unknown = sorted(set(modes) - set(FETCH_MODES))
+        if unknown:
+            parser.error(f"未知 mode: {', '.join(unknown)}")
+    report = run_nightly(
+        modes=modes,
+        topics=not args.no_topics,
+        do_full_translate=not args.no_full,
+        force=args.force,
+    )
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,13 @@
 通用论文处理 runner
 被 run_daily.py / run_monthly.py / main.py(weekly) 共用
 """
-import os, sys, json, time, subprocess
+import os, sys, json, time, subprocess, heapq, itertools, threading
 from datetime import datetime
 from pathlib import Path
 
-from paperhub import paper_store
+from paperhub import paper_store, pdf_cost
+from paperhub.retry_ledger import RetryLedger, ledger_enabled, ledger_path
+from paperhub.run_journal import RunJournal, journal_path
 from paperhub.json_io import read_json, write_json_atomic
 from paperhub.publication_lock import (
     InvalidIndexError,
@@ -82,6 +84,22 @@ def _paper_store_mark_pdf_verified(arxiv_id):
     return paper_store.mark_pdf_verified(arxiv_id)
 
 
+def _paper_store_optimize_pdf(arxiv_id):
+    """Linearize a verified PDF for fast first-page display; never fatal."""
+    try:
+        result = paper_store.optimize_pdf(arxiv_id)
+    except Exception as e:
+        print(f"  ⚠️ PDF 优化失败，保留原文件: {e}", flush=True)
+        return None
+    if result.get("ok"):
+        print(
+            f"  🗜️ PDF 已线性化/压缩 ({result.get('tool')}): "
+            f"{result['before'] // 1024}KB → {result['after'] // 1024}KB",
+            flush=True,
+        )
+    return result
+
+
 _STAT_FIELDS = (
     "metadata_attempted",
     "metadata_succeeded",
@@ -92,14 +110,21 @@ _STAT_FIELDS = (
     "pdf_attempted",
     "pdf_succeeded",
     "pdf_failed",
+    "pdf_deferred",
 )
 
 
 def _new_stats():
-    """Create a stable result shape shared by run/repair/retry commands."""
+    """Create a stable result shape shared by run/repair/retry commands.
+
+    ``pdf_deferred``/``deferred_ids`` are papers skipped on purpose (retry
+    ledger backoff, slow-lane budget).  They still have no PDF, so they are
+    also counted in ``pdf_failed`` and ``residual_ids``.
+    """
     stats = {field: 0 for field in _STAT_FIELDS}
     stats["residual_failures"] = 0
     stats["residual_ids"] = []
+    stats["deferred_ids"] = []
     return stats
 
 
@@ -108,6 +133,7 @@ def _finalize_stats(stats, residual_ids=()):
     ids = sorted({str(item) for item in residual_ids if item})
     result["residual_ids"] = ids
     result["residual_failures"] = len(ids)
+    result["deferred_ids"] = sorted(set(result.get("deferred_ids", [])))
     return result
 
 
@@ -119,6 +145,7 @@ def _merge_stats(target, source):
     ids.update(source.get("residual_ids", []))
     target["residual_ids"] = sorted(ids)
     target["residual_failures"] = len(ids)
+    target["deferred_ids"] = sorted(set(target.get("deferred_ids", [])) | set(source.get("deferred_ids", [])))
     return target
 
 
@@ -129,7 +156,7 @@ def _stats_line(stats):
         f"summary={stats['summary_succeeded']}/{stats['summary_attempted']}"
         f"(失败={stats['summary_failed']}) "
         f"pdf={stats['pdf_succeeded']}/{stats['pdf_attempted']}"
-        f"(失败={stats['pdf_failed']}) "
+        f"(失败={stats['pdf_failed']}, 顺延={stats.get('pdf_deferred', 0)}) "
         f"残留={stats['residual_failures']}"
     )
 
@@ -182,6 +209,8 @@ def _clear_stale_failure_artifacts(arxiv_id):
             pass
         except OSError as exc:
             print(f"  ⚠️ 清理陈旧失败记录失败 {path}: {exc}", flush=True)
+    # 已验证的 PDF 也结束该论文的重试退避
+    RetryLedger(ledger_path(LOGS_DIR)).record_success(arxiv_id)
     return removed
 
 
@@ -193,6 +222,7 @@ def _accept_new_pdf(arxiv_id):
     if not _paper_store_mark_pdf_verified(arxiv_id):
         return None
     _clear_stale_failure_artifacts(arxiv_id)
+    _paper_store_optimize_pdf(arxiv_id)
     return _pdf_store_hit(arxiv_id)
 
 
@@ -323,12 +353,14 @@ def _load_prior_index(base_dir):
     return merged
 
 
-def run(mode, key, limit, do_full_translate=False):
+def run(mode, key, limit, do_full_translate=False, papers=None, attempted=()):
     """
     主流程
     mode:  'daily' | 'weekly' | 'monthly'
     key:   日期字符串
     limit: 论文数上限
+    papers: 已抓取的论文列表（nightly 规划器传入），为 None 时自行抓取
+    attempted: 本轮已由调用方尝试过摘要/PDF 的 arxiv_id；仍未完成的不再重试，只发布现状
     """
     print("=" * 60, flush=True)
     print(f"📚 Paper Trans — {mode.upper()} {key}", flush=True)
@@ -342,12 +374,190 @@ def run(mode, key, limit, do_full_translate=False):
         return False
 
     try:
-        return _run_locked(mode, key, limit, do_full_translate)
+        return _run_locked(mode, key, limit, do_full_translate, papers, attempted)
     finally:
         lock.__exit__(None, None, None)
 
 
-def _run_locked(mode, key, limit, do_full_translate):
+class _PdfPipeline:
+    """Run full-PDF jobs on a background worker while summaries continue.
+
+    ``translate_full`` serializes container jobs behind its own global lock,
+    so a single worker keeps the container busy.  Entries are queued as soon
+    as their summary has been persisted; with an ``estimate`` callable
+    (``paperhub.pdf_cost.CostModel.estimate``) the worker always picks the
+    cheapest queued job, and outliers wait in a slow lane that runs after
+    ``close()`` within its own budget.  Without one, jobs run in rank order.
+    Estimates are computed on the worker thread, so ``submit`` never waits on
+    a source-size probe.
+    """
+
+    def __init__(self, handle, estimate=None, outlier=None, slow_budget=None, on_defer=None):
+        self._handle = handle
+        self._estimate = estimate
+        self._outlier = pdf_cost.outlier_seconds() if outlier is None else outlier
+        self._slow_budget = pdf_cost.LaneBudget(slow_budget)
+        self._on_defer = on_defer
+        self._pending = []
+        self._fast = []
+        self._slow = []
+        self._seq = itertools.count()
+        self._closed = False
+        self._cancelled = False
+        self._cond = threading.Condition()
+        self.deferred = []
+        self._thread = threading.Thread(target=self._run, name="pdf-pipeline", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry):
+        # 成本估计可能发起网络探测（e-print HEAD），交给 worker 线程完成，入队不阻塞
+        with self._cond:
+            self._pending.append(entry)
+            self._cond.notify()
+
+    def _classify(self, entries):
+        for entry in entries:
+            cost = self._estimate(entry.get("arxiv_id", "")) if self._estimate else 0.0
+            lane = self._fast if pdf_cost.lane_for(cost, self._outlier) == pdf_cost.FAST_LANE else self._slow
+            with self._cond:
+                heapq.heappush(lane, (cost, next(self._seq), entry))
+
+    def _next(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._fast and not self._closed:
+                    self._cond.wait()
+                if self._cancelled:
+                    return None
+                pending, self._pending = self._pending, []
+                if not pending:
+                    if self._fast:
+                        return heapq.heappop(self._fast)[2]
+                    # 快车道已清空且不会再有新任务：慢车道按成本在自己的预算内执行
+                    while self._slow:
+                        cost, _, entry = heapq.heappop(self._slow)
+                        if self._slow_budget.admit(cost):
+                            return entry
+                        self.deferred.append(entry)
+                        if self._on_defer is not None:
+                            self._on_defer(entry, cost)
+                    return None
+            self._classify(pending)
+
+    def _run(self):
+        while True:
+            entry = self._next()
+            if entry is None:
+                return
+            try:
+                self._handle(entry)
+            except Exception as e:
+                # 兜底：最终门禁会把没有 PDF 的条目补标 failed
+                print(f"  ❌ PDF 流水线异常 {entry.get('arxiv_id', '')}: {e}", flush=True)
+
+    def close(self, cancel=False):
+        """Wait until every queued PDF job has finished or been deferred.
+
+        With ``cancel`` queued jobs that have not started are dropped and only
+        the running one is waited for (error paths).
+        """
+        with self._cond:
+            self._closed = True
+            self._cancelled = self._cancelled or cancel
+            self._cond.notify()
+        self._thread.join()
+
+
+def _pdf_cost_estimator():
+    """Estimated seconds per arXiv id from phase timing history and source size."""
+    from paperhub.phase_timing import timing_log_path
+
+    return pdf_cost.CostModel.from_log(timing_log_path(LOGS_DIR)).estimate
+
+
+def _full_translate_entry(entry, translate_full, update, mode, key, journal=None, attempted=()):
+    """Full-PDF stage for one index entry; ``update`` applies entry changes under the index lock."""
+    aid = entry.get("arxiv_id", "")
+    if not aid:
+        return
+
+    # ⓪ 续跑：运行日志里已完成的 PDF 阶段不再探测/翻译，最终门禁仍会核对实际文件
+    done = journal.completed("pdf", aid) if journal else None
+    if done:
+        log(f"  ♻️ PDF 阶段已完成（运行日志）: {aid} → {done.get('status')}", mode, key)
+
+        def mark_done():
+            if done.get("status") == "ok":
+                entry["pdf_zh"] = f"papers/{aid}_zh.pdf"
+                entry.pop("pdf_zh_failed", None)
+                entry.pop("pdf_status", None)
+            else:
+                entry["pdf_zh_failed"] = True
+                entry.pop("pdf_zh", None)
+
+        update(mark_done)
+        return
+
+    # ① 命中 paper store PDF → 直接标记，无需重新翻译
+    store_pdf = _pdf_store_hit(aid)
+    if store_pdf:
+        log(f"  ⚡ paper store PDF 命中: {aid} ({os.path.getsize(store_pdf)//1024} KB)", mode, key)
+        _paper_store_update_pdf_status(aid, "ok")
+        _clear_stale_failure_artifacts(aid)
+
+        def mark_hit():
+            entry["pdf_zh"] = f"papers/{aid}_zh.pdf"
+            entry.pop("pdf_zh_failed", None)
+            entry.pop("pdf_status", None)
+
+        update(mark_hit)
+        if journal:
+            journal.record("pdf", aid, status="ok")
+        return
+
+    # ② 本轮已翻译失败（nightly 规划阶段）→ 不再重跑容器，交给重试流程
+    if aid in attempted:
+        log(f"  ⏭️ PDF 本轮已尝试失败，不再重试: {aid}", mode, key)
+
+        def mark_failed():
+            entry["pdf_zh_failed"] = True
+            entry.pop("pdf_zh", None)
+
+        update(mark_failed)
+        return
+
+    # ③ 无缓存 → 调用翻译，输出直接写入 paper store
+    log(f"  🔬 全文翻译: {aid}", mode, key)
+    succeeded = False
+    try:
+        r = translate_full(arxiv_id=aid, output_dir=PAPER_STORE_DIR,
+                           no_cache=False, timeout=3600)
+        verified_pdf = _accept_new_pdf(aid) if r.get("pdf_path") else None
+        if r.get("pdf_path") and verified_pdf:
+            succeeded = True
+            log(f"  ✅ PDF: {r['pdf_path']}", mode, key)
+        else:
+            _paper_store_update_pdf_status(aid, "failed")
+            error = r.get("error", "") or "返回 PDF 路径但 paper store 校验失败"
+            log(f"  ❌ {error}", mode, key)
+    except Exception as e:
+        _paper_store_update_pdf_status(aid, "failed")
+        log(f"  ❌ {aid}: {e}", mode, key)
+
+    def mark_result():
+        if succeeded:
+            entry["pdf_zh"] = f"papers/{aid}_zh.pdf"
+            entry.pop("pdf_zh_failed", None)
+        else:
+            entry["pdf_zh_failed"] = True
+            entry.pop("pdf_zh", None)
+
+    update(mark_result)
+    if journal:
+        journal.record("pdf", aid, status="ok" if succeeded else "failed")
+
+
+def _run_locked(mode, key, limit, do_full_translate, papers=None, attempted=()):
     log(f"开始: {mode} {key}", mode, key)
 
     from fetch_hf import fetch_hf_papers
@@ -358,8 +568,15 @@ def _run_locked(mode, key, limit, do_full_translate):
     base_dir, papers_dir = setup_dirs(mode, key)
     log(f"📁 {base_dir}", mode, key)
 
-    # 1. 抓取
-    papers = fetch_hf_papers(mode, key, limit)
+    # 运行日志：上次运行被中断（OOM/重启/超时）时从断点续跑，已完成阶段不再重做
+    journal = RunJournal(journal_path(mode, key, LOGS_DIR))
+    if journal.resumed:
+        done = journal.counts()
+        log(f"♻️ 从运行日志续跑: 摘要 {done['summary']} 篇、PDF {done['pdf']} 篇已完成", mode, key)
+
+    # 1. 抓取（续跑时沿用日志中的论文列表；规划器已抓取时直接使用）
+    if papers is None:
+        papers = journal.papers if journal.resumed else fetch_hf_papers(mode, key, limit)
     if not papers:
         log("❌ 未获取到论文", mode, key)
         stats["metadata_attempted"] = 1
@@ -369,6 +586,7 @@ def _run_locked(mode, key, limit, do_full_translate):
         return False
 
     log(f"✅ 获取到 {len(papers)} 篇", mode, key)
+    journal.start(papers)
 
     # 2. API 配置
     config = load_api_config()
@@ -377,144 +595,165 @@ def _run_locked(mode, key, limit, do_full_translate):
     # ★ 核心修复：在循环开始前一次性快照已有 index，不受后续 save_index() 影响
     prior = _load_prior_index(base_dir)
 
-    # 3. 逐一翻译摘要
+    # 3. 逐一翻译摘要；开启全文翻译时，每篇摘要落盘后立即把 PDF 任务交给
+    #    后台流水线，摘要阶段继续处理下一篇（容器与 LLM 网关不再互相等待）。
+    #    papers_data 按 rank 顺序追加；逐篇进度只写运行日志，index 在阶段边界发布。
     papers_data = []
+    index_lock = threading.Lock()
 
-    for i, paper in enumerate(papers, 1):
-        arxiv_id = paper.get("arxiv_id", "")
-        if not arxiv_id:
-            log(f"  [{i}/{len(papers)}] ❌ 缺少 arxiv_id，无法处理", mode, key)
-            continue
+    def update(apply):
+        with index_lock:
+            apply()
 
-        html_path = os.path.join(papers_dir, f"{arxiv_id}.html")
-        if os.path.exists(html_path) and os.path.getsize(html_path) > 500:
-            # ★ 从循环前快照中恢复，而非从动态写入的 index.json 里读
-            existing_entry = prior.get(arxiv_id)
+    def publish():
+        with index_lock:
+            return save_index(base_dir, mode, key, papers_data)
 
-            # 缓存必须真正包含中文标题和中文摘要；非空英文不能算成功。
-            if not paper_store.translation_complete(existing_entry):
-                log(f"  [{i}/{len(papers)}] 🔁 翻译不完整，重新翻译: {arxiv_id}", mode, key)
-                try:
-                    os.remove(html_path)
-                except OSError:
-                    pass
-                # 进入下方翻译流程
-            else:
-                log(f"  [{i}/{len(papers)}] ⏭️  已存在: {arxiv_id}", mode, key)
-                # 保留原 rank/upvotes，避免本次列表顺序变化时被覆盖
-                entry = dict(existing_entry)
+    pdf_pipeline = None
+    try:
+        if do_full_translate:
+            log("🔬 开始全文翻译（与摘要阶段流水线并行）...", mode, key)
+            from translate_full import translate_full
+            pdf_pipeline = _PdfPipeline(
+                lambda entry: _full_translate_entry(entry, translate_full, update, mode, key, journal, attempted),
+                estimate=_pdf_cost_estimator(),
+                on_defer=lambda entry, cost: log(
+                    f"  ⏭️ 慢车道预算不足，顺延到重试: {entry.get('arxiv_id', '')}（预估 {cost / 60:.0f} 分钟）",
+                    mode, key,
+                ),
+            )
+
+        def add_entry(entry, completed=True):
+            update(lambda: papers_data.append(entry))
+            if completed:
+                journal.record("summary", entry["arxiv_id"], entry=_slim(entry))
+            if pdf_pipeline is not None:
+                pdf_pipeline.submit(entry)
+
+        for i, paper in enumerate(papers, 1):
+            arxiv_id = paper.get("arxiv_id", "")
+            if not arxiv_id:
+                log(f"  [{i}/{len(papers)}] ❌ 缺少 arxiv_id，无法处理", mode, key)
+                continue
+
+            done = journal.completed("summary", arxiv_id)
+            if done:
+                # 续跑：摘要阶段已完成，跳过 HTML/快照/paper store 检查
+                entry = dict(done.get("entry") or {}, arxiv_id=arxiv_id)
                 entry["rank"] = i
                 entry["upvotes"] = paper.get("upvotes", entry.get("upvotes", 0))
-                papers_data.append(entry)
+                entry["html_file"] = f"papers/{arxiv_id}.html"
+                pdf_status = entry.pop("pdf_status", None)
+                if pdf_status == "ok":
+                    entry["pdf_zh"] = f"papers/{arxiv_id}_zh.pdf"
+                elif pdf_status == "failed":
+                    entry["pdf_zh_failed"] = True
+                add_entry(entry, completed=False)
                 continue
 
-        log(f"  [{i}/{len(papers)}] 🔄 翻译: {arxiv_id}", mode, key)
-        try:
-            # week_str 传 "mode/key" 使 HTML 内嵌的"返回"链接指向正确路径
-            result = translate_and_save(
-                arxiv_id=arxiv_id,
-                output_dir=papers_dir,
-                rank=i,
-                week_str=f"{mode}/{key}",
-                config=config,
-            )
-            result["rank"] = i
-            result["upvotes"] = paper.get("upvotes", 0)
-            result["html_file"] = f"papers/{arxiv_id}.html"
-            papers_data.append(result)
-            persisted = paper_store.read_raw(arxiv_id)
-            if paper_store.translation_complete(persisted):
-                log(f"  ✅ {result.get('title_zh') or result.get('title', arxiv_id)}", mode, key)
-            else:
-                log(f"  ❌ {arxiv_id}: 翻译结果未通过中文完整性/持久化校验", mode, key)
-        except Exception as e:
-            log(f"  ❌ {arxiv_id}: {e}", mode, key)
-            papers_data.append({"arxiv_id": arxiv_id, "rank": i, "error": str(e),
-                                 "html_file": f"papers/{arxiv_id}.html"})
-
-        save_index(base_dir, mode, key, papers_data)
-
-        if i < len(papers):
-            time.sleep(2)
+            html_path = os.path.join(papers_dir, f"{arxiv_id}.html")
+            if os.path.exists(html_path) and os.path.getsize(html_path) > 500:
+                # ★ 从循环前快照中恢复，而非从动态写入的 index.json 里读
+                existing_entry = prior.get(arxiv_id)
+
+                # 缓存必须真正包含中文标题和中文摘要；非空英文不能算成功。
+                if not paper_store.translation_complete(existing_entry):
+                    log(f"  [{i}/{len(papers)}] 🔁 翻译不完整，重新翻译: {arxiv_id}", mode, key)
+                    try:
+                        os.remove(html_path)
+                    except OSError:
+                        pass
+                    # 进入下方翻译流程
+                else:
+                    log(f"  [{i}/{len(papers)}] ⏭️  已存在: {arxiv_id}", mode, key)
+                    # 保留原 rank/upvotes，避免本次列表顺序变化时被覆盖
+                    entry = dict(existing_entry)
+                    entry["rank"] = i
+                    entry["upvotes"] = paper.get("upvotes", entry.get("upvotes", 0))
+                    add_entry(entry)
+                    continue
 
-    idx_file = save_index(base_dir, mode, key, papers_data)
+            if arxiv_id in attempted and not paper_store.translation_complete(paper_store.read_raw(arxiv_id)):
+                log(f"  [{i}/{len(papers)}] ⏭️ 摘要本轮已尝试失败，不再重试: {arxiv_id}", mode, key)
+                add_entry({"arxiv_id": arxiv_id, "rank": i, "error": "摘要本轮已尝试失败",
+                           "html_file": f"papers/{arxiv_id}.html"}, completed=False)
+                continue
 
-    # 对最终持久化状态做统一门禁，避免 translate_and_save 返回后“假绿”。
-    final_entries = {p.get("arxiv_id"): p for p in papers_data if p.get("arxiv_id")}
-    stats["metadata_attempted"] = len(papers)
-    for position, paper in enumerate(papers, 1):
-        aid = paper.get("arxiv_id", "")
-        if not aid:
-            stats["metadata_failed"] += 1
-            residual_ids.add(f"{mode}/{key}:missing-id-{position}")
-            continue
+            log(f"  [{i}/{len(papers)}] 🔄 翻译: {arxiv_id}", mode, key)
+            try:
+                # week_str 传 "mode/key" 使 HTML 内嵌的"返回"链接指向正确路径
+                result = translate_and_save(
+                    arxiv_id=arxiv_id,
+                    output_dir=papers_dir,
+                    rank=i,
+                    week_str=f"{mode}/{key}",
+                    config=config,
+                )
+                result["rank"] = i
+                result["upvotes"] = paper.get("upvotes", 0)
+                result["html_file"] = f"papers/{arxiv_id}.html"
+                persisted = paper_store.read_raw(arxiv_id)
+                complete = paper_store.translation_complete(persisted)
+                if complete:
+                    log(f"  ✅ {result.get('title_zh') or result.get('title', arxiv_id)}", mode, key)
+                else:
+                    log(f"  ❌ {arxiv_id}: 翻译结果未通过中文完整性/持久化校验", mode, key)
+                # 只有通过校验的摘要才算完成阶段；失败的在续跑时重做
+                add_entry(result, completed=complete)
+            except Exception as e:
+                log(f"  ❌ {arxiv_id}: {e}", mode, key)
+                add_entry({"arxiv_id": arxiv_id, "rank": i, "error": str(e),
+                           "html_file": f"papers/{arxiv_id}.html"}, completed=False)
 
-        stored = paper_store.read_raw(aid)
-        merged = {}
-        merged.update(paper)
-        merged.update(final_entries.get(aid, {}))
-        if isinstance(stored, dict):
-            merged.update(stored)
-        has_metadata = bool(
-            str(merged.get("title", "")).strip()
-            and str(merged.get("abstract") or merged.get("summary") or "").strip()
-        )
-        if has_metadata:
-            stats["metadata_succeeded"] += 1
-        else:
-            stats["metadata_failed"] += 1
-            residual_ids.add(aid)
+            if i < len(papers):
+                time.sleep(2)
 
-        stats["summary_attempted"] += 1
-        if paper_store.translation_complete(stored):
-            stats["summary_succeeded"] += 1
-        else:
-            stats["summary_failed"] += 1
-            residual_ids.add(aid)
+        idx_file = publish()
 
-    # 4. 全文翻译（所有模式均支持，传 do_full_translate=False 可跳过）
-    if do_full_translate:
-        log("🔬 开始全文翻译...", mode, key)
-        from translate_full import translate_full
-        for entry in papers_data:
-            aid = entry.get("arxiv_id", "")
+        # 对最终持久化状态做统一门禁，避免 translate_and_save 返回后“假绿”。
+        final_entries = {p.get("arxiv_id"): p for p in papers_data if p.get("arxiv_id")}
+        stats["metadata_attempted"] = len(papers)
+        for position, paper in enumerate(papers, 1):
+            aid = paper.get("arxiv_id", "")
             if not aid:
+                stats["metadata_failed"] += 1
+                residual_ids.add(f"{mode}/{key}:missing-id-{position}")
                 continue
 
-            # ① 命中 paper store PDF → 直接标记，无需重新翻译
-            store_pdf = _pdf_store_hit(aid)
-            if store_pdf:
-                entry["pdf_zh"] = f"papers/{aid}_zh.pdf"
-                entry.pop("pdf_zh_failed", None)
-                entry.pop("pdf_status", None)
-                log(f"  ⚡ paper store PDF 命中: {aid} ({os.path.getsize(store_pdf)//1024} KB)", mode, key)
-                _paper_store_update_pdf_status(aid, "ok")
-                _clear_stale_failure_artifacts(aid)
-                save_index(base_dir, mode, key, papers_data)
-                continue
+            stored = paper_store.read_raw(aid)
+            merged = {}
+            merged.update(paper)
+            merged.update(final_entries.get(aid, {}))
+            if isinstance(stored, dict):
+                merged.update(stored)
+            has_metadata = bool(
+                str(merged.get("title", "")).strip()
+                and str(merged.get("abstract") or merged.get("summary") or "").strip()
+            )
+            if has_metadata:
+                stats["metadata_succeeded"] += 1
+            else:
+                stats["metadata_failed"] += 1
+                residual_ids.add(aid)
 
-            # ② 无缓存 → 调用翻译，输出直接写入 paper store
-            log(f"  🔬 全文翻译: {aid}", mode, key)
-            try:
-                r = translate_full(arxiv_id=aid, output_dir=PAPER_STORE_DIR,
-                                   no_cache=False, timeout=3600)
-                verified_pdf = _accept_new_pdf(aid) if r.get("pdf_path") else None
-                if r.get("pdf_path") and verified_pdf:
-                    entry["pdf_zh"] = f"papers/{aid}_zh.pdf"
-                    entry.pop("pdf_zh_failed", None)
-                    log(f"  ✅ PDF: {r['pdf_path']}", mode, key)
-                else:
-                    entry["pdf_zh_failed"] = True
-                    entry.pop("pdf_zh", None)
-                    _paper_store_update_pdf_status(aid, "failed")
-                    error = r.get("error", "") or "返回 PDF 路径但 paper store 校验失败"
-                    log(f"  ❌ {error}", mode, key)
-            except Exception as e:
-                entry["pdf_zh_failed"] = True
-                entry.pop("pdf_zh", None)
-                _paper_store_update_pdf_status(aid, "failed")
-                log(f"  ❌ {aid}: {e}", mode, key)
-            save_index(base_dir, mode, key, papers_data)
+            stats["summary_attempted"] += 1
+            if paper_store.translation_complete(stored):
+                stats["summary_succeeded"] += 1
+            else:
+                stats["summary_failed"] += 1
+                residual_ids.add(aid)
+    except BaseException:
+        # 异常退出也要等流水线收尾：否则 run() 释放运行锁后，daemon worker 可能在
+        # docker exec 中途被解释器终止。尚未开始的任务直接丢弃，续跑时重做。
+        if pdf_pipeline is not None:
+            pdf_pipeline.close(cancel=True)
+        raise
+
+    # 4. 全文翻译（所有模式均支持，传 do_full_translate=False 可跳过）
+    if do_full_translate:
+        # 等待流水线中剩余的 PDF 任务完成后再做最终门禁
+        pdf_pipeline.close()
+        deferred_ids = {entry.get("arxiv_id", "") for entry in pdf_pipeline.deferred}
 
         # 兜底：全文翻译结束后，仍无 pdf_zh 且无失败标志的条目 → 补标 failed
         for entry in papers_data:
@@ -545,6 +784,10 @@ def _run_locked(mode, key, limit, do_full_translate):
                 entry.pop("pdf_zh", None)
                 _paper_store_update_pdf_status(aid, "failed")
                 residual_ids.add(aid)
+                if aid in deferred_ids:
+                    # 慢车道顺延：未尝试，仍计入残留，单独列出
+                    stats["pdf_deferred"] += 1
+                    stats["deferred_ids"].append(aid)
         idx_file = save_index(base_dir, mode, key, papers_data)
     else:
         # do_full_translate=False 时，明确标记 pdf_status="none"（未尝试）
@@ -554,10 +797,13 @@ def _run_locked(mode, key, limit, do_full_translate):
         idx_file = save_index(base_dir, mode, key, papers_data)
 
     result_stats = _finalize_stats(stats, residual_ids)
+    journal.finish(result_stats["residual_failures"] == 0)
     status = "完成" if not result_stats["residual_failures"] else "部分失败"
     log(f"📊 {status}: {_stats_line(result_stats)}  {idx_file}", mode, key)
     if result_stats["residual_ids"]:
         log(f"📌 残留: {', '.join(result_stats['residual_ids'])}", mode, key)
+    if result_stats["deferred_ids"]:
+        log(f"⏭️ 其中顺延（未尝试）: {', '.join(result_stats['deferred_ids'])}", mode, key)
     return result_stats["residual_failures"] == 0
 
 
@@ -568,6 +814,12 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
 
     优先复用 paper store PDF；其次复用容器/宿主机里的翻译 tex 缓存只重跑编译；
     缓存重编译失败时再清缓存重新全文翻译。调用方负责把 papers 写回对应 index。
+
+    派发容器任务前先查重试账本（paperhub/retry_ledger.py）：manual_review 类
+    失败与仍在退避期内的论文本轮跳过，保持 failed 并计入 deferred。
+    候选按预估耗时短作业优先（paperhub/pdf_cost.py）；超出离群阈值的论文
+    排在最后，慢车道预算用尽后同样顺延并计入 deferred。
+    顺延的论文仍没有 PDF，因此也出现在 residual_ids 中；deferred_ids 单独列出它们。
     """
     from translate_full import (
         CONTAINER_NAME,
@@ -581,7 +833,9 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
     total_fail = 0
     changed = False
     attempted = 0
+    deferred_ids = []
     processed = processed_ids if processed_ids is not None else set()
+    ledger = RetryLedger(ledger_path(LOGS_DIR)) if ledger_enabled() else None
 
     # Reconcile every verified store PDF before selecting retry candidates.
     # This also clears diagnostics left by an older failed attempt when the
@@ -637,7 +891,15 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
             changed = True
 
     failed = [p for p in papers if p.get("pdf_status") == "failed"]
-    for slim in failed:
+    # 短作业优先：预估耗时小的先重试，超大论文排在最后并受慢车道预算约束
+    if failed:
+        estimate = _pdf_cost_estimator()
+        outlier = pdf_cost.outlier_seconds()
+        ordered = pdf_cost.order_by_cost(failed, lambda p: estimate(p.get("arxiv_id", "")), outlier)
+    else:
+        ordered = []
+    slow_lane = pdf_cost.LaneBudget()
+    for seconds, slim in ordered:
         aid = slim.get("arxiv_id", "")
         if not aid:
             continue
@@ -650,7 +912,6 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
                 _clear_stale_failure_artifacts(aid)
             continue
         processed.add(aid)
-        attempted += 1
 
         diagnosis = read_json(os.path.join(LOGS_DIR, "pdf_errors", f"{aid}.json"), {})
         retry_strategy = diagnosis.get("retry_strategy", "")
@@ -670,9 +931,22 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
             _paper_store_update_pdf_status(aid, "ok")
             _clear_stale_failure_artifacts(aid)
             changed = True
+            attempted += 1
             total_ok += 1
             continue
 
+        if ledger is not None:
+            eligible, reason = ledger.eligible(aid)
+            if not eligible:
+                print(f"{label} ⏸️  {aid} — 跳过本轮: {reason}", flush=True)
+                deferred_ids.append(aid)
+                continue
+        if pdf_cost.lane_for(seconds, outlier) == pdf_cost.SLOW_LANE and not slow_lane.admit(seconds):
+            print(f"{label} ⏭️  {aid} — 慢车道预算不足（预估 {seconds / 60:.0f} 分钟），顺延到下轮", flush=True)
+            deferred_ids.append(aid)
+            continue
+        attempted += 1
+
         # 检测是否已有翻译 tex，有则只重跑编译（优先查宿主机备份，再查容器内）
         container_tex = f"/gpt/gpt_log/arxiv_cache/{aid}/workfolder/merge_translate_zh.tex"
         has_container = subprocess.run(
@@ -744,6 +1018,10 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
             _paper_store_update_pdf_status(aid, "failed")
             print(f"{label} ❌ {aid}: {e}", flush=True)
             total_fail += 1
+        if ledger is not None and slim.get("pdf_status") == "failed":
+            ledger.record_failure(
+                aid, read_json(os.path.join(LOGS_DIR, "pdf_errors", f"{aid}.json"), {})
+            )
 
     residual_ids = sorted({
         p.get("arxiv_id", "")
@@ -757,8 +1035,10 @@ def retry_failed_pdf_entries(papers, label="[retry-pdf]", processed_ids=None):
         "pdf_attempted": attempted,
         "pdf_succeeded": total_ok,
         "pdf_failed": total_fail,
+        "pdf_deferred": len(deferred_ids),
         "residual_failures": len(residual_ids),
         "residual_ids": residual_ids,
+        "deferred_ids": sorted(deferred_ids),
     }
 
 
@@ -774,6 +1054,7 @@ def retry_pdf(mode=None, key=None, keys=None, return_stats=False, processed_ids=
     modes = [mode] if mode else ["daily", "weekly", "monthly", "manual"]
     processed = processed_ids if processed_ids is not None else set()
     candidate_ids = set()
+    deferred_ids = set()
     references = {}
     structural_residuals = set()
 
@@ -851,6 +1132,7 @@ def retry_pdf(mode=None, key=None, keys=None, return_stats=False, processed_ids=
                 processed_ids=processed,
             )
             changed = result["changed"]
+            deferred_ids.update(result.get("deferred_ids", ()))
 
             current_papers = papers
             if changed:
@@ -907,10 +1189,15 @@ def retry_pdf(mode=None, key=None, keys=None, return_stats=False, processed_ids=
         else:
             stats["pdf_failed"] += 1
             residual_ids.add(aid)
+            if aid in deferred_ids:
+                stats["pdf_deferred"] += 1
+                stats["deferred_ids"].append(aid)
     result_stats = _finalize_stats(stats, residual_ids)
     print(f"[retry-pdf] 完成: {_stats_line(result_stats)}", flush=True)
     if result_stats["residual_ids"]:
         print(f"[retry-pdf] 残留: {', '.join(result_stats['residual_ids'])}", flush=True)
+    if result_stats["deferred_ids"]:
+        print(f"[retry-pdf] 其中顺延（未尝试）: {', '.join(result_stats['deferred_ids'])}", flush=True)
     return result_stats if return_stats else result_stats["pdf_succeeded"]
 
 
@@ -47,6 +47,7 @@ _COUNTER_FIELDS = (
     "pdf_attempted",
     "pdf_succeeded",
     "pdf_failed",
+    "pdf_deferred",
     "refetch_attempted",
     "refetch_succeeded",
     "refetch_failed",
@@ -59,6 +60,8 @@ def _new_stats():
     stats["residual_failures"] = 0
     stats["residual_ids"] = []
     stats["audited_ids"] = []
+    # 顺延（账本退避/慢车道预算）的论文仍计入残留，这里单独列出
+    stats["deferred_ids"] = []
     return stats
 
 
@@ -74,6 +77,7 @@ def _merge_stats(target, source):
     audited_ids = set(target.get("audited_ids", []))
     audited_ids.update(source_audited)
     target["audited_ids"] = sorted(audited_ids)
+    target["deferred_ids"] = sorted(set(target.get("deferred_ids", [])) | set(source.get("deferred_ids", [])))
     target["residual_ids"] = sorted(residual_ids)
     target["residual_failures"] = len(residual_ids)
     return target
@@ -86,6 +90,7 @@ def _finish_stats(stats, residual_ids=()):
     result["residual_ids"] = sorted(ids)
     result["residual_failures"] = len(ids)
     result["audited_ids"] = sorted(set(result.get("audited_ids", [])))
+    result["deferred_ids"] = sorted(set(result.get("deferred_ids", [])))
     return result
 
 
@@ -96,7 +101,7 @@ def _stats_line(stats):
         f"summary={stats['summary_succeeded']}/{stats['summary_attempted']}"
         f"(失败={stats['summary_failed']}, 修复={stats['summary_repaired']}) "
         f"pdf={stats['pdf_succeeded']}/{stats['pdf_attempted']}"
-        f"(失败={stats['pdf_failed']}) "
+        f"(失败={stats['pdf_failed']}, 顺延={stats['pdf_deferred']}) "
         f"refetch={stats['refetch_succeeded']}/{stats['refetch_attempted']}"
         f"(失败={stats['refetch_failed']}) "
         f"残留={stats['residual_failures']}"
@@ -548,6 +553,12 @@ def repair_topic_keys(
     return _return_stats_or_count(stats, "summary_repaired", return_stats)
 
 
+def _note_deferred(stats, deferred, residual_ids):
+    """Count residual papers the retry skipped on purpose (ledger/slow lane)."""
+    stats["deferred_ids"] = sorted(set(deferred) & set(residual_ids))
+    stats["pdf_deferred"] = len(stats["deferred_ids"])
+
+
 def retry_topic_pdf_keys(
     topic, days, scan_all, key, return_stats=False, processed_ids=None
 ):
@@ -556,6 +567,7 @@ def retry_topic_pdf_keys(
 
     label = f"topic={topic or 'all'}"
     attempted, _ = _topic_pdf_failures(topic, days, scan_all, key)
+    deferred = set()
     if key:
         _log(f"[retry-pdf:topic] 指定 key={key} ({label})，开始重试...")
         n = retry_topic_pdf(
@@ -563,12 +575,14 @@ def retry_topic_pdf_keys(
             key=key,
             scan_all=True,
             processed_ids=processed_ids,
+            deferred_ids=deferred,
         )
         _, residual_ids = _topic_pdf_failures(topic, days, scan_all, key)
         stats = _new_stats()
         stats["pdf_attempted"] = attempted
         stats["pdf_succeeded"] = n
         stats["pdf_failed"] = len([aid for aid in residual_ids if not aid.endswith(":index")])
+        _note_deferred(stats, deferred, residual_ids)
         stats = _finish_stats(stats, residual_ids)
         _log(f"[retry-pdf:topic] {key} — {_stats_line(stats)}")
         return _return_stats_or_count(stats, "pdf_succeeded", return_stats)
@@ -579,12 +593,14 @@ def retry_topic_pdf_keys(
             topic=topic,
             scan_all=True,
             processed_ids=processed_ids,
+            deferred_ids=deferred,
         )
         _, residual_ids = _topic_pdf_failures(topic, days, scan_all, key)
         stats = _new_stats()
         stats["pdf_attempted"] = attempted
         stats["pdf_succeeded"] = n
         stats["pdf_failed"] = len(residual_ids)
+        _note_deferred(stats, deferred, residual_ids)
         stats = _finish_stats(stats, residual_ids)
         _log(f"[retry-pdf:topic] 全量完成 — {_stats_line(stats)}")
         return _return_stats_or_count(stats, "pdf_succeeded", return_stats)
@@ -600,12 +616,14 @@ def retry_topic_pdf_keys(
         days=days,
         scan_all=False,
         processed_ids=processed_ids,
+        deferred_ids=deferred,
     )
     _, residual_ids = _topic_pdf_failures(topic, days, scan_all, key)
     stats = _new_stats()
     stats["pdf_attempted"] = attempted
     stats["pdf_succeeded"] = n
     stats["pdf_failed"] = len(residual_ids)
+    _note_deferred(stats, deferred, residual_ids)
     stats = _finish_stats(stats, residual_ids)
     _log(f"[retry-pdf:topic] 完成 — {_stats_line(stats)}")
     return _return_stats_or_count(stats, "pdf_succeeded", return_stats)
@@ -773,6 +791,8 @@ def main():
         _log(f"retry-pdf 完成 — {_stats_line(stats)}")
         if stats["residual_ids"]:
             _log(f"retry-pdf 残留 — {', '.join(stats['residual_ids'])}")
+        if stats["deferred_ids"]:
+            _log(f"retry-pdf 其中顺延（未尝试） — {', '.join(stats['deferred_ids'])}")
         _log("=" * 50)
         sys.exit(1 if stats["residual_failures"] else 0)
 
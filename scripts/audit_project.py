@@ -50,7 +50,18 @@ def main():
         "--pdf-text-workers",
         type=int,
         default=4,
-        help="PDF 文本提取并发数，范围 1-8（默认 4）",
+        help="PDF 文本扫描进程数，范围 1-8（默认 4）",
+    )
+    parser.add_argument(
+        "--quality-workers",
+        type=int,
+        default=None,
+        help="TeX 质量扫描进程数，默认 CPU 核数；1 表示串行",
+    )
+    parser.add_argument(
+        "--pdf-text-full-scan",
+        action="store_true",
+        help="逐页读完整份 PDF，不在结论确定后提前停止提取",
     )
     parser.add_argument(
         "--pdf-text-no-cache",
@@ -69,6 +80,8 @@ def main():
         pdf_text_timeout=args.pdf_text_timeout,
         pdf_text_workers=args.pdf_text_workers,
         pdf_text_cache=not args.pdf_text_no_cache,
+        pdf_text_early_verdict=not args.pdf_text_full_scan,
+        quality_workers=args.quality_workers,
     )
     if args.json:
         print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Aggregate full-translation phase timings (p50/p95) and flag splitter regressions."""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from paperhub.phase_timing import (
+    DEFAULT_MIN_SAMPLES,
+    DEFAULT_REGRESSION_RATIO,
+    aggregate,
+    find_regressions,
+    load_records,
+    timing_log_path,
+    version_order,
+)
+
+
+def build_report(records, baseline=None, candidate=None,
+                 ratio=DEFAULT_REGRESSION_RATIO, min_samples=DEFAULT_MIN_SAMPLES):
+    stats = aggregate(records)
+    versions = version_order(records)
+    if candidate is None and versions:
+        candidate = versions[-1]
+    if baseline is None and len(versions) >= 2:
+        baseline = versions[-2]
+    regressions = []
+    if baseline and candidate and baseline != candidate:
+        regressions = find_regressions(stats, baseline, candidate, ratio, min_samples)
+    return {
+        "records": len(records),
+        "versions": versions,
+        "baseline": baseline,
+        "candidate": candidate,
+        "stats": stats,
+        "regressions": regressions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总全文翻译各阶段耗时（p50/p95）")
+    parser.add_argument("--log", default=timing_log_path(), help="phase_timing.jsonl 路径")
+    parser.add_argument("--since", help="只统计该时间之后的记录，例如 2026-10-01")
+    parser.add_argument("--baseline", help="对比基线 SPLITTER_CACHE_VERSION（默认倒数第二个）")
+    parser.add_argument("--candidate", help="待检查 SPLITTER_CACHE_VERSION（默认最新）")
+    parser.add_argument("--ratio", type=float, default=DEFAULT_REGRESSION_RATIO,
+                        help="p50/p95 增长超过该倍数视为回退")
+    parser.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES)
+    parser.add_argument("--json", action="store_true", help="输出完整 JSON")
+    args = parser.parse_args()
+
+    records = load_records(args.log, since=args.since)
+    report = build_report(
+        records, args.baseline, args.candidate, args.ratio, args.min_samples,
+    )
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if report["regressions"] else 0
+
+    print(f"耗时记录: {report['records']} 条")
+    for version in report["versions"]:
+        phases = report["stats"].get(version, {})
+        print(f"\n[{version}]")
+        print(f"  {'phase':<24}{'n':>6}{'p50(s)':>10}{'p95(s)':>10}{'total(h)':>10}")
+        for phase, item in phases.items():
+            print(
+                f"  {phase:<24}{item['count']:>6}{item['p50']:>10.1f}"
+                f"{item['p95']:>10.1f}{item['total'] / 3600:>10.2f}"
+            )
+    if report["regressions"]:
+        print(f"\n⚠️  {report['baseline']} → {report['candidate']} 阶段耗时回退:")
+        for item in report["regressions"]:
+            print(
+                f"  {item['phase']} {item['metric']}: "
+                f"{item['baseline']:.1f}s → {item['candidate']:.1f}s (x{item['ratio']})"
+            )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,7 +24,10 @@ from paperhub.publication_lock import (
     merge_index_paper_fields,
     paper_lock_path,
 )
-from paperhub.translation_quality import analyze_tex, is_untranslated_prose
+from paperhub.quality_cache import cache_path as quality_cache_path
+from paperhub.quality_scan import scan as quality_scan
+from paperhub.quality_scan import tex_quality_task
+from paperhub.translation_quality import is_untranslated_prose
 
 
 PDF_ISSUE_CATEGORIES = (
@@ -82,14 +85,24 @@ def referenced_papers(data_dir):
     return references
 
 
-def _find_tex_quality_failures(data_dir, references):
+def _find_tex_quality_failures(data_dir, references, logs_dir, workers=None):
     backup_dir = os.path.join(data_dir, "tex_backup")
-    failures = []
+    targets = []
     for path in sorted(glob.glob(os.path.join(backup_dir, "*_merge_translate_zh.tex"))):
         arxiv_id = os.path.basename(path).split("_merge_translate_zh.tex", 1)[0]
-        if arxiv_id not in references:
+        if arxiv_id in references:
+            targets.append((arxiv_id, path))
+    store_path = quality_cache_path(logs_dir)
+    results = quality_scan(
+        tex_quality_task,
+        [(path, store_path) for _, path in targets],
+        workers=workers,
+    )
+    failures = []
+    for (arxiv_id, path), (report, error) in zip(targets, results):
+        if error:
+            print(f"⚠️ {arxiv_id} TeX 质量扫描失败，跳过: {error}", file=sys.stderr)
             continue
-        report = analyze_tex(path)
         if not is_untranslated_prose(report):
             continue
         failures.append({
@@ -110,13 +123,14 @@ def _find_tex_quality_failures(data_dir, references):
     return failures
 
 
-def _find_pdf_quality_failures(data_dir, logs_dir, references):
+def _find_pdf_quality_failures(data_dir, logs_dir, references, workers=None):
     """Map cached audit findings for valid PDFs without TeX to queue records."""
     report = audit_repository(
         data_dir,
         logs_dir,
         scan_pdf_text=True,
         pdf_text_cache=True,
+        quality_workers=workers,
     )
     issues = report.get("issues", {})
     failures = []
@@ -141,18 +155,26 @@ def _find_pdf_quality_failures(data_dir, logs_dir, references):
     return failures
 
 
-def find_quality_failures(data_dir, logs_dir=None, scan_pdf_text=False):
-    """Return referenced TeX failures and optionally cached PDF-text findings."""
+def find_quality_failures(data_dir, logs_dir=None, scan_pdf_text=False, workers=None):
+    """Return referenced TeX failures and optionally cached PDF-text findings.
+
+    Both scans go through the content-hash verdict store in ``logs_dir``;
+    TeX files are analyzed across ``workers`` processes (default: CPU count).
+    """
     references = referenced_papers(data_dir)
-    failures = _find_tex_quality_failures(data_dir, references)
+    if logs_dir is None:
+        logs_dir = os.path.join(
+            os.path.dirname(os.path.abspath(data_dir)),
+            "logs",
+        )
+    failures = _find_tex_quality_failures(
+        data_dir, references, logs_dir, workers=workers,
+    )
     if scan_pdf_text:
-        if logs_dir is None:
-            logs_dir = os.path.join(
-                os.path.dirname(os.path.abspath(data_dir)),
-                "logs",
-            )
         failures.extend(
-            _find_pdf_quality_failures(data_dir, logs_dir, references)
+            _find_pdf_quality_failures(
+                data_dir, logs_dir, references, workers=workers,
+            )
         )
     return failures
 
@@ -501,6 +523,12 @@ def main():
         action="store_true",
         help="显式扫描无 TeX 的有效 PDF；复用审计的有界提取缓存",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="TeX 质量扫描进程数，默认 CPU 核数；1 表示串行",
+    )
     parser.add_argument("--json", action="store_true")
     args = parser.parse_args()
 
@@ -508,6 +536,7 @@ def main():
         DATA_DIR,
         LOGS_DIR,
         scan_pdf_text=args.scan_pdf_text,
+        workers=args.workers,
     )
     if args.id:
         selected = set(args.id)
@@ -22,6 +22,25 @@ def _json_value(name, expected_type):
     return value
 
 
+POOL_FIELDS = {"name": str, "api_base": str, "api_key": str, "model": str,
+               "weight": (int, float), "rpm": int}
+
+
+def _endpoint_pool():
+    """Optional multi-endpoint pool; kept to Python-compatible JSON literals."""
+    if not os.environ.get("GPT_ACADEMIC_LLM_ENDPOINTS_JSON", "").strip():
+        return None
+    pool = _json_value("GPT_ACADEMIC_LLM_ENDPOINTS_JSON", list)
+    for entry in pool:
+        if not isinstance(entry, dict) or not entry.get("api_base") or not entry.get("api_key"):
+            raise ValueError("each LLM endpoint needs api_base and api_key")
+        for key, value in entry.items():
+            expected = POOL_FIELDS.get(key)
+            if expected is None or isinstance(value, bool) or not isinstance(value, expected):
+                raise ValueError("invalid LLM endpoint field: %s" % key)
+    return pool
+
+
 def render_config():
     model = _required("GPT_ACADEMIC_LLM_MODEL")
     available = _json_value("GPT_ACADEMIC_AVAIL_LLM_MODELS_JSON", list)
@@ -34,20 +53,24 @@ def render_config():
         "API_URL_REDIRECT": redirects,
         "DOC2X_API_KEY": os.environ.get("DOC2X_API_KEY", ""),
     }
-    return "".join(
-        [
-            "# Generated by workspace-ctl. Do not edit or commit.\n",
-            "WEB_PORT=%d\n" % values["WEB_PORT"],
-            "LLM_MODEL=%s\n" % json.dumps(values["LLM_MODEL"], ensure_ascii=False),
-            "AVAIL_LLM_MODELS=%s\n"
-            % json.dumps(values["AVAIL_LLM_MODELS"], ensure_ascii=False),
-            "API_KEY=%s\n" % json.dumps(values["API_KEY"], ensure_ascii=False),
-            "API_URL_REDIRECT=%s\n"
-            % json.dumps(values["API_URL_REDIRECT"], ensure_ascii=False),
-            "DOC2X_API_KEY=%s\n"
-            % json.dumps(values["DOC2X_API_KEY"], ensure_ascii=False),
-        ]
-    )
+    pool = _endpoint_pool()
+    lines = [
+        "# Generated by workspace-ctl. Do not edit or commit.\n",
+        "WEB_PORT=%d\n" % values["WEB_PORT"],
+        "LLM_MODEL=%s\n" % json.dumps(values["LLM_MODEL"], ensure_ascii=False),
+        "AVAIL_LLM_MODELS=%s\n"
+        % json.dumps(values["AVAIL_LLM_MODELS"], ensure_ascii=False),
+        "API_KEY=%s\n" % json.dumps(values["API_KEY"], ensure_ascii=False),
+        "API_URL_REDIRECT=%s\n"
+        % json.dumps(values["API_URL_REDIRECT"], ensure_ascii=False),
+        "DOC2X_API_KEY=%s\n"
+        % json.dumps(values["DOC2X_API_KEY"], ensure_ascii=False),
+    ]
+    if pool is not None:
+        lines.append(
+            "PAPER_TRANS_LLM_ENDPOINTS=%s\n" % json.dumps(pool, ensure_ascii=False)
+        )
+    return "".join(lines)
 
 
 def _apply_metadata(path):
@@ -0,0 +1,680 @@
+"""Fixtures for the PDF text-quality differential test and benchmark.
+
+``ReferencePdfTextAnalyzer`` is a frozen copy of the multi-pass page analyzer
+that preceded the single-pass line-record analyzer in
+``paperhub.pdf_text_quality``; it is the oracle the new analyzer must match
+report-for-report.  :func:`synthetic_documents` builds a seeded corpus that
+exercises every page class the policy distinguishes.
+"""
+
+import random
+import re
+
+from paperhub.pdf_text_quality import (
+    CJK_RE,
+    LETTER_RE,
+    WORD_RE,
+    REFERENCE_HEADING_RE,
+    APPENDIX_HEADING_RE,
+    BARE_APPENDIX_HEADING_RE,
+    BARE_APPENDIX_SUBHEADING_RE,
+    SOURCE_DATA_MARKER_RE,
+    APPENDIX_SECTION_LINE_RE,
+    SOURCE_SECTION_TITLE_RE,
+    MARKDOWN_HEADING_RE,
+    SOURCE_TRAJECTORY_EXAMPLE_RE,
+    TRANSLATION_REFUSAL_RE,
+    SCHOLARLY_PROOF_RE,
+    ACADEMIC_SECTION_HEADING_RE,
+    PARTIAL_SOURCE_HINT_RE,
+    IMPERATIVE_EXAMPLE_LINE_RE,
+    NUMBERED_PROCEDURE_LINE_RE,
+    PARTIAL_VISUAL_BLOCK_RE,
+    ACADEMIC_NARRATIVE_RE,
+    SOURCE_DATA_APPENDIX_RE,
+    CONTENTS_PAGE_RE,
+    DOT_LEADER_RE,
+    SOURCE_DATA_QA_RE,
+    IMAGE_PROMPT_RE,
+    SOURCE_TEMPLATE_TERM_RE,
+    SOURCE_TEMPLATE_STRUCTURE_RE,
+    FIGURE_FRAME_RE,
+    JSON_FIELD_RE,
+    TABLE_HEADING_RE,
+    NUMERIC_TOKEN_RE,
+    REFERENCE_LIKE_LINE_RE,
+    NUMBERED_REFERENCE_ENTRY_RE,
+    PDF_TEXT_POLICY_VERSION,
+    is_untranslated_pdf_prose,
+)
+
+
+def _page_sample(page):
+    candidates = []
+    for line in page.splitlines():
+        normalized = " ".join(line.split())
+        if len(LETTER_RE.findall(normalized)) < 80:
+            continue
+        if len(WORD_RE.findall(normalized)) < 12:
+            continue
+        if REFERENCE_LIKE_LINE_RE.search(normalized):
+            continue
+        candidates.append(normalized)
+        if len(candidates) >= 2:
+            break
+    if not candidates:
+        candidates = [" ".join(page.split())]
+    return " ".join(candidates)[:360]
+
+
+def _english_line_run(page):
+    """Return the strongest run of wrapped English prose lines."""
+    best_lines = 0
+    best_words = 0
+    best_text = ""
+    current = []
+    current_words = 0
+    for raw_line in page.splitlines():
+        line = " ".join(raw_line.split())
+        letters = len(LETTER_RE.findall(line))
+        cjk = len(CJK_RE.findall(line))
+        words = len(WORD_RE.findall(line))
+        english_line = (
+            letters >= 15
+            and words >= 3
+            and 100 * cjk / max(1, cjk + letters) < 10.0
+        )
+        if english_line:
+            current.append(line)
+            current_words += words
+            if (
+                len(current) > best_lines
+                or (
+                    len(current) == best_lines
+                    and current_words > best_words
+                )
+            ):
+                best_lines = len(current)
+                best_words = current_words
+                best_text = " ".join(current)[:360]
+        else:
+            current = []
+            current_words = 0
+    return best_lines, best_words, best_text
+
+
+def _reference_dense(page):
+    lines = [
+        " ".join(line.split())
+        for line in page.splitlines()
+        if line.strip()
+    ]
+    cjk = len(CJK_RE.findall(page))
+    letters = len(LETTER_RE.findall(page))
+    if 100 * cjk / max(1, cjk + letters) >= 8.0:
+        return False
+    # Parenthetical citations are common in ordinary Related Work and
+    # Introduction prose.  Only use bibliography-entry-shaped line starts as
+    # a heading-free fallback; explicit References headings cover other styles.
+    numbered_entries = sum(
+        1 for line in lines if NUMBERED_REFERENCE_ENTRY_RE.match(line)
+    )
+    return numbered_entries >= 3
+
+
+def _substantive_reference_chunk(text):
+    return (
+        len(LETTER_RE.findall(text)) >= 80
+        or len(CJK_RE.findall(text)) >= 30
+        or bool(NUMBERED_REFERENCE_ENTRY_RE.search(text))
+    )
+
+
+def _split_chinese_reference_heading_position(page):
+    """Recognize duplicated vertical glyph extraction of ``参考文献``.
+
+    Some PDFs render a heading with each glyph in several positioned text
+    layers.  Poppler then emits a small block such as ``参 / 参考 / 考文``.
+    Similar duplication also occurs inside figure captions, so the block must
+    be detached from adjacent prose rather than merely contain the four glyphs.
+    """
+    lines = page.splitlines(True)
+    positions = []
+    position = 0
+    for raw_line in lines:
+        positions.append(position)
+        position += len(raw_line)
+    normalized = ["".join(line.split()) for line in lines]
+    allowed = set("参考文献")
+    index = 0
+    while index < len(lines):
+        if (
+            not normalized[index]
+            or not set(normalized[index]).issubset(allowed)
+        ):
+            index += 1
+            continue
+        end = index
+        collapsed = ""
+        while (
+            end < len(lines)
+            and normalized[end]
+            and set(normalized[end]).issubset(allowed)
+        ):
+            collapsed += normalized[end]
+            end += 1
+        previous = normalized[index - 1] if index else ""
+        following = normalized[end] if end < len(lines) else ""
+        ordered = (
+            collapsed.find("参") >= 0
+            and collapsed.find("考", collapsed.find("参") + 1) >= 0
+            and collapsed.find("文", collapsed.find("考") + 1) >= 0
+            and collapsed.find("献", collapsed.find("文") + 1) >= 0
+        )
+        detached = (
+            (not previous or previous[-1] not in allowed)
+            and (not following or following[0] not in allowed)
+        )
+        if end - index >= 5 and ordered and detached:
+            return positions[index]
+        index = end
+    return None
+
+
+def _bare_appendix_heading_position(page):
+    """Find a top-of-page ``A Title`` heading backed by an ``A.1`` heading.
+
+    Bibliography entries frequently contain title-cased lines such as
+    ``A Benchmark for ...``.  Requiring a matching subsection close to the
+    page top avoids treating those titles as the end of the references.
+    """
+    nonempty = []
+    position = 0
+    for raw_line in page.splitlines(True):
+        normalized = " ".join(raw_line.split())
+        if normalized:
+            nonempty.append((position, normalized))
+            if len(nonempty) >= 8:
+                break
+        position += len(raw_line)
+    for index, (start, line) in enumerate(nonempty[:4]):
+        heading = BARE_APPENDIX_HEADING_RE.match(line)
+        if not heading:
+            continue
+        letter = heading.group(1)
+        for _, following in nonempty[index + 1:]:
+            subsection = BARE_APPENDIX_SUBHEADING_RE.match(following)
+            if subsection and subsection.group(1) == letter:
+                return start
+    return None
+
+
+def _update_source_section(page, current_label):
+    """Track explicitly source-oriented appendix sections across pages."""
+    for match in APPENDIX_SECTION_LINE_RE.finditer(page):
+        label = match.group(1)
+        title = match.group(2)
+        if current_label:
+            is_descendant = (
+                label == current_label
+                or label.startswith(current_label + ".")
+            )
+            if (
+                not is_descendant
+                and len(label.split(".")) <= len(current_label.split("."))
+            ):
+                current_label = None
+        if SOURCE_SECTION_TITLE_RE.search(title):
+            current_label = label
+    return current_label
+
+
+class ReferencePdfTextAnalyzer:
+    """The ``pdf-text-quality-2026-07-28-v18`` multi-pass page analyzer."""
+
+    def __init__(self, max_samples=5):
+        self.max_samples = max(0, int(max_samples))
+        self.pages_scanned = 0
+        self.in_references = False
+        self.in_appendix = False
+        self.source_section_label = None
+        self.reference_pages = []
+        self.source_data_pages = []
+        self.structural_pages = []
+        self.refusal_pages = []
+        self.refusal_samples = []
+        self.dominant_pages = []
+        self.partial_pages = []
+        self.partial_samples = []
+        self.samples = []
+        self.analyzable_pages = 0
+        self.cjk_total = 0
+        self.letter_total = 0
+        self._dominant_run = 0
+        self.longest_english_page_run = 0
+
+    def feed(self, page):
+        self.pages_scanned += 1
+        page_number = self.pages_scanned
+        refusal = TRANSLATION_REFUSAL_RE.search(page)
+        if refusal:
+            self.refusal_pages.append(page_number)
+            if len(self.refusal_samples) < self.max_samples:
+                start = max(0, refusal.start() - 80)
+                end = min(len(page), refusal.end() + 120)
+                self.refusal_samples.append({
+                    "page": page_number,
+                    "text": " ".join(page[start:end].split())[:360],
+                })
+        markers = []
+        markers.extend(
+            (match.start(), "references")
+            for match in REFERENCE_HEADING_RE.finditer(page)
+        )
+        split_reference_heading = _split_chinese_reference_heading_position(
+            page
+        )
+        if split_reference_heading is not None:
+            markers.append((split_reference_heading, "references"))
+        markers.extend(
+            (match.start(), "appendix")
+            for match in APPENDIX_HEADING_RE.finditer(page)
+        )
+        if self.in_references and not any(
+            marker == "appendix" for _, marker in markers
+        ):
+            bare_appendix = _bare_appendix_heading_position(page)
+            if bare_appendix is not None:
+                markers.append((bare_appendix, "appendix"))
+        ordered_markers = sorted(set(markers))
+        analysis_parts = []
+        reference_content = False
+        cursor = 0
+        reference_state = self.in_references
+        for position, marker in ordered_markers:
+            position = max(cursor, min(len(page), position))
+            chunk = page[cursor:position]
+            if reference_state:
+                reference_content = (
+                    reference_content
+                    or _substantive_reference_chunk(chunk)
+                )
+            else:
+                analysis_parts.append(chunk)
+            reference_state = marker == "references"
+            if marker == "appendix":
+                self.in_appendix = True
+            cursor = position
+        remainder = page[cursor:]
+        if reference_state:
+            reference_content = (
+                reference_content
+                or _substantive_reference_chunk(remainder)
+            )
+        else:
+            analysis_parts.append(remainder)
+        self.in_references = reference_state
+        analysis_page = "".join(analysis_parts)
+        if (
+            not ordered_markers
+            and not self.in_references
+            and _reference_dense(page)
+        ):
+            # A citation-dense page without a heading is probably part of the
+            # bibliography, but must not force every later survey/body page
+            # into reference mode.
+            reference_content = True
+            analysis_page = ""
+        if reference_content:
+            self.reference_pages.append(page_number)
+        if not analysis_page.strip():
+            return
+        page = analysis_page
+        if self.in_appendix:
+            self.source_section_label = _update_source_section(
+                page,
+                self.source_section_label,
+            )
+
+        cjk = len(CJK_RE.findall(page))
+        letters = len(LETTER_RE.findall(page))
+        words = len(WORD_RE.findall(page))
+        structural = (
+            bool(CONTENTS_PAGE_RE.search(page))
+            or len(DOT_LEADER_RE.findall(page)) >= 8
+            or (
+                bool(TABLE_HEADING_RE.search(page))
+                and len(NUMERIC_TOKEN_RE.findall(page)) >= 35
+            )
+        )
+        if structural:
+            self.structural_pages.append(page_number)
+            return
+        if cjk + letters < 300 or (words < 30 and cjk < 100):
+            return
+        cjk_pct = 100 * cjk / max(1, cjk + letters)
+        source_markers = len(SOURCE_DATA_MARKER_RE.findall(page))
+        qa_markers = len(SOURCE_DATA_QA_RE.findall(page))
+        image_prompt_markers = len(IMAGE_PROMPT_RE.findall(page))
+        template_terms = len(SOURCE_TEMPLATE_TERM_RE.findall(page))
+        json_fields = len(JSON_FIELD_RE.findall(page))
+        source_data = cjk_pct < 20.0 and (
+            bool(self.source_section_label)
+            or source_markers >= 2
+            or len(MARKDOWN_HEADING_RE.findall(page)) >= 4
+            or bool(SOURCE_TRAJECTORY_EXAMPLE_RE.search(page))
+            or (
+                template_terms >= 3
+                and bool(SOURCE_TEMPLATE_STRUCTURE_RE.search(page))
+            )
+            or json_fields >= 6
+            or (
+                image_prompt_markers >= 2
+                and bool(FIGURE_FRAME_RE.search(page))
+            )
+            or (
+                self.in_appendix
+                and (
+                    source_markers >= 1
+                    or qa_markers >= 1
+                    or image_prompt_markers >= 2
+                    or (
+                        template_terms >= 3
+                        and bool(SOURCE_TEMPLATE_STRUCTURE_RE.search(page))
+                    )
+                )
+            )
+            or (
+                self.in_appendix
+                and bool(SOURCE_DATA_APPENDIX_RE.search(page[:2000]))
+            )
+        )
+        if source_data:
+            self.source_data_pages.append(page_number)
+            return
+
+        self.analyzable_pages += 1
+        self.cjk_total += cjk
+        self.letter_total += letters
+
+        english_dominant = (
+            letters >= 700
+            and words >= 100
+            and cjk_pct < 20.0
+        )
+        if english_dominant:
+            previous = self.dominant_pages[-1] if self.dominant_pages else None
+            self._dominant_run = (
+                self._dominant_run + 1 if previous == page_number - 1 else 1
+            )
+            self.longest_english_page_run = max(
+                self.longest_english_page_run,
+                self._dominant_run,
+            )
+            self.dominant_pages.append(page_number)
+            if len(self.samples) < self.max_samples:
+                self.samples.append({
+                    "page": page_number,
+                    "cjk_pct": round(cjk_pct, 1),
+                    "english_words": words,
+                    "text": _page_sample(page),
+                })
+        line_run, line_words, line_sample = _english_line_run(page)
+        partial_source_like = (
+            source_markers >= 1
+            or bool(PARTIAL_SOURCE_HINT_RE.search(page))
+            or len(IMPERATIVE_EXAMPLE_LINE_RE.findall(page)) >= 3
+            or len(NUMBERED_PROCEDURE_LINE_RE.findall(page)) >= 3
+            or bool(PARTIAL_VISUAL_BLOCK_RE.search(line_sample[:160]))
+        )
+        partial_reason = None
+        if english_dominant and SCHOLARLY_PROOF_RE.search(page):
+            partial_reason = "scholarly_proof"
+        elif (
+            not partial_source_like
+            and
+            ACADEMIC_SECTION_HEADING_RE.search(page)
+            and line_run >= 3
+            and line_words >= 30
+            and (
+                len(re.findall(r"[.!?](?:\s|$)", line_sample)) >= 2
+                or bool(ACADEMIC_NARRATIVE_RE.search(line_sample))
+            )
+        ):
+            partial_reason = "english_paragraph_in_academic_section"
+        if partial_reason:
+            self.partial_pages.append(page_number)
+            if len(self.partial_samples) < self.max_samples:
+                self.partial_samples.append({
+                    "page": page_number,
+                    "reason": partial_reason,
+                    "text": line_sample or _page_sample(page),
+                })
+
+    def report(self):
+        total_letters = self.cjk_total + self.letter_total
+        cjk_pct_exact = 100 * self.cjk_total / max(1, total_letters)
+        report = {
+            "policy_version": PDF_TEXT_POLICY_VERSION,
+            "pages_scanned": self.pages_scanned,
+            "analyzable_pages": self.analyzable_pages,
+            "reference_pages": len(self.reference_pages),
+            "reference_page_numbers": list(self.reference_pages),
+            "source_data_pages": len(self.source_data_pages),
+            "source_data_page_numbers": list(self.source_data_pages),
+            "structural_pages": len(self.structural_pages),
+            "structural_page_numbers": list(self.structural_pages),
+            "translation_refusal_pages": len(self.refusal_pages),
+            "translation_refusal_page_numbers": list(self.refusal_pages),
+            "translation_refusal_samples": list(self.refusal_samples),
+            "cjk": self.cjk_total,
+            "letters": self.letter_total,
+            "cjk_pct": round(cjk_pct_exact, 1),
+            "cjk_pct_exact": cjk_pct_exact,
+            "english_dominant_pages": len(self.dominant_pages),
+            "english_dominant_page_numbers": list(self.dominant_pages),
+            "longest_english_page_run": self.longest_english_page_run,
+            "partial_untranslated_prose_pages": len(self.partial_pages),
+            "partial_untranslated_prose_page_numbers": list(self.partial_pages),
+            "partial_untranslated_prose_samples": list(self.partial_samples),
+            "samples": list(self.samples),
+        }
+        report["untranslated_prose"] = is_untranslated_pdf_prose(report)
+        return report
+
+
+
+
+ENGLISH_SENTENCES = [
+    "We present a retrieval-augmented method that improves long-context reasoning.",
+    "The evaluation protocol follows prior work and reports accuracy on held-out splits.",
+    "In this paper we introduce a simple baseline that scales with model size.",
+    "Despite its simplicity, the approach outperforms stronger supervised systems.",
+    "Results show consistent gains across all benchmarks and random seeds.",
+    "We find that the learned policy generalizes to unseen environments!",
+    "Does the improvement persist when the training budget is halved?",
+    "The encoder-decoder architecture uses rotary embeddings and grouped attention.",
+]
+CHINESE_SENTENCES = [
+    "本文提出一种检索增强方法，用于提升长上下文推理能力。",
+    "评估流程遵循已有工作，并在留出集上报告准确率。",
+    "尽管方法简单，它仍然优于更强的监督系统。",
+    "实验结果表明该方法在所有基准上都有稳定提升。",
+    "我们使用 Transformer 编码器并在 ImageNet 上预训练。",
+]
+REFERENCE_ENTRIES = [
+    "[{n}] A. Author and B. Writer. Scaling laws for language models. arXiv preprint, 2020.",
+    "[{n}] C. Person et al. Deep learning. In Proceedings of the Conference on Vision, 2019.",
+    "[{n}] D. Researcher. A benchmark for agents. IEEE Transactions on Learning, 2021.",
+    "[{n}] E. Scholar. https://doi.org/10.1000/xyz{n}",
+]
+SOURCE_LINES = [
+    "System prompt: You are a helpful assistant that answers questions.",
+    "User: Please describe the image in detail.",
+    "Assistant: The image shows a cat sitting on a table.",
+    "Question: Which of the following options is correct?",
+    "Answer: Option B",
+    "Instructions: Select all that apply.",
+    '{"question": "q", "answer": "a", "rationale": "r"}',
+    "## Task",
+    "### Output format",
+    "<think> reasoning about the task </think>",
+    "Add a red hat to the person in the photo.",
+    "Change the background to a beach scene.",
+    "A cinematic illustration depicting a city at night in watercolor style.",
+    "Example 3: attack prompt followed by trajectory: step one",
+    "1. Open the settings 2. Click the button 3. Select the file",
+]
+WHITESPACE_NOISE = [" ", "  ", "\t", "　", " "]
+LINE_ENDINGS = ["\n", "\n", "\n", "\r\n", "\r", "\x0b", " "]
+
+
+def _wrap(rng, text, width):
+    words = text.split(" ")
+    lines, current = [], ""
+    for word in words:
+        if current and len(current) + len(word) + 1 > width:
+            lines.append(current)
+            current = word
+        else:
+            current = (current + " " + word).strip()
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _english_lines(rng, count):
+    text = " ".join(rng.choice(ENGLISH_SENTENCES) for _ in range(count))
+    return _wrap(rng, text, rng.choice([60, 80, 95]))
+
+
+def _chinese_lines(rng, count):
+    text = "".join(rng.choice(CHINESE_SENTENCES) for _ in range(count))
+    return [text[index:index + 40] for index in range(0, len(text), 40)]
+
+
+def synthetic_page(rng, kind, number):
+    """One Poppler-style page of ``kind`` (see ``PAGE_KINDS``)."""
+    if kind == "chinese":
+        lines = _chinese_lines(rng, rng.randint(10, 40))
+    elif kind == "english":
+        lines = _english_lines(rng, rng.randint(4, 60))
+    elif kind == "mixed":
+        lines = _chinese_lines(rng, rng.randint(5, 20))
+        lines.insert(rng.randint(0, len(lines)), rng.choice(
+            ["5 Conclusion", "Discussion", "3.2 Methods", "Results"]
+        ))
+        at = rng.randint(0, len(lines))
+        lines[at:at] = _english_lines(rng, rng.randint(2, 8))
+    elif kind == "references":
+        lines = _chinese_lines(rng, rng.randint(0, 8))
+        heading = rng.choice([
+            "参考文献", "References", "REFERENCES", "Bibliography",
+            "Related prose ends here    References",
+            "中文正文    参考文献    ",
+        ])
+        lines.append(heading)
+        lines.extend(
+            rng.choice(REFERENCE_ENTRIES).format(n=index + 1)
+            for index in range(rng.randint(2, 25))
+        )
+    elif kind == "split_heading":
+        lines = _chinese_lines(rng, rng.randint(0, 6))
+        lines.extend(rng.choice([
+            ["参", "参考", "考文", "文献", "献"],
+            ["参考", "文", "献"],
+            ["参", "考", "文", "献", "献"],
+        ]))
+        lines.extend(
+            rng.choice(REFERENCE_ENTRIES).format(n=index + 1)
+            for index in range(rng.randint(0, 10))
+        )
+    elif kind == "citations":
+        lines = [
+            rng.choice(REFERENCE_ENTRIES).format(n=index + number)
+            for index in range(rng.randint(1, 30))
+        ]
+    elif kind == "appendix":
+        lines = [rng.choice([
+            "附录 A", "Appendix B", "Supplementary Material", "APPENDIX",
+            "A Additional Results", "B Benchmark Details",
+        ])]
+        if rng.random() < 0.6:
+            lines.append(rng.choice(["A.1 Setup", "B.1 Task Examples", "A.2 Ablations"]))
+        lines.extend(_english_lines(rng, rng.randint(2, 30)))
+        if rng.random() < 0.4:
+            lines.append(rng.choice(["B.2 Instructions for annotators", "C Other Results"]))
+            lines.extend(rng.choice(SOURCE_LINES) for _ in range(rng.randint(1, 6)))
+    elif kind == "source":
+        lines = [rng.choice(SOURCE_LINES) for _ in range(rng.randint(3, 30))]
+        lines.extend(_english_lines(rng, rng.randint(0, 20)))
+        rng.shuffle(lines)
+    elif kind == "structural":
+        if rng.random() < 0.5:
+            lines = ["Contents"] + [
+                "{} Section title {} . . . . . . . . {}".format(index, index, index * 3)
+                for index in range(1, rng.randint(3, 20))
+            ]
+        else:
+            lines = ["Table {}".format(rng.randint(1, 9)), "Method Acc F1 Time"] + [
+                "Model-{} {:.1f} {:.2f} {}%".format(index, rng.random() * 100, rng.random(), index)
+                for index in range(rng.randint(3, 20))
+            ]
+        lines.extend(_english_lines(rng, rng.randint(0, 10)))
+    elif kind == "proof":
+        lines = ["Proof."] + _english_lines(rng, rng.randint(20, 50))
+        lines.append("This completes the proof.")
+    elif kind == "refusal":
+        lines = _chinese_lines(rng, rng.randint(2, 20))
+        lines.insert(rng.randint(0, len(lines)), rng.choice([
+            "抱歉，我无法查看该图片并进行翻译。",
+            "抱歉我目前不能访问这个链接以完成翻译",
+        ]))
+    else:
+        lines = []
+    out = []
+    for line in lines:
+        if rng.random() < 0.1:
+            line = rng.choice(WHITESPACE_NOISE) + line
+        if rng.random() < 0.1:
+            line = line + rng.choice(WHITESPACE_NOISE)
+        out.append(line)
+        if rng.random() < 0.05:
+            out.append("")
+    if not out:
+        return ""
+    ending = rng.choice(LINE_ENDINGS)
+    return "".join(line + (rng.choice(LINE_ENDINGS) if rng.random() < 0.1 else ending) for line in out)
+
+
+PAGE_KINDS = (
+    ("chinese", 30), ("english", 12), ("mixed", 10), ("references", 6),
+    ("split_heading", 3), ("citations", 5), ("appendix", 8), ("source", 8),
+    ("structural", 5), ("proof", 3), ("refusal", 2), ("empty", 1),
+)
+
+
+def synthetic_documents(seed=20261019, count=300, max_pages=30):
+    """Seeded Poppler-style documents (pages joined by form feeds)."""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in PAGE_KINDS]
+    weights = [weight for _, weight in PAGE_KINDS]
+    documents = []
+    for _ in range(count):
+        pages = [
+            synthetic_page(rng, rng.choices(kinds, weights)[0], number)
+            for number in range(rng.randint(1, max_pages))
+        ]
+        documents.append("\f".join(pages))
+    return documents
+
+
+def reference_report(text, max_samples=5):
+    """Report of the frozen multi-pass analyzer for one extracted document."""
+    pages = str(text or "").split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    analyzer = ReferencePdfTextAnalyzer(max_samples=max_samples)
+    for page in pages:
+        analyzer.feed(page)
+    return analyzer.report()
@@ -453,5 +453,58 @@ class ProjectAuditTest(unittest.TestCase):
         self.assertEqual(report["quality_pdf_text_scan"]["inconclusive"], 1)
 
 
+    def test_early_clean_pdf_verdicts_are_reported_apart_from_full_reads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = os.path.join(tmp, "data")
+            logs = os.path.join(tmp, "logs")
+            index_dir = os.path.join(data, "daily", "2026-07-21")
+            paper_dir = os.path.join(data, "papers")
+            os.makedirs(index_dir)
+            os.makedirs(paper_dir)
+            ids = ["2607.00011", "2607.00012"]
+            with open(
+                os.path.join(index_dir, "index.json"),
+                "w",
+                encoding="utf-8",
+            ) as handle:
+                json.dump({
+                    "mode": "daily",
+                    "total": 2,
+                    "papers": [
+                        {"arxiv_id": arxiv_id, "pdf_status": "ok"}
+                        for arxiv_id in ids
+                    ],
+                }, handle)
+            for arxiv_id in ids:
+                self._write_translated_store(paper_dir, arxiv_id)
+                self._write_valid_pdf(paper_dir, arxiv_id)
+            base = {
+                "pages_scanned": 40,
+                "analyzable_pages": 40,
+                "page_limit_reached": False,
+                "untranslated_prose": False,
+            }
+
+            with mock.patch(
+                "paperhub.audit.analyze_pdf",
+                side_effect=[
+                    dict(base, early_verdict="clean"),
+                    dict(base, early_verdict=None),
+                ],
+            ):
+                report = audit_repository(
+                    data,
+                    logs,
+                    scan_pdf_text=True,
+                    pdf_text_workers=1,
+                    pdf_text_cache=False,
+                )
+
+        scan = report["quality_pdf_text_scan"]
+        self.assertEqual(scan["early_verdicts"], {"clean": 1})
+        self.assertEqual(scan["early_clean_pages"], 40)
+        self.assertEqual(scan["early_clean_ids"], [ids[0]])
+
+
 if __name__ == "__main__":
     unittest.main()
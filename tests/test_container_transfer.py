@@ -0,0 +1,146 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+import translate_full
+from paperhub import container_transfer as transfer
+
+
+def _helper(op, spec, payload=None):
+    return subprocess.run(
+        [sys.executable, "-c", transfer.TRANSFER_HELPER, op, json.dumps(spec)],
+        input=payload if payload is not None else b"",
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+    )
+
+
+def _write(path, data):
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+class TransferHelperTest(unittest.TestCase):
+    def setUp(self):
+        # The helper only accepts container roots; /tmp is one of them.
+        self.tmp = tempfile.TemporaryDirectory(dir="/tmp")
+        self.root = os.path.realpath(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put_status_and_get_round_trip(self):
+        local = os.path.join(self.root, "local.tex")
+        _write(local, b"\\documentclass{article}")
+        remote = os.path.join(self.root, "work", "nested", "merge_translate_zh.tex")
+
+        put = _helper("put", {}, transfer.pack({remote: local}))
+        status = _helper("status", {"hash": [remote], "size": [remote, remote + ".missing"]})
+        got = _helper("get", {"paths": [remote, remote + ".missing"]})
+
+        self.assertEqual(put.returncode, 0, put.stderr)
+        self.assertEqual(os.stat(remote).st_mode & 0o777, 0o644)
+        payload = transfer.parse_json_line(status.stdout.decode())
+        self.assertEqual(payload["hash"][remote], transfer.file_digest(local))
+        self.assertEqual(payload["size"][remote + ".missing"], -1)
+        fetched = os.path.join(self.root, "fetched.tex")
+        arrived = transfer.unpack(got.stdout, {remote: fetched, remote + ".missing": fetched + "2"})
+        self.assertEqual(arrived, {remote: True, remote + ".missing": False})
+        with open(fetched, "rb") as handle:
+            self.assertEqual(handle.read(), b"\\documentclass{article}")
+
+    def test_paths_outside_container_roots_are_refused(self):
+        local = os.path.join(self.root, "evil")
+        _write(local, b"x")
+        with self.assertRaises(ValueError):
+            transfer.pack({"/etc/evil": local})
+
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            tar.add(local, arcname="tmp/../etc/evil")
+        result = _helper("put", {}, buffer.getvalue())
+
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("refusing tar member", result.stderr.decode())
+
+    def test_unpack_ignores_unrequested_members(self):
+        local = os.path.join(self.root, "a")
+        _write(local, b"a")
+        data = transfer.pack({os.path.join(self.root, "remote"): local})
+        target = os.path.join(self.root, "out")
+
+        self.assertEqual(transfer.unpack(data, {"/tmp/other": target}), {"/tmp/other": False})
+        self.assertFalse(os.path.exists(target))
+
+
+class BatchedControlPlaneTest(unittest.TestCase):
+    def _hashes(self):
+        return {
+            remote: transfer.file_digest(local)
+            for remote, local in translate_full._container_support_files().items()
+        }
+
+    def test_unchanged_driver_files_are_not_copied(self):
+        status = {"ok": True, "hash": self._hashes(), "size": {}}
+        with mock.patch.object(translate_full, "_container_put") as put:
+            self.assertTrue(translate_full.copy_driver_to_container(status))
+        put.assert_not_called()
+
+        stale = dict(status["hash"], **{"/tmp/figure_cache.py": "0" * 64})
+        with mock.patch.object(translate_full, "_container_put", return_value=True) as put:
+            self.assertTrue(translate_full.copy_driver_to_container({"hash": stale}))
+        self.assertEqual(list(put.call_args[0][0]), ["/tmp/figure_cache.py"])
+
+    def test_successful_paper_uses_three_docker_calls(self):
+        arxiv_id = "2610.00001"
+        remote_pdf = f"/gpt/gpt_log/arxiv_cache/{arxiv_id}/translation/translate_zh.pdf"
+        remote_tex = translate_full._container_translated_tex(arxiv_id)
+        pdf = b"%PDF-1.5\n" + b"0" * 2048 + b"\n%%EOF\n"
+        calls = []
+
+        with tempfile.TemporaryDirectory() as tmp:
+            src_pdf = os.path.join(tmp, "src.pdf")
+            src_tex = os.path.join(tmp, "src.tex")
+            _write(src_pdf, pdf)
+            _write(src_tex, b"translated")
+            bundle = transfer.pack({remote_pdf: src_pdf, remote_tex: src_tex})
+
+            def docker_control(command, operation, **_):
+                calls.append(command)
+                if command[:3] == ["docker", "container", "inspect"]:
+                    return mock.Mock(returncode=0, stdout="true\n")
+                if command[-2] == "status":
+                    payload = {"ok": True, "hash": self._hashes(), "size": {remote_tex: -1}}
+                    return mock.Mock(returncode=0, stdout=json.dumps(payload).encode(), stderr=b"")
+                self.assertEqual(command[-2], "get")
+                return mock.Mock(returncode=0, stdout=bundle, stderr=b"")
+
+            backup_dir = os.path.join(tmp, "tex_backup")
+            out_dir = os.path.join(tmp, "out")
+            with mock.patch.object(translate_full, "_run_docker_control", side_effect=docker_control), \
+                    mock.patch.object(translate_full, "TEX_BACKUP_DIR", backup_dir), \
+                    mock.patch.object(translate_full, "LOCK_DIR", os.path.join(tmp, "locks")), \
+                    mock.patch.object(translate_full, "TEX_FAILED_BACKUP_DIR", os.path.join(tmp, "failed")), \
+                    mock.patch.object(translate_full, "check_local_pdf_integrity", return_value=True), \
+                    mock.patch.object(translate_full, "_clear_error_log"), \
+                    mock.patch.object(translate_full, "_clear_failed_tex_backup"), \
+                    mock.patch.object(
+                        translate_full, "run_in_container",
+                        return_value=(0, f"RESULT:SUCCESS:{remote_pdf}\n", ""),
+                    ):
+                result = translate_full._translate_full_locked(arxiv_id, out_dir)
+
+            self.assertTrue(result["success"], result)
+            self.assertEqual(len(calls), 3)
+            with open(os.path.join(backup_dir, f"{arxiv_id}_merge_translate_zh.tex"), "rb") as handle:
+                self.assertEqual(handle.read(), b"translated")
+            self.assertEqual(os.listdir(backup_dir), [f"{arxiv_id}_merge_translate_zh.tex"])
+
+
+if __name__ == "__main__":
+    unittest.main()
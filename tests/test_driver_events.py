@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import translate_full
+from paperhub import driver_events as events
+from paperhub import phase_timing
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DriverEventsTest(unittest.TestCase):
+    def test_event_lines_round_trip_and_reject_foreign_payloads(self):
+        line = events.format_event("compile_pass", engine="xelatex", returncode=0)
+
+        parsed = events.parse_event(line)
+
+        self.assertEqual(parsed["engine"], "xelatex")
+        self.assertIsNone(events.parse_event(events.EVENT_PREFIX + '{"event": "rm"}'))
+        self.assertIsNone(events.parse_event(events.EVENT_PREFIX + "{torn"))
+        self.assertIsNone(events.parse_event("[driver] compile_pass"))
+        with self.assertRaises(ValueError):
+            events.format_event("bogus")
+
+    def test_transcript_is_bounded_but_keeps_protocol_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events", "2610.00001.jsonl")
+            transcript = events.DriverTranscript(path, max_lines=5)
+            transcript.feed(events.format_event("phase_start", phase="translate"))
+            transcript.feed("PDF_DIAGNOSIS:{}")
+            transcript.feed(events.format_event("result", status="error", message="boom"))
+            for idx in range(50):
+                transcript.feed(f"[driver] line {idx}")
+            transcript.close()
+
+            text = transcript.text().splitlines()
+            self.assertEqual(len(text), 7)
+            self.assertEqual(text[0], "PDF_DIAGNOSIS:{}")
+            self.assertEqual(text[-1], "[driver] line 49")
+            self.assertEqual(transcript.result["message"], "boom")
+            self.assertEqual(
+                [event["event"] for event in events.load_events(path)],
+                ["phase_start", "result"],
+            )
+
+    def test_source_event_reaches_the_timing_summary(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            events.emit_event("source", tar_bytes=900000, files=12, tex_bytes=96000, chunks_est=40)
+            events.emit_event("result", status="success")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "2610.00001.jsonl")
+            transcript = events.DriverTranscript(path)
+            for line in stdout.getvalue().splitlines():
+                transcript.feed(line)
+            transcript.close()
+            loaded = events.load_events(path)
+
+        self.assertEqual([event["event"] for event in loaded], ["source", "result"])
+        summary = phase_timing.summarize_driver_events(loaded)
+        self.assertEqual(
+            summary["source"],
+            {"tar_bytes": 900000, "files": 12, "tex_bytes": 96000, "chunks_est": 40},
+        )
+
+    def test_extract_result_prefers_result_event(self):
+        stdout = "\n".join([
+            events.format_event("result", status="success", pdf="/gpt/x.pdf"),
+            "RESULT:SUCCESS:/gpt/legacy.pdf",
+        ])
+
+        self.assertEqual(translate_full.extract_result(stdout), ("pdf", "/gpt/x.pdf"))
+        self.assertEqual(
+            translate_full.extract_result("RESULT:ERROR:bad"), ("error", "bad"),
+        )
+
+    def test_streamed_verbose_driver_keeps_host_memory_flat(self):
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {ROOT!r})\n"
+            "from paperhub.driver_events import emit_event\n"
+            "emit_event('job_start', arxiv_id='2610.00001')\n"
+            "for i in range(20000):\n"
+            "    print('[driver] noisy', i)\n"
+            "emit_event('result', status='success', pdf='/gpt/out.pdf')\n"
+            "print('RESULT:SUCCESS:/gpt/out.pdf', flush=True)\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(translate_full, "_driver_events_path", return_value=os.path.join(tmp, "e.jsonl")), \
+                mock.patch("builtins.print"):
+            rc, stdout, err = translate_full._stream_container_command(
+                [sys.executable, "-c", script], "2610.00001", 60,
+            )
+            recorded = events.load_events(os.path.join(tmp, "e.jsonl"))
+
+        self.assertEqual((rc, err), (0, ""))
+        self.assertLessEqual(len(stdout.splitlines()), events.DEFAULT_RING_LINES + events.MAX_PINNED_LINES)
+        self.assertEqual(translate_full.extract_result(stdout), ("pdf", "/gpt/out.pdf"))
+        self.assertEqual([event["event"] for event in recorded], ["job_start", "result"])
+
+    def test_driver_emits_typed_events(self):
+        with open(os.path.join(ROOT, "full_translate_driver.py"), encoding="utf-8") as handle:
+            source = handle.read()
+
+        for snippet in (
+            "from driver_events import emit_event",
+            '_emit_event("result", status="success"',
+            '"compile_pass", engine=cmd[0]',
+            '_emit_event("diagnosis", diagnosis=diag)',
+            '_timed_phase("translate", run_translation',
+        ):
+            self.assertIn(snippet, source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,31 @@
+import io
 import os
+import random
 import tempfile
+import time
 import unittest
 
-from failure_taxonomy import classify_failure, quality_failure
+from failure_taxonomy import classify_failure, classify_failure_stream, quality_failure
+from failure_taxonomy_fixtures import (
+    COMPILE_SIGNALS,
+    TRANSLATE_SIGNALS,
+    reference_classify_failure,
+    reference_load_failure_records,
+    synthetic_log,
+    write_sidecars,
+)
 from paperhub.failure_reports import load_failure_records, summarize_failures
 from paperhub.json_io import write_json_atomic
 
 
+def _random_chunks(rng, text):
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 64)
+        yield text[position:position + size]
+        position += size
+
+
 class FailureTaxonomyTest(unittest.TestCase):
     def test_compile_categories_are_stable_and_actionable(self):
         missing = classify_failure(
@@ -167,6 +186,60 @@ class FailureTaxonomyTest(unittest.TestCase):
             self.assertEqual(record["retry_strategy"], "retry_translation")
             self.assertEqual(record["reclassified_from"], "compile.unknown")
 
+    def test_streaming_matches_whole_text_reference(self):
+        rng = random.Random(20261019)
+        signals = COMPILE_SIGNALS + TRANSLATE_SIGNALS
+        for index in range(400):
+            phase = rng.choice(("compile", "compile", "translate", "unknown"))
+            latex = synthetic_log(rng, rng.randint(0, 60), rng.choice((0.02, 0.1, 0.3)), signals)
+            plugin = synthetic_log(rng, rng.randint(0, 8), 0.3, signals) if rng.random() < 0.6 else ""
+            expected = reference_classify_failure(phase, latex, plugin)
+
+            self.assertEqual(classify_failure(phase, latex, plugin), expected, index)
+            self.assertEqual(
+                classify_failure_stream(phase, _random_chunks(rng, latex), _random_chunks(rng, plugin)),
+                expected,
+                index,
+            )
+            self.assertEqual(
+                classify_failure_stream(phase, io.BytesIO(latex.encode("utf-8")), io.StringIO(plugin)),
+                expected,
+                index,
+            )
+
+    def test_stream_stops_reading_once_the_verdict_is_fixed(self):
+        consumed = []
+
+        def chunks():
+            yield "! TeX capacity exceeded, sorry [input stack size=10000].\n" + "x" * 400 + "\n"
+            for index in range(1000):
+                consumed.append(index)
+                yield "Overfull \\hbox (12.3pt too wide) in paragraph\n" * 100
+
+        result = classify_failure_stream("compile", chunks())
+
+        self.assertEqual(result["category"], "compile.macro_recursion")
+        self.assertLessEqual(len(consumed), 1)
+
+    def test_failure_records_match_reference_and_stream_large_logs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_sidecars(tmp, random.Random(7), count=60, lines=300)
+            write_json_atomic(
+                os.path.join(tmp, "2610.99999.json"),
+                {"arxiv_id": "2610.99999", "category": "compile.unknown", "retry_strategy": "manual_review"},
+            )
+            with open(os.path.join(tmp, "2610.99999.log"), "w", encoding="utf-8") as handle:
+                handle.write(synthetic_log(random.Random(8), 40000, 0.0))
+
+            started = time.perf_counter()
+            records = load_failure_records(tmp)
+            elapsed = time.perf_counter() - started
+
+            self.assertEqual(records, reference_load_failure_records(tmp))
+            self.assertEqual(records[-1]["category"], "compile.unknown")
+            # 旧实现对约 2 MB 无错误日志逐条跑全部正则需要数秒
+            self.assertLess(elapsed, 1.0)
+
 
 if __name__ == "__main__":
     unittest.main()
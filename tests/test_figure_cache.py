@@ -0,0 +1,165 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import figure_cache as figs
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+class FigureCacheTest(unittest.TestCase):
+    def test_resolves_included_graphics_with_graphicspath_and_extensions(self):
+        with tempfile.TemporaryDirectory() as work:
+            _write(os.path.join(work, "figs", "plot.pdf"), b"%PDF-1.5")
+            _write(os.path.join(work, "teaser.png"), b"png")
+            tex = os.path.join(work, "merge_translate_zh.tex")
+            _write(tex, (
+                "\\graphicspath{{figs/}}\n"
+                "\\includegraphics[width=\\linewidth]{plot}\n"
+                "\\includegraphics{teaser.png}\n"
+                "% \\includegraphics{commented.png}\n"
+                "\\includegraphics{../escape.png}\n"
+            ).encode("utf-8"))
+
+            found = figs.referenced_graphics(work, [tex])
+
+        self.assertEqual(
+            [os.path.relpath(path, os.path.realpath(work)) for path in found],
+            [os.path.join("figs", "plot.pdf"), "teaser.png"],
+        )
+
+    def test_optimized_pdf_is_cached_and_reused_on_fresh_sources(self):
+        big = b"%PDF-1.5\n" + b"0" * (figs.PDF_MIN_BYTES + 10)
+
+        def shrink(src, dst, timeout):
+            _write(dst, b"%PDF-1.5 small")
+            return True
+
+        with tempfile.TemporaryDirectory() as work, tempfile.TemporaryDirectory() as cache:
+            fig = os.path.join(work, "big.pdf")
+            tex = os.path.join(work, "main.tex")
+            _write(fig, big)
+            _write(tex, b"\\includegraphics{big}\n")
+            with mock.patch.object(figs, "_recompress_pdf", side_effect=shrink) as run:
+                first = figs.optimize_workfolder_figures(work, cache, [tex])
+                _write(fig, big)   # source re-extracted by a --no-cache retry
+                second = figs.optimize_workfolder_figures(work, cache, [tex])
+
+            self.assertEqual(run.call_count, 1)
+            self.assertEqual(first["optimized"], 1)
+            self.assertEqual(second["cached"], 1)
+            with open(fig, "rb") as handle:
+                self.assertEqual(handle.read(), b"%PDF-1.5 small")
+
+    def test_unimprovable_figures_are_remembered(self):
+        big = b"%PDF-1.5\n" + b"1" * (figs.PDF_MIN_BYTES + 10)
+        with tempfile.TemporaryDirectory() as work, tempfile.TemporaryDirectory() as cache:
+            _write(os.path.join(work, "big.pdf"), big)
+            tex = os.path.join(work, "main.tex")
+            _write(tex, b"\\includegraphics{big.pdf}\n")
+            with mock.patch.object(figs, "_recompress_pdf", return_value=False) as run:
+                figs.optimize_workfolder_figures(work, cache, [tex])
+                figs.optimize_workfolder_figures(work, cache, [tex])
+
+            self.assertEqual(run.call_count, 1)
+
+    def test_eps_is_converted_once_and_explicit_references_rewritten(self):
+        def convert(src, dst, timeout):
+            _write(dst, b"%PDF-1.5 eps")
+            return True
+
+        with tempfile.TemporaryDirectory() as work, tempfile.TemporaryDirectory() as cache:
+            _write(os.path.join(work, "arch.eps"), b"%!PS-Adobe-3.0 EPSF")
+            tex = os.path.join(work, "main.tex")
+            _write(tex, b"\\includegraphics[scale=0.5]{arch.eps}\n")
+            with mock.patch.object(figs, "_convert_eps", side_effect=convert) as run:
+                stats = figs.optimize_workfolder_figures(work, cache, [tex])
+                _write(tex, b"\\includegraphics[scale=0.5]{arch.eps}\n")
+                again = figs.optimize_workfolder_figures(work, cache, [tex])
+
+            self.assertEqual(run.call_count, 1)
+            self.assertEqual(stats["eps_converted"], 1)
+            self.assertEqual(again["optimized"], 0)
+            with open(tex, encoding="utf-8") as handle:
+                self.assertEqual(handle.read(), "\\includegraphics[scale=0.5]{arch.pdf}\n")
+            self.assertTrue(os.path.exists(os.path.join(work, "arch.pdf")))
+
+    def test_eps_found_through_graphicspath_is_rewritten(self):
+        def convert(src, dst, timeout):
+            _write(dst, b"%PDF-1.5 eps")
+            return True
+
+        with tempfile.TemporaryDirectory() as work, tempfile.TemporaryDirectory() as cache:
+            _write(os.path.join(work, "figs", "plot.eps"), b"%!PS-Adobe-3.0 EPSF")
+            tex = os.path.join(work, "main.tex")
+            _write(tex, b"\\graphicspath{{figs/}}\n\\includegraphics{plot.eps}\n")
+            with mock.patch.object(figs, "_convert_eps", side_effect=convert):
+                stats = figs.optimize_workfolder_figures(work, cache, [tex])
+
+            self.assertEqual(stats["eps_converted"], 1)
+            self.assertTrue(os.path.exists(os.path.join(work, "figs", "plot.pdf")))
+            with open(tex, encoding="utf-8") as handle:
+                self.assertEqual(handle.read(), "\\graphicspath{{figs/}}\n\\includegraphics{plot.pdf}\n")
+
+    def test_author_pdf_beside_eps_is_not_substituted(self):
+        with tempfile.TemporaryDirectory() as work, tempfile.TemporaryDirectory() as cache:
+            _write(os.path.join(work, "arch.eps"), b"%!PS-Adobe-3.0 EPSF")
+            _write(os.path.join(work, "arch.pdf"), b"%PDF-1.5 author")
+            tex = os.path.join(work, "main.tex")
+            _write(tex, b"\\includegraphics{arch.eps}\n")
+            with mock.patch.object(figs, "_convert_eps") as run:
+                figs.optimize_workfolder_figures(work, cache, [tex])
+
+            run.assert_not_called()
+            with open(tex, encoding="utf-8") as handle:
+                self.assertIn("arch.eps", handle.read())
+
+    @unittest.skipUnless(figs.Image is not None, "Pillow not installed")
+    def test_raster_downscale_preserves_physical_size(self):
+        with tempfile.TemporaryDirectory() as work:
+            src = os.path.join(work, "photo.png")
+            dst = os.path.join(work, "small.png")
+            figs.Image.new("RGB", (4000, 2000), "white").save(src, dpi=(300, 300))
+            with open(src, "ab") as handle:
+                handle.write(os.urandom(1024))
+
+            figs._downscale_raster(src, dst, 2000)
+
+            with figs.Image.open(dst) as image:
+                self.assertEqual(image.size, (2000, 1000))
+                self.assertAlmostEqual(float(image.info["dpi"][0]), 150, delta=1)
+
+    def test_prune_drops_least_recently_used_entries(self):
+        with tempfile.TemporaryDirectory() as cache:
+            for idx in range(3):
+                path = os.path.join(cache, "ab", f"{idx}.png")
+                _write(path, b"x" * 10)
+                os.utime(path, (100 + idx, 100 + idx))
+
+            removed = figs.prune_figure_cache(cache, max_bytes=15)
+
+            self.assertEqual(removed, 2)
+            self.assertEqual(os.listdir(os.path.join(cache, "ab")), ["2.png"])
+
+    def test_env_knobs_are_bounded(self):
+        self.assertFalse(figs.figure_cache_enabled({"PAPER_TRANS_FIGURE_CACHE": "0"}))
+        self.assertEqual(figs.max_pixels_from_env({"PAPER_TRANS_FIGURE_MAX_PIXELS": "10"}), 800)
+        self.assertEqual(figs.max_pixels_from_env({}), figs.DEFAULT_MAX_PIXELS)
+
+    def test_driver_runs_figure_stage_before_compiles(self):
+        driver = os.path.join(os.path.dirname(os.path.dirname(__file__)), "full_translate_driver.py")
+        with open(driver, encoding="utf-8") as handle:
+            source = handle.read()
+
+        self.assertIn("import figure_cache as _figs", source)
+        self.assertIn("optimize_figures_before_compile(cwd)", source)
+        self.assertIn("optimize_figures_before_compile(workfolder, [trans_tex])", source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import full_translate_service as service
+import translate_full
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Stdout:
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+
+class FullTranslateServiceTest(unittest.TestCase):
+    def test_support_files_match_host_deployment(self):
+        self.assertEqual(
+            set(service.SUPPORT_FILES),
+            {os.path.basename(path) for path in translate_full.DRIVER_SUPPORT_FILES},
+        )
+
+    def test_submit_args_are_validated(self):
+        self.assertEqual(
+            service.parse_submit_args(["2610.00001", "--no-cache"]),
+            ["2610.00001", "--no-cache"],
+        )
+        self.assertIsNone(service.parse_submit_args(["../etc"]))
+        self.assertIsNone(service.parse_submit_args(["2610.00001", "--rm-rf"]))
+        self.assertIsNone(service.parse_submit_args(["2610.00001", "2610.00002"]))
+
+    def test_service_key_tracks_support_files_and_driver_env(self):
+        with tempfile.TemporaryDirectory() as base:
+            for name in service.SUPPORT_FILES:
+                with open(os.path.join(base, name), "w", encoding="utf-8") as handle:
+                    handle.write(name)
+            key = service.service_key({"PAPER_TRANS_LLM_MODEL": "a"}, base)
+            self.assertEqual(key, service.service_key({"PAPER_TRANS_LLM_MODEL": "a", "HOME": "/x"}, base))
+            self.assertNotEqual(key, service.service_key({"PAPER_TRANS_LLM_MODEL": "b"}, base))
+            with open(os.path.join(base, "figure_cache.py"), "a", encoding="utf-8") as handle:
+                handle.write("# changed\n")
+            self.assertNotEqual(key, service.service_key({"PAPER_TRANS_LLM_MODEL": "a"}, base))
+
+    def test_submit_reports_unavailable_without_service(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(service, "socket_path", return_value=os.path.join(tmp, "none.sock")), \
+                mock.patch("sys.stdout", new_callable=io.StringIO) as out:
+            rc = service.submit(["2610.00001"])
+
+        self.assertEqual(rc, service.UNAVAILABLE_EXIT_CODE)
+        self.assertTrue(out.getvalue().startswith("SERVICE:UNAVAILABLE"))
+        self.assertEqual(rc, translate_full.SERVICE_UNAVAILABLE_EXIT_CODE)
+
+    def test_submit_relays_output_and_returns_driver_exit_code(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "svc.sock")
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(path)
+            listener.listen(1)
+            received = []
+
+            def fake_service():
+                conn, _ = listener.accept()
+                received.append(conn.makefile("rb").readline())
+                conn.sendall(b"STEP:1\nRESULT:SUCCESS:/tmp/x.pdf\n")
+                conn.sendall(service.EXIT_MARKER + b"0\n")
+                conn.close()
+
+            thread = threading.Thread(target=fake_service)
+            thread.start()
+            stdout = _Stdout()
+            with mock.patch.object(service, "socket_path", return_value=path), \
+                    mock.patch("sys.stdout", stdout):
+                rc = service.submit(["2610.00001", "--keep-translation"])
+            thread.join(5)
+            listener.close()
+
+        self.assertEqual(rc, 0)
+        self.assertIn(b'"2610.00001", "--keep-translation"', received[0])
+        self.assertEqual(stdout.buffer.getvalue(), b"STEP:1\nRESULT:SUCCESS:/tmp/x.pdf\n")
+
+    def test_driver_exposes_job_entrypoints_for_the_service(self):
+        with open(os.path.join(ROOT, "full_translate_driver.py"), encoding="utf-8") as handle:
+            source = handle.read()
+
+        self.assertIn("def configure_job(", source)
+        self.assertIn("def main(", source)
+        self.assertIn('if __name__ == "__main__":', source)
+
+
+class RunInContainerServiceTest(unittest.TestCase):
+    def test_unavailable_service_is_started_and_paper_falls_back_to_launcher(self):
+        calls = []
+
+        def stream(cmd, arxiv_id, timeout):
+            calls.append(cmd)
+            if len(calls) == 1:
+                return service.UNAVAILABLE_EXIT_CODE, "SERVICE:UNAVAILABLE:FileNotFoundError\n", ""
+            return 0, "RESULT:SUCCESS:/tmp/x.pdf\n", ""
+
+        with mock.patch.dict(os.environ, {"PAPER_TRANS_DRIVER_SERVICE": "1"}), \
+                mock.patch.object(translate_full, "_stream_container_command", side_effect=stream), \
+                mock.patch.object(translate_full, "_start_container_service", return_value=True) as start:
+            rc, stdout, _ = translate_full.run_in_container("2610.00001", True, 60)
+
+        self.assertEqual(rc, 0)
+        start.assert_called_once()
+        self.assertIn("submit", calls[0])
+        self.assertEqual(calls[0][-2:], ["2610.00001", "--no-cache"])
+        self.assertEqual(calls[1], translate_full._container_driver_command("2610.00001") + ["--no-cache"])
+
+    def test_service_can_be_disabled(self):
+        with mock.patch.dict(os.environ, {"PAPER_TRANS_DRIVER_SERVICE": "off"}), \
+                mock.patch.object(translate_full, "_stream_container_command", return_value=(0, "", "")) as stream:
+            translate_full.run_in_container("2610.00001", False, 60)
+
+        self.assertNotIn("submit", stream.call_args[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
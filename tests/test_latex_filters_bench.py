@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import latex_filters_bench as bench  # noqa: E402
+
+
+def _result(us_per_kb=100.0, worst=200.0, growth=4.1, calibration=1000.0):
+    return {
+        "calibration_us": calibration,
+        "functions": [{
+            "function": "llm_translation_response_invalid",
+            "us_per_kb": us_per_kb,
+            "worst_case": "long_english_line",
+            "worst_us_per_kb": worst,
+            "growth_ratio": growth,
+            "growth_case": "long_english_line",
+            "cases": [],
+        }],
+    }
+
+
+_BASELINE = {
+    "calibration_us": 1000.0,
+    "threshold": 0.5,
+    "growth_limit": 8.0,
+    "functions": {
+        "llm_translation_response_invalid": {"us_per_kb": 100.0, "budget_us_per_kb": 1000.0},
+    },
+}
+
+
+class LatexFiltersBenchTest(unittest.TestCase):
+    def test_corpus_covers_every_function_with_adversarial_cases(self):
+        documents, chunks = bench.load_corpus()
+        cases = bench.build_cases(documents, chunks, size=512)
+
+        self.assertIn("translated_paper", documents)
+        self.assertTrue(chunks)
+        for name in bench.FUNCTIONS:
+            self.assertTrue(any(generator for _, _, _, generator in cases[name]), name)
+
+    def test_within_threshold_passes(self):
+        self.assertEqual(bench.compare(_result(us_per_kb=140.0), _BASELINE), [])
+
+    def test_regression_budget_and_growth_are_reported(self):
+        failures = bench.compare(_result(us_per_kb=160.0, worst=1200.0, growth=16.0), _BASELINE)
+
+        self.assertEqual(len(failures), 3)
+        self.assertIn("慢 60%", failures[0])
+        self.assertIn("超出预算", failures[1])
+        self.assertIn("超线性", failures[2])
+
+    def test_timings_are_normalized_by_calibration(self):
+        # 本机慢一倍：原始 200 µs/KB 换算后等于基线
+        self.assertEqual(bench.compare(_result(us_per_kb=200.0, calibration=2000.0), _BASELINE), [])
+
+    def test_per_function_calibration_takes_precedence(self):
+        result = _result(us_per_kb=200.0, calibration=1000.0)
+        result["functions"][0]["calibration_us"] = 2000.0
+
+        self.assertEqual(bench.compare(result, _BASELINE), [])
+
+    def test_updating_baseline_keeps_hand_set_budgets(self):
+        updated = bench.updated_baseline(_result(us_per_kb=90.0, calibration=900.0), _BASELINE)
+
+        entry = updated["functions"]["llm_translation_response_invalid"]
+        self.assertEqual(entry, {"us_per_kb": 90.0, "budget_us_per_kb": 1000.0, "calibration_us": 900.0})
+        self.assertEqual(updated["calibration_us"], 900.0)
+
+    def test_recorded_baseline_lists_every_function(self):
+        baseline = bench.load_baseline()
+
+        self.assertEqual(set(baseline["functions"]), set(bench.FUNCTIONS))
+
+
+if __name__ == "__main__":
+    unittest.main()
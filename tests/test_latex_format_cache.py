@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import latex_format_cache as lfc
+
+
+TRANSLATED = (
+    "\\documentclass[fontset=windows,UTF8]{article}\n"
+    "\\usepackage{ctex}\n"
+    "\\usepackage{url}\n"
+    "\\usepackage{tikz} % heavy\n"
+    "\\usepackage{hyperref}\n"
+    "\\usepackage{fontawesome5}\n"
+    "\\newcommand{\\method}{Ours}\n"
+    "\\begin{document}\n"
+    "正文。\n"
+    "\\end{document}\n"
+)
+
+
+class LatexFormatCacheTest(unittest.TestCase):
+    def test_dump_stops_before_fonts_and_moves_injected_ctex(self):
+        prefix, compile_source = lfc.split_dumpable_preamble(TRANSLATED)
+
+        self.assertIn("\\usepackage{tikz}", prefix)
+        self.assertIn("\\usepackage{hyperref}", prefix)
+        self.assertNotIn("ctex", prefix.split("\n", 1)[1])
+        self.assertNotIn("fontawesome5", prefix)
+        self.assertTrue(compile_source.startswith(prefix + lfc.DUMP_MARKER + "\n\\usepackage{ctex}\n"))
+        self.assertIn("\\usepackage{fontawesome5}\n\\newcommand", compile_source)
+        self.assertTrue(compile_source.endswith("正文。\n\\end{document}\n"))
+
+    def test_font_classes_and_class_only_preambles_are_not_dumped(self):
+        self.assertIsNone(lfc.split_dumpable_preamble(
+            "\\documentclass{ctexart}\n\\usepackage{amsmath}\n\\begin{document}\n\\end{document}\n"
+        ))
+        self.assertIsNone(lfc.split_dumpable_preamble(
+            "\\documentclass{article}\n\\usepackage{ctex}\n\\setmainfont{Times}\n\\begin{document}\n\\end{document}\n"
+        ))
+        self.assertIsNone(lfc.split_dumpable_preamble(
+            "\\RequirePackage{fix-cm}\n\\documentclass{article}\n\\usepackage{amsmath}\n\\begin{document}\n\\end{document}\n"
+        ))
+
+    def test_commented_font_lines_do_not_cut_the_dump(self):
+        source = (
+            "\\documentclass{article}\n"
+            "% \\usepackage{fontspec}\n"
+            "\\usepackage{amsmath,xeCJK}\n"
+            "\\begin{document}\n\\end{document}\n"
+        )
+        prefix, _compile_source = lfc.split_dumpable_preamble(source)
+
+        self.assertIn("% \\usepackage{fontspec}", prefix)
+        self.assertNotIn("xeCJK", prefix)
+
+    def test_key_tracks_preamble_tex_version_and_local_styles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sty = os.path.join(tmp, "neurips_2026.sty")
+            with open(sty, "w", encoding="utf-8") as handle:
+                handle.write("\\ProvidesPackage{neurips_2026}\n")
+            styles = lfc.local_style_files(tmp)
+            base = lfc.format_cache_key("pre", "XeTeX 3.141592653", styles, tmp)
+
+            self.assertEqual(base, lfc.format_cache_key("pre", "XeTeX 3.141592653", styles, tmp))
+            self.assertNotEqual(base, lfc.format_cache_key("pre2", "XeTeX 3.141592653", styles, tmp))
+            self.assertNotEqual(base, lfc.format_cache_key("pre", "XeTeX 3.2", styles, tmp))
+            with open(sty, "a", encoding="utf-8") as handle:
+                handle.write("% changed\n")
+            self.assertNotEqual(base, lfc.format_cache_key("pre", "XeTeX 3.141592653", styles, tmp))
+
+    def test_cache_hit_writes_compile_source_without_dumping(self):
+        with tempfile.TemporaryDirectory() as workfolder, tempfile.TemporaryDirectory() as cache:
+            with open(os.path.join(workfolder, "merge_translate_zh.tex"), "w", encoding="utf-8") as handle:
+                handle.write(TRANSLATED)
+            prefix, _source = lfc.split_dumpable_preamble(TRANSLATED)
+            name = lfc.format_cache_key(prefix, "XeTeX test", [], workfolder)
+            with open(lfc.format_path(cache, name), "wb") as handle:
+                handle.write(b"fmt")
+
+            with mock.patch.object(lfc, "tex_engine_version", return_value="XeTeX test"), \
+                    mock.patch.object(lfc.subprocess, "run") as run:
+                result = lfc.prepare_xelatex_format(workfolder, cache, {})
+
+            run.assert_not_called()
+            self.assertEqual(result["name"], name)
+            self.assertTrue(result["hit"])
+            self.assertTrue(os.path.exists(os.path.join(workfolder, lfc.FORMAT_SOURCE_NAME)))
+            env = lfc.format_env({"PATH": "/bin"}, cache)
+            self.assertEqual(env["TEXFORMATS"], cache + ":")
+
+    def test_prune_keeps_most_recent_formats(self):
+        with tempfile.TemporaryDirectory() as cache:
+            for idx in range(4):
+                path = os.path.join(cache, f"f{idx}.fmt")
+                with open(path, "wb") as handle:
+                    handle.write(b"x")
+                os.utime(path, (1000 + idx, 1000 + idx))
+
+            removed = lfc.prune_format_cache(cache, max_entries=2)
+
+            self.assertEqual(sorted(os.path.basename(p) for p in removed), ["f0.fmt", "f1.fmt"])
+            self.assertEqual(sorted(os.listdir(cache)), ["f2.fmt", "f3.fmt"])
+
+    def test_cache_can_be_disabled_from_the_environment(self):
+        self.assertTrue(lfc.format_cache_enabled({}))
+        self.assertFalse(lfc.format_cache_enabled({"PAPER_TRANS_LATEX_FORMAT_CACHE": "off"}))
+
+    def test_driver_uses_format_for_xelatex_passes_with_fallback(self):
+        driver = os.path.join(os.path.dirname(os.path.dirname(__file__)), "full_translate_driver.py")
+        with open(driver, encoding="utf-8") as handle:
+            source = handle.read()
+
+        self.assertIn("import latex_format_cache as _lfc", source)
+        self.assertIn("_lfc.prepare_xelatex_format(", source)
+        self.assertIn("_lfc.discard_format(", source)
+        self.assertIn("'-jobname=merge_translate_zh'", source)
+
+
+if __name__ == "__main__":
+    unittest.main()
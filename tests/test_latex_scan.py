@@ -0,0 +1,162 @@
+import random
+import re
+import unittest
+
+import latex_translation_filters as filters
+from paperhub.latex_scan import LatexScan
+
+
+def _reference_strip_comment(line):
+    # 迁移前各扫描器逐字符查找未转义 % 的写法（冻结副本，用于等价性对照）
+    for index, char in enumerate(line):
+        if char != "%":
+            continue
+        backslashes = 0
+        cursor = index - 1
+        while cursor >= 0 and line[cursor] == "\\":
+            backslashes += 1
+            cursor -= 1
+        if backslashes % 2 == 0:
+            return line[:index]
+    return line
+
+
+def _reference_brace_balance(text):
+    balance = 0
+    stripped = "".join(
+        _reference_strip_comment(line)
+        for line in text.splitlines(keepends=True)
+    )
+    for line in stripped.splitlines(keepends=True):
+        for index, char in enumerate(line):
+            if char not in "{}":
+                continue
+            slashes = len(line[:index]) - len(line[:index].rstrip("\\"))
+            if slashes % 2:
+                continue
+            balance += 1 if char == "{" else -1
+    return balance
+
+
+def _reference_find_uncommented(text, token):
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        position = _reference_strip_comment(line).find(token)
+        if position >= 0:
+            return offset + position
+        offset += len(line)
+    return -1
+
+
+_PIECES = [
+    "\\begin{figure}", "\\end{figure}", "\\begin{document}", "\\end{document}",
+    "\\begin{itemize}", "\\end{itemize}", "%", "\\%", "\\\\%", "\\\\\\%",
+    "{", "}", "\\{", "\\}", "\\\\{", "text ", "中文", "\n", "\r\n", "\r",
+    "\u2028", "\\item ", "\\begin{tab", "ular}", "\\end{", "\\begin{a{b}",
+    "x}", "  ", "\\section{Intro}", "\\", "\\\\", "\\begin{}", "$x$",
+]
+
+
+def _random_snippets(count=3000, seed=20261019):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 60)))
+        for _ in range(count)
+    ]
+
+
+class LatexScanTest(unittest.TestCase):
+    def test_comment_spans_and_code(self):
+        scan = LatexScan("a 50\\% rate % note\n\\\\% comment\nplain\n")
+
+        self.assertEqual(len(scan), 3)
+        self.assertEqual(scan.code(0), "a 50\\% rate ")
+        self.assertEqual(scan.code(1), "\\\\")
+        self.assertFalse(scan.has_comment(2))
+        self.assertEqual(scan.code(2), "plain")
+        self.assertEqual(scan.code(2, keepends=True), "plain\n")
+        self.assertEqual(scan.without_comments(), "a 50\\% rate \\\\plain\n")
+
+    def test_environment_events_and_document_body(self):
+        scan = LatexScan(
+            "\\documentclass{article}\n"
+            "% \\begin{document}\n"
+            "\\begin{document}\n"
+            "\\begin{figure}\\end{figure} % \\end{table}\n"
+            "\\end{document}\n"
+        )
+
+        self.assertEqual(scan.body_start, 2)
+        self.assertEqual(scan.body_end, 4)
+        self.assertEqual(scan.events(3), [(True, "figure"), (False, "figure"), (False, "table")])
+        self.assertEqual(scan.ends(3, code_only=True), ["figure"])
+        self.assertEqual(scan.begins(1), ["document"])
+        self.assertEqual(scan.begins(1, code_only=True), [])
+
+    def test_overlapping_names_follow_combined_and_separate_regexes(self):
+        scan = LatexScan("\\end{\\begin{figure}\n")
+
+        self.assertEqual(scan.events(0), [(False, "\\begin{figure")])
+        self.assertEqual(scan.begins(0), ["figure"])
+        self.assertEqual(scan.ends(0), ["\\begin{figure"])
+
+    def test_brace_depth_ignores_escapes_and_comments(self):
+        scan = LatexScan("\\title{A \\{ B\n% }\nC}}\n")
+
+        self.assertEqual(list(scan.depth_before), [0, 1, 1])
+        self.assertEqual(scan.final_depth, -1)
+
+    def test_empty_text(self):
+        scan = LatexScan("")
+
+        self.assertEqual(len(scan), 0)
+        self.assertIsNone(scan.body_start)
+        self.assertEqual(scan.without_comments(), "")
+        self.assertEqual(scan.find_uncommented("%"), -1)
+
+    def test_matches_per_line_scanners_on_random_snippets(self):
+        for text in _random_snippets():
+            scan = LatexScan(text)
+            raw_lines = text.splitlines(keepends=True)
+            self.assertEqual(len(scan), len(raw_lines))
+            for index, raw in enumerate(raw_lines):
+                code = _reference_strip_comment(text.splitlines()[index])
+                self.assertEqual(scan.line(index), raw)
+                self.assertEqual(scan.code(index), code, text)
+                self.assertEqual(
+                    scan.events(index),
+                    [
+                        (action == "begin", name)
+                        for action, name in re.findall(r"\\(begin|end)\{([^}]+)\}", raw)
+                    ],
+                    text,
+                )
+                self.assertEqual(scan.begins(index), re.findall(r"\\begin\{([^}]+)\}", raw), text)
+                self.assertEqual(
+                    scan.begins(index, code_only=True),
+                    re.findall(r"\\begin\{([^}]+)\}", code),
+                    text,
+                )
+                self.assertEqual(
+                    scan.ends(index, code_only=True),
+                    re.findall(r"\\end\{([^}]+)\}", code),
+                    text,
+                )
+            self.assertEqual(scan.final_depth, _reference_brace_balance(text), text)
+            for token in ("\\begin{document}", "%", "{", "x}"):
+                self.assertEqual(
+                    scan.find_uncommented(token),
+                    _reference_find_uncommented(text, token),
+                    (text, token),
+                )
+
+    def test_filters_delegate_to_the_scan(self):
+        text = "\\newcommand{\\x}{1} % \\usepackage{y}\n\\begin{document}\n"
+
+        self.assertEqual(filters.find_uncommented_latex_token(text, "\\usepackage"), -1)
+        self.assertEqual(filters.find_uncommented_latex_token(text, "\\begin{document}"), 36)
+        self.assertEqual(filters._unescaped_brace_balance("{a} {b % }\n"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import io
 import os
 import tarfile
 import tempfile
+import time
 import unittest
 from unittest import mock
 
@@ -499,6 +500,20 @@ Language: Chinese
             "translation_task_echo",
         )
 
+    def test_task_echo_check_is_linear_on_long_responses(self):
+        prose = "模型检索证据 the model retrieves evidence and reranks it. " * 2500
+        echo = "Language: Chinese\nTask: English to Chinese\nClassification: Academic Translation\n"
+
+        started = time.perf_counter()
+        clean = filters.llm_translation_response_invalid(prose, prose)
+        echoed = filters.llm_translation_response_invalid(prose, prose + echo)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(clean, "")
+        self.assertEqual(echoed, "translation_task_echo")
+        # 未锚定时每个偏移都重跑整串 lookahead，这一长度需要数十秒
+        self.assertLess(elapsed, 5.0)
+
     def test_single_line_code_output_instruction_is_protected_and_bounded(self):
         instructions = (
             (
@@ -2103,5 +2118,63 @@ Language: Chinese
         self.assertLess(fixed.index("paper-trans reset ACM"), fixed.index(r"\end{document}"))
 
 
+    def test_token_estimate_counts_words_cjk_and_latex_symbols(self):
+        self.assertEqual(filters.estimate_translation_tokens(""), 0)
+        self.assertEqual(filters.estimate_translation_tokens("translation model"), 5)
+        self.assertEqual(filters.estimate_translation_tokens(r"\emph{x} 中文"), 7)
+
+    def test_translation_packs_stay_within_budget_and_structural_units(self):
+        sentence = "We evaluate the proposed method on several benchmarks. "
+        sources = [
+            sentence,
+            sentence,
+            sentence * 30,
+            sentence,
+            r"\subsection{Results} " + sentence,
+            sentence,
+            r"Prior work \cite{a} and \citep{b} differs.",
+            sentence,
+        ]
+        prompts = ["zh"] * len(sources)
+        prompts[7] = "retry"
+
+        packs = filters.plan_translation_packs(sources, 120, prompts)
+
+        self.assertEqual(packs, [[0, 1], [2], [3], [4, 5], [6], [7]])
+        self.assertEqual(
+            filters.plan_translation_packs(sources, 0, prompts),
+            [[index] for index in range(len(sources))],
+        )
+        self.assertEqual(
+            filters.plan_translation_packs([sentence] * 5, 10 ** 6, max_segments=2),
+            [[0, 1], [2, 3], [4]],
+        )
+
+    def test_packed_translation_round_trips_markers_and_boundary_whitespace(self):
+        sources = ["First paragraph.\n\n", "\nSecond one."]
+        packed = filters.build_packed_translation_input("Translate:\n\n", sources)
+        self.assertTrue(packed.startswith("Translate:\n\n%%% PAPER_TRANS_SEGMENT 1 %%%\n"))
+
+        response = (
+            "%%% PAPER_TRANS_SEGMENT 1 %%%\n第一段。\n"
+            "  %%% PAPER_TRANS_SEGMENT 2 %%%  \n第二段。\n"
+        )
+        self.assertEqual(
+            filters.split_packed_translation_response(response, sources),
+            ["第一段。\n\n", "\n第二段。"],
+        )
+
+    def test_packed_translation_rejects_lost_or_reordered_markers(self):
+        sources = ["a", "b"]
+        for response in (
+            "%%% PAPER_TRANS_SEGMENT 1 %%%\n第一段和第二段。",
+            "%%% PAPER_TRANS_SEGMENT 2 %%%\n乙\n%%% PAPER_TRANS_SEGMENT 1 %%%\n甲",
+            "译文如下：\n%%% PAPER_TRANS_SEGMENT 1 %%%\n甲\n%%% PAPER_TRANS_SEGMENT 2 %%%\n乙",
+            "",
+        ):
+            with self.subTest(response=response):
+                self.assertIsNone(filters.split_packed_translation_response(response, sources))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,303 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import llm_concurrency as llm_conc
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LimitsFromEnvTest(unittest.TestCase):
+    def test_workers_env_is_initial_limit_bounded_by_ceiling(self):
+        self.assertEqual(llm_conc.limits_from_env({}), (2, 8))
+        self.assertEqual(
+            llm_conc.limits_from_env({"PAPER_TRANS_LLM_WORKERS": "12", "PAPER_TRANS_LLM_MAX_WORKERS": "6"}),
+            (6, 6),
+        )
+        self.assertEqual(
+            llm_conc.limits_from_env({"PAPER_TRANS_LLM_MAX_WORKERS": "99"}),
+            (2, llm_conc.HARD_MAX_LIMIT),
+        )
+        self.assertEqual(llm_conc.limits_from_env({"PAPER_TRANS_LLM_WORKERS": "x"}), (2, 8))
+
+    def test_adaptive_switch(self):
+        self.assertTrue(llm_conc.adaptive_enabled({}))
+        self.assertFalse(llm_conc.adaptive_enabled({"PAPER_TRANS_LLM_ADAPTIVE": "0"}))
+        self.assertFalse(llm_conc.adaptive_enabled({"PAPER_TRANS_LLM_ADAPTIVE": "off"}))
+
+    def test_throttle_markers_include_quota_failures(self):
+        self.assertTrue(llm_conc.is_throttled("429 Client Error: Too Many Requests for url"))
+        self.assertTrue(llm_conc.is_throttled('{"error": {"code": "insufficient_user_quota"}}'))
+        self.assertFalse(llm_conc.is_throttled("这是翻译后的中文段落。"))
+
+
+class AimdLimiterTest(unittest.TestCase):
+    def test_success_increases_additively_and_throttle_halves_once_per_cooldown(self):
+        clock = FakeClock()
+        limiter = llm_conc.AimdLimiter(None, initial=2, maximum=8, clock=clock, cooldown=10)
+        for _ in range(2):
+            limiter.call(lambda: "中文")
+        self.assertAlmostEqual(limiter.limit, 2.0 + 1 / 2 + 1 / 2.5)
+
+        for _ in range(3):
+            limiter.call(lambda: "[Local Message] Error code: 429 - Rate limit reached")
+        self.assertAlmostEqual(limiter.limit, (2.0 + 1 / 2 + 1 / 2.5) / 2)
+        self.assertEqual(limiter.throttles, 3)
+
+        clock.now += 11
+        with self.assertRaises(RuntimeError):
+            limiter.call(self._raise_429)
+        self.assertEqual(limiter.limit, llm_conc.MIN_LIMIT)
+
+    @staticmethod
+    def _raise_429():
+        raise RuntimeError("429 Client Error: Too Many Requests")
+
+    def test_limit_is_clamped_to_ceiling_and_errors_do_not_adjust(self):
+        limiter = llm_conc.AimdLimiter(None, initial=3, maximum=3)
+        limiter.call(lambda: "中文")
+        self.assertEqual(limiter.limit, 3.0)
+        limiter.call(lambda: "")
+        with self.assertRaises(ValueError):
+            limiter.call(self._raise_value_error)
+        self.assertEqual(limiter.limit, 3.0)
+        self.assertEqual(limiter._inflight, 0)
+
+    @staticmethod
+    def _raise_value_error():
+        raise ValueError("boom")
+
+    def test_gate_caps_in_flight_requests_at_current_limit(self):
+        limiter = llm_conc.AimdLimiter(None, initial=2, maximum=2)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def request():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return "中文"
+
+        threads = [threading.Thread(target=limiter.call, args=(request,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 2)
+
+
+class SharedStateTest(unittest.TestCase):
+    def test_limit_is_persisted_and_adopted_by_next_driver(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "gpt_log", "llm_concurrency.json")
+            clock = FakeClock()
+            first = llm_conc.AimdLimiter(state, initial=4, maximum=8, clock=clock)
+            first.call(lambda: "Error code: 429")
+            with open(state, encoding="utf-8") as handle:
+                self.assertEqual(json.load(handle)["limit"], 2.0)
+
+            second = llm_conc.AimdLimiter(state, initial=4, maximum=8, clock=clock)
+            second.acquire()
+            self.assertEqual(second.limit, 2.0)
+            second.release("error")
+
+    def test_stale_state_falls_back_to_initial_limit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "llm_concurrency.json")
+            with open(state, "w", encoding="utf-8") as handle:
+                json.dump({"limit": 1.0, "updated": 0, "drivers": {}}, handle)
+            limiter = llm_conc.AimdLimiter(state, initial=3, maximum=8, clock=FakeClock(10 ** 6))
+            limiter.acquire()
+            limiter.release("error")
+            self.assertEqual(limiter.limit, 3.0)
+
+    def test_budget_is_split_across_live_drivers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "llm_concurrency.json")
+            clock = FakeClock()
+            # 另一个存活驱动（父进程）与一个早已退出的驱动
+            with open(state, "w", encoding="utf-8") as handle:
+                json.dump({
+                    "limit": 6.0,
+                    "updated": clock.now,
+                    "drivers": {str(os.getppid()): clock.now, "999999999": clock.now},
+                }, handle)
+            limiter = llm_conc.AimdLimiter(state, initial=2, maximum=8, clock=clock)
+            limiter.acquire()
+            limiter.release("error")
+            self.assertEqual(limiter.local_cap(), 3)
+            with open(state, encoding="utf-8") as handle:
+                drivers = json.load(handle)["drivers"]
+            self.assertEqual(set(drivers), {str(os.getppid()), str(os.getpid())})
+
+    def test_successes_are_published_in_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "llm_concurrency.json")
+            clock = FakeClock()
+            limiter = llm_conc.AimdLimiter(state, initial=2, maximum=16, clock=clock)
+            limiter.acquire()
+            limiter.release("error")
+            with patch("llm_concurrency.os.replace", wraps=os.replace) as replace:
+                for _ in range(llm_conc.SYNC_EVERY_SUCCESSES - 1):
+                    limiter.call(lambda: "中文")
+                # 增长立即在本地生效，但尚未写状态文件
+                self.assertGreater(limiter.limit, 2.0)
+                self.assertEqual(replace.call_count, 0)
+                limiter.call(lambda: "中文")
+                self.assertEqual(replace.call_count, 1)
+            expected = 2.0
+            for _ in range(llm_conc.SYNC_EVERY_SUCCESSES):
+                expected += 1 / expected
+            with open(state, encoding="utf-8") as handle:
+                self.assertAlmostEqual(json.load(handle)["limit"], expected)
+            self.assertAlmostEqual(limiter.limit, expected)
+
+            limiter.call(lambda: "中文")
+            clock.now += llm_conc.SYNC_INTERVAL_SECONDS
+            limiter.acquire()
+            limiter.release("error")
+            with open(state, encoding="utf-8") as handle:
+                self.assertAlmostEqual(json.load(handle)["limit"], expected + 1 / expected)
+
+    def test_state_file_io_runs_outside_the_gate_condition(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "llm_concurrency.json")
+            limiter = llm_conc.AimdLimiter(state, initial=4, maximum=8, clock=FakeClock())
+            limiter.acquire()
+            free = []
+
+            def probe():
+                acquired = limiter._cond.acquire(timeout=1)
+                if acquired:
+                    limiter._cond.release()
+                free.append(acquired)
+
+            def replace(src, dst):
+                # 写状态文件期间，其他线程仍能拿到限流门的条件锁
+                thread = threading.Thread(target=probe)
+                thread.start()
+                thread.join()
+                os.rename(src, dst)
+
+            with patch("llm_concurrency.os.replace", side_effect=replace):
+                limiter.release("throttled")
+            self.assertEqual(free, [True])
+            self.assertEqual(limiter.limit, 2.0)
+
+    def test_concurrent_drivers_share_one_cut_per_cooldown(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "llm_concurrency.json")
+            clock = FakeClock()
+            first = llm_conc.AimdLimiter(state, initial=8, maximum=8, clock=clock)
+            second = llm_conc.AimdLimiter(state, initial=8, maximum=8, clock=clock)
+            for limiter in (first, second):
+                limiter.acquire()
+                limiter.release("error")
+
+            first.call(lambda: "Error code: 429")
+            clock.now += 1
+            second.call(lambda: "Error code: 429")
+            with open(state, encoding="utf-8") as handle:
+                self.assertEqual(json.load(handle)["limit"], 4.0)
+            self.assertEqual(second.limit, 4.0)
+
+            clock.now += llm_conc.DECREASE_COOLDOWN_SECONDS
+            second.call(lambda: "Error code: 429")
+            self.assertEqual(second.limit, 2.0)
+
+
+def _upstream_predict(delays, calls):
+    """Stand-in for ``predict_no_ui_long_connection`` honouring the watchdog slot."""
+
+    def predict(inputs, llm_kwargs=None, history=None, sys_prompt="", observe_window=None,
+                console_slience=False):
+        index = len(calls)
+        calls.append(observe_window)
+        delay, first_token = delays[index]
+        deadline = time.time() + delay
+        while time.time() < deadline:
+            if first_token is not None and time.time() >= deadline - delay + first_token:
+                observe_window[0] = f"partial-{index}"
+            if time.time() - observe_window[1] > 5:
+                raise RuntimeError("用户取消了程序。")
+            time.sleep(0.005)
+        return f"译文-{index}"
+
+    return predict
+
+
+class HedgingTest(unittest.TestCase):
+    def test_hedge_settings_from_env(self):
+        self.assertEqual(llm_conc.hedge_settings_from_env({}), (0.1, 45))
+        self.assertEqual(
+            llm_conc.hedge_settings_from_env({"PAPER_TRANS_LLM_HEDGE_BUDGET": "0", "PAPER_TRANS_LLM_TTFT_SECONDS": "1"}),
+            (0.0, 5),
+        )
+
+    def test_latency_tracker_reports_p90_per_size_bucket(self):
+        tracker = llm_conc.LatencyTracker(min_samples=5)
+        for seconds in (1, 2, 3, 4):
+            tracker.record(500, seconds)
+        self.assertIsNone(tracker.threshold(500))
+        for seconds in range(5, 11):
+            tracker.record(500, seconds)
+        self.assertEqual(tracker.threshold(800), 9.0)
+        self.assertIsNone(tracker.threshold(5000))
+
+    def test_slow_request_is_hedged_and_loser_cancelled(self):
+        tracker = llm_conc.LatencyTracker(min_samples=1)
+        tracker.record(10, 0.05)
+        hedger = llm_conc.HedgedCaller(budget=1.0, ttft_seconds=60, tracker=tracker, poll_seconds=0.01)
+        calls = []
+        predict = _upstream_predict([(2.0, 0.0), (0.05, 0.0)], calls)
+        window = ["", time.time(), ""]
+
+        result = hedger.call(predict, inputs="short text", llm_kwargs={}, history=[],
+                             sys_prompt="", observe_window=window)
+
+        self.assertEqual(result, "译文-1")
+        self.assertEqual((hedger.hedges, hedger.hedge_wins), (1, 1))
+        self.assertEqual(calls[0][1], 0)
+        self.assertEqual(window[0], "partial-0")
+
+    def test_stalled_request_without_first_token_is_hedged(self):
+        hedger = llm_conc.HedgedCaller(budget=1.0, ttft_seconds=0.05, poll_seconds=0.01)
+        calls = []
+        predict = _upstream_predict([(2.0, None), (0.02, 0.0)], calls)
+
+        self.assertEqual(hedger.call(predict, "text", {}, [], "", ["", time.time()]), "译文-1")
+        self.assertEqual(hedger.hedges, 1)
+
+    def test_budget_bounds_hedges_and_fast_requests_are_not_duplicated(self):
+        hedger = llm_conc.HedgedCaller(budget=0.0, ttft_seconds=0.01, poll_seconds=0.01)
+        calls = []
+        predict = _upstream_predict([(0.1, None)], calls)
+        self.assertEqual(hedger.call(predict, inputs="text", observe_window=["", time.time()]), "译文-0")
+        self.assertEqual((len(calls), hedger.hedges), (1, 0))
+
+    def test_errors_propagate_when_every_attempt_fails(self):
+        hedger = llm_conc.HedgedCaller(budget=1.0, ttft_seconds=60, poll_seconds=0.01)
+
+        def predict(*args, **kwargs):
+            raise ConnectionError("429 Client Error: Too Many Requests")
+
+        with self.assertRaises(ConnectionError):
+            hedger.call(predict, inputs="text")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import llm_router
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _endpoint(name, clock, **kwargs):
+    return llm_router.Endpoint(name, f"https://{name}.test/v1", f"key-{name}", clock=clock, **kwargs)
+
+
+class LoadConfigPoolTest(unittest.TestCase):
+    def _write(self, directory, lines):
+        path = os.path.join(directory, "config_private.py")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+        return path
+
+    def test_primary_endpoint_joins_configured_pool_without_duplicates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, [
+                'API_KEY="primary-key"',
+                'API_URL_REDIRECT={"https://api.openai.com/v1/chat/completions": "https://relay.test/v1/chat/completions"}',
+                "PAPER_TRANS_LLM_ENDPOINTS=" + json.dumps([
+                    {"api_base": "https://relay.test/v1", "api_key": "primary-key"},
+                    {"name": "backup", "api_base": "https://backup.test/v1", "api_key": "k2", "weight": 2, "rpm": 30},
+                    {"api_base": "https://broken.test/v1"},
+                ]),
+            ])
+
+            endpoints = llm_router.load_config_pool(path)
+
+        self.assertEqual([endpoint.name for endpoint in endpoints], ["primary", "backup"])
+        self.assertEqual(endpoints[1].url, "https://backup.test/v1/chat/completions")
+        self.assertEqual((endpoints[1].weight, endpoints[1].rpm), (2.0, 30))
+
+    def test_without_pool_routing_stays_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, ['API_KEY="k"', 'API_URL_REDIRECT={"a": "https://a.test/v1"}'])
+            self.assertEqual(llm_router.load_config_pool(path), [])
+        self.assertEqual(llm_router.load_config_pool("/nonexistent/config_private.py"), [])
+
+
+class LlmRouterTest(unittest.TestCase):
+    def test_prefers_faster_healthier_endpoint_and_spreads_inflight_load(self):
+        clock = FakeClock()
+        fast, slow = _endpoint("fast", clock), _endpoint("slow", clock)
+        router = llm_router.LlmRouter([slow, fast], clock=clock)
+        router.report(router.acquire(), 20.0)
+        router.report(router.acquire(), 2.0)
+
+        first = router.acquire()
+        self.assertIs(first, fast)
+        self.assertEqual(fast.inflight, 1)
+        router.report(first, 2.0, "ConnectionError: timed out")
+        self.assertGreater(fast.error_rate, 0)
+        self.assertFalse(fast.disabled_until > clock.now)
+
+    def test_quota_and_auth_errors_take_endpoint_out_of_rotation(self):
+        clock = FakeClock()
+        a, b = _endpoint("a", clock), _endpoint("b", clock)
+        router = llm_router.LlmRouter([a, b], clock=clock)
+
+        category = router.report(router.acquire(), 1.0, "RuntimeError: insufficient_user_quota")
+        self.assertEqual(category, "translate.api_quota")
+        self.assertIs(router.acquire(), b)
+        self.assertEqual(router.report(b, 1.0, "HTTPError: 401 Unauthorized"), "translate.api_auth")
+        with self.assertRaisesRegex(llm_router.RouterExhausted, "insufficient_user_quota"):
+            router.acquire()
+
+        clock.now += llm_router.QUOTA_COOLDOWN_SECONDS + 1
+        self.assertIn(router.acquire().name, {"a", "b"})
+
+    def test_rpm_budget_waits_for_refill(self):
+        clock = FakeClock()
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock.now += seconds
+
+        limited = _endpoint("limited", clock, rpm=6)
+        router = llm_router.LlmRouter([limited], clock=clock, sleep=sleep)
+        router.acquire()
+        self.assertEqual(router.acquire(), limited)
+        # 6 rpm：令牌桶容量 1，下一次请求需等满 10 秒（每次最多睡 5 秒）
+        self.assertEqual([round(seconds, 3) for seconds in sleeps], [5.0, 5.0])
+
+    def test_call_fails_over_and_binds_endpoint_to_thread(self):
+        clock = FakeClock()
+        a, b = _endpoint("a", clock, weight=5), _endpoint("b", clock, model="model-b")
+        router = llm_router.LlmRouter([a, b], clock=clock)
+        seen = []
+
+        def predict(inputs):
+            endpoint = llm_router.active_endpoint()
+            seen.append(endpoint.name)
+            if endpoint is a:
+                raise RuntimeError("OpenAI拒绝了请求: Error code: 429 Too Many Requests")
+            url, kwargs = endpoint.rewrite(
+                "https://primary.test/v1/chat/completions",
+                {"headers": {"Authorization": "Bearer primary"}, "json": {"model": "m"}},
+            )
+            return url, kwargs
+
+        url, kwargs = router.call(predict, "text")
+
+        self.assertEqual(seen, ["a", "b"])
+        self.assertEqual(url, "https://b.test/v1/chat/completions")
+        self.assertEqual(kwargs["headers"]["Authorization"], "Bearer key-b")
+        self.assertEqual(kwargs["json"]["model"], "model-b")
+        self.assertEqual(router.failovers, 1)
+        self.assertIsNone(llm_router.active_endpoint())
+        self.assertEqual((a.inflight, b.inflight), (0, 0))
+
+    def test_call_reraises_non_failover_errors(self):
+        router = llm_router.LlmRouter([_endpoint("a", FakeClock()), _endpoint("b", FakeClock())])
+
+        def predict():
+            raise ValueError("bad payload")
+
+        with self.assertRaises(ValueError):
+            router.call(predict)
+        self.assertEqual(router.failovers, 0)
+
+    def test_rewrite_leaves_non_chat_requests_alone(self):
+        endpoint = _endpoint("a", FakeClock())
+        kwargs = {"headers": {"Authorization": "Bearer x"}}
+        self.assertEqual(
+            endpoint.rewrite("https://arxiv.org/e-print/2401.00001", kwargs),
+            ("https://arxiv.org/e-print/2401.00001", kwargs),
+        )
+
+    def test_active_endpoint_is_thread_local(self):
+        router = llm_router.LlmRouter([_endpoint("a", FakeClock())])
+        observed = []
+
+        def predict():
+            worker = threading.Thread(target=lambda: observed.append(llm_router.active_endpoint()))
+            worker.start()
+            worker.join()
+            return llm_router.active_endpoint().name
+
+        self.assertEqual(router.call(predict), "a")
+        self.assertEqual(observed, [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
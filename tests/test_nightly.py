@@ -0,0 +1,142 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import run_papers
+from paperhub import nightly
+from paperhub.modes import mode_spec
+
+
+class DueKeyTest(unittest.TestCase):
+    def test_daily_is_always_due_and_weekly_monthly_follow_their_trigger(self):
+        saturday_night = datetime(2026, 7, 25, 23, 0)
+        self.assertEqual(nightly.due_key(mode_spec("daily"), saturday_night), "2026-07-25")
+        # 周日 02:00 的 weekly 落在当晚窗口内
+        self.assertEqual(nightly.due_key(mode_spec("weekly"), saturday_night), "2026-W30")
+        self.assertIsNone(nightly.due_key(mode_spec("weekly"), datetime(2026, 7, 26, 23, 0)))
+        self.assertIsNone(nightly.due_key(mode_spec("monthly"), saturday_night))
+        self.assertEqual(nightly.due_key(mode_spec("monthly"), datetime(2026, 7, 27, 23, 0)), "2026-07")
+
+
+class BuildPlanTest(unittest.TestCase):
+    def test_papers_shared_across_lists_are_planned_and_probed_once(self):
+        targets = [
+            nightly.Target("daily", "2026-07-25", [{"arxiv_id": "2607.00001", "title": "A"},
+                                                   {"arxiv_id": "2607.00002", "title": "B"}]),
+            nightly.Target("weekly", "2026-W30", [{"arxiv_id": "2607.00002", "title": "B"},
+                                                  {"arxiv_id": "2607.00003", "title": "C"}]),
+            nightly.Target("topic", "2026-07-25",
+                           [{"arxiv_id": "2607.00001", "title": "A", "abstract": "full abstract"}],
+                           topic=({"slug": "opd"}, "2026-07-25", [])),
+        ]
+        summary_done = Mock(side_effect=lambda aid: aid == "2607.00003")
+        pdf_done = Mock(side_effect=lambda aid: aid == "2607.00002")
+
+        items = nightly.build_plan(targets, True, summary_done=summary_done, pdf_done=pdf_done)
+
+        self.assertEqual([item.arxiv_id for item in items], ["2607.00001", "2607.00002", "2607.00003"])
+        self.assertEqual(summary_done.call_count, 3)
+        self.assertEqual(pdf_done.call_count, 3)
+        self.assertEqual(items[0].targets, ["daily/2026-07-25", "topic/opd/2026-07-25"])
+        self.assertEqual(items[0].meta["abstract"], "full abstract")
+        self.assertEqual([(i.needs_summary, i.needs_pdf) for i in items],
+                         [(True, True), (True, False), (False, True)])
+
+        summary_only = nightly.build_plan(targets, False, summary_done=summary_done, pdf_done=pdf_done)
+        self.assertFalse(any(item.needs_pdf for item in summary_only))
+
+
+class ExecutePlanTest(unittest.TestCase):
+    def test_each_distinct_paper_is_summarized_and_translated_once(self):
+        targets = [
+            nightly.Target("daily", "2026-07-25", [{"arxiv_id": "2607.00001"}, {"arxiv_id": "2607.00002"}]),
+            nightly.Target("weekly", "2026-W30", [{"arxiv_id": "2607.00002"}]),
+        ]
+        items = [
+            nightly.PlanItem("2607.00001", {"arxiv_id": "2607.00001"}, ["daily/2026-07-25"], True, True),
+            nightly.PlanItem("2607.00002", {"arxiv_id": "2607.00002"},
+                             ["daily/2026-07-25", "weekly/2026-W30"], True, True),
+        ]
+        translate_and_save = Mock(return_value={})
+        translate_full = Mock(side_effect=lambda arxiv_id, **kw: {
+            "pdf_path": "x.pdf" if arxiv_id == "2607.00001" else None,
+        })
+        modules = {
+            "translate_arxiv": types.SimpleNamespace(
+                load_api_config=Mock(return_value={"model": "m"}),
+                translate_and_save=translate_and_save,
+            ),
+            "translate_full": types.SimpleNamespace(translate_full=translate_full),
+        }
+        with patch.dict(sys.modules, modules), patch.multiple(
+            run_papers,
+            log=Mock(),
+            _pdf_store_hit=Mock(return_value=None),
+            _accept_new_pdf=Mock(side_effect=lambda aid: aid == "2607.00001"),
+            _paper_store_update_pdf_status=Mock(),
+            _pdf_cost_estimator=Mock(return_value=None),
+        ), patch.object(nightly, "_summary_done", side_effect=lambda aid: aid == "2607.00001"):
+            stats = nightly.execute_plan(items, targets, True, key="2026-07-25")
+
+        self.assertEqual(translate_and_save.call_count, 2)
+        self.assertEqual(translate_and_save.call_args_list[1].kwargs["week_str"], "daily/2026-07-25")
+        self.assertIsNone(translate_and_save.call_args_list[1].kwargs["prefetched_meta"])
+        self.assertEqual(translate_full.call_count, 2)
+        self.assertEqual(stats, {"summary_attempted": 2, "summary_failed": 1,
+                                 "pdf_attempted": 2, "pdf_failed": 1})
+
+
+class PublishTargetsTest(unittest.TestCase):
+    def test_pdf_failed_in_the_plan_is_not_translated_again(self):
+        ids = ["2607.00001", "2607.00002"]
+        targets = [
+            nightly.Target("daily", "2026-07-25", [{"arxiv_id": aid, "upvotes": 1} for aid in ids]),
+            nightly.Target("weekly", "2026-W30", [{"arxiv_id": ids[0], "upvotes": 1}]),
+        ]
+        items = [
+            nightly.PlanItem(ids[0], {}, ["daily/2026-07-25", "weekly/2026-W30"], False, True),
+            nightly.PlanItem(ids[1], {}, ["daily/2026-07-25"], False, False),
+        ]
+        translate_full = Mock(return_value={"pdf_path": None, "error": "compile failed"})
+        translate_and_save = Mock(side_effect=lambda arxiv_id, **kw: {"arxiv_id": arxiv_id, "title": arxiv_id})
+        with tempfile.TemporaryDirectory() as tmp:
+            def setup_dirs(mode, key):
+                base = os.path.join(tmp, mode, key)
+                os.makedirs(os.path.join(base, "papers"), exist_ok=True)
+                return base, os.path.join(base, "papers")
+
+            modules = {
+                "translate_arxiv": types.SimpleNamespace(
+                    load_api_config=Mock(return_value={"model": "m"}),
+                    translate_and_save=translate_and_save,
+                ),
+                "translate_full": types.SimpleNamespace(translate_full=translate_full),
+            }
+            with patch.dict(sys.modules, modules), patch.multiple(
+                run_papers,
+                run=lambda mode, key, limit, full, papers=None, attempted=(): run_papers._run_locked(
+                    mode, key, limit, full, papers, attempted),
+                setup_dirs=setup_dirs,
+                LOGS_DIR=tmp,
+                log=Mock(),
+                _load_prior_index=Mock(return_value={}),
+                _pdf_store_hit=Mock(side_effect=lambda aid: aid == ids[1] and aid),
+                _paper_store_update_pdf_status=Mock(),
+                _clear_stale_failure_artifacts=Mock(),
+                _pdf_cost_estimator=Mock(return_value=None),
+            ), patch("run_papers.time.sleep"), patch(
+                "run_papers.paper_store.read_raw",
+                side_effect=lambda aid: {"title": aid, "abstract": "a"},
+            ), patch("run_papers.paper_store.translation_complete", return_value=True):
+                published = nightly.publish_targets(targets, True, attempted=nightly.attempted_ids(items))
+
+        translate_full.assert_not_called()
+        self.assertEqual(published, {"daily/2026-07-25": False, "weekly/2026-W30": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
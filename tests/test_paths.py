@@ -49,9 +49,19 @@ class SharedPathsTest(unittest.TestCase):
             names,
             {
                 "full_translate_driver.py",
+                "full_translate_service.py",
                 "latex_translation_filters.py",
                 "failure_taxonomy.py",
+                "latex_format_cache.py",
+                "figure_cache.py",
+                "llm_concurrency.py",
+                "llm_router.py",
                 "translation_quality.py",
+                "driver_events.py",
+                "pdf_cost.py",
+                "quality_cache.py",
+                "latex_scan.py",
+                "text_similarity.py",
             },
         )
 
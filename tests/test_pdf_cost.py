@@ -0,0 +1,108 @@
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+
+from paperhub import pdf_cost
+from paperhub.pdf_cost import CostModel, LaneBudget
+
+
+def _timing(aid, seconds, chunks=0, tar_bytes=0, success=True, keep_translation=False):
+    source = {"tar_bytes": tar_bytes, "chunks_est": chunks} if tar_bytes else {}
+    return {
+        "arxiv_id": aid,
+        "total_seconds": seconds,
+        "success": success,
+        "keep_translation": keep_translation,
+        "driver": {"chunks": chunks, "source": source},
+    }
+
+
+class SourceFeaturesTest(unittest.TestCase):
+    def test_tarball_counts_files_and_tex_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "2610.00001.tar")
+            with tarfile.open(path, "w:gz") as archive:
+                for name, size in (("main.tex", 3000), ("sec/intro.tex", 2000), ("fig.png", 500)):
+                    info = tarfile.TarInfo(name)
+                    info.size = size
+                    archive.addfile(info, io.BytesIO(b"x" * size))
+
+            features = pdf_cost.source_features(path)
+
+        self.assertEqual(features["files"], 3)
+        self.assertEqual(features["tex_bytes"], 5000)
+        self.assertEqual(features["chunks_est"], 3)
+        self.assertGreater(features["tar_bytes"], 0)
+
+    def test_single_file_submission_and_missing_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "2610.00002.tar")
+            with gzip.open(path, "wb") as handle:
+                handle.write(b"\\documentclass{article}" + b"y" * 4800)
+
+            features = pdf_cost.source_features(path)
+            missing = pdf_cost.source_features(os.path.join(tmp, "absent.tar"))
+
+        self.assertEqual((features["files"], features["tex_bytes"], features["chunks_est"]), (1, 4823, 3))
+        self.assertEqual(missing, {})
+
+
+class CostModelTest(unittest.TestCase):
+    def test_history_then_source_size_then_median_default(self):
+        model = CostModel([
+            _timing("2610.00010", 490, chunks=100, tar_bytes=1_000_000),
+            _timing("2610.00011", 890, chunks=200, tar_bytes=2_000_000),
+            # 只重编译的运行不代表逐 chunk 翻译耗时
+            _timing("2610.00012", 60, chunks=50, keep_translation=True),
+            _timing("2610.00010", 520, chunks=100, tar_bytes=1_000_000),
+        ])
+
+        self.assertEqual(model.estimate("2610.00010"), 520)
+        self.assertAlmostEqual(model.seconds_per_chunk, 4.0, places=1)
+        self.assertAlmostEqual(model.estimate("2610.00099", {"chunks_est": 50}), 90 + 50 * model.seconds_per_chunk)
+        self.assertAlmostEqual(model.estimate("2610.00099", {"tar_bytes": 500_000}), 90 + 50 * model.seconds_per_chunk)
+        # 无任何线索时取各论文最近一次耗时的中位数
+        self.assertEqual(model.estimate("2610.00099", {}), 520)
+
+    def test_probe_used_only_without_history(self):
+        probed = []
+        model = CostModel([_timing("2610.00020", 300)], probe=lambda aid: probed.append(aid) or {})
+
+        model.estimate("2610.00020")
+        model.estimate("2610.00021")
+
+        self.assertEqual(probed, ["2610.00021"])
+        self.assertEqual(CostModel().estimate("2610.00022"), pdf_cost.DEFAULT_SECONDS)
+
+
+class SchedulingTest(unittest.TestCase):
+    def test_fast_lane_cheapest_first_then_outliers(self):
+        costs = {"a": 900, "b": 4000, "c": 120, "d": 2500, "e": 120}
+
+        ordered = pdf_cost.order_by_cost(list(costs), costs.get, outlier=1800)
+
+        self.assertEqual([item for _, item in ordered], ["c", "e", "a", "d", "b"])
+        self.assertEqual(pdf_cost.lane_for(2500, 1800), pdf_cost.SLOW_LANE)
+
+    def test_lane_budget_counts_wall_clock_from_first_admission(self):
+        now = [0.0]
+        budget = LaneBudget(7200, clock=lambda: now[0])
+
+        self.assertTrue(budget.admit(3000))
+        now[0] = 3500
+        self.assertTrue(budget.admit(3000))
+        now[0] = 6000
+        self.assertFalse(budget.admit(3000))
+        self.assertFalse(LaneBudget(7200).admit(9000))
+
+    def test_env_overrides(self):
+        env = {"PAPER_TRANS_PDF_OUTLIER_SECONDS": "900", "PAPER_TRANS_PDF_SLOW_LANE_SECONDS": "bad"}
+        self.assertEqual(pdf_cost.outlier_seconds(env), 900)
+        self.assertEqual(pdf_cost.slow_lane_seconds(env), pdf_cost.DEFAULT_SLOW_LANE_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from paperhub import paper_store, paths, pdf_optimize
+
+
+def _valid_pdf_bytes(extra=1):
+    filler = b"x" * (paper_store.MIN_VALID_PDF_BYTES + extra)
+    return b"%PDF-1.7\n" + filler + b"\n%%EOF\n"
+
+
+def _install_fake_tool(bin_dir, name, body):
+    path = os.path.join(bin_dir, name)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(f"#!{sys.executable}\n" + textwrap.dedent(body))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+FAKE_QPDF = """
+import sys
+args = sys.argv[1:]
+if "--compression-level=9" in args and {reject_modern}:
+    sys.exit(2)
+src, dst = args[-2], args[-1]
+data = open(src, "rb").read()
+open(dst, "wb").write({transform})
+sys.exit(3)
+"""
+
+
+class PdfOptimizeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bin_dir = os.path.join(self.tmp.name, "bin")
+        os.makedirs(self.bin_dir)
+        self.old_store = paths.PAPER_STORE_DIR
+        paths.PAPER_STORE_DIR = os.path.join(self.tmp.name, "papers")
+        os.makedirs(paths.PAPER_STORE_DIR)
+        self.env = mock.patch.dict(os.environ, {"PATH": self.bin_dir}, clear=False)
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        paths.PAPER_STORE_DIR = self.old_store
+        self.tmp.cleanup()
+
+    def _fake_qpdf(self, transform='data[:9] + b"%linearized\\n" + data[9:-4000] + data[-7:]', reject_modern=False):
+        _install_fake_tool(
+            self.bin_dir, "qpdf",
+            FAKE_QPDF.format(transform=transform, reject_modern=reject_modern),
+        )
+
+    def _publish(self, arxiv_id):
+        path = paths.paper_store_pdf_path(arxiv_id)
+        with open(path, "wb") as handle:
+            handle.write(_valid_pdf_bytes(extra=8000))
+        return path
+
+    def test_mode_parsing_defaults_to_lossless(self):
+        self.assertEqual(pdf_optimize.optimize_mode({}), "lossless")
+        self.assertEqual(pdf_optimize.optimize_mode({"PAPER_TRANS_PDF_OPTIMIZE": "FULL"}), "full")
+        self.assertEqual(pdf_optimize.optimize_mode({"PAPER_TRANS_PDF_OPTIMIZE": "0"}), "off")
+        self.assertEqual(pdf_optimize.optimize_mode({"PAPER_TRANS_PDF_OPTIMIZE": "bogus"}), "lossless")
+
+    def test_linearized_copy_replaces_published_pdf(self):
+        self._fake_qpdf()
+        path = self._publish("2610.00001")
+
+        result = paper_store.optimize_pdf("2610.00001")
+
+        self.assertTrue(result["ok"], result)
+        self.assertEqual(result["tool"], "qpdf")
+        self.assertLess(result["after"], result["before"])
+        self.assertTrue(paper_store.pdf_file_valid(path))
+        with open(path, "rb") as handle:
+            self.assertIn(b"%linearized", handle.read(64))
+        self.assertEqual(os.listdir(paths.PAPER_STORE_DIR), ["2610.00001_zh.pdf"])
+
+    def test_old_qpdf_falls_back_to_plain_linearization(self):
+        self._fake_qpdf(reject_modern=True)
+        self._publish("2610.00002")
+
+        result = paper_store.optimize_pdf("2610.00002")
+
+        self.assertTrue(result["ok"], result)
+
+    def test_invalid_or_grown_output_keeps_original(self):
+        self._fake_qpdf(transform='data[:-10]')
+        path = self._publish("2610.00003")
+        with open(path, "rb") as handle:
+            original = handle.read()
+
+        broken = paper_store.optimize_pdf("2610.00003")
+
+        self.assertFalse(broken["ok"])
+        self.assertIn("validation", broken["reason"])
+        self._fake_qpdf(transform='data[:9] + b"x" * 20000 + data[9:]')
+        grown = paper_store.optimize_pdf("2610.00003")
+        self.assertFalse(grown["ok"])
+        with open(path, "rb") as handle:
+            self.assertEqual(handle.read(), original)
+
+    def test_missing_tools_and_disabled_mode_are_noops(self):
+        self._publish("2610.00004")
+
+        self.assertEqual(
+            paper_store.optimize_pdf("2610.00004")["reason"],
+            "no optimizer available",
+        )
+        self._fake_qpdf()
+        self.assertFalse(paper_store.optimize_pdf("2610.00004", mode="off")["ok"])
+        self.assertFalse(paper_store.optimize_pdf("2610.99999")["ok"])
+
+    def test_full_mode_uses_ghostscript_before_qpdf(self):
+        self._fake_qpdf()
+        _install_fake_tool(self.bin_dir, "gs", """
+            import sys
+            out = [a for a in sys.argv if a.startswith("-sOutputFile=")][0].split("=", 1)[1]
+            data = open(sys.argv[-1], "rb").read()
+            open(out, "wb").write(data[:-2000] + data[-7:])
+        """)
+        self._publish("2610.00005")
+
+        result = paper_store.optimize_pdf("2610.00005", mode="full")
+
+        self.assertTrue(result["ok"], result)
+        self.assertEqual(result["tool"], "gs+qpdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,8 @@
+import json
+import os
+import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from unittest import mock
@@ -7,11 +11,13 @@ from paperhub.pdf_text_quality import (
     PdfTextQualityError,
     analyze_pdf,
     analyze_pdf_cached,
+    analyze_pdf_stream,
     analyze_pdf_text,
     extract_pdf_text,
     is_untranslated_pdf_prose,
     pdftotext_command,
 )
+from pdf_text_fixtures import reference_report, synthetic_documents
 
 
 class PdfTextQualityTest(unittest.TestCase):
@@ -31,6 +37,81 @@ class PdfTextQualityTest(unittest.TestCase):
             "主要结果、局限性以及科学意义。"
         ) * 24
 
+    @staticmethod
+    def _fake_pdftotext(tmp, pages, hang_seconds=0):
+        """Executable that prints ``pages`` like ``pdftotext ... -``, then hangs."""
+        Path(tmp, "pages.json").write_text(json.dumps(pages), encoding="utf-8")
+        script = Path(tmp, "pdftotext")
+        script.write_text(
+            "#!{}\n"
+            "import json, sys, time\n"
+            "pages = json.load(open({!r}, encoding='utf-8'))\n"
+            "assert sys.argv[-1] == '-'\n"
+            "for page in pages:\n"
+            "    sys.stdout.write(page + '\\f')\n"
+            "    sys.stdout.flush()\n"
+            "time.sleep({})\n".format(
+                sys.executable, str(Path(tmp, "pages.json")), hang_seconds,
+            ),
+            encoding="utf-8",
+        )
+        os.chmod(script, 0o755)
+        return str(script)
+
+    def test_streaming_full_read_matches_batch_analysis(self):
+        pages = [self._chinese_page(), self._english_page(), self._chinese_page()]
+        with tempfile.TemporaryDirectory() as tmp:
+            executable = self._fake_pdftotext(tmp, pages)
+            streamed = analyze_pdf_stream(
+                "/tmp/paper.pdf", executable=executable, early_verdict=False,
+            )
+            limited = analyze_pdf_stream(
+                "/tmp/paper.pdf", executable=executable, max_pages=2,
+            )
+
+        batch = analyze_pdf_text("\f".join(pages))
+        for key, value in batch.items():
+            self.assertEqual(streamed[key], value, key)
+        self.assertIsNone(streamed["early_verdict"])
+        self.assertFalse(streamed["page_limit_reached"])
+        self.assertTrue(limited["page_limit_reached"])
+        self.assertEqual(limited["pages_scanned"], 2)
+
+    def test_streaming_stops_and_kills_extractor_once_verdict_is_certain(self):
+        english = [self._chinese_page()] + [self._english_page()] * 30
+        clean = [self._chinese_page()] * 12
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.monotonic()
+            flagged = analyze_pdf_stream(
+                "/tmp/paper.pdf",
+                executable=self._fake_pdftotext(tmp, english, hang_seconds=60),
+            )
+            passed = analyze_pdf_stream(
+                "/tmp/paper.pdf",
+                executable=self._fake_pdftotext(tmp, clean, hang_seconds=60),
+                clean_pages=5,
+            )
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 30)
+        self.assertEqual(flagged["early_verdict"], "untranslated")
+        self.assertTrue(flagged["untranslated_prose"])
+        self.assertEqual(flagged["pages_scanned"], 5)
+        self.assertEqual(passed["early_verdict"], "clean")
+        self.assertFalse(passed["untranslated_prose"])
+        self.assertEqual(passed["pages_scanned"], 5)
+
+    def test_streaming_enforces_byte_budget_while_reading(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            executable = self._fake_pdftotext(
+                tmp, [self._chinese_page()] * 200, hang_seconds=60,
+            )
+            with self.assertRaises(PdfTextQualityError) as raised:
+                analyze_pdf_stream(
+                    "/tmp/paper.pdf", executable=executable, max_text_bytes=4096,
+                )
+        self.assertIn("exceeds 4096 bytes", str(raised.exception))
+
     def test_sustained_english_body_is_flagged_but_references_are_ignored(self):
         pages = [self._chinese_page(), self._chinese_page()]
         pages.extend(self._english_page() for _ in range(6))
@@ -478,5 +559,26 @@ class PdfTextQualityTest(unittest.TestCase):
         self.assertEqual(analyze.call_count, 2)
 
 
+class SinglePassDifferentialTest(unittest.TestCase):
+    """The line-record analyzer must reproduce the multi-pass reports."""
+
+    def test_reports_match_multi_pass_analyzer_on_synthetic_corpus(self):
+        documents = synthetic_documents(count=120)
+        for index, text in enumerate(documents):
+            with self.subTest(document=index):
+                self.assertEqual(analyze_pdf_text(text), reference_report(text))
+
+    def test_reports_match_with_truncated_samples_and_unusual_line_breaks(self):
+        documents = synthetic_documents(seed=7, count=30, max_pages=12)
+        for index, text in enumerate(documents):
+            text = text.replace("\n", "\u2028", index % 2).replace("  ", "\u3000")
+            for max_samples in (0, 1):
+                with self.subTest(document=index, max_samples=max_samples):
+                    self.assertEqual(
+                        analyze_pdf_text(text, max_samples=max_samples),
+                        reference_report(text, max_samples=max_samples),
+                    )
+
+
 if __name__ == "__main__":
     unittest.main()
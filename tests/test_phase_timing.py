@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import translate_full
+from paperhub import phase_timing
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _record(version, translate, xelatex, arxiv_id="2610.00001"):
+    return {
+        "arxiv_id": arxiv_id,
+        "recorded_at": "2026-10-19T00:00:00",
+        "splitter_version": version,
+        "total_seconds": translate + xelatex + 5,
+        "host": {"deploy": 0.5, "container": translate + xelatex},
+        "driver": {"phases": {"translate": translate}, "compile": {"xelatex": xelatex}},
+    }
+
+
+class PhaseTimingTest(unittest.TestCase):
+    def test_driver_events_collapse_into_phase_totals(self):
+        events = [
+            {"event": "job_start", "splitter_version": "v30"},
+            {"event": "phase_end", "phase": "source", "seconds": 4},
+            {"event": "source", "tar_bytes": 900000, "files": 12, "tex_bytes": 96000, "chunks_est": 40},
+            {"event": "chunks", "round": 0, "total": 40, "requests": 12, "tokens_est": 9000, "failed": 3},
+            {"event": "chunks", "round": 1, "total": 40, "failed": 0},
+            {"event": "compile_pass", "engine": "xelatex", "seconds": 20},
+            {"event": "compile_pass", "engine": "xelatex", "seconds": 15},
+            {"event": "phase_end", "phase": "translate", "seconds": 300},
+            {"event": "result", "status": "success"},
+        ]
+        ticks = iter([0.0, 1.0, 3.0, 10.0])
+        timer = phase_timing.PhaseTimer(clock=lambda: next(ticks))
+        with timer.phase("deploy"):
+            pass
+
+        record = phase_timing.build_record("2610.00001", timer, events, True)
+
+        self.assertEqual(record["splitter_version"], "v30")
+        self.assertEqual(record["host"], {"deploy": 2.0})
+        self.assertEqual(record["total_seconds"], 10.0)
+        driver = record["driver"]
+        self.assertEqual(driver["compile"], {"xelatex": 35.0})
+        self.assertEqual(driver["compile_passes"], 2)
+        self.assertEqual(driver["tokens_est"], 9000)
+        self.assertEqual((driver["chunks"], driver["llm_requests"]), (40, 12))
+        self.assertEqual(driver["chunk_retry_rounds"], 1)
+        self.assertEqual(driver["chunks_failed"], 0)
+        self.assertEqual(driver["translate_attempts"], 1)
+        self.assertEqual(driver["source"], {"tar_bytes": 900000, "files": 12, "tex_bytes": 96000, "chunks_est": 40})
+
+    def test_percentiles_and_version_regressions(self):
+        self.assertEqual(phase_timing.percentile([1, 2, 3, 4], 50), 2.5)
+        self.assertEqual(phase_timing.percentile([7], 95), 7)
+        records = (
+            [_record("v29", 100, 20) for _ in range(4)]
+            + [_record("v30", 100, 40) for _ in range(4)]
+        )
+
+        stats = phase_timing.aggregate(records)
+        regressions = phase_timing.find_regressions(stats, "v29", "v30")
+
+        self.assertEqual(stats["v30"]["compile.xelatex"]["p50"], 40)
+        # container/total grew only 1.17x, below the default 1.25x threshold
+        self.assertEqual({item["phase"] for item in regressions}, {"compile.xelatex"})
+        self.assertEqual(phase_timing.find_regressions(stats, "v29", "v30", min_samples=5), [])
+
+    def test_report_script_flags_regressions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "phase_timing.jsonl")
+            for record in [_record("v29", 100, 20)] * 3 + [_record("v30", 200, 20)] * 3:
+                phase_timing.append_record(record, log)
+            with open(log, "a", encoding="utf-8") as handle:
+                handle.write("{torn\n")
+
+            completed = subprocess.run(
+                [sys.executable, os.path.join(ROOT, "scripts", "phase_timing_report.py"),
+                 "--log", log, "--json"],
+                stdout=subprocess.PIPE, universal_newlines=True, check=False,
+            )
+
+        report = json.loads(completed.stdout)
+        self.assertEqual(completed.returncode, 1)
+        self.assertEqual(report["records"], 6)
+        self.assertEqual((report["baseline"], report["candidate"]), ("v29", "v30"))
+        self.assertIn("driver.translate", {item["phase"] for item in report["regressions"]})
+
+    def test_stale_driver_events_are_ignored_when_container_never_ran(self):
+        timer = phase_timing.PhaseTimer()
+        with timer.phase("check"):
+            pass
+        with mock.patch.object(translate_full.driver_events, "load_events") as load, \
+                mock.patch.object(translate_full.phase_timing, "append_record") as append:
+            translate_full._record_phase_timing("2610.00001", timer, {"success": False})
+
+        load.assert_not_called()
+        self.assertEqual(append.call_args[0][0]["driver"]["phases"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from paperhub import quality_cache
+from paperhub.quality_cache import QualityCache, cached_analyze_tex, cached_tex_gate
+
+
+class QualityCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.store = quality_cache.cache_path(os.path.join(self.tmp, "logs"))
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        return path
+
+    def test_verdict_follows_content_and_policy_not_path_or_mtime(self):
+        first = self._write("a.tex", "内容")
+        analyze = mock.Mock(side_effect=lambda path: {"path": path, "ok": True})
+        cache = QualityCache(self.store)
+
+        miss = cache.analyze("tex", first, "v1", analyze)
+        copy = os.path.join(self.tmp, "restored.tex")
+        shutil.copy(first, copy)
+        os.utime(copy, (1, 1))
+        hit = cache.analyze("tex", copy, "v1", analyze)
+        bumped = cache.analyze("tex", copy, "v2", analyze)
+        other_params = cache.analyze("tex", copy, "v2", analyze, {"max_pages": 3})
+        with open(copy, "a", encoding="utf-8") as handle:
+            handle.write("更多")
+        changed = cache.analyze("tex", copy, "v2", analyze)
+
+        self.assertFalse(miss["_cache_hit"])
+        self.assertTrue(hit["_cache_hit"])
+        self.assertEqual(hit["path"], copy)
+        self.assertEqual(
+            [bumped["_cache_hit"], other_params["_cache_hit"], changed["_cache_hit"]],
+            [False, False, False],
+        )
+        self.assertEqual(analyze.call_count, 4)
+
+    def test_unusable_store_degrades_to_uncached_analysis(self):
+        path = self._write("a.tex", "内容")
+        analyze = mock.Mock(return_value={"ok": True})
+        with mock.patch.object(QualityCache, "_connect", side_effect=sqlite3.OperationalError("locked")):
+            report = QualityCache(self.store).analyze("tex", path, "v1", analyze)
+        self.assertEqual(report, {"ok": True, "_cache_hit": False})
+
+    def test_translated_tex_report_round_trips_through_the_store(self):
+        path = self._write(
+            "2610.00001_merge_translate_zh.tex",
+            "\\begin{document}\n"
+            + "这是已经翻译完成的中文正文段落，包含实验方法与结论。\n" * 20
+            + "\\end{document}\n",
+        )
+        first = cached_analyze_tex(path, self.store)
+        second = cached_analyze_tex(path, self.store)
+
+        self.assertFalse(first["_cache_hit"])
+        self.assertTrue(second["_cache_hit"])
+        first.pop("_cache_hit")
+        second.pop("_cache_hit")
+        self.assertEqual(first, second)
+
+    def test_gate_and_full_report_are_cached_separately(self):
+        path = self._write(
+            "2610.00002_merge_translate_zh.tex",
+            "\\begin{document}\n"
+            + "This ordinary paragraph remains untranslated and explains the method in detail.\n" * 50
+            + "\\end{document}\n",
+        )
+        gate = cached_tex_gate(path, self.store)
+        full = cached_analyze_tex(path, self.store)
+        gate_again = cached_tex_gate(path, self.store)
+
+        self.assertFalse(full["_cache_hit"])
+        self.assertTrue(gate_again["_cache_hit"])
+        self.assertTrue(gate["untranslated"])
+        self.assertNotIn("untranslated", full)
+        self.assertIn("top_english_words", full)
+
+
+if __name__ == "__main__":
+    unittest.main()
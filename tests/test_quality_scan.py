@@ -0,0 +1,133 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from paperhub import quality_scan
+from paperhub.quality_cache import cache_path
+from paperhub.translation_quality import analyze_tex
+
+
+def _delayed_square(value):
+    # 先提交的任务更慢：完成顺序与输入顺序相反
+    time.sleep(0.02 * (5 - value % 5))
+    return value * value
+
+
+def _fail_on_three(value):
+    if value == 3:
+        raise ValueError("bad input 3")
+    return value
+
+
+def _sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _exit_worker(value):
+    os._exit(1)
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    """Thread pool standing in for the process pool; records chunks in flight."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def submit(self, fn, *args, **kwargs):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+
+        def run():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with cls.lock:
+                    cls.in_flight -= 1
+
+        return super().submit(run)
+
+
+class QualityScanTest(unittest.TestCase):
+    def test_results_keep_input_order_across_processes(self):
+        items = list(range(12))
+
+        results = quality_scan.scan(_delayed_square, items, workers=3, chunk_size=1)
+
+        self.assertEqual(results, [(value * value, "") for value in items])
+
+    def test_errors_are_isolated_per_item(self):
+        results = quality_scan.scan(_fail_on_three, range(6), workers=2, chunk_size=2)
+
+        self.assertEqual(results[3], (None, "bad input 3"))
+        self.assertEqual([row[0] for row in results if not row[1]], [0, 1, 2, 4, 5])
+
+    def test_per_file_timeout_does_not_stall_the_chunk(self):
+        results = quality_scan.scan(_sleep_for, [0, 5, 0], workers=2, chunk_size=3, timeout=0.3)
+
+        self.assertEqual(results[0], (0, ""))
+        self.assertIsNone(results[1][0])
+        self.assertIn("timed out", results[1][1])
+        self.assertEqual(results[2], (0, ""))
+
+    def test_in_process_mode_also_enforces_timeout(self):
+        results = quality_scan.scan(_sleep_for, [5], workers=1, timeout=0.2)
+
+        self.assertIn("timed out", results[0][1])
+
+    def test_submission_window_is_bounded(self):
+        _CountingExecutor.in_flight = _CountingExecutor.peak = 0
+        with mock.patch.object(quality_scan, "ProcessPoolExecutor", _CountingExecutor):
+            results = quality_scan.scan(
+                _sleep_for, [0.01] * 40, workers=4, chunk_size=2, max_pending=3, timeout=None,
+            )
+
+        self.assertEqual(results, [(0.01, "")] * 40)
+        self.assertLessEqual(_CountingExecutor.peak, 3)
+
+    def test_crashed_worker_fails_items_instead_of_raising(self):
+        results = quality_scan.scan(_exit_worker, range(4), workers=2, chunk_size=1)
+
+        self.assertEqual(len(results), 4)
+        for result, error in results:
+            self.assertIsNone(result)
+            self.assertIn("scan worker failed", error)
+
+    def test_tex_task_matches_direct_analysis_with_and_without_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for index, text in enumerate([
+                "\\section{引言}\n本文研究大规模语言模型的翻译质量。\n",
+                "This paragraph was left completely untranslated by the pipeline "
+                "and keeps going in English for a long while.\n",
+            ]):
+                path = os.path.join(tmp, f"{index}.tex")
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(text)
+                paths.append(path)
+            store = cache_path(os.path.join(tmp, "logs"))
+
+            plain = quality_scan.scan(
+                quality_scan.tex_quality_task, [(path, None) for path in paths], workers=2,
+            )
+            cached = quality_scan.scan(
+                quality_scan.tex_quality_task, [(path, store) for path in paths], workers=2,
+            )
+
+            for path, (report, error), (cached_report, cached_error) in zip(paths, plain, cached):
+                self.assertEqual(error, "")
+                self.assertEqual(cached_error, "")
+                self.assertEqual(report, analyze_tex(path))
+                cached_report.pop("_cache_hit")
+                self.assertEqual(cached_report, report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from paperhub import retry_ledger
+from paperhub.retry_ledger import RetryLedger
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+LATEX_FAILURE = {
+    "category": "compile.undefined_command",
+    "family": "latex_command",
+    "retry_strategy": "reuse_translation",
+}
+
+
+class RetryLedgerTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.clock = FakeClock()
+        self.ledger = RetryLedger(os.path.join(tmp.name, "retry_ledger.json"), clock=self.clock)
+
+    def test_backoff_doubles_per_family_and_success_clears_entry(self):
+        day = 24 * retry_ledger.HOUR
+        self.assertTrue(self.ledger.eligible("2607.00001")[0])
+        self.assertEqual(self.ledger.record_failure("2607.00001", LATEX_FAILURE)["attempts"], 1)
+        eligible, reason = self.ledger.eligible("2607.00001")
+        self.assertFalse(eligible)
+        self.assertIn("compile.undefined_command", reason)
+
+        self.clock.now += day + 1
+        self.assertTrue(self.ledger.eligible("2607.00001")[0])
+        record = self.ledger.record_failure("2607.00001", LATEX_FAILURE)
+        self.assertEqual(record["next_eligible"] - self.clock.now, 2 * day)
+
+        self.ledger.record_success("2607.00001")
+        self.assertEqual(self.ledger.get("2607.00001"), {})
+        self.assertEqual(retry_ledger.backoff_seconds("api", 1), retry_ledger.HOUR)
+        self.assertEqual(retry_ledger.backoff_seconds("latex", 20), retry_ledger.MAX_BACKOFF_SECONDS)
+
+    def test_manual_review_waits_for_patch_catalog_change(self):
+        self.ledger.record_failure("2607.00002", {
+            "category": "compile.unknown", "family": "compile", "retry_strategy": "manual_review",
+        })
+        self.clock.now += retry_ledger.MAX_BACKOFF_SECONDS * 2
+        self.assertFalse(self.ledger.eligible("2607.00002")[0])
+
+        with patch.object(retry_ledger, "catalog_fingerprint", return_value="patched"):
+            self.assertTrue(self.ledger.eligible("2607.00002")[0])
+            # 补丁上线后的首次失败从头开始退避
+            self.assertEqual(self.ledger.record_failure("2607.00002", {
+                "category": "compile.unknown", "family": "compile", "retry_strategy": "manual_review",
+            })["attempts"], 1)
+
+    def test_switch(self):
+        self.assertTrue(retry_ledger.ledger_enabled({}))
+        self.assertFalse(retry_ledger.ledger_enabled({"PAPER_TRANS_RETRY_LEDGER": "0"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from paperhub.run_journal import RunJournal, journal_path
+
+
+class RunJournalTest(unittest.TestCase):
+    def test_interrupted_run_is_resumed_and_finished_run_starts_fresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = journal_path("daily", "2026-07-27", tmp)
+            papers = [{"arxiv_id": "2607.00001"}, {"arxiv_id": "2607.00002"}]
+
+            first = RunJournal(path)
+            self.assertFalse(first.resumed)
+            first.start(papers)
+            first.record("summary", "2607.00001", entry={"arxiv_id": "2607.00001", "rank": 1})
+            first.record("pdf", "2607.00001", status="failed")
+            # 被强杀时最后一行可能只写了一半
+            with open(path, "a", encoding="utf-8") as handle:
+                handle.write('{"event": "stage", "stage": "summ')
+
+            resumed = RunJournal(path)
+            self.assertTrue(resumed.resumed)
+            self.assertEqual(resumed.papers, papers)
+            self.assertEqual(resumed.counts(), {"summary": 1, "pdf": 1})
+            self.assertEqual(resumed.completed("summary", "2607.00001")["entry"]["rank"], 1)
+            self.assertEqual(resumed.completed("pdf", "2607.00001")["status"], "failed")
+            self.assertIsNone(resumed.completed("summary", "2607.00002"))
+            resumed.start([{"arxiv_id": "other"}])
+            self.assertEqual(resumed.papers, papers)
+            resumed.finish(True)
+
+            fresh = RunJournal(path)
+            self.assertFalse(fresh.resumed)
+            fresh.start(papers[:1])
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(len(handle.readlines()), 1)
+
+    def test_missing_or_empty_journal_is_not_resumable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run_journal", "weekly-2026-W30.jsonl")
+            self.assertFalse(RunJournal(path).resumed)
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write('{"event": "run_start", "papers": []}\n')
+            self.assertFalse(RunJournal(path).resumed)
+
+
+if __name__ == "__main__":
+    unittest.main()
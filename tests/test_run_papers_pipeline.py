@@ -0,0 +1,258 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+import unittest
+from unittest.mock import Mock, patch
+
+import run_papers
+
+
+class RunPapersPipelineTest(unittest.TestCase):
+    def test_pdf_jobs_start_before_summaries_finish_and_index_stays_ranked(self):
+        ids = ["2607.00101", "2607.00102", "2607.00103"]
+        first_pdf_started = threading.Event()
+        events = []
+        pdfs = set()
+
+        def translate_and_save(arxiv_id, output_dir, rank, week_str, config):
+            if rank == len(ids):
+                # 最后一篇摘要必须等到第一篇 PDF 已在流水线中开跑
+                self.assertTrue(first_pdf_started.wait(5))
+            events.append(("summary", arxiv_id))
+            return {"arxiv_id": arxiv_id, "title": arxiv_id}
+
+        def translate_full(arxiv_id, output_dir, no_cache, timeout):
+            events.append(("pdf", arxiv_id))
+            first_pdf_started.set()
+            if arxiv_id == ids[1]:
+                return {"pdf_path": None, "error": "compile failed"}
+            pdfs.add(arxiv_id)
+            return {"pdf_path": os.path.join(output_dir, f"{arxiv_id}_zh.pdf")}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            papers_dir = os.path.join(tmp, "papers")
+            os.makedirs(papers_dir)
+            modules = {
+                "fetch_hf": types.SimpleNamespace(
+                    fetch_hf_papers=Mock(return_value=[{"arxiv_id": aid, "upvotes": 1} for aid in ids])
+                ),
+                "translate_arxiv": types.SimpleNamespace(
+                    load_api_config=Mock(return_value={"model": "m"}),
+                    translate_and_save=translate_and_save,
+                ),
+                "translate_full": types.SimpleNamespace(translate_full=translate_full),
+            }
+            with patch.dict(sys.modules, modules), patch.multiple(
+                run_papers,
+                setup_dirs=Mock(return_value=(tmp, papers_dir)),
+                LOGS_DIR=tmp,
+                log=Mock(),
+                _load_prior_index=Mock(return_value={}),
+                _pdf_store_hit=Mock(side_effect=lambda aid: aid in pdfs and aid),
+                _accept_new_pdf=Mock(side_effect=lambda aid: aid in pdfs and aid),
+                _paper_store_update_pdf_status=Mock(),
+                _clear_stale_failure_artifacts=Mock(),
+                _pdf_cost_estimator=Mock(return_value=None),
+            ), patch("run_papers.time.sleep"), patch(
+                "run_papers.paper_store.read_raw",
+                side_effect=lambda aid: {"title": aid, "abstract": "a"},
+            ), patch(
+                "run_papers.paper_store.translation_complete", return_value=True
+            ):
+                ok = run_papers._run_locked("daily", "2026-07-27", 3, True)
+
+            with open(os.path.join(tmp, "index.json"), encoding="utf-8") as handle:
+                index = json.load(handle)
+
+        self.assertFalse(ok)
+        self.assertLess(events.index(("pdf", ids[0])), events.index(("summary", ids[2])))
+        self.assertEqual(sorted(e for e in events if e[0] == "pdf"), [("pdf", aid) for aid in ids])
+        self.assertEqual([p["arxiv_id"] for p in index["papers"]], ids)
+        self.assertEqual([p["rank"] for p in index["papers"]], [1, 2, 3])
+        self.assertEqual(
+            [p.get("pdf_status") for p in index["papers"]], ["ok", "failed", "ok"]
+        )
+
+    def test_worker_runs_cheapest_queued_job_first_and_outliers_last(self):
+        costs = {"big": 5000, "mid": 600, "small": 100, "huge": 9000, "slow": 2500}
+        started = threading.Event()
+        gate = threading.Event()
+        handled = []
+        deferred = []
+
+        def handle(entry):
+            if not handled:
+                # 第一篇开跑后其余论文才陆续入队
+                started.set()
+                gate.wait(5)
+            handled.append(entry["arxiv_id"])
+
+        pipeline = run_papers._PdfPipeline(
+            handle, estimate=costs.get, outlier=1800, slow_budget=6000,
+            on_defer=lambda entry, cost: deferred.append((entry["arxiv_id"], cost)),
+        )
+        pipeline.submit({"arxiv_id": "mid"})
+        self.assertTrue(started.wait(5))
+        for aid in ("big", "huge", "slow", "small"):
+            pipeline.submit({"arxiv_id": aid})
+        gate.set()
+        pipeline.close()
+
+        self.assertEqual(handled, ["mid", "small", "slow", "big"])
+        # 慢车道按成本执行；单篇预估就超过整个慢车道预算的论文顺延
+        self.assertEqual(deferred, [("huge", 9000)])
+        self.assertEqual([e["arxiv_id"] for e in pipeline.deferred], ["huge"])
+
+    def test_submit_does_not_wait_for_cost_probe(self):
+        probing = threading.Event()
+        release = threading.Event()
+        threads = []
+        handled = []
+
+        def estimate(arxiv_id):
+            threads.append(threading.current_thread().name)
+            probing.set()
+            release.wait(5)
+            return 100
+
+        pipeline = run_papers._PdfPipeline(lambda entry: handled.append(entry["arxiv_id"]), estimate=estimate)
+        pipeline.submit({"arxiv_id": "a"})
+        self.assertTrue(probing.wait(5))
+        # 探测仍阻塞时，后续入队立即返回
+        pipeline.submit({"arxiv_id": "b"})
+        release.set()
+        pipeline.close()
+
+        self.assertEqual(handled, ["a", "b"])
+        self.assertEqual(set(threads), {"pdf-pipeline"})
+
+    def test_cancel_drops_queued_jobs_and_waits_for_the_running_one(self):
+        started = threading.Event()
+        gate = threading.Event()
+        handled = []
+
+        def handle(entry):
+            started.set()
+            gate.wait(5)
+            handled.append(entry["arxiv_id"])
+
+        pipeline = run_papers._PdfPipeline(handle, estimate=lambda arxiv_id: 100)
+        pipeline.submit({"arxiv_id": "a"})
+        self.assertTrue(started.wait(5))
+        pipeline.submit({"arxiv_id": "b"})
+        threading.Timer(0.05, gate.set).start()
+        pipeline.close(cancel=True)
+
+        self.assertEqual(handled, ["a"])
+        self.assertFalse(pipeline._thread.is_alive())
+
+    def test_summary_loop_error_still_closes_pdf_pipeline(self):
+        ids = ["2607.00301", "2607.00302"]
+        pipelines = []
+        real_pipeline = run_papers._PdfPipeline
+
+        def track(*args, **kwargs):
+            pipelines.append(real_pipeline(*args, **kwargs))
+            return pipelines[-1]
+
+        def translate_and_save(arxiv_id, output_dir, rank, week_str, config):
+            if rank == 2:
+                raise KeyboardInterrupt
+            return {"arxiv_id": arxiv_id, "title": arxiv_id}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            papers_dir = os.path.join(tmp, "papers")
+            os.makedirs(papers_dir)
+            modules = {
+                "fetch_hf": types.SimpleNamespace(
+                    fetch_hf_papers=Mock(return_value=[{"arxiv_id": aid, "upvotes": 1} for aid in ids])
+                ),
+                "translate_arxiv": types.SimpleNamespace(
+                    load_api_config=Mock(return_value={"model": "m"}),
+                    translate_and_save=translate_and_save,
+                ),
+                "translate_full": types.SimpleNamespace(
+                    translate_full=Mock(return_value={"pdf_path": None, "error": "compile failed"})
+                ),
+            }
+            with patch.dict(sys.modules, modules), patch.multiple(
+                run_papers,
+                _PdfPipeline=track,
+                setup_dirs=Mock(return_value=(tmp, papers_dir)),
+                LOGS_DIR=tmp,
+                log=Mock(),
+                _load_prior_index=Mock(return_value={}),
+                _pdf_store_hit=Mock(return_value=None),
+                _accept_new_pdf=Mock(return_value=None),
+                _paper_store_update_pdf_status=Mock(),
+                _clear_stale_failure_artifacts=Mock(),
+                _pdf_cost_estimator=Mock(return_value=None),
+            ), patch("run_papers.time.sleep"), patch(
+                "run_papers.paper_store.read_raw",
+                side_effect=lambda aid: {"title": aid, "abstract": "a"},
+            ), patch(
+                "run_papers.paper_store.translation_complete", return_value=True
+            ):
+                with self.assertRaises(KeyboardInterrupt):
+                    run_papers._run_locked("daily", "2026-07-27", 2, True)
+
+        self.assertEqual(len(pipelines), 1)
+        self.assertFalse(pipelines[0]._thread.is_alive())
+
+    def test_interrupted_run_resumes_from_journal(self):
+        ids = ["2607.00201", "2607.00202", "2607.00203"]
+        summaries = []
+
+        def translate_and_save(arxiv_id, output_dir, rank, week_str, config):
+            summaries.append(arxiv_id)
+            if arxiv_id == ids[2] and len(summaries) == 3:
+                raise SystemExit("killed")
+            return {"arxiv_id": arxiv_id, "title": arxiv_id}
+
+        fetch = Mock(return_value=[{"arxiv_id": aid, "upvotes": 1} for aid in ids])
+        with tempfile.TemporaryDirectory() as tmp:
+            papers_dir = os.path.join(tmp, "papers")
+            os.makedirs(papers_dir)
+            save_index = Mock(side_effect=run_papers.save_index)
+            modules = {
+                "fetch_hf": types.SimpleNamespace(fetch_hf_papers=fetch),
+                "translate_arxiv": types.SimpleNamespace(
+                    load_api_config=Mock(return_value={"model": "m"}),
+                    translate_and_save=translate_and_save,
+                ),
+            }
+            with patch.dict(sys.modules, modules), patch.multiple(
+                run_papers,
+                setup_dirs=Mock(return_value=(tmp, papers_dir)),
+                LOGS_DIR=tmp,
+                log=Mock(),
+                save_index=save_index,
+                _load_prior_index=Mock(return_value={}),
+            ), patch("run_papers.time.sleep"), patch(
+                "run_papers.paper_store.read_raw",
+                side_effect=lambda aid: {"title": aid, "abstract": "a"},
+            ), patch(
+                "run_papers.paper_store.translation_complete", return_value=True
+            ):
+                with self.assertRaises(SystemExit):
+                    run_papers._run_locked("daily", "2026-07-28", 3, False)
+                # 逐篇进度只进运行日志，不逐篇重写 index
+                save_index.assert_not_called()
+
+                self.assertTrue(run_papers._run_locked("daily", "2026-07-28", 3, False))
+                # 已结束的运行不会再被续跑
+                self.assertTrue(run_papers._run_locked("daily", "2026-07-28", 3, False))
+
+            with open(os.path.join(tmp, "index.json"), encoding="utf-8") as handle:
+                index = json.load(handle)
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(summaries, ids + [ids[2]] + ids)
+        self.assertEqual([p["arxiv_id"] for p in index["papers"]], ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,23 @@ import run_papers
 
 
 class RunPapersRetryTest(unittest.TestCase):
+    def setUp(self):
+        # 每个用例使用独立的重试账本，避免失败记录跨用例产生退避
+        ledger_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(ledger_dir.cleanup)
+        self.ledger_file = os.path.join(ledger_dir.name, "retry_ledger.json")
+        ledger_patch = patch(
+            "run_papers.ledger_path", return_value=self.ledger_file
+        )
+        ledger_patch.start()
+        self.addCleanup(ledger_patch.stop)
+        # 成本估计不读真实耗时日志、不探测 arXiv
+        cost_patch = patch(
+            "run_papers._pdf_cost_estimator", return_value=lambda aid: 0.0
+        )
+        cost_patch.start()
+        self.addCleanup(cost_patch.stop)
+
     def test_run_lock_is_shared_persistent_and_reacquirable(self):
         with tempfile.TemporaryDirectory() as tmp, patch.object(
             run_papers, "LOCK_DIR", tmp
@@ -72,6 +89,132 @@ class RunPapersRetryTest(unittest.TestCase):
         self.assertEqual(papers[0]["pdf_status"], "failed")
         translate_full.assert_called_once()
 
+    def test_ledger_defers_backed_off_and_manual_review_failures(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            translate_full = Mock(
+                return_value={"pdf_path": None, "error": "compile failed"}
+            )
+            fake_translate_mod = types.SimpleNamespace(
+                CONTAINER_NAME="latex",
+                TEX_BACKUP_DIR=tmp,
+                TEX_FAILED_BACKUP_DIR=tmp,
+                _restore_tex_to_container=Mock(return_value=False),
+                translate_full=translate_full,
+            )
+            docker_test = Mock()
+            docker_test.return_value.returncode = 1
+            diagnoses = {
+                "2607.00011": {"category": "compile.undefined_command",
+                               "family": "latex_command",
+                               "retry_strategy": "reuse_translation"},
+                "2607.00012": {"category": "compile.unknown", "family": "compile",
+                               "retry_strategy": "manual_review"},
+            }
+
+            def read_json(path, default=None):
+                name = os.path.basename(path)
+                return diagnoses.get(name[:-len(".json")], default)
+
+            with patch.dict(
+                sys.modules, {"translate_full": fake_translate_mod}
+            ), patch(
+                "run_papers.paper_store.read_raw", return_value={}
+            ), patch(
+                "run_papers._pdf_store_hit", return_value=None
+            ), patch(
+                "run_papers._pdf_quality_tainted", return_value=False
+            ), patch(
+                "run_papers.read_json", side_effect=read_json
+            ), patch(
+                "run_papers._paper_store_update_pdf_status"
+            ), patch(
+                "run_papers.subprocess.run", docker_test
+            ):
+                first = run_papers.retry_failed_pdf_entries(
+                    [{"arxiv_id": aid, "pdf_status": "failed"} for aid in diagnoses],
+                    label="[test]",
+                )
+                second = run_papers.retry_failed_pdf_entries(
+                    [{"arxiv_id": aid, "pdf_status": "failed"} for aid in diagnoses],
+                    label="[test]",
+                )
+
+        self.assertEqual((first["pdf_attempted"], first["pdf_deferred"]), (2, 0))
+        # 第二轮：LaTeX 失败仍在退避期，manual_review 等待 patch catalog 更新
+        self.assertEqual((second["pdf_attempted"], second["pdf_deferred"]), (0, 2))
+        self.assertEqual(second["residual_ids"], sorted(diagnoses))
+        self.assertEqual(second["deferred_ids"], sorted(diagnoses))
+        self.assertEqual(translate_full.call_count, 2)
+
+    def test_retries_run_shortest_first_with_outliers_in_slow_lane(self):
+        costs = {"2607.00021": 4000, "2607.00022": 2500, "2607.00023": 100, "2607.00024": 600}
+        with tempfile.TemporaryDirectory() as tmp:
+            translate_full = Mock(
+                return_value={"pdf_path": None, "error": "compile failed"}
+            )
+            fake_translate_mod = types.SimpleNamespace(
+                CONTAINER_NAME="latex",
+                TEX_BACKUP_DIR=tmp,
+                TEX_FAILED_BACKUP_DIR=tmp,
+                _restore_tex_to_container=Mock(return_value=False),
+                translate_full=translate_full,
+            )
+            docker_test = Mock()
+            docker_test.return_value.returncode = 1
+
+            with patch.dict(
+                sys.modules, {"translate_full": fake_translate_mod}
+            ), patch.dict(
+                os.environ,
+                {"PAPER_TRANS_PDF_OUTLIER_SECONDS": "1800",
+                 "PAPER_TRANS_PDF_SLOW_LANE_SECONDS": "3000"},
+            ), patch(
+                "run_papers._pdf_cost_estimator", return_value=costs.get
+            ), patch(
+                "run_papers.paper_store.read_raw", return_value={}
+            ), patch(
+                "run_papers._pdf_store_hit", return_value=None
+            ), patch(
+                "run_papers._pdf_quality_tainted", return_value=False
+            ), patch(
+                "run_papers.read_json", return_value={}
+            ), patch(
+                "run_papers._paper_store_update_pdf_status"
+            ), patch(
+                "run_papers.subprocess.run", docker_test
+            ):
+                result = run_papers.retry_failed_pdf_entries(
+                    [{"arxiv_id": aid, "pdf_status": "failed"} for aid in costs],
+                    label="[test]",
+                )
+
+        self.assertEqual(
+            [c.kwargs["arxiv_id"] for c in translate_full.call_args_list],
+            ["2607.00023", "2607.00024", "2607.00022"],
+        )
+        # 4000 s 的论文超出慢车道预算，保持 failed 顺延到下轮
+        self.assertEqual((result["pdf_attempted"], result["pdf_deferred"]), (3, 1))
+        self.assertEqual(result["residual_ids"], sorted(costs))
+        self.assertEqual(result["deferred_ids"], ["2607.00021"])
+
+    def test_deferred_counter_survives_stat_merges(self):
+        import run_repair
+
+        first = {"pdf_attempted": 2, "pdf_failed": 2, "pdf_deferred": 1,
+                 "residual_ids": ["2607.00021", "2607.00022"], "deferred_ids": ["2607.00021"]}
+        second = {"pdf_attempted": 1, "pdf_failed": 1, "pdf_deferred": 1,
+                  "residual_ids": ["2607.00031"], "deferred_ids": ["2607.00031"]}
+
+        for module in (run_papers, run_repair):
+            stats = module._new_stats()
+            module._merge_stats(stats, first)
+            module._merge_stats(stats, second)
+
+            self.assertEqual(stats["pdf_deferred"], 2, module.__name__)
+            self.assertEqual(stats["deferred_ids"], ["2607.00021", "2607.00031"])
+            self.assertEqual(stats["residual_failures"], 3)
+            self.assertIn("顺延=2", module._stats_line(stats))
+
     def test_existing_ok_pdf_still_clears_stale_failure_artifacts(self):
         with tempfile.TemporaryDirectory() as tmp:
             aid = "2606.00005"
@@ -162,8 +305,10 @@ class RunPapersRetryTest(unittest.TestCase):
             "pdf_attempted": 1,
             "pdf_succeeded": 1,
             "pdf_failed": 0,
+            "pdf_deferred": 0,
             "residual_failures": 0,
             "residual_ids": [],
+            "deferred_ids": [],
         })
         self.assertEqual(papers[0]["pdf_status"], "ok")
         self.assertEqual(
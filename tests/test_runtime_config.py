@@ -35,6 +35,31 @@ class RuntimeConfigTests(unittest.TestCase):
             {"test-model": "https://example.invalid"},
         )
 
+    @mock.patch.dict(
+        os.environ,
+        dict(
+            RUNTIME_ENV,
+            GPT_ACADEMIC_LLM_ENDPOINTS_JSON=(
+                '[{"name":"b","api_base":"https://b.invalid/v1","api_key":"k","weight":2,"rpm":60}]'
+            ),
+        ),
+        clear=True,
+    )
+    def test_optional_endpoint_pool_is_rendered_as_python_literal(self):
+        namespace = {}
+        exec(render_config(), namespace)
+
+        self.assertEqual(namespace["PAPER_TRANS_LLM_ENDPOINTS"][0]["weight"], 2)
+
+    @mock.patch.dict(
+        os.environ,
+        dict(RUNTIME_ENV, GPT_ACADEMIC_LLM_ENDPOINTS_JSON='[{"api_base":"x","api_key":"k","tls":true}]'),
+        clear=True,
+    )
+    def test_endpoint_pool_rejects_unknown_or_non_python_fields(self):
+        with self.assertRaisesRegex(ValueError, "tls"):
+            render_config()
+
     @mock.patch.dict(os.environ, RUNTIME_ENV, clear=True)
     def test_written_runtime_config_is_owner_only_and_idempotent(self):
         with tempfile.TemporaryDirectory() as directory:
@@ -0,0 +1,170 @@
+import difflib
+import json
+import os
+import random
+import re
+import time
+import unittest
+
+import latex_translation_filters as filters
+from paperhub import text_similarity
+
+CHUNKS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "benchmarks", "tex_corpus", "chunks.json",
+)
+_STEMS = (
+    "overview main results ablation pipeline architecture qualitative comparison "
+    "attention scaling dataset stats training curve loss example failure case prompt"
+).split()
+_NAMESPACES = ("fig", "tab", "sec", "eq", "alg", "app")
+
+
+def _dp_lcs(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _reference_label_replacement(label, labels, original_refs):
+    # 迁移前基于 SequenceMatcher 的模糊匹配分支（冻结副本）
+    namespace = label.split(":", 1)[0]
+    comparable = [
+        target for target in sorted(set(labels))
+        if target.startswith(namespace + ":") and target in set(original_refs)
+    ]
+    scored = sorted(
+        (difflib.SequenceMatcher(None, label, target).ratio(), target)
+        for target in comparable
+    )
+    if not scored:
+        return None
+    best_score, best = scored[-1]
+    runner_up = scored[-2][0] if len(scored) > 1 else 0.0
+    if best_score >= 0.78 and best_score - runner_up >= 0.08:
+        return best
+    return None
+
+
+def _mutated_label(rng, label):
+    namespace, body = label.split(":", 1)
+    operation = rng.choice(("drop", "substitute", "suffix", "cjk", "swap"))
+    index = rng.randrange(len(body))
+    if operation == "drop" and len(body) > 2:
+        body = body[:index] + body[index + 1:]
+    elif operation == "substitute":
+        body = body[:index] + rng.choice("abcdefghij_-") + body[index + 1:]
+    elif operation == "suffix":
+        body += rng.choice(("1", "_2", "s", "-cn"))
+    elif operation == "cjk":
+        body += "图"
+    elif len(body) > 3:
+        index = min(index, len(body) - 2)
+        body = body[:index] + body[index + 1] + body[index] + body[index + 2:]
+    return namespace + ":" + body
+
+
+class TextSimilarityTest(unittest.TestCase):
+    def test_lcs_matches_dynamic_programming(self):
+        rng = random.Random(20261019)
+        for _ in range(2000):
+            a = "".join(rng.choice("abc d图") for _ in range(rng.randint(0, 25)))
+            b = "".join(rng.choice("abc d图") for _ in range(rng.randint(0, 25)))
+            self.assertEqual(text_similarity.lcs_length(a, b), _dp_lcs(a, b), (a, b))
+
+    def test_cutoff_bounded_lcs_agrees_with_full_computation(self):
+        rng = random.Random(48)
+        for _ in range(2000):
+            a = "".join(rng.choice("the model ") for _ in range(rng.randint(0, 40)))
+            b = "".join(rng.choice("the model ") for _ in range(rng.randint(0, 40)))
+            exact = _dp_lcs(a, b)
+            minimum = rng.randint(0, 40)
+            bounded = text_similarity.lcs_length(a, b, minimum)
+            # 能达标时给出精确值，否则提前返回一个低于下限的值
+            if exact >= minimum:
+                self.assertEqual(bounded, exact, (a, b, minimum))
+            else:
+                self.assertLess(bounded, minimum, (a, b, minimum))
+            for cutoff in (0.78, 0.92):
+                full = text_similarity.ratio(a, b)
+                capped = text_similarity.ratio(a, b, cutoff=cutoff)
+                self.assertEqual(capped >= cutoff, full >= cutoff, (a, b, cutoff))
+                if full >= cutoff:
+                    self.assertEqual(capped, full)
+
+    def test_ratio_scale_and_bounds(self):
+        self.assertEqual(text_similarity.ratio("", ""), 1.0)
+        self.assertEqual(text_similarity.ratio("abc", ""), 0.0)
+        self.assertEqual(text_similarity.ratio("fig:overview", "fig:overview"), 1.0)
+        self.assertEqual(text_similarity.ratio("abcd", "wxyz", cutoff=0.5), 0.0)
+        rng = random.Random(7)
+        for _ in range(500):
+            a = "".join(rng.choice("the model ") for _ in range(rng.randint(1, 40)))
+            b = "".join(rng.choice("the model ") for _ in range(rng.randint(1, 40)))
+            value = text_similarity.ratio(a, b)
+            # SequenceMatcher 的匹配块是公共子序列：新值不低于旧值，且不超过两个上界
+            self.assertGreaterEqual(value + 1e-12, difflib.SequenceMatcher(None, a, b).ratio())
+            self.assertLessEqual(value, text_similarity.upper_bound(a, b) + 1e-12)
+            self.assertLessEqual(value, text_similarity.length_bound(a, b) + 1e-12)
+
+    def test_label_decisions_match_sequence_matcher_calibration(self):
+        rng = random.Random(20261019)
+        for _ in range(1500):
+            labels = sorted({
+                rng.choice(_NAMESPACES) + ":" + rng.choice(("_", "-", "")).join(
+                    rng.sample(_STEMS, rng.randint(1, 3))
+                )
+                for _ in range(rng.randint(2, 60))
+            })
+            label = _mutated_label(rng, rng.choice(labels))
+            if label in labels or label.split(":", 1)[1].startswith(("_", "-")):
+                continue
+            self.assertEqual(
+                filters.unique_label_replacement(label, labels, labels),
+                _reference_label_replacement(label, labels, labels),
+                label,
+            )
+
+    def test_untranslated_decisions_on_chunk_corpus(self):
+        with open(CHUNKS_PATH, encoding="utf-8") as handle:
+            chunks = json.load(handle)
+        expected = {
+            "prose_untranslated": True,
+            "mixed_partial": True,
+            "prompt_source_data": True,
+            "failure_payload": True,
+        }
+        for chunk in chunks:
+            self.assertEqual(
+                filters.llm_translation_response_untranslated(chunk["source"], chunk["response"]),
+                expected.get(chunk["name"], False),
+                chunk["name"],
+            )
+            # 短句原样回显：走相似度分支，判定与 SequenceMatcher 阈值一致
+            words = re.findall(r"\b[A-Za-z][A-Za-z'-]{1,}\b", filters.extract_translation_fragment(chunk["source"]))
+            short = " ".join(words[:5])
+            echo = short.replace("the ", "", 1)
+            self.assertEqual(
+                text_similarity.ratio(short.lower(), echo.lower(), cutoff=0.92) >= 0.92,
+                difflib.SequenceMatcher(None, short.lower(), echo.lower()).ratio() >= 0.92,
+                chunk["name"],
+            )
+
+    def test_hundreds_of_labels_and_long_chunks_do_not_stall(self):
+        labels = ["fig:panel_%03d_%s" % (index, _STEMS[index % len(_STEMS)]) for index in range(600)]
+        long_source = "The model retrieves evidence from every passage. " * 400
+        long_response = long_source.replace("every", "each")
+
+        started = time.perf_counter()
+        for index in range(0, 600, 3):
+            filters.unique_label_replacement(labels[index] + "x", labels, labels)
+        self.assertTrue(filters.llm_translation_response_untranslated(long_source, long_response))
+        self.assertLess(time.perf_counter() - started, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -67,6 +67,99 @@ class TranslateArxivTest(unittest.TestCase):
             {"type": "json_object"},
         )
 
+    def test_call_llm_fails_over_when_pool_endpoint_is_out_of_quota(self):
+        import llm_router
+
+        exhausted = Mock(status_code=403, text='{"error":{"code":"insufficient_user_quota"}}')
+        ok = Mock(status_code=200)
+        ok.raise_for_status.return_value = None
+        ok.json.return_value = {"choices": [{"message": {"content": "译文"}}]}
+        config = {
+            "api_base": "https://primary.test/v1/chat/completions",
+            "api_key": "primary-key",
+            "model": "test-model",
+            "router": llm_router.LlmRouter([
+                llm_router.Endpoint("a", "https://a.test/v1", "key-a", weight=10),
+                llm_router.Endpoint("b", "https://b.test/v1", "key-b", model="model-b"),
+            ]),
+        }
+
+        with patch("translate_arxiv.requests.post", side_effect=[exhausted, ok]) as post, \
+                patch("translate_arxiv.time.sleep") as sleep:
+            result = translate_arxiv.call_llm([{"role": "user", "content": "x"}], config)
+
+        self.assertEqual(result, "译文")
+        sleep.assert_not_called()
+        first, second = post.call_args_list
+        self.assertEqual(first.args[0], "https://a.test/v1/chat/completions")
+        self.assertEqual(second.args[0], "https://b.test/v1/chat/completions")
+        self.assertEqual(second.kwargs["headers"]["Authorization"], "Bearer key-b")
+        self.assertEqual(second.kwargs["json"]["model"], "model-b")
+
+    def test_failover_does_not_spend_a_retry_or_skip_the_backoff(self):
+        import llm_router
+
+        limited = Mock(status_code=429, text="Too Many Requests")
+        ok = Mock(status_code=200)
+        ok.raise_for_status.return_value = None
+        ok.json.return_value = {"choices": [{"message": {"content": "译文"}}]}
+        config = {
+            "api_base": "https://primary.test/v1/chat/completions",
+            "api_key": "primary-key",
+            "model": "test-model",
+            "router": llm_router.LlmRouter([
+                llm_router.Endpoint("a", "https://a.test/v1", "key-a", weight=10),
+                llm_router.Endpoint("b", "https://b.test/v1", "key-b"),
+            ]),
+        }
+        timeout = translate_arxiv.requests.exceptions.Timeout("read timed out")
+
+        with patch.object(translate_arxiv, "PROXY", ""), \
+                patch("translate_arxiv.requests.post", side_effect=[limited, timeout, ok]) as post, \
+                patch("translate_arxiv.time.sleep") as sleep, \
+                patch("builtins.print") as printed:
+            result = translate_arxiv.call_llm([{"role": "user", "content": "x"}], config, max_retries=2)
+
+        self.assertEqual(result, "译文")
+        self.assertEqual(post.call_count, 3)
+        # 429 切换端点不算一次重试：超时仍按第 1/2 次重试退避
+        sleep.assert_called_once_with(1)
+        lines = " ".join(str(call.args[0]) for call in printed.call_args_list)
+        self.assertIn("尝试 1/2", lines)
+        self.assertNotIn("尝试 2/2", lines)
+
+        with patch.object(translate_arxiv, "PROXY", ""), \
+                patch("translate_arxiv.requests.post", side_effect=[timeout, timeout]), \
+                patch("translate_arxiv.time.sleep"), patch("builtins.print"):
+            with self.assertRaisesRegex(RuntimeError, "已重试 2 次"):
+                translate_arxiv.call_llm([{"role": "user", "content": "x"}], config, max_retries=2)
+
+    def test_proxy_fallback_does_not_penalize_the_routed_endpoint(self):
+        import llm_router
+
+        ok = Mock(status_code=200)
+        ok.raise_for_status.return_value = None
+        ok.json.return_value = {"choices": [{"message": {"content": "译文"}}]}
+        endpoint = llm_router.Endpoint("a", "https://a.test/v1", "key-a")
+        config = {
+            "api_base": "https://primary.test/v1/chat/completions",
+            "api_key": "primary-key",
+            "model": "test-model",
+            "router": llm_router.LlmRouter([endpoint]),
+        }
+
+        with patch.object(translate_arxiv, "PROXY", "http://127.0.0.1:7890"), \
+                patch("translate_arxiv.requests.post",
+                      side_effect=[translate_arxiv.requests.exceptions.ProxyError("refused"), ok]) as post, \
+                patch("llm_router.classify_failure") as classify:
+            result = translate_arxiv.call_llm([{"role": "user", "content": "x"}], config)
+
+        self.assertEqual(result, "译文")
+        self.assertEqual(post.call_args_list[1].kwargs["proxies"], {"http": "", "https": ""})
+        classify.assert_not_called()
+        self.assertEqual(endpoint.error_rate, 0.0)
+        self.assertEqual(endpoint.inflight, 0)
+
     def test_translate_paper_requests_json_mode(self):
         translated = (
             '{"title_zh":"测试标题","abstract_zh":"测试摘要",'
@@ -1,8 +1,10 @@
+import io
 import json
 import os
 import signal
 import subprocess
 import sys
+import tarfile
 import tempfile
 import threading
 import time
@@ -109,10 +111,11 @@ class TranslateFullCommandTest(unittest.TestCase):
             with open(backup, "w", encoding="utf-8") as handle:
                 handle.write("last-good")
 
+            staged = f"{backup}.tmp.{os.getpid()}"
+
             def docker_control(command, operation, **_):
-                if command[1] == "exec":
-                    return mock.Mock(returncode=0)
-                with open(command[-1], "w", encoding="utf-8") as handle:
+                self.assertEqual(command[-2], "get")
+                with open(staged, "w", encoding="utf-8") as handle:
                     handle.write("partial")
                 return None
 
@@ -148,11 +151,15 @@ class TranslateFullCommandTest(unittest.TestCase):
             os.utime(failed, ns=(2_000_000_000, 2_000_000_000))
 
             copied = []
+            specs = []
 
-            def docker_control(command, operation, **_):
-                if command[1] == "cp":
-                    copied.append(command[2])
-                return mock.Mock(returncode=0)
+            def docker_control(command, operation, **kwargs):
+                self.assertEqual(command[-2], "put")
+                specs.append(json.loads(command[-1]))
+                with tarfile.open(fileobj=io.BytesIO(kwargs["input"])) as tar:
+                    for member in tar.getmembers():
+                        copied.append(tar.extractfile(member).read().decode("utf-8"))
+                return mock.Mock(returncode=0, stdout=b"", stderr=b"")
 
             with mock.patch.object(translate_full, "TEX_BACKUP_DIR", good_dir), \
                  mock.patch.object(
@@ -164,17 +171,16 @@ class TranslateFullCommandTest(unittest.TestCase):
                      translate_full,
                      "_run_docker_control",
                      side_effect=docker_control,
-                 ), \
-                 mock.patch.object(
-                     translate_full,
-                     "_ensure_workfolder_writable",
-                     return_value=True,
                  ):
                 self.assertTrue(
                     translate_full._restore_tex_to_container(arxiv_id)
                 )
 
-            self.assertEqual(copied, [failed])
+            self.assertEqual(copied, ["new translated tex"])
+            self.assertEqual(
+                specs,
+                [{"writable": [translate_full._container_workfolder(arxiv_id)]}],
+            )
 
     @unittest.skipUnless(os.path.isdir("/proc"), "requires Linux /proc")
     def test_process_helper_terminates_real_scoped_descendant_tree(self):
@@ -0,0 +1,96 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from paperhub.translation_quality import analyze_tex, is_untranslated_prose, tex_quality_gate
+
+_ENGLISH = (
+    "This ordinary paragraph remains untranslated and explains how the model "
+    "retrieves evidence from many passages before it answers the question."
+)
+_CHINESE = "本段为中文正文，介绍方法细节与实验设置，并讨论了主要结果。"
+_PIECES = (
+    _ENGLISH,
+    _CHINESE,
+    _CHINESE + " the model retrieves evidence from several passages " + _CHINESE,
+    "\\section{Introduction}",
+    "% " + _ENGLISH,
+    "\\begin{lstlisting}",
+    "\\end{lstlisting}",
+    "\\begin{table}",
+    "\\end{table}",
+    "短句",
+    "",
+)
+_SHARED_KEYS = (
+    "cjk", "letters", "cjk_pct", "prose_lines", "long_english_lines",
+    "very_long_english_lines", "mixed_english_clause_count",
+)
+
+
+class TexQualityGateTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def _write(self, text, name="paper.tex"):
+        path = self.tmp / name
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            handle.write(text)
+        return path
+
+    def test_gate_verdict_matches_full_report(self):
+        rng = random.Random(20261019)
+        for index in range(60):
+            newline = rng.choice(("\n", "\r\n", "\r", "\x0c\n"))
+            weights = [rng.random() for _ in _PIECES]
+            lines = rng.choices(_PIECES, weights=weights, k=rng.randint(0, 600))
+            path = self._write(
+                "\\begin{document}" + newline + newline.join(lines)
+                + newline + "\\end{document}" + newline,
+                "doc%d.tex" % index,
+            )
+            full = analyze_tex(path)
+            gate = tex_quality_gate(path)
+
+            self.assertEqual(gate["untranslated"], is_untranslated_prose(full), index)
+            if not gate["early_verdict"]:
+                for key in _SHARED_KEYS:
+                    self.assertEqual(gate[key], full[key], (index, key))
+                self.assertEqual(gate["samples"], full["samples"], index)
+
+    def test_untranslated_file_fails_without_reading_to_the_end(self):
+        lines = ["\\begin{document}"] + [_ENGLISH] * 3000 + ["\\end{document}"]
+        path = self._write("\n".join(lines) + "\n")
+
+        gate = tex_quality_gate(path)
+
+        self.assertTrue(gate["untranslated"])
+        self.assertTrue(gate["early_verdict"])
+        self.assertLess(gate["lines_read"], 200)
+        self.assertEqual(gate["samples"][0]["line"], 2)
+        self.assertNotIn("top_english_words", gate)
+
+    def test_translated_file_passes_with_samples_on_original_lines(self):
+        lines = (
+            ["\\begin{document}"] + [_CHINESE] * 400 + [_ENGLISH]
+            + [_CHINESE] * 400 + ["\\end{document}"]
+        )
+        path = self._write("\r\n".join(lines) + "\r\n")
+
+        gate = tex_quality_gate(path)
+        full = analyze_tex(path)
+
+        self.assertFalse(gate["untranslated"])
+        self.assertFalse(is_untranslated_prose(full))
+        self.assertEqual([sample["line"] for sample in full["samples"]], [402])
+        if not gate["early_verdict"]:
+            self.assertEqual(gate["samples"], full["samples"])
+        # 完整报告保留诊断计数
+        self.assertIn("top_english_words", full)
+
+
+if __name__ == "__main__":
+    unittest.main()
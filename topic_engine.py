@@ -509,7 +509,7 @@ def _clear_topic_pdf_failure_artifacts(arxiv_id):
             print(f"[topic] 清理旧 PDF 失败现场失败 {path}: {exc}", flush=True)
 
 
-def _ensure_pdf(arxiv_id):
+def _ensure_pdf(arxiv_id, translate=True):
     diagnosis = read_json(_topic_pdf_failure_sidecar(arxiv_id), {})
     quality_tainted = paper_store.pdf_quality_tainted(arxiv_id)
     force_retranslation = (
@@ -523,6 +523,10 @@ def _ensure_pdf(arxiv_id):
         paper_store.update_pdf_status(arxiv_id, "ok")
         _clear_topic_pdf_failure_artifacts(arxiv_id)
         return True
+    if not translate:
+        # nightly 规划阶段已尝试过；失败结果留给重试流程
+        paper_store.update_pdf_status(arxiv_id, "failed")
+        return False
     from translate_full import translate_full
 
     result = translate_full(
@@ -536,18 +540,27 @@ def _ensure_pdf(arxiv_id):
             paper_store.update_pdf_status(arxiv_id, "failed")
             return False
         _clear_topic_pdf_failure_artifacts(arxiv_id)
+        try:
+            paper_store.optimize_pdf(arxiv_id)
+        except Exception as e:
+            print(f"[topic] ⚠️ PDF 优化失败，保留原文件: {e}", flush=True)
         return True
     paper_store.update_pdf_status(arxiv_id, "failed")
     return False
 
 
-def run_topic(slug_or_query, key=None, limit=3, do_full_translate=True, force=False, refresh_terms=False):
+def plan_topic(slug_or_query, key=None, limit=3, force=False, refresh_terms=False, votes=None):
+    """Fetch and rank one topic's candidates; returns ``(profile, key, ranked)``.
+
+    ``votes`` lets a caller planning several topics share one HF vote table.
+    """
     key = key or datetime.now().strftime("%Y-%m-%d")
     profile = ensure_topic(slug_or_query, refresh_terms=refresh_terms)
     slug = profile["slug"]
     print(f"[topic] 开始: {slug} {key}", flush=True)
     candidates = fetch_arxiv_candidates(profile)
-    votes = fetch_hf_votes()
+    if votes is None:
+        votes = fetch_hf_votes()
     ranked = rank_candidates(
         profile,
         candidates,
@@ -557,12 +570,24 @@ def run_topic(slug_or_query, key=None, limit=3, do_full_translate=True, force=Fa
         force=force,
         key=key,
     )
+    return profile, key, ranked
+
+
+def run_topic(slug_or_query, key=None, limit=3, do_full_translate=True, force=False, refresh_terms=False,
+              planned=None, attempted=()):
+    """Translate and publish one topic day; ids in ``attempted`` are not retried."""
+    if planned is None:
+        planned = plan_topic(slug_or_query, key=key, limit=limit, force=force, refresh_terms=refresh_terms)
+    profile, key, ranked = planned
+    slug = profile["slug"]
 
     papers = []
     for i, cand in enumerate(ranked, 1):
         aid = cand["arxiv_id"]
         print(f"[topic] [{i}/{len(ranked)}] {aid} score={cand['topic_score']}", flush=True)
         try:
+            if aid in attempted and not paper_store.read_translated(aid):
+                raise RuntimeError("摘要本轮已尝试失败")
             translated = _translate_summary(cand, i, slug, key)
             entry = {**cand, **translated, "rank": i}
         except Exception as e:
@@ -571,7 +596,7 @@ def run_topic(slug_or_query, key=None, limit=3, do_full_translate=True, force=Fa
             entry = {**cand, **stored, "rank": i, "error": str(e)}
         if do_full_translate:
             try:
-                if _ensure_pdf(aid):
+                if _ensure_pdf(aid, translate=aid not in attempted):
                     entry["pdf_zh"] = f"papers/{aid}_zh.pdf"
                 else:
                     entry["pdf_zh_failed"] = True
@@ -713,8 +738,12 @@ def repair_topic(topic=None, key=None, days=None, scan_all=False, processed_ids=
     return total_fixed
 
 
-def retry_topic_pdf(topic=None, key=None, days=None, scan_all=False, processed_ids=None):
-    """Retry topic pdf_status=failed entries using the same retry logic as daily."""
+def retry_topic_pdf(topic=None, key=None, days=None, scan_all=False, processed_ids=None, deferred_ids=None):
+    """Retry topic pdf_status=failed entries using the same retry logic as daily.
+
+    Ids skipped by the retry ledger or the slow-lane budget are added to
+    ``deferred_ids`` when a set is given.
+    """
     from run_papers import retry_failed_pdf_entries
 
     total_ok = 0
@@ -747,6 +776,8 @@ def retry_topic_pdf(topic=None, key=None, days=None, scan_all=False, processed_i
         )
         total_ok += result["ok"]
         total_fail += result["failed"]
+        if deferred_ids is not None:
+            deferred_ids.update(result.get("deferred_ids", ()))
         if result["changed"]:
             updates = {
                 paper.get("arxiv_id"): {
@@ -15,6 +15,7 @@ import argparse
 from datetime import datetime
 from pathlib import Path
 
+import llm_router
 from paperhub import paper_store
 from paperhub.env_config import get_env
 from paperhub.paths import PAPER_STORE_DIR, TEX_BACKUP_DIR
@@ -162,6 +163,11 @@ def load_api_config():
     else:
         config["base_url"] = base.rstrip("/")
 
+    # 可选的多端点池（PAPER_TRANS_LLM_ENDPOINTS）：按延迟/错误率路由，额度/鉴权失败自动切换
+    endpoints = llm_router.load_config_pool(GPT_ACADEMIC_CONFIG)
+    if len(endpoints) > 1:
+        config["router"] = llm_router.LlmRouter(endpoints)
+
     return config
 
 
@@ -242,18 +248,52 @@ def call_llm(messages, config, max_tokens=4000, max_retries=3, response_format=N
 
     proxies = {"http": PROXY, "https": PROXY}
     last_exc = None
-
-    for attempt in range(max_retries):
+    router = config.get("router")
+    # 端点切换不占用重试次数（退避与日志只按真实重试计数）；每次调用最多切换 端点数-1 次
+    max_failovers = len(router.endpoints) - 1 if router else 0
+    failovers = 0
+    attempt = 0
+
+    while attempt < max_retries:
+        endpoint = None
+        target_url, request_kwargs = url, {"headers": headers, "json": payload}
+        if router:
+            endpoint = router.acquire()
+            target_url, request_kwargs = endpoint.rewrite(url, request_kwargs)
+        started = time.monotonic()
         try:
-            resp = requests.post(url, headers=headers, json=payload,
-                                 proxies=proxies, timeout=120)
+            resp = requests.post(target_url, proxies=proxies, timeout=120, **request_kwargs)
+            if endpoint is not None and resp.status_code >= 400:
+                category = router.report(
+                    endpoint, time.monotonic() - started,
+                    f"{resp.status_code} {getattr(resp, 'text', '')[:500]}",
+                )
+                endpoint = None
+                if (
+                    category in llm_router.FAILOVER_CATEGORIES
+                    and failovers < max_failovers
+                    and router.has_available()
+                ):
+                    print(f"  ⚠️ LLM 端点触发 {category}，切换到下一个端点...", flush=True)
+                    last_exc = RuntimeError(f"{category}: HTTP {resp.status_code}")
+                    failovers += 1
+                    continue
             resp.raise_for_status()
-            return _extract_chat_completion_text(resp.json())
+            text = _extract_chat_completion_text(resp.json())
+            if endpoint is not None:
+                router.report(endpoint, time.monotonic() - started)
+                endpoint = None
+            return text
         except requests.exceptions.ProxyError:
             if proxies.get("https"):
                 print("  ⚠️ LLM 代理失败，切换直连重试...", flush=True)
                 proxies = {"http": "", "https": ""}
                 last_exc = None
+                if endpoint is not None:
+                    # 本地代理故障与端点无关：只归还占用，不计入错误率
+                    router.release(endpoint)
+                    endpoint = None
+                attempt += 1
                 continue
             last_exc = RuntimeError("代理不可用且直连也失败")
         except (requests.exceptions.SSLError,
@@ -274,8 +314,14 @@ def call_llm(messages, config, max_tokens=4000, max_retries=3, response_format=N
             print(f"  ⚠️ LLM 调用失败 (尝试 {attempt+1}/{max_retries}): {e}", flush=True)
             if attempt < max_retries - 1:
                 time.sleep(wait)
+        finally:
+            if endpoint is not None:
+                router.report(endpoint, time.monotonic() - started, repr(last_exc))
+        attempt += 1
 
-    raise RuntimeError(f"LLM API 调用失败（已重试 {max_retries} 次）: {last_exc}")
+    raise RuntimeError(
+        f"LLM API 调用失败（已重试 {attempt} 次，切换端点 {failovers} 次）: {last_exc}"
+    )
 
 
 def fetch_arxiv_metadata(arxiv_id, use_proxy=True):
@@ -2,7 +2,7 @@
 """
 全文翻译入口脚本 (容器外调用)
 使用 docker exec 在 GPT_ACADEMIC_CONTAINER 指定的容器内运行驱动脚本，
-翻译 arxiv 论文全文（LaTeX → 中文 PDF），然后 docker cp 取回 PDF。
+翻译 arxiv 论文全文（LaTeX → 中文 PDF），然后以 tar 流取回 PDF。
 
 用法:
   python3 translate_full.py <arxiv_id> -o <output_dir> [--no-cache] [--keep-translation] [--timeout 3600]
@@ -18,15 +18,19 @@ import json
 import fcntl
 import re
 import math
+import posixpath
+import selectors
 from pathlib import Path
 
 from paperhub.json_io import write_json_atomic
 from paperhub.paper_store import pdf_file_valid
+from paperhub import container_transfer, driver_events, phase_timing
 from paperhub.publication_lock import paper_publication_lock
 from paperhub.paths import (
     ROOT_DIR as BASE_DIR,
     DEFAULT_GPT_ACADEMIC_CONTAINER,
     LOCK_DIR,
+    LOGS_DIR,
     TEX_BACKUP_DIR,
     TEX_FAILED_BACKUP_DIR,
 )
@@ -36,10 +40,23 @@ CONTAINER_NAME  = os.environ.get("GPT_ACADEMIC_CONTAINER", DEFAULT_CONTAINER_NAM
 DRIVER_SCRIPT   = os.path.join(BASE_DIR, "full_translate_driver.py")
 DRIVER_SUPPORT_FILES = [
     DRIVER_SCRIPT,
+    os.path.join(BASE_DIR, "full_translate_service.py"),
     os.path.join(BASE_DIR, "latex_translation_filters.py"),
     os.path.join(BASE_DIR, "failure_taxonomy.py"),
+    os.path.join(BASE_DIR, "latex_format_cache.py"),
+    os.path.join(BASE_DIR, "figure_cache.py"),
+    os.path.join(BASE_DIR, "llm_concurrency.py"),
+    os.path.join(BASE_DIR, "llm_router.py"),
     os.path.join(BASE_DIR, "paperhub", "translation_quality.py"),
+    os.path.join(BASE_DIR, "paperhub", "driver_events.py"),
+    os.path.join(BASE_DIR, "paperhub", "pdf_cost.py"),
+    os.path.join(BASE_DIR, "paperhub", "quality_cache.py"),
+    os.path.join(BASE_DIR, "paperhub", "latex_scan.py"),
+    os.path.join(BASE_DIR, "paperhub", "text_similarity.py"),
 ]
+CONTAINER_SERVICE_SCRIPT = "/tmp/full_translate_service.py"
+# full_translate_service.py submit 在服务未运行时的退出码（EX_TEMPFAIL）
+SERVICE_UNAVAILABLE_EXIT_CODE = 75
 # 容器内 gpt_log/arxiv_cache 对应的绝对路径
 CONTAINER_CACHE = "/gpt/gpt_log/arxiv_cache"
 # 宿主机侧 tex 备份目录（容器重启后可从这里恢复翻译缓存，避免重复调 GPT）
@@ -172,6 +189,8 @@ import sys
 import time
 
 DRIVER = "/tmp/full_translate_driver.py"
+SERVICE = "/tmp/full_translate_service.py"
+JOB_REGISTRY = "/tmp/paper-trans-driver-jobs"
 ID_RE = re.compile(r"^\d{4}\.\d{4,5}$")
 
 
@@ -203,18 +222,47 @@ def snapshot():
     return result
 
 
-def driver_id(proc):
+def registered_jobs():
+    # 常驻服务 fork 出的任务沿用服务 argv，靠登记文件（pid + starttime）识别。
+    jobs = {}
+    try:
+        names = os.listdir(JOB_REGISTRY)
+    except OSError:
+        return jobs
+    for name in names:
+        if not name.isdigit():
+            continue
+        try:
+            with open(os.path.join(JOB_REGISTRY, name), encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if isinstance(entry, dict) and ID_RE.fullmatch(str(entry.get("arxiv_id", ""))):
+            jobs[int(name)] = entry
+    return jobs
+
+
+def driver_id(proc, jobs):
     argv = proc["argv"]
     for pos, arg in enumerate(argv[:-1]):
         if arg == DRIVER and ID_RE.fullmatch(argv[pos + 1]):
             return argv[pos + 1]
+        if (
+            arg == SERVICE and pos + 2 < len(argv)
+            and argv[pos + 1] == "submit" and ID_RE.fullmatch(argv[pos + 2])
+        ):
+            return argv[pos + 2]
+    job = jobs.get(proc["pid"])
+    if job and job.get("starttime") == proc["starttime"]:
+        return job["arxiv_id"]
     return ""
 
 
 def matching_drivers(table, selector):
     found = []
+    jobs = registered_jobs()
     for proc in table.values():
-        arxiv_id = driver_id(proc)
+        arxiv_id = driver_id(proc, jobs)
         if arxiv_id and (not selector or selector == arxiv_id):
             item = dict(proc)
             item.pop("argv", None)
@@ -366,88 +414,141 @@ def _container_translated_tex(arxiv_id: str) -> str:
     return f"{_container_workfolder(arxiv_id)}/merge_translate_zh.tex"
 
 
-def _container_tex_exists(arxiv_id: str) -> bool:
-    result = _run_docker_control(
-        ["docker", "exec", CONTAINER_NAME, "test", "-s", _container_translated_tex(arxiv_id)],
-        f"检查翻译 TeX {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+def _container_transfer(op: str, spec: dict, operation: str, payload: bytes = None):
+    """Run one batched transfer exec; ``put`` always gets an explicit stdin."""
+    if op == "put" and payload is None:
+        payload = b""
+    kwargs = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+    if payload is not None:
+        kwargs["input"] = payload
+    return _run_docker_control(
+        container_transfer.transfer_command(CONTAINER_NAME, op, spec),
+        operation, **kwargs,
     )
-    return result is not None and result.returncode == 0
 
 
-def _ensure_workfolder_writable(arxiv_id: str) -> bool:
-    workfolder = _container_workfolder(arxiv_id)
-    chown = _run_docker_control(
-        ["docker", "exec", "-u", "root", CONTAINER_NAME,
-         "chown", "-R", "gptuser:gptuser", workfolder],
-        f"修复 workfolder owner {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+def _transfer_error(result) -> str:
+    detail = container_transfer.parse_json_line(
+        (result.stderr or b"").decode("utf-8", "replace")
+    ).get("error")
+    return detail or (result.stderr or b"").decode("utf-8", "replace").strip()
+
+
+def _container_status(hash_paths=(), size_paths=()):
+    """One exec: SHA-256 of ``hash_paths`` and sizes (-1 = missing) of ``size_paths``."""
+    r = _container_transfer(
+        "status", {"hash": list(hash_paths), "size": list(size_paths)},
+        "检查容器文件状态",
     )
-    if chown is None or chown.returncode != 0:
-        print(f"⚠️  重设容器 workfolder owner 失败: {workfolder}", flush=True)
+    if r is None:
+        return None
+    payload = container_transfer.parse_json_line(
+        (r.stdout or b"").decode("utf-8", "replace")
+    )
+    if r.returncode != 0 or not payload.get("ok"):
+        msg = _transfer_error(r)
+        if msg:
+            print(f"❌ 检查容器文件状态失败: {msg}", flush=True)
+        return None
+    return payload
+
+
+def _container_put(files: dict, operation: str, writable=()) -> bool:
+    """One exec: extract ``{container_path: local_path}`` and re-own ``writable`` dirs."""
+    try:
+        payload = container_transfer.pack(files)
+    except OSError as exc:
+        print(f"❌ 打包待复制文件失败: {operation} ({exc})", flush=True)
         return False
-    chmod = _run_docker_control(
-        ["docker", "exec", "-u", "root", CONTAINER_NAME,
-         "chmod", "-R", "u+rw", workfolder],
-        f"修复 workfolder mode {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    r = _container_transfer(
+        "put", {"writable": list(writable)}, operation, payload=payload,
+    )
+    if r is None:
+        return False
+    if r.returncode != 0:
+        msg = _transfer_error(r)
+        if msg:
+            print(f"❌ {operation}失败: {msg}", flush=True)
+        return False
+    return True
+
+
+def _container_get(targets: dict, operation: str) -> dict:
+    """One exec: fetch ``{container_path: local_path}``; returns which arrived non-empty."""
+    r = _container_transfer("get", {"paths": list(targets)}, operation)
+    if r is None or r.returncode != 0:
+        return {path: False for path in targets}
+    try:
+        arrived = container_transfer.unpack(r.stdout or b"", targets)
+    except OSError as exc:
+        print(f"⚠️  写入取回文件失败: {operation} ({exc})", flush=True)
+        return {path: False for path in targets}
+    return {
+        path: ok and os.path.getsize(targets[path]) > 0
+        for path, ok in arrived.items()
+    }
+
+
+def _container_support_files() -> dict:
+    return {f"/tmp/{os.path.basename(src)}": src for src in DRIVER_SUPPORT_FILES}
+
+
+def _container_paper_status(arxiv_id: str):
+    """Driver file digests and the translated TeX size in a single exec."""
+    return _container_status(
+        hash_paths=_container_support_files(),
+        size_paths=[_container_translated_tex(arxiv_id)],
     )
-    ok = chmod is not None and chmod.returncode == 0
+
+
+def _container_tex_exists(arxiv_id: str, status: dict = None) -> bool:
+    container_tex = _container_translated_tex(arxiv_id)
+    if status is None:
+        status = _container_status(size_paths=[container_tex])
+    return bool(status) and status.get("size", {}).get(container_tex, -1) > 0
+
+
+def _ensure_workfolder_writable(arxiv_id: str) -> bool:
+    workfolder = _container_workfolder(arxiv_id)
+    ok = _container_put({}, f"修复 workfolder 权限 {arxiv_id}", writable=[workfolder])
     if not ok:
         print(f"⚠️  重设容器 workfolder 权限失败: {workfolder}", flush=True)
     return ok
 
 
-def _backup_tex_from_container(arxiv_id: str, failed: bool = False) -> bool:
-    """
-    将容器内已翻译的 merge_translate_zh.tex 备份到宿主机 TEX_BACKUP_DIR。
-    容器重启后可通过 _restore_tex_to_container 恢复，避免重新调用 GPT 翻译。
-    返回是否备份成功。
-    """
-    container_tex = _container_translated_tex(arxiv_id)
-    # 先确认文件在容器内存在且非空
-    check = _run_docker_control(
-        ["docker", "exec", CONTAINER_NAME, "test", "-s", container_tex],
-        f"检查待备份 TeX {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+def _staged_tex_backup(arxiv_id: str):
+    """Return a cleared host staging path for a TeX backup, or None."""
+    os.makedirs(TEX_BACKUP_DIR, exist_ok=True)
+    staged_tex = os.path.join(
+        TEX_BACKUP_DIR, f"{arxiv_id}_merge_translate_zh.tex.tmp.{os.getpid()}",
     )
-    if check is None or check.returncode != 0:
-        return False
-    backup_dir = TEX_FAILED_BACKUP_DIR if failed else TEX_BACKUP_DIR
-    os.makedirs(backup_dir, exist_ok=True)
-    local_tex = os.path.join(backup_dir, f"{arxiv_id}_merge_translate_zh.tex")
-    staged_tex = f"{local_tex}.tmp.{os.getpid()}"
     try:
         os.remove(staged_tex)
     except FileNotFoundError:
         pass
     except OSError as exc:
         print(f"⚠️  无法清理旧 TeX 备份临时文件: {staged_tex} ({exc})", flush=True)
-        return False
-    r = _run_docker_control(
-        ["docker", "cp", f"{CONTAINER_NAME}:{container_tex}", staged_tex],
-        f"备份翻译 TeX {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-    )
-    ok = (
-        r is not None
-        and r.returncode == 0
-        and os.path.exists(staged_tex)
-        and os.path.getsize(staged_tex) > 0
-    )
+        return None
+    return staged_tex
+
+
+def _install_tex_backup(arxiv_id: str, staged_tex: str, arrived: bool,
+                        failed: bool = False) -> bool:
+    """Atomically publish a fetched TeX backup; always consumes ``staged_tex``."""
+    backup_dir = TEX_FAILED_BACKUP_DIR if failed else TEX_BACKUP_DIR
+    local_tex = os.path.join(backup_dir, f"{arxiv_id}_merge_translate_zh.tex")
+    ok = arrived and os.path.exists(staged_tex) and os.path.getsize(staged_tex) > 0
     if ok:
         try:
+            os.makedirs(backup_dir, exist_ok=True)
             os.replace(staged_tex, local_tex)
         except OSError as exc:
             print(f"⚠️  翻译 TeX 备份落盘失败: {local_tex} ({exc})", flush=True)
-            try:
-                os.remove(staged_tex)
-            except OSError:
-                pass
-            return False
-        label = "失败现场 tex" if failed else "翻译 tex"
-        print(f"💾 已备份{label} 到宿主机: {local_tex}", flush=True)
-    else:
+            ok = False
+        else:
+            label = "失败现场 tex" if failed else "翻译 tex"
+            print(f"💾 已备份{label} 到宿主机: {local_tex}", flush=True)
+    if not ok and staged_tex:
         try:
             os.remove(staged_tex)
         except OSError:
@@ -455,6 +556,24 @@ def _backup_tex_from_container(arxiv_id: str, failed: bool = False) -> bool:
     return ok
 
 
+def _backup_tex_from_container(arxiv_id: str, failed: bool = False) -> bool:
+    """
+    将容器内已翻译的 merge_translate_zh.tex 备份到宿主机 TEX_BACKUP_DIR。
+    容器重启后可通过 _restore_tex_to_container 恢复，避免重新调用 GPT 翻译。
+    返回是否备份成功。
+    """
+    staged_tex = _staged_tex_backup(arxiv_id)
+    if staged_tex is None:
+        return False
+    container_tex = _container_translated_tex(arxiv_id)
+    arrived = _container_get(
+        {container_tex: staged_tex}, f"备份翻译 TeX {arxiv_id}",
+    )
+    return _install_tex_backup(
+        arxiv_id, staged_tex, arrived[container_tex], failed=failed,
+    )
+
+
 def _restore_tex_to_container(arxiv_id: str) -> bool:
     """
     将宿主机备份的 merge_translate_zh.tex 恢复到容器内 workfolder。
@@ -485,37 +604,23 @@ def _restore_tex_to_container(arxiv_id: str) -> bool:
             ),
         ),
     )
-    workfolder = _container_workfolder(arxiv_id)
-    # 确保容器内目标目录存在
-    mkdir = _run_docker_control(
-        ["docker", "exec", CONTAINER_NAME, "mkdir", "-p", workfolder],
-        f"创建 workfolder {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-    )
-    if mkdir is None or mkdir.returncode != 0:
-        print(f"⚠️  容器 workfolder 创建失败: {workfolder}", flush=True)
-        return False
     container_tex = _container_translated_tex(arxiv_id)
-    r = _run_docker_control(
-        ["docker", "cp", local_tex, f"{CONTAINER_NAME}:{container_tex}"],
-        f"恢复翻译 TeX {arxiv_id}",
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    # 一次 exec 完成建目录、写入和 owner 修复：驱动以 gptuser 运行，
+    # keep-translation 修复轮次需要改写 merge_translate_zh.tex。
+    ok = _container_put(
+        {container_tex: local_tex}, f"恢复翻译 TeX {arxiv_id}",
+        writable=[_container_workfolder(arxiv_id)],
     )
-    ok = r is not None and r.returncode == 0
     if ok:
-        # docker cp writes files as root. The driver runs as gptuser and needs to
-        # rewrite merge_translate_zh.tex during keep-translation repair passes.
-        ok = _ensure_workfolder_writable(arxiv_id)
-        if ok:
-            print(f"♻️  已从宿主机恢复翻译 tex 到容器: {container_tex} (来自 {os.path.basename(os.path.dirname(local_tex))})", flush=True)
+        print(f"♻️  已从宿主机恢复翻译 tex 到容器: {container_tex} (来自 {os.path.basename(os.path.dirname(local_tex))})", flush=True)
     return ok
 
 
-def _prepare_keep_translation(arxiv_id: str) -> bool:
+def _prepare_keep_translation(arxiv_id: str, status: dict = None) -> bool:
     """Prepare an existing translated tex for a compile-only retry."""
     if _restore_tex_to_container(arxiv_id):
         return True
-    if _container_tex_exists(arxiv_id):
+    if _container_tex_exists(arxiv_id, status):
         if _ensure_workfolder_writable(arxiv_id):
             print(f"♻️  容器内已有翻译 tex，直接复用: {_container_translated_tex(arxiv_id)}", flush=True)
             return True
@@ -532,39 +637,19 @@ def check_container():
     return r is not None and r.returncode == 0 and r.stdout.strip() == "true"
 
 
-def copy_driver_to_container():
-    """将驱动脚本及其纯 Python 支持模块复制进容器"""
-    copied = []
-    for src in DRIVER_SUPPORT_FILES:
-        name = os.path.basename(src)
-        dst = f"{CONTAINER_NAME}:/tmp/{name}"
-        r = _run_docker_control(
-            ["docker", "cp", src, dst],
-            f"复制容器驱动支持文件 {name}",
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
-        if r is None or r.returncode != 0:
-            if r is None:
-                return False
-            msg = (r.stderr or r.stdout or "").strip()
-            if msg:
-                print(f"❌ 复制 {name} 到容器失败: {msg}", flush=True)
-            return False
-        copied.append(f"/tmp/{name}")
-    chmod = _run_docker_control(
-        ["docker", "exec", "-u", "root", CONTAINER_NAME, "chmod", "0644", *copied],
-        "设置容器驱动支持文件权限",
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-        universal_newlines=True,
-    )
-    if chmod is None:
+def copy_driver_to_container(status: dict = None):
+    """将驱动脚本及其纯 Python 支持模块复制进容器（内容未变的文件跳过）"""
+    files = _container_support_files()
+    if status is None:
+        status = _container_status(hash_paths=files)
+    if status is None:
         return False
-    if chmod.returncode != 0:
-        msg = (chmod.stderr or chmod.stdout or "").strip()
-        if msg:
-            print(f"❌ 设置容器驱动脚本权限失败: {msg}", flush=True)
-    return chmod.returncode == 0
+    changed = container_transfer.changed_files(files, status.get("hash", {}))
+    if not changed:
+        return True
+    names = ", ".join(os.path.basename(path) for path in changed)
+    print(f"   更新容器驱动支持文件: {names}", flush=True)
+    return _container_put(changed, "复制容器驱动支持文件")
 
 
 def _container_process_tree_action(action: str, arxiv_id: str = "",
@@ -671,14 +756,19 @@ def _cleanup_container_driver(proc, arxiv_id: str):
     return cleanup
 
 
-def _container_driver_command(arxiv_id: str):
-    """Build docker exec command with an explicit, bounded LLM env allowlist."""
-    cmd = ["docker", "exec"]
+def _container_env_args():
+    """Explicit, bounded LLM/driver env allowlist forwarded into the container."""
+    args = []
     for name in (
         "HOST_PROXY",
         "PAPER_TRANS_LLM_HTTP_TIMEOUT",
         "PAPER_TRANS_LLM_MODEL",
         "PAPER_TRANS_LLM_WORKERS",
+        "PAPER_TRANS_LLM_MAX_WORKERS",
+        "PAPER_TRANS_LLM_ADAPTIVE",
+        "PAPER_TRANS_LLM_HEDGE_BUDGET",
+        "PAPER_TRANS_LLM_TTFT_SECONDS",
+        "PAPER_TRANS_LLM_PACK_TOKENS",
         "PAPER_TRANS_LLM_RETRIES",
         "PAPER_TRANS_FAILED_CHUNK_RETRY_ROUNDS",
         "PAPER_TRANS_EXPAND_TRANSLATION_SPLIT",
@@ -686,10 +776,19 @@ def _container_driver_command(arxiv_id: str):
         "PAPER_TRANS_EXTRA_SOFT_ENVS",
         "PAPER_TRANS_EXTRA_RESTORE_ENVS",
         "PAPER_TRANS_EXTRA_LLM_ARTIFACT_PATTERNS",
+        "PAPER_TRANS_LATEX_FORMAT_CACHE",
+        "PAPER_TRANS_FIGURE_CACHE",
+        "PAPER_TRANS_FIGURE_MAX_PIXELS",
     ):
         value = os.environ.get(name)
         if value:
-            cmd.extend(["-e", f"{name}={value}"])
+            args.extend(["-e", f"{name}={value}"])
+    return args
+
+
+def _container_driver_command(arxiv_id: str):
+    """Build docker exec command with an explicit, bounded LLM env allowlist."""
+    cmd = ["docker", "exec"] + _container_env_args()
     cmd.extend([
         CONTAINER_NAME,
         "python3", "-c", _CONTAINER_DRIVER_LAUNCHER, arxiv_id,
@@ -697,48 +796,118 @@ def _container_driver_command(arxiv_id: str):
     return cmd
 
 
+def _driver_service_enabled() -> bool:
+    value = os.environ.get("PAPER_TRANS_DRIVER_SERVICE", "1").strip().lower()
+    return value not in ("0", "off", "false", "no")
+
+
+def _container_service_command(arxiv_id: str):
+    """Submit one paper to the resident in-container driver service."""
+    cmd = ["docker", "exec"] + _container_env_args()
+    cmd.extend([CONTAINER_NAME, "python3", CONTAINER_SERVICE_SCRIPT, "submit", arxiv_id])
+    return cmd
+
+
+def _start_container_service() -> bool:
+    """Start the resident driver service detached; docker reaps it on exit."""
+    cmd = ["docker", "exec", "-d"] + _container_env_args()
+    cmd.extend([CONTAINER_NAME, "python3", CONTAINER_SERVICE_SCRIPT, "serve"])
+    result = _run_docker_control(
+        cmd, "启动容器常驻翻译服务",
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return result is not None and result.returncode == 0
+
+
 def run_in_container(arxiv_id: str, no_cache: bool, timeout: int,
                      keep_translation: bool = False):
     """
     在容器内运行翻译驱动，实时流式打印进度，返回 (returncode, stdout_full, "")
     每 30s 打印一次心跳，避免长时间无输出让人误以为卡死。
+
+    默认提交给容器内常驻服务（省去每篇重新 import gpt-academic 与 monkey patch）；
+    服务尚未运行时先后台拉起服务，本篇仍走一次性 launcher，下一篇即可复用。
     """
-    cmd = _container_driver_command(arxiv_id)
+    flags = []
     if no_cache:
-        cmd.append("--no-cache")
+        flags.append("--no-cache")
     if keep_translation:
-        cmd.append("--keep-translation")
+        flags.append("--keep-translation")
+
+    if _driver_service_enabled():
+        started = time.monotonic()
+        rc, stdout, err = _stream_container_command(
+            _container_service_command(arxiv_id) + flags, arxiv_id, timeout,
+        )
+        if rc != SERVICE_UNAVAILABLE_EXIT_CODE or not stdout.startswith("SERVICE:UNAVAILABLE"):
+            return rc, stdout, err
+        if _start_container_service():
+            print("   ℹ️  容器常驻翻译服务未就绪，已后台启动；本篇使用一次性驱动", flush=True)
+        remaining = max(1, int(timeout - (time.monotonic() - started)))
+        return _stream_container_command(
+            _container_driver_command(arxiv_id) + flags, arxiv_id, remaining,
+        )
+    return _stream_container_command(
+        _container_driver_command(arxiv_id) + flags, arxiv_id, timeout,
+    )
+
+
+def _driver_events_path(arxiv_id: str) -> str:
+    return os.path.join(LOGS_DIR, "driver_events", f"{arxiv_id}.jsonl")
+
+
+def _stream_container_command(cmd, arxiv_id: str, timeout: int):
+    """Stream one docker-exec driver command, enforcing timeout and tree cleanup.
 
+    Output is kept in a bounded DriverTranscript; typed driver events go to
+    ``logs/driver_events/<id>.jsonl`` instead of host memory.
+    """
     proc = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,   # 合并 stderr → stdout
     )
 
-    collected = []
+    transcript = driver_events.DriverTranscript(_driver_events_path(arxiv_id))
     t_start   = time.time()
     t_beat    = t_start   # 上次心跳时间
     BEAT_INTERVAL = 30    # 秒
+    WAIT_INTERVAL = 1.0   # 无输出时的最长等待；有输出时 selector 立即唤醒
     pending = b""
 
     def _emit_line(line_b: bytes):
         line = line_b.decode("utf-8", errors="replace").rstrip()
-        collected.append(line)
+        if transcript.feed(line) is not None:
+            return
         # 只打印有意义的行（驱动标记 + 结果）
         if any(tag in line for tag in ("[driver]", "RESULT:", "✅", "❌", "⚠")):
             elapsed = int(time.time() - t_start)
             print(f"   [{elapsed:4d}s] {line}", flush=True)
 
     if proc.stdout is None:
+        transcript.close()
         return -1, "", "无法读取容器输出"
     fd = proc.stdout.fileno()
     try:
         os.set_blocking(fd, False)
     except Exception:
         pass
+    selector = selectors.DefaultSelector()
+    try:
+        selector.register(fd, selectors.EVENT_READ)
+        watching = True
+    except (OSError, ValueError):
+        # 普通文件等不支持 epoll 的 fd：退回定时轮询
+        watching = False
+
+    def _wait():
+        if watching:
+            selector.select(WAIT_INTERVAL)
+        else:
+            time.sleep(0.5)
 
     def _drain_stdout():
-        nonlocal pending
+        nonlocal pending, watching
         while True:
             try:
                 chunk = os.read(fd, 65536)
@@ -747,6 +916,10 @@ def run_in_container(arxiv_id: str, no_cache: bool, timeout: int,
             except OSError:
                 break
             if not chunk:
+                if watching:
+                    # EOF 后 fd 永远可读，注销以免空转，等待进程退出
+                    selector.unregister(fd)
+                    watching = False
                 break
             pending += chunk
             while True:
@@ -776,24 +949,33 @@ def run_in_container(arxiv_id: str, no_cache: bool, timeout: int,
                 if pending:
                     _emit_line(pending)
                     pending = b""
-                return retcode, "\n".join(collected), ""
+                return retcode, transcript.text(), ""
 
             if time.time() - t_start > timeout:
                 cleanup = _cleanup_container_driver(proc, arxiv_id)
                 suffix = ""
                 if not cleanup.get("verified"):
                     suffix = "；容器进程树清理未完全验证"
-                return -1, "\n".join(collected), f"超时 ({timeout}s){suffix}"
+                return -1, transcript.text(), f"超时 ({timeout}s){suffix}"
 
-            time.sleep(0.5)
+            _wait()
 
     except Exception as e:
         _cleanup_container_driver(proc, arxiv_id)
-        return -1, "\n".join(collected), str(e)
+        return -1, transcript.text(), str(e)
+    finally:
+        selector.close()
+        transcript.close()
 
 
 def extract_result(stdout: str):
-    """从驱动脚本输出中提取结果路径（只认 SUCCESS 和 ERROR）"""
+    """从驱动脚本输出中提取结果路径（优先 result 事件，否则只认 SUCCESS 和 ERROR）"""
+    for line in stdout.splitlines():
+        event = driver_events.parse_event(line)
+        if event and event.get("event") == "result":
+            if event.get("status") == "success":
+                return "pdf", str(event.get("pdf") or "")
+            return "error", str(event.get("message") or "")
     for line in stdout.splitlines():
         if line.startswith("RESULT:SUCCESS:"):
             return "pdf", line[len("RESULT:SUCCESS:"):]
@@ -803,14 +985,12 @@ def extract_result(stdout: str):
 
 
 def copy_from_container(container_path: str, local_path: str):
-    """docker cp 将文件从容器复制到本地"""
-    r = _run_docker_control(
-        ["docker", "cp",
-         f"{CONTAINER_NAME}:{container_path}", local_path],
+    """将文件从容器取回本地（单次 tar 流）"""
+    arrived = _container_get(
+        {container_path: local_path},
         f"复制生成 PDF {os.path.basename(local_path)}",
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
     )
-    return r is not None and r.returncode == 0
+    return arrived[container_path]
 
 
 def _write_error_log(arxiv_id: str, stdout: str):
@@ -821,6 +1001,10 @@ def _write_error_log(arxiv_id: str, stdout: str):
     """
     diag = None
     for line in stdout.splitlines():
+        event = driver_events.parse_event(line)
+        if event and event.get("event") == "diagnosis" and isinstance(event.get("diagnosis"), dict):
+            diag = event["diagnosis"]
+            break
         if line.startswith("PDF_DIAGNOSIS:"):
             try:
                 diag = json.loads(line[len("PDF_DIAGNOSIS:"):])
@@ -1058,7 +1242,8 @@ class GlobalTranslationLock:
 
 def _translate_full_locked(arxiv_id: str, output_dir: str,
                            no_cache: bool = False, timeout: int = 3600,
-                           keep_translation: bool = False) -> dict:
+                           keep_translation: bool = False,
+                           timer: phase_timing.PhaseTimer = None) -> dict:
     """
     全文翻译主函数：仅以 PDF 为成功标准，失败则直接报错（由驱动内部重试）。
     Returns: {
@@ -1069,21 +1254,29 @@ def _translate_full_locked(arxiv_id: str, output_dir: str,
     """
     os.makedirs(output_dir, exist_ok=True)
     result = {'success': False, 'pdf_path': None, 'error': None}
+    timer = timer or phase_timing.PhaseTimer()
 
     # 1. 检查容器
-    if not check_container():
+    with timer.phase("check"):
+        running = check_container()
+    if not running:
         result['error'] = f"容器 {CONTAINER_NAME} 未运行"
         print(f"❌ {result['error']}", flush=True)
         return result
 
-    # 2. 复制驱动脚本
+    # 2. 复制驱动脚本（一次 exec 同时取回驱动文件 hash 与翻译 tex 状态）
     print(f"📦 复制驱动脚本到容器...", flush=True)
-    if not copy_driver_to_container():
+    with timer.phase("deploy"):
+        status = _container_paper_status(arxiv_id)
+        deployed = status is not None and copy_driver_to_container(status)
+    if not deployed:
         result['error'] = "无法复制驱动脚本到容器"
         print(f"❌ {result['error']}", flush=True)
         return result
 
-    if keep_translation and not _prepare_keep_translation(arxiv_id):
+    with timer.phase("prepare"):
+        prepared = not keep_translation or _prepare_keep_translation(arxiv_id, status)
+    if not prepared:
         result['error'] = f"找不到可复用的翻译 tex 备份: {arxiv_id}"
         print(f"❌ {result['error']}", flush=True)
         return result
@@ -1091,8 +1284,9 @@ def _translate_full_locked(arxiv_id: str, output_dir: str,
     # 3. 在容器内执行翻译
     print(f"🚀 启动容器内翻译 (timeout={timeout}s)...", flush=True)
     t0 = time.time()
-    rc, stdout, stderr = run_in_container(arxiv_id, no_cache, timeout,
-                                          keep_translation=keep_translation)
+    with timer.phase("container"):
+        rc, stdout, stderr = run_in_container(arxiv_id, no_cache, timeout,
+                                              keep_translation=keep_translation)
     elapsed = time.time() - t0
     print(f"⏱️  耗时: {elapsed:.0f}s", flush=True)
 
@@ -1107,6 +1301,8 @@ def _translate_full_locked(arxiv_id: str, output_dir: str,
     # 驱动脚本返回相对路径（相对于 /gpt），转为绝对路径（仅对文件路径操作，不处理错误消息）
     if kind in ("pdf", "zip", "tex") and container_path and not container_path.startswith("/"):
         container_path = "/gpt/" + container_path
+    if kind == "pdf" and container_path:
+        container_path = posixpath.normpath(container_path)
     print(f"   输出类型: {kind}  路径: {container_path}", flush=True)
 
     if kind == "error" or kind == "unknown":
@@ -1123,8 +1319,19 @@ def _translate_full_locked(arxiv_id: str, output_dir: str,
             output_dir,
             f".{arxiv_id}_zh.pdf.{os.getpid()}.tmp",
         )
+        container_tex = _container_translated_tex(arxiv_id)
+        staged_tex = _staged_tex_backup(arxiv_id)
+        targets = {container_path: temp_pdf}
+        if staged_tex is not None:
+            targets[container_tex] = staged_tex
         try:
-            if copy_from_container(container_path, temp_pdf):
+            # PDF 与翻译 tex 备份在同一个 tar 流里取回。
+            with timer.phase("fetch"):
+                arrived = _container_get(
+                    targets, f"复制生成 PDF {os.path.basename(local_pdf)}",
+                )
+            tex_arrived = staged_tex is not None and arrived.get(container_tex, False)
+            if arrived[container_path]:
                 if check_local_pdf_integrity(temp_pdf):
                     with open(temp_pdf, "rb") as handle:
                         os.fsync(handle.fileno())
@@ -1137,26 +1344,46 @@ def _translate_full_locked(arxiv_id: str, output_dir: str,
                     result['pdf_path'] = local_pdf
                     size_mb = os.path.getsize(local_pdf) / 1024 / 1024
                     print(f"✅ PDF 翻译成功: {local_pdf} ({size_mb:.2f} MB)", flush=True)
-                    _backup_tex_from_container(arxiv_id)
+                    _install_tex_backup(arxiv_id, staged_tex, tex_arrived)
                     _clear_error_log(arxiv_id)
                     _clear_failed_tex_backup(arxiv_id)
                 else:
                     result['error'] = "PDF 复制成功但文件损坏或为空（header/EOF 校验失败）"
                     print(f"❌ {result['error']}", flush=True)
-                    _backup_tex_from_container(arxiv_id, failed=True)
+                    _install_tex_backup(arxiv_id, staged_tex, tex_arrived, failed=True)
             else:
                 result['error'] = f"无法从容器复制 PDF: {container_path}"
                 print(f"❌ {result['error']}", flush=True)
-                _backup_tex_from_container(arxiv_id, failed=True)
+                _install_tex_backup(arxiv_id, staged_tex, tex_arrived, failed=True)
         finally:
-            try:
-                os.remove(temp_pdf)
-            except OSError:
-                pass
+            for leftover in (temp_pdf, staged_tex):
+                try:
+                    if leftover:
+                        os.remove(leftover)
+                except OSError:
+                    pass
 
     return result
 
 
+def _record_phase_timing(arxiv_id: str, timer, result: dict,
+                         no_cache: bool = False, keep_translation: bool = False):
+    """Append this run's host + driver phase timings to logs/phase_timing.jsonl."""
+    # 未进入容器阶段时，事件文件仍是上一次运行的，不能混入本次记录。
+    events = (
+        driver_events.load_events(_driver_events_path(arxiv_id))
+        if "container" in timer.phases else []
+    )
+    record = phase_timing.build_record(
+        arxiv_id, timer, events, bool(result.get("success")),
+        no_cache=no_cache, keep_translation=keep_translation,
+    )
+    try:
+        phase_timing.append_record(record)
+    except OSError as exc:
+        print(f"⚠️  写入阶段耗时记录失败: {exc}", flush=True)
+
+
 def translate_full(arxiv_id: str, output_dir: str,
                    no_cache: bool = False, timeout: int = 3600,
                    keep_translation: bool = False) -> dict:
@@ -1172,13 +1399,21 @@ def translate_full(arxiv_id: str, output_dir: str,
 
     try:
         with GlobalTranslationLock(arxiv_id, wait_seconds):
-            return _translate_full_locked(
+            # 计时从拿到全局锁开始：排队等待不算容器时间。
+            timer = phase_timing.PhaseTimer()
+            result = _translate_full_locked(
                 arxiv_id,
                 output_dir,
                 no_cache=no_cache,
                 timeout=timeout,
                 keep_translation=keep_translation,
+                timer=timer,
+            )
+            _record_phase_timing(
+                arxiv_id, timer, result,
+                no_cache=no_cache, keep_translation=keep_translation,
             )
+            return result
     except TimeoutError as exc:
         error = str(exc)
         print(f"❌ {error}", flush=True)
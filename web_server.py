@@ -462,6 +462,10 @@ def _do_submit_job(arxiv_id):
             paper_store.save_pdf(arxiv_id, r["pdf_path"])
             if not paper_store.mark_pdf_verified(arxiv_id):
                 raise RuntimeError("PDF 已生成但 paper store 状态提交失败")
+            try:
+                paper_store.optimize_pdf(arxiv_id)
+            except Exception as e:
+                print(f"[submit] ⚠️ PDF 优化失败，保留原文件: {e}", flush=True)
             paper_entry["pdf_zh"] = "papers/" + arxiv_id + "_zh.pdf"
             _upsert_manual_index(mode, key, paper_entry)
             _update_job(arxiv_id, status="done", msg="完成",